@@ -0,0 +1,133 @@
+from collections import deque
+from statistics import median
+from typing import Optional
+
+
+class ResolutionController:
+    """
+    Adjusts the detector input size (imgsz) to the recent per-frame latency
+    and the backlog in front of the worker. When the median latency of the
+    last frames exceeds the frame budget, or the queue stayed full over the
+    whole window, the size is lowered; when there is clear headroom and the
+    queue is mostly drained it is raised again, one step at a time. A
+    cooldown after every switch lets the new size settle before the next
+    decision.
+
+    A queue of one frame is refilled as soon as the worker takes its frame,
+    so being full says nothing about overload: with a queue_capacity below
+    2 only latency is considered.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 320,
+        max_size: int = 640,
+        target_latency_ms: float = 100.0,
+        initial_size: Optional[int] = None,
+        step: int = 32,
+        window: int = 10,
+        cooldown: int = 10,
+        high_water: float = 0.9,
+        low_water: float = 0.6,
+        queue_capacity: int = 1,
+        metrics=None,
+    ):
+        """
+        Args:
+            min_size (int): Smallest input size used under load.
+            max_size (int): Largest input size used with headroom.
+            target_latency_ms (float): Per-frame time budget, e.g.
+                1000 * frame_skip / source_fps.
+            initial_size (Optional[int]): Starting size, default max_size.
+            step (int): Size increment; sizes stay multiples of it, as
+                YOLO strides require.
+            window (int): Frames whose latency median drives decisions.
+            cooldown (int): Frames to wait after a switch.
+            high_water (float): Lower the size above this budget fraction.
+            low_water (float): Raise the size below this budget fraction.
+            queue_capacity (int): Size of the queue feeding the worker; a
+                queue full throughout the window counts as overload. Below
+                2 the queue depth is ignored.
+            metrics (MetricsLog, optional): Receives an "imgsz_switch"
+                event for every change.
+        """
+        if min_size > max_size:
+            raise ValueError("min_size must not exceed max_size")
+        self.step = step
+        self.max_size = self._snap(max_size)
+        # Rounded up: never below the configured lower bound.
+        self.min_size = min(self.max_size, self._snap(-(-int(min_size) // step) * step))
+        self.target_latency = target_latency_ms / 1000.0
+        self.size = min(
+            self.max_size, max(self.min_size, self._snap(initial_size or max_size))
+        )
+        self.cooldown = cooldown
+        self.high_water = high_water
+        self.low_water = low_water
+        self.queue_capacity = queue_capacity
+        self.metrics = metrics
+        self.switches = []
+        self._latencies = deque(maxlen=window)
+        self._depths = deque(maxlen=window)
+        self._since_switch = 0
+
+    def _snap(self, size: int) -> int:
+        return max(self.step, int(size) // self.step * self.step)
+
+    def update(
+        self,
+        latency: float,
+        queue_depth: int = 0,
+        frame_index: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Records one processed frame.
+
+        Args:
+            latency (float): Seconds spent on the frame (detect + track).
+            queue_depth (int): Frames waiting for the worker.
+            frame_index (Optional[int]): Logged with switches.
+
+        Returns:
+            Optional[int]: The new input size if it changed, else None.
+        """
+        self._latencies.append(latency)
+        self._depths.append(queue_depth)
+        self._since_switch += 1
+        if self._since_switch < self.cooldown or len(self._latencies) < 3:
+            return None
+
+        load = median(self._latencies) / self.target_latency
+        backlog = draining = False
+        if self.queue_capacity > 1:
+            backlog = min(self._depths) >= self.queue_capacity
+            draining = median(self._depths) < self.queue_capacity / 2
+        else:
+            draining = True
+        size = self.size
+        if load > self.high_water or backlog:
+            # Inference cost grows with the square of the size; jump further
+            # down when far over budget.
+            steps = 2 if load > 1.5 else 1
+            size = max(self.min_size, size - steps * self.step)
+        elif load < self.low_water and draining:
+            size = min(self.max_size, size + self.step)
+        if size == self.size:
+            return None
+
+        switch = {
+            "from": self.size,
+            "to": size,
+            "latency_ms": round(median(self._latencies) * 1000, 2),
+            "budget_ms": round(self.target_latency * 1000, 2),
+            "queue_depth": queue_depth,
+            "frame_index": frame_index,
+        }
+        self.switches.append(switch)
+        if self.metrics is not None:
+            self.metrics.log("imgsz_switch", **switch)
+        self.size = size
+        self._latencies.clear()
+        self._depths.clear()
+        self._since_switch = 0
+        return size
@@ -0,0 +1,234 @@
+import json
+import math
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+KINDS = ("occupancy", "dwell", "visits")
+
+
+class Heatmap:
+    """
+    Where people were seen, accumulated from the track stream into grids
+    of cell_size x cell_size source pixels. Every track counts at its foot
+    point (the bottom centre of its box, where the person stands):
+
+        occupancy: track observations per cell,
+        dwell: seconds tracks spent in each cell,
+        visits: times a track entered each cell.
+
+    Updates cost O(1) per track and frame and memory depends only on the
+    frame and cell size, so a whole mission fits without keeping frames.
+    Frames given with their source index count once: after a seek back,
+    results up to the furthest frame already added are skipped.
+    """
+
+    def __init__(self, frame_size: Sequence[int], cell_size: int = 16, max_gap: float = 1.0):
+        """
+        Args:
+            frame_size (Sequence[int]): (width, height) of the source frames
+                the track boxes refer to.
+            cell_size (int): Cell edge in source pixels.
+            max_gap (float): Longest time between two observations of a
+                track that still counts as dwell time; longer gaps (lost
+                tracks, skipped frames after a seek) count nothing.
+        """
+        self.frame_size = (int(frame_size[0]), int(frame_size[1]))
+        self.cell_size = int(cell_size)
+        self.max_gap = max_gap
+        self.grid_size = (
+            math.ceil(self.frame_size[0] / self.cell_size),
+            math.ceil(self.frame_size[1] / self.cell_size),
+        )
+        shape = (self.grid_size[1], self.grid_size[0])
+        self.occupancy = np.zeros(shape, np.float32)
+        self.dwell = np.zeros(shape, np.float32)
+        self.visits = np.zeros(shape, np.float32)
+        self.frames = 0
+        # Highest source frame index added, None if none was given.
+        self.last_frame = None
+        # track_id -> (timestamp, cell) of its last observation.
+        self._last = {}
+        self._layer = None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the grids and the cached display layer."""
+        grids = sum(self.grid(kind).nbytes for kind in KINDS)
+        if self._layer is not None:
+            grids += self._layer[1].nbytes + self._layer[2].nbytes
+        return grids
+
+    def cell_of(self, bbox) -> tuple:
+        """The (row, column) of the foot point of an [x, y, w, h] box."""
+        x, y, w, h = bbox
+        cols, rows = self.grid_size
+        col = min(max(int((x + w / 2) // self.cell_size), 0), cols - 1)
+        row = min(max(int((y + h) // self.cell_size), 0), rows - 1)
+        return row, col
+
+    def update(
+        self,
+        tracked_objects,
+        timestamp: Optional[float] = None,
+        frame_index: Optional[int] = None,
+    ) -> bool:
+        """
+        Adds one frame's tracks.
+
+        Args:
+            tracked_objects (list): Dicts with "bbox" ([x, y, w, h] in
+                source coordinates) and "track_id".
+            timestamp (Optional[float]): Frame time in seconds; dwell time
+                is only accumulated when given.
+            frame_index (Optional[int]): Source frame index; a frame at or
+                before the furthest one added is a repeat and skipped.
+
+        Returns:
+            bool: False if the frame was skipped as a repeat.
+        """
+        if frame_index is not None:
+            if self.last_frame is not None and frame_index <= self.last_frame:
+                return False
+            self.last_frame = frame_index
+        self.frames += 1
+        for track in tracked_objects:
+            cell = self.cell_of(track["bbox"])
+            self.occupancy[cell] += 1
+            last = self._last.get(track["track_id"])
+            if last is None or last[1] != cell:
+                self.visits[cell] += 1
+            if last is not None and timestamp is not None and last[0] is not None:
+                gap = timestamp - last[0]
+                if 0 < gap <= self.max_gap:
+                    self.dwell[cell] += gap
+            self._last[track["track_id"]] = (timestamp, cell)
+        if self.frames % 100 == 0 and timestamp is not None:
+            self._forget(timestamp - self.max_gap)
+        return True
+
+    def _forget(self, before: float) -> None:
+        """Drops tracks last seen before the given time."""
+        self._last = {
+            track_id: last
+            for track_id, last in self._last.items()
+            if last[0] is None or last[0] >= before
+        }
+
+    def grid(self, kind: str = "occupancy") -> np.ndarray:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown heatmap {kind!r}, expected one of {KINDS}")
+        return getattr(self, kind)
+
+    def normalized(self, kind: str = "occupancy") -> np.ndarray:
+        """
+        The grid scaled to 0..1 on a log scale, so a few crowded cells do
+        not wash out everything else.
+        """
+        grid = np.log1p(self.grid(kind))
+        peak = float(grid.max())
+        return grid / peak if peak > 0 else grid
+
+    def render(
+        self,
+        kind: str = "occupancy",
+        size: Optional[Sequence[int]] = None,
+        colormap: int = cv2.COLORMAP_JET,
+    ) -> np.ndarray:
+        """
+        Renders a grid as a colour-mapped BGR image of the given (width,
+        height), by default the source frame size.
+        """
+        width, height = size or self.frame_size
+        levels = (self.normalized(kind) * 255).astype(np.uint8)
+        levels = cv2.resize(levels, (int(width), int(height)), interpolation=cv2.INTER_LINEAR)
+        return cv2.applyColorMap(levels, colormap)
+
+    def render_layer(
+        self,
+        size: Sequence[int],
+        kind: str = "occupancy",
+        max_alpha: int = 160,
+    ) -> np.ndarray:
+        """
+        Renders a grid into a BGRA layer whose alpha follows the level, for
+        drawing over video. Cells nobody was seen in stay transparent.
+        """
+        width, height = int(size[0]), int(size[1])
+        levels = cv2.resize(
+            self.normalized(kind), (width, height), interpolation=cv2.INTER_LINEAR
+        )
+        layer = np.empty((height, width, 4), np.uint8)
+        layer[..., :3] = cv2.applyColorMap(
+            (levels * 255).astype(np.uint8), cv2.COLORMAP_JET
+        )
+        layer[..., 3] = (levels * max_alpha).astype(np.uint8)
+        return layer
+
+    def blend(self, img: np.ndarray, kind: str = "occupancy", rgb: bool = False) -> np.ndarray:
+        """
+        Draws the heatmap over a frame in place. img may be the frame at
+        any display size; the heatmap always covers all of it. The layer
+        is reused until the grid changes.
+
+        Args:
+            img (np.ndarray): BGR (or RGB, with rgb=True) image.
+            kind (str): Which grid to show.
+            rgb (bool): Whether img is RGB.
+        """
+        height, width = img.shape[:2]
+        key = (kind, width, height, rgb, self.frames)
+        if self._layer is None or self._layer[0] != key:
+            layer = self.render_layer((width, height), kind)
+            colour = layer[..., 2::-1] if rgb else layer[..., :3]
+            alpha = layer[..., 3:].astype(np.float32) / 255.0
+            self._layer = (key, colour.astype(np.float32) * alpha, 1.0 - alpha)
+        _, premultiplied, keep = self._layer
+        img[:] = (img * keep + premultiplied).astype(np.uint8)
+        return img
+
+    def save(self, path: str) -> None:
+        """Saves the grids and their geometry as a compressed .npz file."""
+        meta = {
+            "frame_size": list(self.frame_size),
+            "cell_size": self.cell_size,
+            "max_gap": self.max_gap,
+            "frames": self.frames,
+            "last_frame": self.last_frame,
+        }
+        np.savez_compressed(
+            path,
+            occupancy=self.occupancy,
+            dwell=self.dwell,
+            visits=self.visits,
+            meta=np.array(json.dumps(meta)),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "Heatmap":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            heatmap = cls(meta["frame_size"], meta["cell_size"], meta["max_gap"])
+            for kind in KINDS:
+                getattr(heatmap, kind)[:] = data[kind]
+        heatmap.frames = meta["frames"]
+        heatmap.last_frame = meta.get("last_frame")
+        return heatmap
+
+    def export_image(
+        self,
+        path: str,
+        kind: str = "occupancy",
+        background: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Writes the heatmap as an image, over a BGR background frame (e.g.
+        a representative frame of the flight) if given.
+        """
+        if background is None:
+            image = self.render(kind)
+        else:
+            image = self.blend(background.copy(), kind)
+        if not cv2.imwrite(path, image):
+            raise IOError(f"Cannot write {path}")
@@ -0,0 +1,420 @@
+import threading
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+from ..metrics import MetricsLog
+
+
+class Line:
+    """
+    A counting line from a to b in source pixels. Walking from a to b,
+    crossing from the left to the right side counts as "in", the other
+    way as "out" (as drawn on screen, y pointing down).
+    """
+
+    def __init__(self, name: str, a: Sequence[float], b: Sequence[float]):
+        self.name = name
+        self.a = (float(a[0]), float(a[1]))
+        self.b = (float(b[0]), float(b[1]))
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "a": list(self.a), "b": list(self.b)}
+
+
+class Zone:
+    """A polygonal area in source pixels, counting entries and exits."""
+
+    def __init__(self, name: str, points: Sequence[Sequence[float]]):
+        if len(points) < 3:
+            raise ValueError("A zone needs at least three points.")
+        self.name = name
+        self.points = [(float(x), float(y)) for x, y in points]
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "points": [list(p) for p in self.points]}
+
+
+def foot_points(tracked_objects) -> np.ndarray:
+    """(N, 2) bottom centres of the tracks' [x, y, w, h] boxes."""
+    if not tracked_objects:
+        return np.zeros((0, 2), np.float32)
+    boxes = np.asarray([t["bbox"] for t in tracked_objects], np.float32)
+    return np.stack([boxes[:, 0] + boxes[:, 2] / 2, boxes[:, 1] + boxes[:, 3]], 1)
+
+
+def side_of(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Signs (-1, 0, 1) of the points relative to the lines a -> b, for N
+    points and L lines given as (L, 2) arrays: an (N, L) array, 1 meaning
+    right of the line as drawn on screen.
+    """
+    direction = b - a
+    offset = points[:, None, :] - a[None, :, :]
+    cross = direction[None, :, 0] * offset[..., 1] - direction[None, :, 1] * offset[..., 0]
+    return np.sign(cross).astype(np.int8)
+
+
+def segments_intersect(p: np.ndarray, q: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Whether the N movements p -> q cross the L segments a -> b, as an
+    (N, L) array; touching counts.
+    """
+    d1 = side_of(p, a, b)
+    d2 = side_of(q, a, b)
+    # Sides of the segment ends relative to each movement.
+    move = (q - p)[:, None, :]
+    to_a = a[None, :, :] - p[:, None, :]
+    to_b = b[None, :, :] - p[:, None, :]
+    d3 = np.sign(move[..., 0] * to_a[..., 1] - move[..., 1] * to_a[..., 0])
+    d4 = np.sign(move[..., 0] * to_b[..., 1] - move[..., 1] * to_b[..., 0])
+    return (d1 * d2 <= 0) & (d3 * d4 <= 0)
+
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Even-odd ray casting of N points against one (E, 2) polygon, all edges
+    at once. Returns an (N,) bool array.
+    """
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    straddles = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return ((straddles & (x < x_cross)).sum(axis=1) % 2) == 1
+
+
+class ZoneCounter:
+    """
+    Counts line crossings and zone entries/exits from the tracker output,
+    by each track's foot point. Per frame, all tracks are tested against
+    all lines and zones with array operations; per-track state (last side
+    of every line, inside of every zone) lives in arrays indexed by a
+    slot per track, so every crossing is counted once and a track that
+    hovers on a line does not count again until it really changes side.
+    Tracks first seen inside a zone count towards its occupancy, not as
+    entries. Cumulative counts are written every report_interval seconds
+    of video time to a MetricsLog as "zone_counts" events. Frames given
+    with their source index are counted once: after a seek back, results
+    up to the furthest frame already counted are skipped.
+    """
+
+    def __init__(
+        self,
+        lines: Sequence[Line] = (),
+        zones: Sequence[Zone] = (),
+        report_path: Optional[str] = None,
+        report_interval: float = 10.0,
+        max_age: float = 5.0,
+    ):
+        """
+        Args:
+            lines (Sequence[Line]): Counting lines.
+            zones (Sequence[Zone]): Counting zones.
+            report_path (Optional[str]): JSON-lines file for periodic counts.
+            report_interval (float): Seconds of video between reports.
+            max_age (float): Seconds after which an unseen track's state is
+                dropped; it counts as a new track if it reappears.
+        """
+        self.lines = []
+        self.zones = []
+        self.report_interval = report_interval
+        self.max_age = max_age
+        self.report = MetricsLog(report_path) if report_path else None
+        self.line_counts = {}
+        self.zone_counts = {}
+        self.frames = 0
+        # Highest source frame index counted, None if none was given.
+        self.last_frame = None
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._free = []
+        self._point = np.zeros((0, 2), np.float32)
+        self._seen = np.zeros(0, np.float64)
+        self._side = np.zeros((0, 0), np.int8)
+        # 1 inside, 0 outside, -1 unknown, per track slot and zone.
+        self._inside = np.zeros((0, 0), np.int8)
+        self._last_report = None
+        self._time = None
+        for line in lines:
+            self.add_line(line)
+        for zone in zones:
+            self.add_zone(zone)
+
+    # Geometry.
+
+    def add_line(self, line: Line) -> None:
+        with self._lock:
+            self.lines.append(line)
+            self.line_counts[line.name] = {"in": 0, "out": 0}
+            # Unknown side until the tracks are next seen.
+            column = np.zeros((len(self._seen), 1), np.int8)
+            self._side = np.concatenate([self._side, column], axis=1)
+
+    def add_zone(self, zone: Zone) -> None:
+        with self._lock:
+            self.zones.append(zone)
+            self.zone_counts[zone.name] = {"entered": 0, "exited": 0, "occupancy": 0}
+            column = np.full((len(self._seen), 1), -1, np.int8)
+            self._inside = np.concatenate([self._inside, column], axis=1)
+
+    def clear(self) -> None:
+        """Removes all lines and zones and their counts."""
+        with self._lock:
+            self.lines, self.zones = [], []
+            self.line_counts, self.zone_counts = {}, {}
+            self._side = np.zeros((len(self._seen), 0), np.int8)
+            self._inside = np.zeros((len(self._seen), 0), np.int8)
+
+    def to_dict(self) -> dict:
+        return {
+            "lines": [line.to_dict() for line in self.lines],
+            "zones": [zone.to_dict() for zone in self.zones],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs) -> "ZoneCounter":
+        return cls(
+            lines=[Line(d["name"], d["a"], d["b"]) for d in data.get("lines", [])],
+            zones=[Zone(d["name"], d["points"]) for d in data.get("zones", [])],
+            **kwargs,
+        )
+
+    # Per-track state.
+
+    def _grow(self) -> None:
+        capacity = max(16, 2 * len(self._seen))
+        extra = capacity - len(self._seen)
+        self._point = np.concatenate([self._point, np.zeros((extra, 2), np.float32)])
+        self._seen = np.concatenate([self._seen, np.full(extra, -np.inf)])
+        self._side = np.concatenate(
+            [self._side, np.zeros((extra, self._side.shape[1]), np.int8)]
+        )
+        self._inside = np.concatenate(
+            [self._inside, np.full((extra, self._inside.shape[1]), -1, np.int8)]
+        )
+        self._free.extend(range(capacity - 1, capacity - extra - 1, -1))
+
+    def _slots_of(self, track_ids) -> np.ndarray:
+        """The state slot of every track, allocating slots for new ones."""
+        slots = np.empty(len(track_ids), np.intp)
+        for i, track_id in enumerate(track_ids):
+            slot = self._slots.get(track_id)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self._slots[track_id] = self._free.pop()
+            slots[i] = slot
+        return slots
+
+    def _forget(self, now: float) -> None:
+        stale = [
+            track_id
+            for track_id, slot in self._slots.items()
+            if self._seen[slot] < now - self.max_age
+        ]
+        for track_id in stale:
+            slot = self._slots.pop(track_id)
+            self._side[slot] = 0
+            self._inside[slot] = -1
+            self._free.append(slot)
+
+    # Counting.
+
+    def update(
+        self,
+        tracked_objects,
+        timestamp: Optional[float] = None,
+        frame_index: Optional[int] = None,
+    ) -> list:
+        """
+        Counts one frame's tracks.
+
+        Args:
+            tracked_objects (list): Dicts with "bbox" ([x, y, w, h] in
+                source coordinates) and "track_id".
+            timestamp (Optional[float]): Frame time in seconds; the frame
+                number is used if None.
+            frame_index (Optional[int]): Source frame index; a frame at or
+                before the furthest one counted is a repeat and skipped.
+
+        Returns:
+            list: The crossings and entries/exits of this frame, as dicts
+            with "kind" ("line" or "zone"), "name", "direction" ("in",
+            "out", "entered", "exited") and "track_id".
+        """
+        with self._lock:
+            if frame_index is not None:
+                if self.last_frame is not None and frame_index <= self.last_frame:
+                    return []
+                self.last_frame = frame_index
+            self.frames += 1
+            now = float(self.frames) if timestamp is None else timestamp
+            self._time = now
+            events = []
+            track_ids = [t["track_id"] for t in tracked_objects]
+            points = foot_points(tracked_objects)
+            slots = self._slots_of(track_ids)
+            if self.lines and len(slots):
+                events += self._count_lines(track_ids, slots, points)
+            if self.zones:
+                events += self._count_zones(track_ids, slots, points)
+            self._point[slots] = points
+            self._seen[slots] = now
+            if self.frames % 50 == 0:
+                self._forget(now)
+            if self.report is not None:
+                if self._last_report is None:
+                    self._last_report = now
+                elif now - self._last_report >= self.report_interval:
+                    self._write_report(now)
+            return events
+
+    def _count_lines(self, track_ids, slots, points) -> list:
+        a = np.asarray([line.a for line in self.lines], np.float32)
+        b = np.asarray([line.b for line in self.lines], np.float32)
+        side = side_of(points, a, b)
+        previous = self._side[slots]
+        # New tracks and new lines start with an unknown side (0).
+        changed = (previous != 0) & (side != 0) & (side != previous)
+        events = []
+        if changed.any():
+            # The side changed: count it if the movement since the last
+            # side seen passes through the segment, not beside its ends.
+            rows = np.nonzero(changed.any(axis=1))[0]
+            crossed = changed[rows] & segments_intersect(
+                self._point[slots[rows]], points[rows], a, b
+            )
+            for r, l in zip(*np.nonzero(crossed)):
+                direction = "in" if side[rows[r], l] > 0 else "out"
+                line = self.lines[l]
+                self.line_counts[line.name][direction] += 1
+                events.append(
+                    {
+                        "kind": "line",
+                        "name": line.name,
+                        "direction": direction,
+                        "track_id": track_ids[rows[r]],
+                    }
+                )
+        # Remember the last definite side of every line.
+        self._side[slots] = np.where(side != 0, side, previous)
+        return events
+
+    def _count_zones(self, track_ids, slots, points) -> list:
+        events = []
+        for z, zone in enumerate(self.zones):
+            polygon = np.asarray(zone.points, np.float32)
+            inside = points_in_polygon(points, polygon)
+            was_inside = self._inside[slots, z]
+            counts = self.zone_counts[zone.name]
+            changed = (was_inside >= 0) & (inside != (was_inside == 1))
+            for i in np.nonzero(changed)[0]:
+                direction = "entered" if inside[i] else "exited"
+                counts[direction] += 1
+                events.append(
+                    {
+                        "kind": "zone",
+                        "name": zone.name,
+                        "direction": direction,
+                        "track_id": track_ids[i],
+                    }
+                )
+            counts["occupancy"] = int(inside.sum())
+            self._inside[slots, z] = inside
+        return events
+
+    def counts(self) -> dict:
+        with self._lock:
+            return {
+                "lines": {name: dict(c) for name, c in self.line_counts.items()},
+                "zones": {name: dict(c) for name, c in self.zone_counts.items()},
+            }
+
+    def _write_report(self, now: float) -> None:
+        self._last_report = now
+        self.report.log(
+            "zone_counts",
+            video_time=round(now, 3),
+            lines={name: dict(c) for name, c in self.line_counts.items()},
+            zones={name: dict(c) for name, c in self.zone_counts.items()},
+        )
+
+    def close(self) -> None:
+        """Writes the final counts and closes the report."""
+        if self.report is not None:
+            with self._lock:
+                if self._time is not None:
+                    self._write_report(self._time)
+            self.report.close()
+            self.report = None
+
+    # Display.
+
+    def draw(
+        self,
+        img: np.ndarray,
+        scale: float = 1.0,
+        color=(255, 200, 0),
+        draft: Sequence = (),
+    ) -> np.ndarray:
+        """
+        Draws the lines and zones with their counts onto img in place.
+
+        Args:
+            img (np.ndarray): The frame, at scale times the source size.
+            scale (float): Factor mapping source coordinates onto img.
+            color (tuple): Colour in img's channel order.
+            draft (Sequence): Source points of a line or zone being drawn.
+        """
+        with self._lock:
+            lines = list(self.lines)
+            zones = list(self.zones)
+            line_counts = {n: dict(c) for n, c in self.line_counts.items()}
+            zone_counts = {n: dict(c) for n, c in self.zone_counts.items()}
+        font = cv2.FONT_HERSHEY_SIMPLEX
+
+        def px(point):
+            return int(round(point[0] * scale)), int(round(point[1] * scale))
+
+        def label_at(point):
+            # Above the point, but not off the top of the frame.
+            return point[0] + 4, max(point[1] - 6, 14)
+
+        for zone in zones:
+            polygon = np.asarray([px(p) for p in zone.points], np.int32)
+            cv2.polylines(img, [polygon], True, color, 2, cv2.LINE_AA)
+            c = zone_counts[zone.name]
+            cv2.putText(
+                img,
+                f"{zone.name}: {c['occupancy']} (+{c['entered']} -{c['exited']})",
+                label_at(tuple(int(v) for v in polygon[0])),
+                font,
+                0.5,
+                color,
+                1,
+                cv2.LINE_AA,
+            )
+        for line in lines:
+            a, b = px(line.a), px(line.b)
+            cv2.line(img, a, b, color, 2, cv2.LINE_AA)
+            c = line_counts[line.name]
+            cv2.putText(
+                img,
+                f"{line.name}: in {c['in']} out {c['out']}",
+                label_at(a),
+                font,
+                0.5,
+                color,
+                1,
+                cv2.LINE_AA,
+            )
+        if draft:
+            points = np.asarray([px(p) for p in draft], np.int32)
+            cv2.polylines(img, [points], False, color, 1, cv2.LINE_AA)
+            for point in points:
+                cv2.circle(img, tuple(int(v) for v in point), 3, color, -1)
+        return img
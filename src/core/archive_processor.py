@@ -10,16 +10,17 @@ class ArchiveProcessor:
     def __init__(self, output_path: str, fps: int = 30, frame_size: tuple = (
             640,
             480
-            )):
+            ), codec: str = "mp4v"):
         """
         Initializes the video writer and ensures the output directory exists.
         :param output_path: Path where the output video will be saved.
         :param fps: Frames per second for the output video.
         :param frame_size: Tuple indicating (width, height)
         of the video frames.
+        :param codec: FourCC code of the encoder.
         """
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        fourcc = cv2.VideoWriter_fourcc(*codec)
         self.video_writer = cv2.VideoWriter(
             output_path,
             fourcc,
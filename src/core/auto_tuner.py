@@ -0,0 +1,259 @@
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from .video_processor import VideoProcessor
+
+DEFAULT_IMGSZ = (320, 480, 640)
+DEFAULT_FRAME_SKIPS = (1, 2, 3, 4, 5, 6, 8, 10)
+
+
+def available_backends() -> list:
+    """Returns the inference devices usable on this machine."""
+    import torch
+
+    backends = ["cpu"]
+    if torch.cuda.is_available():
+        backends.insert(0, "cuda:0")
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        backends.insert(0, "mps")
+    return backends
+
+
+def default_model_factory(model_path: str, imgsz: int, backend: str):
+    from .model_processor import Model
+
+    return Model(model_path, input_size=imgsz, device=backend)
+
+
+def load_sample_frames(path: str, max_frames: int = 90) -> list:
+    """Decodes up to max_frames frames from the start of a clip."""
+    video = VideoProcessor(path)
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            frame = video.get_frame()
+            if frame is None:
+                break
+            frames.append(frame)
+    finally:
+        video.release()
+    if not frames:
+        raise IOError(f"Cannot read frames from {path}.")
+    return frames
+
+
+class AutoTuner:
+    """
+    Benchmarks model, imgsz and backend combinations on a sample clip and
+    picks the most accurate configuration, including frame skip, that
+    keeps up with a target source frame rate.
+
+    Accuracy is ranked by model (larger weights file first), then imgsz
+    (larger first), then frame skip (smaller first). Frame skip does not
+    change the cost of one inference, so each model/imgsz/backend is
+    measured once and every skip value is derived from that measurement:
+    a configuration sustains min(1000 / latency * skip, decode fps).
+    """
+
+    def __init__(
+        self,
+        model_paths: dict,
+        imgsz_options: Sequence[int] = DEFAULT_IMGSZ,
+        frame_skips: Sequence[int] = DEFAULT_FRAME_SKIPS,
+        backends: Optional[Sequence[str]] = None,
+        target_fps: float = 15.0,
+        warmup: int = 3,
+        model_factory: Callable = default_model_factory,
+    ):
+        """
+        Args:
+            model_paths (dict): Model name to weights path.
+            imgsz_options (Sequence[int]): Inference sizes to try.
+            frame_skips (Sequence[int]): Frame skip values to consider.
+            backends (Optional[Sequence[str]]): Devices to try; defaults
+                to available_backends().
+            target_fps (float): Source frame rate the pipeline must keep.
+            warmup (int): Untimed frames per configuration.
+            model_factory (Callable): (model_path, imgsz, backend) -> object
+                with process_frame(frame, frame_index, timestamp).
+        """
+        if not model_paths:
+            raise ValueError("No models to tune.")
+        self.model_paths = dict(model_paths)
+        self.imgsz_options = sorted(set(imgsz_options), reverse=True)
+        self.frame_skips = sorted(set(frame_skips))
+        self.backends = list(backends) if backends else available_backends()
+        self.target_fps = target_fps
+        self.warmup = warmup
+        self.model_factory = model_factory
+
+    def model_rank(self) -> list:
+        """Model names ordered from most to least accurate."""
+
+        def size(name):
+            path = self.model_paths[name]
+            return os.path.getsize(path) if os.path.exists(path) else 0
+
+        return sorted(self.model_paths, key=size, reverse=True)
+
+    def measure(
+        self, frames: list, model_name: str, imgsz: int, backend: str
+    ) -> dict:
+        """
+        Runs one configuration over the sample frames.
+
+        Returns:
+            dict: latency_ms (mean), p95_ms and inference_fps.
+        """
+        model = self.model_factory(self.model_paths[model_name], imgsz, backend)
+        for i, frame in enumerate(frames[: self.warmup]):
+            model.process_frame(frame, i, None)
+        latencies = []
+        for i, frame in enumerate(frames[self.warmup:] or frames, self.warmup):
+            start = time.perf_counter()
+            model.process_frame(frame, i, None)
+            latencies.append(time.perf_counter() - start)
+        close = getattr(model, "close", None)
+        if close is not None:
+            close()
+        latency = max(float(np.mean(latencies)), 1e-6)
+        return {
+            "latency_ms": round(latency * 1000, 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+            "inference_fps": round(1.0 / latency, 2),
+        }
+
+    def run(
+        self,
+        frames: list,
+        decode_fps: Optional[float] = None,
+        on_progress: Optional[Callable] = None,
+    ) -> dict:
+        """
+        Benchmarks every model/imgsz/backend combination.
+
+        Args:
+            frames (list): Sample frames (see load_sample_frames).
+            decode_fps (Optional[float]): Upper bound from decoding, if known.
+            on_progress (Optional[Callable]): Called with (done, total,
+                measurement) after each configuration.
+
+        Returns:
+            dict: "best" (the chosen configuration, or the fastest one
+            with "meets_target" False if none keeps up) and "results"
+            (every configuration in accuracy order).
+        """
+        combos = [
+            (model_name, imgsz, backend)
+            for model_name in self.model_rank()
+            for imgsz in self.imgsz_options
+            for backend in self.backends
+        ]
+        results = []
+        for done, (model_name, imgsz, backend) in enumerate(combos, 1):
+            measurement = self.measure(frames, model_name, imgsz, backend)
+            measurement.update(model=model_name, imgsz=imgsz, backend=backend)
+            if on_progress is not None:
+                on_progress(done, len(combos), measurement)
+            for skip in self.frame_skips:
+                fps = measurement["inference_fps"] * skip
+                if decode_fps:
+                    fps = min(fps, decode_fps)
+                results.append(
+                    dict(
+                        measurement,
+                        frame_skip=skip,
+                        sustained_fps=round(fps, 2),
+                        meets_target=fps >= self.target_fps,
+                    )
+                )
+
+        # Backends do not change accuracy, so within a model and imgsz the
+        # smallest skip wins, with the faster backend breaking ties.
+        rank = {name: i for i, name in enumerate(self.model_rank())}
+        results.sort(
+            key=lambda r: (
+                rank[r["model"]], -r["imgsz"], r["frame_skip"], -r["sustained_fps"]
+            )
+        )
+        best = next((r for r in results if r["meets_target"]), None)
+        if best is None:
+            best = max(results, key=lambda r: r["sustained_fps"])
+        return {"target_fps": self.target_fps, "best": best, "results": results}
+
+
+def save_to_qsettings(best: dict, target_fps: float) -> None:
+    """
+    Stores the chosen configuration where the GUI reads it: "model",
+    "frame_skip", "imgsz", "device" and the tuning summary.
+    """
+    from PySide6.QtCore import QSettings
+
+    settings = QSettings("DroneTek", "DroneLink")
+    settings.setValue("model", best["model"])
+    settings.setValue("frame_skip", best["frame_skip"])
+    settings.setValue("imgsz", best["imgsz"])
+    settings.setValue("device", best["backend"])
+    settings.setValue("tuning/target_fps", target_fps)
+    settings.setValue("tuning/result", json.dumps(best))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pick the most accurate DroneLink configuration that "
+        "keeps up with a target frame rate on this machine."
+    )
+    parser.add_argument("sample", help="Sample video clip")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        help="Weights files (default: src/assets/*.pt)",
+    )
+    parser.add_argument("--target-fps", type=float, default=15.0)
+    parser.add_argument("--imgsz", type=int, nargs="+", default=list(DEFAULT_IMGSZ))
+    parser.add_argument(
+        "--frame-skip", type=int, nargs="+", default=list(DEFAULT_FRAME_SKIPS)
+    )
+    parser.add_argument("--backends", nargs="+", help="Devices (default: detected)")
+    parser.add_argument("--frames", type=int, default=60, help="Frames per run")
+    parser.add_argument(
+        "--save", action="store_true", help="Store the result in the GUI settings"
+    )
+    args = parser.parse_args(argv)
+
+    paths = args.models or glob.glob(
+        os.path.join(os.path.dirname(__file__), "..", "assets", "*.pt")
+    )
+    models = {os.path.basename(path): os.path.abspath(path) for path in paths}
+    tuner = AutoTuner(
+        models,
+        imgsz_options=args.imgsz,
+        frame_skips=args.frame_skip,
+        backends=args.backends,
+        target_fps=args.target_fps,
+    )
+    start = time.perf_counter()
+    frames = load_sample_frames(args.sample, args.frames)
+    decode_fps = len(frames) / max(time.perf_counter() - start, 1e-6)
+
+    def progress(done, total, m):
+        print(
+            f"[{done}/{total}] {m['model']} imgsz={m['imgsz']} {m['backend']}: "
+            f"{m['latency_ms']} ms ({m['inference_fps']} fps)"
+        )
+
+    result = tuner.run(frames, decode_fps=decode_fps, on_progress=progress)
+    print(json.dumps(result["best"], indent=4))
+    if args.save:
+        save_to_qsettings(result["best"], args.target_fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Bytes read from the start, middle and end of a video for its content hash.
+SAMPLE_BYTES = 1 << 20
+# Approximate per-row storage charged on top of the payload, so frames
+# without detections still count towards the size bound.
+ROW_OVERHEAD = 64
+
+
+def video_hash(path: str, sample_bytes: int = SAMPLE_BYTES) -> str:
+    """
+    Returns a content hash of a video file built from its size and samples
+    of its start, middle and end, so multi-gigabyte files hash instantly
+    while renamed or copied files still map to the same cache entries.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        middle = max(0, size // 2 - sample_bytes // 2)
+        for offset in (0, middle, max(0, size - sample_bytes)):
+            f.seek(offset)
+            digest.update(f.read(sample_bytes))
+    return digest.hexdigest()
+
+
+def weights_hash(path: str) -> str:
+    """Returns the SHA-1 of a model weights file."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(
+    video: str,
+    frame_index: int,
+    weights: str,
+    imgsz: int,
+    classes: Optional[Sequence[int]],
+    conf: float,
+) -> str:
+    """
+    Combines the video content hash, frame index and detector configuration
+    into one cache key.
+    """
+    config = json.dumps(
+        [weights, int(imgsz), sorted(classes) if classes else None, round(conf, 4)]
+    )
+    config_hash = hashlib.sha1(config.encode()).hexdigest()[:16]
+    return f"{video}:{config_hash}:{int(frame_index)}"
+
+
+class DetectionCache:
+    """
+    Persistent SQLite cache of raw detector outputs with size-bounded LRU
+    eviction. Values are float32 arrays of shape (N, 5) holding
+    x1, y1, x2, y2, confidence per detection. Writes are batched and
+    committed every commit_interval seconds or on close().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        commit_interval: float = 2.0,
+    ):
+        """
+        Args:
+            path (str): SQLite database file, created if missing.
+            max_bytes (int): Total stored size kept before the least
+                recently used entries are evicted.
+            commit_interval (float): Seconds between commits.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.commit_interval = commit_interval
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS detections ("
+            "key TEXT PRIMARY KEY, data BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS detections_lru ON detections(last_used)"
+        )
+        self._conn.commit()
+        self._total_bytes, self._clock = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) "
+            "FROM detections"
+        ).fetchone()
+        self._last_commit = time.monotonic()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Returns the cached detections for key, or None on a miss.
+        """
+        row = self._conn.execute(
+            "SELECT data FROM detections WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._conn.execute(
+            "UPDATE detections SET last_used = ? WHERE key = ?", (self._tick(), key)
+        )
+        self._maybe_commit()
+        return np.frombuffer(row[0], dtype=np.float32).reshape(-1, 5)
+
+    def put(self, key: str, detections: np.ndarray) -> None:
+        """
+        Stores detections (N x 5: x1, y1, x2, y2, confidence) under key.
+        """
+        data = np.ascontiguousarray(detections, dtype=np.float32).reshape(-1, 5)
+        blob = data.tobytes()
+        old = self._conn.execute(
+            "SELECT size FROM detections WHERE key = ?", (key,)
+        ).fetchone()
+        size = len(blob) + ROW_OVERHEAD
+        self._conn.execute(
+            "INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?)",
+            (key, blob, size, self._tick()),
+        )
+        self._total_bytes += size - (old[0] if old else 0)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+        self._maybe_commit()
+
+    def _tick(self) -> int:
+        # Logical access clock; persisted in last_used so recency survives
+        # restarts without depending on wall-clock resolution.
+        self._clock += 1
+        return self._clock
+
+    def _evict(self) -> None:
+        # Free a little extra so eviction does not run on every put.
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, size FROM detections ORDER BY last_used"
+        )
+        doomed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM detections WHERE key = ?", doomed)
+
+    def _maybe_commit(self) -> None:
+        now = time.monotonic()
+        if now - self._last_commit >= self.commit_interval:
+            self._conn.commit()
+            self._last_commit = now
+
+    def stats(self) -> dict:
+        """Returns hits, misses, entry count and stored bytes."""
+        entries = self._conn.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": self._total_bytes,
+        }
+
+    def close(self) -> None:
+        """Commits pending writes and closes the database."""
+        self._conn.commit()
+        self._conn.close()
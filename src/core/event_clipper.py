@@ -0,0 +1,266 @@
+import collections
+import os
+import queue
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from .archive_processor import ArchiveProcessor
+from .video_utils.frame_clock import FrameClock
+from .video_utils.detections_sidecar import (
+    SIDECAR_SUFFIX,
+    DetectionsSidecarWriter,
+    encode_tracks,
+)
+
+
+class EventClipper:
+    """
+    Writes short clips around new person sightings instead of whole videos.
+    The last pre_seconds of frames are kept JPEG-compressed in a ring
+    buffer; when a track ID appears that has not been seen before, the
+    buffer plus the following post_seconds are written as
+    event_NNNN.mp4 with an event_NNNN.detections.jsonl sidecar. A new track
+    appearing before a clip is finished, or within pre_seconds after it,
+    extends that clip instead of starting an overlapping one. Encoding runs
+    on a background thread.
+
+    Durations are measured on the frame timestamps (see FrameClock), as
+    frames are pushed at the processing rate rather than the source
+    rate. Clips are written at fps, each frame held until the next one
+    is due.
+    """
+
+    # Tolerance when comparing frame times.
+    EPSILON = 1e-6
+
+    def __init__(
+        self,
+        output_dir: str,
+        fps: float = 30,
+        pre_seconds: float = 5.0,
+        post_seconds: float = 10.0,
+        jpeg_quality: int = 85,
+        max_clip_seconds: float = 300.0,
+        codec: str = "mp4v",
+        rgb_input: bool = False,
+    ):
+        """
+        Args:
+            output_dir (str): Directory for clips and sidecars.
+            fps (float): Frame rate of the clips, and the rate assumed for
+                frames pushed without a timestamp.
+            pre_seconds (float): Footage kept before the triggering frame.
+            post_seconds (float): Footage kept after the last trigger.
+            jpeg_quality (int): Quality of the buffered frames (0-100).
+            max_clip_seconds (float): Longer events are split into
+                consecutive clips to bound memory use.
+            codec (str): FourCC code of the clip encoder.
+            rgb_input (bool): Frames are RGB instead of BGR.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.fps = fps
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_clip_seconds = max(pre_seconds + post_seconds, max_clip_seconds)
+        self.clock = FrameClock(fps)
+        self.codec = codec
+        self.rgb_input = rgb_input
+        self._encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+
+        self.clips = []
+        self.error = None
+        # Entries are (frame_index, timestamp, jpeg, tracks, time), time
+        # being on self.clock.
+        self._ring = collections.deque()
+        self._seen_ids = set()
+        self._event = None
+        self._clip_count = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def nbytes(self) -> int:
+        """
+        Bytes of compressed frames held in the ring buffer and the open
+        event (clips being written are not counted).
+        """
+        entries = list(self._ring)
+        event = self._event
+        if event is not None:
+            entries += event["entries"]
+        return sum(entry[2].nbytes for entry in entries)
+
+    def push(
+        self,
+        frame: np.ndarray,
+        tracked_objects: list,
+        frame_index: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        scale: float = 1.0,
+    ) -> None:
+        """
+        Adds one processed frame.
+
+        Args:
+            frame (np.ndarray): Clean (un-annotated) frame.
+            tracked_objects (list): Model.process_frame output for the frame.
+            frame_index (Optional[int]): Source frame index.
+            timestamp (Optional[float]): Source timestamp in seconds.
+            scale (float): Factor mapping track boxes onto this frame.
+        """
+        ok, jpeg = cv2.imencode(".jpg", frame, self._encode_params)
+        if not ok:
+            return
+        now = self.clock.tick(timestamp)
+        entry = (
+            frame_index,
+            timestamp,
+            jpeg,
+            encode_tracks(tracked_objects, scale),
+            now,
+        )
+
+        track_ids = {str(t["track_id"]) for t in tracked_objects}
+        new_ids = sorted(track_ids - self._seen_ids)
+        self._seen_ids |= track_ids
+
+        event = self._event
+        if event is None:
+            if new_ids:
+                self._event = {
+                    "entries": list(self._ring) + [entry],
+                    "trigger_ids": new_ids,
+                    "end": now + self.post_seconds,
+                }
+                self._ring.clear()
+            else:
+                self._ring.append(entry)
+                self._trim_ring(now)
+            return
+
+        event["entries"].append(entry)
+        if new_ids:
+            event["end"] = now + self.post_seconds
+            event["trigger_ids"] += new_ids
+        elif now >= event["end"] + self.pre_seconds - self.EPSILON:
+            # Nothing new within pre_seconds after the clip: close it and
+            # hand the frames past its end back to the ring buffer.
+            tail = self._past_end(event)
+            self._ring.extend(event["entries"][-tail:])
+            del event["entries"][-tail:]
+            self._trim_ring(now)
+            self._finish_event()
+            return
+
+        # The last frame lasts one frame interval.
+        duration = now - event["entries"][0][4] + self.clock.last_step
+        if duration >= self.max_clip_seconds - self.EPSILON:
+            self._finish_event()
+            self._event = {"entries": [], "trigger_ids": [], "end": event["end"]}
+
+    def _trim_ring(self, now: float) -> None:
+        """Keeps the frames of the last pre_seconds in the ring buffer."""
+        while self._ring and self._ring[0][4] <= now - self.pre_seconds + self.EPSILON:
+            self._ring.popleft()
+
+    def _past_end(self, event: dict) -> int:
+        """Number of trailing entries of an event after its end."""
+        count = 0
+        for entry in reversed(event["entries"]):
+            if entry[4] <= event["end"] + self.EPSILON:
+                break
+            count += 1
+        return count
+
+    def _finish_event(self) -> None:
+        event, self._event = self._event, None
+        if event["entries"]:
+            name = f"event_{self._clip_count:04d}"
+            self._clip_count += 1
+            self._queue.put((name, event))
+
+    def _write_clip(self, name: str, event: dict) -> None:
+        entries = event["entries"]
+        first = cv2.imdecode(entries[0][2], cv2.IMREAD_COLOR)
+        frame_size = (first.shape[1], first.shape[0])
+        video_path = os.path.join(self.output_dir, name + ".mp4")
+        writer = ArchiveProcessor(video_path, self.fps, frame_size, codec=self.codec)
+        start = entries[0][4]
+        written = 0
+        sidecar = DetectionsSidecarWriter(
+            os.path.join(self.output_dir, name + SIDECAR_SUFFIX),
+            frame_size=list(frame_size),
+            fps=self.fps,
+            trigger_track_ids=event["trigger_ids"],
+        )
+        try:
+            for i, (frame_index, timestamp, jpeg, tracks, _) in enumerate(entries):
+                # Held until the next frame is due; a frame due before the
+                # current output frame is skipped.
+                until = (
+                    int(round((entries[i + 1][4] - start) * self.fps))
+                    if i + 1 < len(entries)
+                    else written + 1
+                )
+                if until <= written:
+                    continue
+                frame = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+                if (frame.shape[1], frame.shape[0]) != frame_size:
+                    frame = cv2.resize(frame, frame_size, interpolation=cv2.INTER_AREA)
+                if self.rgb_input:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                # One sidecar record per video frame, so overlays can be
+                # re-rendered onto the clip.
+                while written < until:
+                    writer.write_frame(frame)
+                    sidecar.write(tracks, frame_index, timestamp)
+                    written += 1
+        finally:
+            writer.release()
+            sidecar.close()
+        self.clips.append(video_path)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write_clip(*item)
+            except IOError as exc:
+                # Surfaced through stats(); later events are still tried.
+                self.error = exc
+
+    def stats(self) -> dict:
+        """
+        Returns clips written, frames held in memory and buffered bytes,
+        whether an event is open, and the last write error, if any.
+        """
+        entries = list(self._ring) + (self._event["entries"] if self._event else [])
+        return {
+            "clips": len(self.clips),
+            "buffered_frames": len(entries),
+            "buffered_bytes": sum(len(e[2]) for e in entries),
+            "event_open": self._event is not None,
+            "pending_clips": self._queue.qsize(),
+            "error": str(self.error) if self.error else None,
+        }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Writes the open event, trimmed to its end, and waits for all
+        clips to be encoded.
+        """
+        event = self._event
+        if event is not None:
+            overshoot = self._past_end(event)
+            if overshoot > 0:
+                del event["entries"][-overshoot:]
+            self._finish_event()
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
@@ -0,0 +1,317 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+
+class CachedFrame:
+    """A display-ready frame and the scale it was resized by."""
+
+    __slots__ = ("frame", "timestamp", "scale")
+
+    def __init__(self, frame: np.ndarray, timestamp: float, scale: float = 1.0):
+        self.frame = frame
+        self.timestamp = timestamp
+        self.scale = scale
+
+
+class FrameCache:
+    """
+    Decoded frames keyed by source frame index, evicting the least
+    recently used once their total size exceeds max_bytes. Tracks are
+    kept separately: they are tiny, outlive the frames they belong to and
+    are looked up for frames the worker skipped (see tracks_at), so that
+    seeking back never has to run inference again.
+    """
+
+    def __init__(self, max_bytes: int = 256 << 20, max_tracked_frames: int = 100000):
+        """
+        Args:
+            max_bytes (int): Total size of cached frames.
+            max_tracked_frames (int): Number of frames whose tracks are kept.
+        """
+        self.max_bytes = max_bytes
+        self.max_tracked_frames = max_tracked_frames
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()
+        self._tracks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._frames
+
+    def get(self, index: int) -> Optional[CachedFrame]:
+        """Returns a cached frame, marking it most recently used."""
+        with self._lock:
+            entry = self._frames.get(index)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(index)
+            self.hits += 1
+            return entry
+
+    def touch(self, indices) -> None:
+        """Marks the cached ones of the given frames most recently used."""
+        with self._lock:
+            for index in indices:
+                if index in self._frames:
+                    self._frames.move_to_end(index)
+
+    def put(
+        self,
+        index: int,
+        frame: np.ndarray,
+        timestamp: float,
+        scale: float = 1.0,
+        tracks=None,
+    ) -> None:
+        """
+        Caches a frame, and its tracks if given.
+        """
+        with self._lock:
+            old = self._frames.pop(index, None)
+            if old is not None:
+                self.nbytes -= old.frame.nbytes
+            self._frames[index] = CachedFrame(frame, timestamp, scale)
+            self.nbytes += frame.nbytes
+            while self.nbytes > self.max_bytes and len(self._frames) > 1:
+                _, evicted = self._frames.popitem(last=False)
+                self.nbytes -= evicted.frame.nbytes
+                self.evictions += 1
+        if tracks is not None:
+            self.set_tracks(index, tracks)
+
+    def set_tracks(self, index: int, tracks) -> None:
+        with self._lock:
+            self._tracks[index] = tracks
+            self._tracks.move_to_end(index)
+            while len(self._tracks) > self.max_tracked_frames:
+                self._tracks.popitem(last=False)
+
+    def tracks_at(self, index: int, max_distance: int = 0):
+        """
+        Returns the tracks of a frame or, for a frame the worker skipped,
+        those of the nearest processed frame at most max_distance frames
+        before it (the boxes shown with it during playback). None if there
+        are none.
+        """
+        with self._lock:
+            for i in range(index, index - max_distance - 1, -1):
+                tracks = self._tracks.get(i)
+                if tracks is not None:
+                    return tracks
+        return None
+
+    def shed(self, target_bytes: int) -> int:
+        """
+        Evicts the least recently used frames until at least target_bytes
+        are freed. Tracks are kept; they are small and not re-decodable.
+
+        Returns:
+            The number of bytes freed.
+        """
+        freed = 0
+        with self._lock:
+            while self._frames and freed < target_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.nbytes -= evicted.frame.nbytes
+                self.evictions += 1
+                freed += evicted.frame.nbytes
+        return freed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._tracks.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "frames": len(self._frames),
+            "tracked_frames": len(self._tracks),
+            "mb": round(self.nbytes / (1 << 20), 1),
+            "max_mb": round(self.max_bytes / (1 << 20), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class FramePrefetcher:
+    """
+    Background decoder filling a FrameCache around a playhead: the
+    playhead frame first, then the frames ahead of it, then those behind.
+    It has its own VideoCapture, so it never competes with playback for
+    the decoder position. Frames are read sequentially where possible;
+    gaps of up to max_grab frames are skipped by grabbing, and farther
+    targets are reached by seeking, which decodes from the preceding
+    keyframe. Backward prefetch seeks once to the start of the missing
+    range and then reads forward, instead of seeking for every frame.
+    Runs only between set_playhead() and suspend().
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        cache: FrameCache,
+        prepare: Optional[Callable] = None,
+        on_frame: Optional[Callable] = None,
+        ahead: int = 30,
+        behind: int = 30,
+        decode_threads: int = 0,
+    ):
+        """
+        Args:
+            video_path (str): The video file.
+            cache (FrameCache): Receives the decoded frames.
+            prepare (Optional[Callable]): Turns a decoded BGR frame into
+                (display frame, scale) before it is cached; frames are
+                cached as decoded if None.
+            on_frame (Optional[Callable]): Called with the index of every
+                frame cached, from the decoder thread.
+            ahead (int): Frames to keep decoded after the playhead.
+            behind (int): Frames to keep decoded before the playhead.
+            decode_threads (int): Decoder threads, 0 lets the backend decide.
+        """
+        self.video_path = video_path
+        self.cache = cache
+        self.prepare = prepare
+        self.on_frame = on_frame
+        self.ahead = ahead
+        self.behind = behind
+        self.decode_threads = decode_threads
+        self.decoded = 0
+        self.seeks = 0
+        self._cap = None
+        self._position = 0
+        self._last = None  # last frame index, None while unknown
+        self._max_grab = 60
+        self._frame_bytes = None
+        self._playhead = None
+        self._running = True
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def set_playhead(self, index: int) -> None:
+        """Moves the prefetch window and (re)starts decoding."""
+        with self._cond:
+            self._playhead = index
+            self._cond.notify_all()
+
+    def suspend(self) -> None:
+        """Stops decoding until the next set_playhead()."""
+        with self._cond:
+            self._playhead = None
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the window is decoded. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._playhead is None or self._next_missing() is None,
+                timeout,
+            )
+
+    def close(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+
+    def _open(self) -> None:
+        if self.decode_threads:
+            self._cap = cv2.VideoCapture(
+                self.video_path,
+                cv2.CAP_ANY,
+                [cv2.CAP_PROP_N_THREADS, self.decode_threads],
+            )
+        else:
+            self._cap = cv2.VideoCapture(self.video_path)
+        frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._last = frame_count - 1 if frame_count > 0 else None
+        # Up to two seconds are cheaper to grab through than to seek over.
+        self._max_grab = int(2 * (self._cap.get(cv2.CAP_PROP_FPS) or 30))
+        self._position = 0
+
+    def _window(self):
+        """The (ahead, behind) frame counts that fit in the cache."""
+        ahead, behind = self.ahead, self.behind
+        if self._frame_bytes:
+            fit = max(1, self.cache.max_bytes // self._frame_bytes - 1)
+            if ahead + behind + 1 > fit:
+                ahead = (fit - 1) * ahead // max(1, ahead + behind)
+                behind = max(0, fit - 1 - ahead)
+        return ahead, behind
+
+    def _next_missing(self) -> Optional[int]:
+        """The next frame to decode, or None once the window is cached."""
+        playhead = self._playhead
+        if playhead is None:
+            return None
+        ahead, behind = self._window()
+        last = playhead + ahead if self._last is None else self._last
+        if playhead not in self.cache and playhead <= last:
+            return playhead
+        for index in range(playhead + 1, min(playhead + ahead, last) + 1):
+            if index not in self.cache:
+                return index
+        for index in range(max(0, playhead - behind), min(playhead, last + 1)):
+            if index not in self.cache:
+                return index
+        return None
+
+    def _decode(self, index: int) -> bool:
+        if not 0 <= index - self._position <= self._max_grab:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self._position = index
+            self.seeks += 1
+        while self._position < index and self._cap.grab():
+            self._position += 1
+        ok, frame = self._cap.read()
+        if not ok:
+            return False
+        self._position += 1
+        timestamp = self._cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        scale = 1.0
+        if self.prepare is not None:
+            frame, scale = self.prepare(frame)
+        self._frame_bytes = frame.nbytes
+        self.cache.put(index, frame, timestamp, scale)
+        self.decoded += 1
+        return True
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    while self._running and self._next_missing() is None:
+                        self._cond.notify_all()
+                        self._cond.wait()
+                    if not self._running:
+                        return
+                    playhead = self._playhead
+                    index = self._next_missing()
+                    ahead, behind = self._window()
+                # Keep the window from being evicted by its own prefetch.
+                self.cache.touch(range(playhead - behind, playhead + ahead + 1))
+                if self._cap is None:
+                    self._open()
+                if not self._decode(index):
+                    # Past the real end of a file with a wrong frame count.
+                    with self._cond:
+                        self._last = index - 1
+                    continue
+                if self.on_frame is not None:
+                    self.on_frame(index)
+        finally:
+            if self._cap is not None:
+                self._cap.release()
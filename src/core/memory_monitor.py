@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+import psutil
+
+from .metrics import MetricsLog
+
+MB = 1 << 20
+
+
+class MemoryMonitor:
+    """
+    Accounts for the memory of the pipeline. Subsystems register probes
+    returning the bytes they hold (queues, caches, pixmaps, tracker state);
+    sample() reads them next to the RSS of this process and its workers,
+    so a leak shows up as the subsystem that grows, or as growing memory
+    nobody accounts for.
+
+    With a ceiling, a sample above it calls the registered shedders in
+    order (e.g. drop buffered archive frames, then cached frames) until
+    enough was freed. tracemalloc can be enabled to diff Python
+    allocations between snapshots when the growth is unaccounted.
+    """
+
+    def __init__(
+        self,
+        ceiling_mb: Optional[float] = None,
+        history: int = 120,
+        trace_frames: int = 0,
+        metrics: Optional[MetricsLog] = None,
+    ):
+        """
+        Args:
+            ceiling_mb (Optional[float]): Total RSS (this process and
+                registered processes) above which memory is shed. None
+                disables shedding.
+            history (int): Number of samples kept for growth estimates.
+            trace_frames (int): Traceback depth for tracemalloc; 0 leaves
+                tracing off until start_trace() is called.
+            metrics (Optional[MetricsLog]): Log for "memory_shed" events.
+        """
+        self.ceiling = int(ceiling_mb * MB) if ceiling_mb else None
+        self.metrics = metrics
+        self.history = deque(maxlen=history)
+        self.last = None
+        self.shed_events = deque(maxlen=20)
+        self.shed_count = 0
+        self._probes = {}
+        self._shedders = []
+        self._processes = {}
+        self._process = psutil.Process(os.getpid())
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._started_trace = False
+        if trace_frames:
+            self.start_trace(trace_frames)
+
+    def register(self, name: str, probe: Callable[[], int]) -> None:
+        """
+        Adds a subsystem whose probe returns the bytes it holds.
+        """
+        with self._lock:
+            self._probes[name] = probe
+
+    def add_shedder(self, name: str, shed: Callable[[int], int]) -> None:
+        """
+        Adds a way to free memory: shed(target_bytes) frees up to about
+        target_bytes and returns the bytes freed. Shedders run in the
+        order they were added.
+        """
+        with self._lock:
+            self._shedders.append((name, shed))
+
+    def add_processes(self, name: str, pids: Callable[[], list]) -> None:
+        """
+        Adds child processes (e.g. the inference workers) whose RSS counts
+        towards the total. pids is called at every sample, so restarted
+        processes are followed.
+        """
+        with self._lock:
+            self._processes[name] = pids
+
+    def sample(self, now: Optional[float] = None) -> dict:
+        """
+        Reads all probes and RSS values, and sheds memory if the total is
+        above the ceiling.
+
+        Returns:
+            {"time", "rss", "processes": {name: bytes}, "subsystems":
+            {name: bytes}, "unaccounted", "total"}, all sizes in bytes.
+            unaccounted is the RSS of this process not covered by probes.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            probes = dict(self._probes)
+            processes = dict(self._processes)
+        subsystems = {}
+        for name, probe in probes.items():
+            try:
+                subsystems[name] = int(probe())
+            except Exception:
+                subsystems[name] = 0
+        rss = self._process.memory_info().rss
+        children = {name: _rss_of(pids) for name, pids in processes.items()}
+        record = {
+            "time": now,
+            "rss": rss,
+            "processes": children,
+            "subsystems": subsystems,
+            "unaccounted": max(0, rss - sum(subsystems.values())),
+            "total": rss + sum(children.values()),
+        }
+        with self._lock:
+            self.history.append((now, record["total"]))
+            self.last = record
+        if self.ceiling is not None and record["total"] > self.ceiling:
+            self.shed(record["total"] - self.ceiling, total=record["total"])
+        return record
+
+    def shed(self, target_bytes: int, total: Optional[int] = None) -> int:
+        """
+        Calls the shedders in order until target_bytes were freed. Sheds
+        that freed something are recorded in shed_events and logged.
+
+        Returns:
+            The number of bytes freed.
+        """
+        freed = {}
+        remaining = target_bytes
+        for name, shed in list(self._shedders):
+            if remaining <= 0:
+                break
+            try:
+                released = int(shed(remaining))
+            except Exception:
+                released = 0
+            if released:
+                freed[name] = released
+                remaining -= released
+        if not freed:
+            return 0
+        event = {
+            "target_mb": round(target_bytes / MB, 1),
+            "freed_mb": {name: round(b / MB, 1) for name, b in freed.items()},
+        }
+        if total is not None:
+            event["total_mb"] = round(total / MB, 1)
+        self.shed_events.append(event)
+        self.shed_count += 1
+        if self.metrics is not None:
+            self.metrics.log("memory_shed", **event)
+        return sum(freed.values())
+
+    def growth(self) -> Optional[float]:
+        """
+        Least-squares trend of the total over the kept samples, in bytes
+        per second. None with fewer than three samples.
+        """
+        with self._lock:
+            samples = list(self.history)
+        if len(samples) < 3:
+            return None
+        times = np.array([t for t, _ in samples], np.float64)
+        totals = np.array([b for _, b in samples], np.float64)
+        times -= times[0]
+        if times[-1] <= 0:
+            return None
+        slope, _ = np.polyfit(times, totals, 1)
+        return float(slope)
+
+    def start_trace(self, frames: int = 10) -> None:
+        """
+        Starts tracemalloc (if it is not running already) and takes the
+        baseline snapshot for snapshot_diff().
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_trace = True
+        self._snapshot = _take_snapshot()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing() and self._snapshot is not None
+
+    def snapshot_diff(self, limit: int = 10) -> list:
+        """
+        Compares Python allocations with the previous snapshot and makes
+        the current one the new baseline.
+
+        Returns:
+            Up to limit {"location", "size_diff", "count_diff", "size"}
+            dicts, largest growth first. Empty if tracing is off.
+        """
+        if not self.tracing:
+            return []
+        snapshot = _take_snapshot()
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size": stat.size,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def close(self) -> None:
+        if self._started_trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._snapshot = None
+        self._started_trace = False
+
+
+def _rss_of(pids: Callable[[], list]) -> int:
+    total = 0
+    try:
+        pid_list = list(pids())
+    except Exception:
+        return 0
+    for pid in pid_list:
+        try:
+            total += psutil.Process(pid).memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    """A snapshot without tracemalloc's own allocations."""
+    return tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
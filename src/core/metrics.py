@@ -0,0 +1,54 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+
+class MetricsLog:
+    """
+    Append-only JSON-lines log of pipeline events. Each line is
+    {"event": <name>, "time": <unix seconds>, ...fields}. Lines are flushed
+    as they are written so the log survives a crash.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Log file, created (with its directory) if missing.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def log(self, event: str, **fields) -> dict:
+        """
+        Appends one event and returns the record written.
+        """
+        record = {"event": event, "time": round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+                self._file.flush()
+        return record
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_metrics(path: str, event: Optional[str] = None) -> list:
+    """
+    Returns the records of a metrics log, optionally only those of one
+    event type.
+    """
+    with open(path, "r") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if event is not None:
+        records = [r for r in records if r["event"] == event]
+    return records
@@ -1,7 +1,15 @@
+import time
+
+import numpy as np
 from ultralytics import YOLO
 from deep_sort_realtime.deepsort_tracker import DeepSort
 import torch
 
+from .detection_cache import cache_key, weights_hash
+from .remote_inference import RemoteUnavailable
+from .tracker_state import TrackerSnapshot, reserve_track_ids
+from .video_utils.letterbox import boxes_to_model, boxes_to_source, ltwh_to_source
+
 
 class Model:
     def __init__(
@@ -12,13 +20,34 @@ class Model:
         nn_budget: int = 30,
         nms_max_overlap: float = 1.0,
         input_size: int = 640,
+        track_store=None,
+        reid_gallery=None,
+        video_id: str = None,
+        detection_cache=None,
+        video_hash: str = None,
+        device: str = None,
+        remote=None,
     ):
         """
         Initializes the YOLO model (filtered to only class 0 == 'person')
-        and DeepSORT tracker.
+        and DeepSORT tracker. If a TrackStore is given, every confirmed
+        track observation is appended to it. If a ReIDGallery is given,
+        the appearance features of confirmed tracks are accumulated into
+        it under video_id. If a DetectionCache and the content hash of the
+        video being processed are given, raw detections are cached per
+        frame index and cache hits skip the detector. device selects the
+        inference backend ("cpu", "cuda:0", "mps"); None lets YOLO pick.
+        With a RemoteDetector, detection runs on inference servers and
+        falls back to the local model when none answers; tracking always
+        runs here so track IDs stay consistent across servers.
         """
+        self.model_path = model_path
         self.conf_threshold = conf_threshold
         self.input_size = input_size
+        self.video_id = video_id
+        self.frame_count = 0
+        self.video_hash = video_hash
+        self.remote = remote
 
         # tell YOLO to only detect class 0 (person)
         self.yolo_kwargs = {
@@ -26,6 +55,8 @@ class Model:
             "classes": [0],
             "imgsz": self.input_size,
         }
+        if device:
+            self.yolo_kwargs["device"] = device
 
         self.model = YOLO(model_path)
         self.tracker = DeepSort(
@@ -33,40 +64,195 @@ class Model:
             nn_budget=nn_budget,
             nms_max_overlap=nms_max_overlap,
         )
+        self.attach_stores(track_store, reid_gallery, detection_cache)
+
+    def attach_stores(self, track_store=None, reid_gallery=None, detection_cache=None):
+        """
+        Sets the TrackStore, ReIDGallery and DetectionCache after
+        construction, so a standby worker can load the detector before it
+        takes over the session's stores.
+        """
+        self.track_store = track_store
+        self.reid_gallery = reid_gallery
+        self.detection_cache = detection_cache
+        self.weights_hash = (
+            weights_hash(self.model_path) if detection_cache is not None else None
+        )
+        if track_store is not None and track_store.track_ids():
+            # Continue numbering after the tracks already in the store so a
+            # restarted worker does not reuse their IDs.
+            reserve_track_ids(self.tracker, max(track_store.track_ids()) + 1)
+
+    def snapshot_tracker(self, **meta) -> TrackerSnapshot:
+        """
+        Captures the tracker state (tracks, Kalman states, appearance
+        features and the ID counter), with meta describing where it was
+        taken, e.g. frame_index and timestamp.
+        """
+        return TrackerSnapshot.capture(self.tracker, **meta)
+
+    def restore_tracker(self, snapshot: TrackerSnapshot) -> None:
+        """
+        Continues from a snapshot taken by snapshot_tracker, so existing
+        tracks keep their IDs. IDs never go below those already in the
+        track store.
+        """
+        snapshot.restore(self.tracker)
+
+    def warm_up(self) -> None:
+        """
+        Runs the detector once on a blank frame so weights, kernels and
+        buffers are initialised before the first real frame.
+        """
+        self.detect(np.zeros((self.input_size, self.input_size, 3), np.uint8))
 
-    def process_frame(self, frame):
+    def set_input_size(self, input_size: int) -> None:
+        """
+        Changes the detector input size (imgsz) from the next frame on,
+        without reloading the model.
+        """
+        self.input_size = int(input_size)
+        self.yolo_kwargs["imgsz"] = self.input_size
+
+    def process_frame(self, frame, frame_index=None, timestamp=None, transform=None):
         """
         Process a single frame: run detection with
         YOLO and track objects with DeepSORT.
 
         Args:
             frame (np.ndarray): The input video frame.
+            frame_index (int, optional): Source frame index, defaults to
+            the number of frames processed so far.
+            timestamp (float, optional): Frame time in seconds, used for
+            the track store. Defaults to the current time.
+            transform (tuple, optional): (scale, pad_x, pad_y) if frame was
+            letterboxed from the source frame on the capture side. Boxes
+            stored, cached and returned are then mapped back to source
+            pixels; detection and tracking run on the letterboxed frame.
 
         Returns:
             list: A list of dictionaries containing
-            bounding boxes ([x, y, w, h])
-            and corresponding track IDs for confirmed tracks.
+            bounding boxes ([x, y, w, h], in source pixels)
+            and corresponding track IDs for confirmed tracks, plus the
+            detection confidence when the track was matched this frame.
         """
-        # run inference with class‐filtering baked in
-        with torch.no_grad():
-            results = self.model(frame, **self.yolo_kwargs)
+        raw = None
+        key = None
+        if (
+            self.detection_cache is not None
+            and self.video_hash is not None
+            and frame_index is not None
+        ):
+            key = cache_key(
+                self.video_hash,
+                frame_index,
+                self.weights_hash,
+                self.input_size,
+                self.yolo_kwargs["classes"],
+                self.conf_threshold,
+            )
+            raw = self.detection_cache.get(key)
+            # The cache holds source pixels, whatever the frame size.
+            if raw is not None:
+                raw = boxes_to_model(raw, transform)
+        if raw is None:
+            raw, local = self._detect(frame)
+            # Remote servers may run other weights than self.weights_hash.
+            if key is not None and local:
+                self.detection_cache.put(key, boxes_to_source(raw, transform))
 
         detections = []
-        for r in results:
-            boxes = r.boxes.xyxy.cpu().numpy()
-            confs = r.boxes.conf.cpu().numpy()
-            # all classes in "r" will be 0, so we can skip checking cls
-            for (x1, y1, x2, y2), conf in zip(boxes, confs):
-                if conf < self.conf_threshold:
-                    continue
-                w, h = x2 - x1, y2 - y1
-                if w <= 0 or h <= 0:
-                    continue
-                detections.append(([x1, y1, w, h], float(conf), 0))
+        for x1, y1, x2, y2, conf in raw:
+            if conf < self.conf_threshold:
+                continue
+            w, h = x2 - x1, y2 - y1
+            if w <= 0 or h <= 0:
+                continue
+            detections.append(([x1, y1, w, h], float(conf), 0))
 
         tracks = self.tracker.update_tracks(detections, frame=frame)
-        return [
-            {"bbox": track.to_ltwh(), "track_id": track.track_id}
-            for track in tracks
-            if track.is_confirmed()
+        confirmed = [track for track in tracks if track.is_confirmed()]
+
+        if frame_index is None:
+            frame_index = self.frame_count
+        if timestamp is None:
+            timestamp = time.time()
+        self.frame_count += 1
+        if self.track_store is not None and confirmed:
+            self.track_store.append(
+                frame_index,
+                timestamp,
+                [track.track_id for track in confirmed],
+                [ltwh_to_source(track.to_ltwh(), transform) for track in confirmed],
+                # det_conf is None for tracks coasting without a detection
+                [getattr(track, "det_conf", None) for track in confirmed],
+            )
+
+        if self.reid_gallery is not None:
+            for track in confirmed:
+                # Only tracks matched this frame carry a fresh feature.
+                if track.time_since_update == 0 and track.features:
+                    self.reid_gallery.observe(
+                        self.video_id, track.track_id, track.get_feature(), timestamp
+                    )
+
+        tracked_objects = []
+        for track in confirmed:
+            obj = {
+                "bbox": ltwh_to_source(track.to_ltwh(), transform),
+                "track_id": track.track_id,
+            }
+            # Kept in the archive sidecar so overlays can be re-filtered.
+            confidence = getattr(track, "det_conf", None)
+            if confidence is not None:
+                obj["confidence"] = float(confidence)
+            tracked_objects.append(obj)
+        return tracked_objects
+
+    def _detect(self, frame) -> tuple:
+        """
+        Detects remotely if possible, otherwise with the local model.
+
+        Returns:
+            tuple: (detections, True if the local model produced them).
+        """
+        if self.remote is not None:
+            try:
+                return self.remote.detect(frame, self.input_size), False
+            except RemoteUnavailable:
+                pass
+        return self.detect(frame), True
+
+    def detect(self, frame) -> np.ndarray:
+        """
+        Runs the local detector and returns an (N, 5) array of
+        x1, y1, x2, y2, confidence rows.
+        """
+        # run inference with class‐filtering baked in
+        with torch.no_grad():
+            results = self.model(frame, **self.yolo_kwargs)
+
+        # all classes in "r" will be 0, so we can skip checking cls
+        rows = [
+            np.column_stack(
+                [r.boxes.xyxy.cpu().numpy(), r.boxes.conf.cpu().numpy()]
+            ).reshape(-1, 5)
+            for r in results
         ]
+        if not rows:
+            return np.zeros((0, 5), dtype=np.float32)
+        return np.concatenate(rows).astype(np.float32)
+
+    def close(self):
+        """
+        Flushes the track store, saves the re-identification gallery,
+        commits the detection cache and disconnects from remote servers.
+        """
+        if self.track_store is not None:
+            self.track_store.close()
+        if self.reid_gallery is not None:
+            self.reid_gallery.save()
+        if self.detection_cache is not None:
+            self.detection_cache.close()
+        if self.remote is not None:
+            self.remote.close()
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class OverlayRenderer:
+    """
+    Draws tracked-object boxes and "ID n" labels.
+
+    Label text is rasterised once per track ID into a cached mask
+    ("sprite") and blitted with NumPy afterwards, so the per-frame cost is
+    a few array writes per track instead of a cv2.putText call. Boxes that
+    extend past the image are clipped rather than skipped. Boxes may be
+    given in source coordinates and scaled onto a smaller (display) image.
+    """
+
+    def __init__(
+        self,
+        color=(0, 0, 255),
+        thickness: int = 2,
+        font_scale: float = 0.5,
+        max_sprites: int = 512,
+    ):
+        """
+        Args:
+            color (tuple): BGR colour of boxes and labels.
+            thickness (int): Box line thickness in pixels.
+            font_scale (float): Label font scale.
+            max_sprites (int): Label sprites kept in the LRU cache.
+        """
+        self.color = np.array(color, dtype=np.uint8)
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.max_sprites = max_sprites
+        self._sprites = OrderedDict()
+
+    def label_sprite(self, track_id) -> np.ndarray:
+        """
+        Returns the cached boolean text mask for a track label.
+        """
+        sprite = self._sprites.get(track_id)
+        if sprite is not None:
+            self._sprites.move_to_end(track_id)
+            return sprite
+
+        label = f"ID {track_id}"
+        (w, h), baseline = cv2.getTextSize(
+            label, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, 1
+        )
+        canvas = np.zeros((h + baseline, w), dtype=np.uint8)
+        cv2.putText(
+            canvas, label, (0, h), cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, 255, 1
+        )
+        sprite = canvas > 0
+        self._sprites[track_id] = sprite
+        if len(self._sprites) > self.max_sprites:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def __blit(self, img: np.ndarray, sprite: np.ndarray, x: int, y: int) -> None:
+        """Writes the label colour where the sprite is set, clipped to img."""
+        img_h, img_w = img.shape[:2]
+        h, w = sprite.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, img_w), min(y + h, img_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        mask = sprite[y0 - y:y1 - y, x0 - x:x1 - x]
+        img[y0:y1, x0:x1][mask] = self.color
+
+    def render(self, img: np.ndarray, tracked_objects, scale: float = 1.0) -> np.ndarray:
+        """
+        Draws boxes and labels onto img in place.
+
+        Args:
+            img (np.ndarray): BGR (or RGB, with a matching colour) image.
+            tracked_objects (list): Dicts with "bbox" ([x, y, w, h] in
+                source coordinates) and "track_id".
+            scale (float): Factor mapping source coordinates onto img.
+
+        Returns:
+            np.ndarray: The same image.
+        """
+        img_h, img_w = img.shape[:2]
+        color = tuple(int(c) for c in self.color)
+        for track in tracked_objects:
+            x, y, w, h = (float(v) * scale for v in track["bbox"])
+            x0, y0 = int(max(x, 0)), int(max(y, 0))
+            x1, y1 = int(min(x + w, img_w - 1)), int(min(y + h, img_h - 1))
+            if x0 >= x1 or y0 >= y1:
+                # Entirely outside the image.
+                continue
+            cv2.rectangle(img, (x0, y0), (x1, y1), color, self.thickness)
+
+            sprite = self.label_sprite(track["track_id"])
+            label_y = y0 - sprite.shape[0] - 4
+            if label_y < 0:
+                # No room above the box: place the label just inside it.
+                label_y = y0 + self.thickness + 2
+            self.__blit(img, sprite, x0, label_y)
+        return img
+
+    def render_layer(self, size, tracked_objects, scale: float = 1.0) -> np.ndarray:
+        """
+        Renders the overlay into a separate transparent BGRA layer.
+
+        Args:
+            size (tuple): (width, height) of the layer.
+            tracked_objects (list): As for render().
+            scale (float): Factor mapping source coordinates onto the layer.
+
+        Returns:
+            np.ndarray: H x W x 4 uint8 layer, alpha 255 where drawn.
+        """
+        width, height = size
+        layer = np.zeros((height, width, 4), dtype=np.uint8)
+        color = self.color
+        self.color = np.array([*color[:3], 255], dtype=np.uint8)
+        try:
+            self.render(layer, tracked_objects, scale)
+        finally:
+            self.color = color
+        return layer
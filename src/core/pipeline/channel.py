@@ -0,0 +1,191 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+# What put() does when the channel is full.
+BLOCK = "block"  # wait for space: the producer slows to the consumer's pace
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued item: lowest latency
+DROP_NEWEST = "drop_newest"  # discard the item being put: keeps a backlog
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+
+class ChannelClosed(Exception):
+    """
+    Raised by put() once a channel is closed, and by get() once it is
+    closed and drained.
+    """
+
+
+class _ChannelState:
+    """
+    Buffer, counters and the full-channel policy shared by the threaded and
+    asyncio channels. Callers hold the channel's lock.
+    """
+
+    def __init__(self, capacity: int, policy: str, name: Optional[str]):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self.name = name
+        self.items = deque()
+        self.closed = False
+        self.put_count = 0
+        self.get_count = 0
+        self.dropped = 0
+
+    def full(self) -> bool:
+        return len(self.items) >= self.capacity
+
+    def offer(self, item) -> bool:
+        """
+        Adds an item to a channel that is not full, or applies a dropping
+        policy to a full one. Returns whether the item was queued.
+        """
+        if self.closed:
+            raise ChannelClosed(self.name)
+        if self.full():
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                return False
+            self.items.popleft()
+        self.items.append(item)
+        self.put_count += 1
+        return True
+
+    def take(self):
+        self.get_count += 1
+        return self.items.popleft()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "policy": self.policy,
+            "capacity": self.capacity,
+            "depth": len(self.items),
+            "put": self.put_count,
+            "got": self.get_count,
+            "dropped": self.dropped,
+            "closed": self.closed,
+        }
+
+
+class Channel:
+    """
+    Bounded, thread-safe FIFO connecting two pipeline stages. When full,
+    put() blocks or drops according to the channel's policy. close()
+    ends the stream: consumers still receive the queued items, then
+    ChannelClosed.
+    """
+
+    def __init__(self, capacity: int = 1, policy: str = BLOCK, name: str = None):
+        """
+        Args:
+            capacity (int): Maximum number of queued items.
+            policy (str): BLOCK, DROP_OLDEST or DROP_NEWEST.
+            name (str): Used in stats and errors.
+        """
+        self._state = _ChannelState(capacity, policy, name)
+        self._cond = threading.Condition()
+
+    @property
+    def closed(self) -> bool:
+        return self._state.closed
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Queues an item.
+
+        Returns:
+            bool: False if the item was dropped, or a blocking put timed out.
+
+        Raises:
+            ChannelClosed: If the channel is (or gets) closed.
+        """
+        state = self._state
+        with self._cond:
+            if state.policy == BLOCK:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while state.full() and not state.closed:
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                    self._cond.wait(remaining)
+            queued = state.offer(item)
+            self._cond.notify_all()
+            return queued
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Returns the oldest item.
+
+        Raises:
+            queue.Empty: If no item arrives within the timeout.
+            ChannelClosed: If the channel is closed and drained.
+        """
+        state = self._state
+        with self._cond:
+            if not self._cond.wait_for(lambda: state.items or state.closed, timeout):
+                raise queue.Empty
+            if not state.items:
+                raise ChannelClosed(state.name)
+            item = state.take()
+            self._cond.notify_all()
+            return item
+
+    def close(self) -> None:
+        with self._cond:
+            self._state.closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return self._state.stats()
+
+
+class AsyncChannel:
+    """
+    The asyncio counterpart of Channel, for use within one event loop.
+    """
+
+    def __init__(self, capacity: int = 1, policy: str = BLOCK, name: str = None):
+        self._state = _ChannelState(capacity, policy, name)
+        self._cond = asyncio.Condition()
+
+    @property
+    def closed(self) -> bool:
+        return self._state.closed
+
+    async def put(self, item: Any) -> bool:
+        state = self._state
+        async with self._cond:
+            if state.policy == BLOCK:
+                await self._cond.wait_for(lambda: not state.full() or state.closed)
+            queued = state.offer(item)
+            self._cond.notify_all()
+            return queued
+
+    async def get(self) -> Any:
+        state = self._state
+        async with self._cond:
+            await self._cond.wait_for(lambda: state.items or state.closed)
+            if not state.items:
+                raise ChannelClosed(state.name)
+            item = state.take()
+            self._cond.notify_all()
+            return item
+
+    async def close(self) -> None:
+        async with self._cond:
+            self._state.closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return self._state.stats()
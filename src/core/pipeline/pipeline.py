@@ -0,0 +1,348 @@
+import asyncio
+import inspect
+import threading
+import time
+from typing import List, Optional
+
+from .channel import BLOCK, AsyncChannel, Channel, ChannelClosed
+from .stages import Sink, Source, Stage
+
+
+class _Node:
+    """A stage or sink with its input settings and run statistics."""
+
+    def __init__(self, stage: Stage, capacity: int, policy: str, name: str):
+        self.stage = stage
+        self.capacity = capacity
+        self.policy = policy
+        self.name = name
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "busy_seconds": round(self.busy_seconds, 4),
+        }
+
+
+class Pipeline:
+    """
+    A source followed by a chain of stages, fanning out to one or more
+    sinks. Every stage and sink reads from its own bounded channel whose
+    capacity and backpressure policy are given when it is added, so e.g.
+    a slow recorder can drop frames without stalling detection:
+
+        pipeline = (
+            Pipeline(CaptureSource(VideoProcessor(path)))
+            .add(SampleStage(3))
+            .add(DetectTrackStage(Model(weights)))
+            .add(DrawStage())
+            .add_sink(ArchiveSink(out), capacity=8, policy=DROP_OLDEST)
+        )
+        pipeline.run()                  # threads, blocks until done
+        await pipeline.run_async()      # or on an asyncio event loop
+
+    The threaded driver runs every node on its own thread; the asyncio
+    driver runs every node as a task, awaiting coroutine process() methods
+    and moving blocking ones to an executor. The end of the source, stop()
+    or an exception in any node closes the pipeline: items already queued
+    are drained, nodes upstream of a failure stop, and exceptions are
+    collected in .errors.
+    """
+
+    def __init__(self, source: Source):
+        self.source = source
+        self.stages: List[_Node] = []
+        self.sinks: List[_Node] = []
+        self.errors = []
+        self.source_frames = 0
+        self._channels = []
+        self._threads = []
+        self._stop = threading.Event()
+
+    def _node(self, stage, capacity, policy, name, kind) -> _Node:
+        if name is None:
+            name = f"{len(self.stages) + len(self.sinks)}:{type(stage).__name__}"
+        node = _Node(stage, capacity, policy, name)
+        kind.append(node)
+        return node
+
+    def add(
+        self,
+        stage: Stage,
+        capacity: int = 1,
+        policy: str = BLOCK,
+        name: Optional[str] = None,
+    ) -> "Pipeline":
+        """
+        Appends a stage to the chain.
+
+        Args:
+            stage (Stage): The stage.
+            capacity (int): Size of the channel in front of it.
+            policy (str): What happens when that channel is full (BLOCK,
+                DROP_OLDEST or DROP_NEWEST).
+            name (Optional[str]): Used in stats().
+        """
+        if self.sinks:
+            raise ValueError("Stages must be added before sinks.")
+        self._node(stage, capacity, policy, name, self.stages)
+        return self
+
+    def add_sink(
+        self,
+        sink: Sink,
+        capacity: int = 1,
+        policy: str = BLOCK,
+        name: Optional[str] = None,
+    ) -> "Pipeline":
+        """
+        Adds a sink receiving every packet that leaves the last stage.
+        Arguments as for add().
+        """
+        self._node(sink, capacity, policy, name, self.sinks)
+        return self
+
+    def _fail(self, node_name: str, error: BaseException) -> None:
+        self.errors.append((node_name, error))
+
+    # Threaded driver.
+
+    def start(self) -> "Pipeline":
+        """Starts one thread per node and returns immediately."""
+        if not self.sinks:
+            raise ValueError("A pipeline needs at least one sink.")
+        self._stop.clear()
+        self.errors = []
+        self._channels = []
+        inputs = {}
+        for node in self.stages + self.sinks:
+            inputs[node.name] = Channel(node.capacity, node.policy, node.name)
+            self._channels.append(inputs[node.name])
+
+        def outputs_of(i):
+            if i + 1 < len(self.stages):
+                return [inputs[self.stages[i + 1].name]]
+            return [inputs[sink.name] for sink in self.sinks]
+
+        self._threads = [
+            threading.Thread(
+                target=self._run_source,
+                args=(outputs_of(-1),),
+                name="source",
+                daemon=True,
+            )
+        ]
+        for i, node in enumerate(self.stages):
+            self._threads.append(
+                threading.Thread(
+                    target=self._run_node,
+                    args=(node, inputs[node.name], outputs_of(i)),
+                    name=node.name,
+                    daemon=True,
+                )
+            )
+        for node in self.sinks:
+            self._threads.append(
+                threading.Thread(
+                    target=self._run_node,
+                    args=(node, inputs[node.name], []),
+                    name=node.name,
+                    daemon=True,
+                )
+            )
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _run_source(self, outputs) -> None:
+        try:
+            self.source.open()
+            while not self._stop.is_set():
+                packet = self.source.read()
+                if packet is None:
+                    break
+                self.source_frames += 1
+                if not _send(packet, outputs):
+                    break
+        except Exception as error:
+            self._fail("source", error)
+        finally:
+            try:
+                self.source.close()
+            except Exception as error:
+                self._fail("source", error)
+            for channel in outputs:
+                channel.close()
+
+    def _run_node(self, node: _Node, inbox: Channel, outputs) -> None:
+        try:
+            node.stage.open()
+            while True:
+                try:
+                    packet = inbox.get()
+                except ChannelClosed:
+                    break
+                start = time.perf_counter()
+                result = node.stage.process(packet)
+                node.busy_seconds += time.perf_counter() - start
+                node.processed += 1
+                if result is not None and outputs and not _send(result, outputs):
+                    break
+        except Exception as error:
+            self._fail(node.name, error)
+        finally:
+            # Upstream sees the closed inbox on its next put and stops too.
+            inbox.close()
+            for channel in outputs:
+                channel.close()
+            try:
+                node.stage.close()
+            except Exception as error:
+                self._fail(node.name, error)
+
+    def stop(self) -> None:
+        """
+        Stops reading the source; queued packets still flow to the sinks.
+        """
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for all nodes to finish. Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            if deadline is None:
+                thread.join()
+            else:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def run(self) -> "Pipeline":
+        """Runs the pipeline on threads until the source ends."""
+        self.start().join()
+        return self
+
+    # Asyncio driver.
+
+    async def run_async(self, executor=None) -> "Pipeline":
+        """
+        Runs the pipeline as tasks on the running event loop until the
+        source ends or stop() is called.
+
+        Args:
+            executor: Where blocking source reads and process() calls run;
+                the loop's default executor if None.
+        """
+        if not self.sinks:
+            raise ValueError("A pipeline needs at least one sink.")
+        self._stop.clear()
+        self.errors = []
+        loop = asyncio.get_running_loop()
+
+        async def call(fn, *args):
+            if inspect.iscoroutinefunction(fn):
+                return await fn(*args)
+            return await loop.run_in_executor(executor, fn, *args)
+
+        inputs = [
+            AsyncChannel(node.capacity, node.policy, node.name)
+            for node in self.stages + self.sinks
+        ]
+        self._channels = inputs
+        stage_inputs = inputs[: len(self.stages)]
+        sink_inputs = inputs[len(self.stages):]
+
+        async def send(packet, outputs) -> bool:
+            sent = False
+            for channel in outputs:
+                try:
+                    await channel.put(packet)
+                    sent = True
+                except ChannelClosed:
+                    continue
+            return sent
+
+        async def run_source(outputs):
+            try:
+                await call(self.source.open)
+                while not self._stop.is_set():
+                    packet = await call(self.source.read)
+                    if packet is None:
+                        break
+                    self.source_frames += 1
+                    if not await send(packet, outputs):
+                        break
+            except Exception as error:
+                self._fail("source", error)
+            finally:
+                try:
+                    await call(self.source.close)
+                except Exception as error:
+                    self._fail("source", error)
+                for channel in outputs:
+                    await channel.close()
+
+        async def run_node(node, inbox, outputs):
+            try:
+                await call(node.stage.open)
+                while True:
+                    try:
+                        packet = await inbox.get()
+                    except ChannelClosed:
+                        break
+                    start = time.perf_counter()
+                    result = await call(node.stage.process, packet)
+                    node.busy_seconds += time.perf_counter() - start
+                    node.processed += 1
+                    if result is not None and outputs and not await send(
+                        result, outputs
+                    ):
+                        break
+            except Exception as error:
+                self._fail(node.name, error)
+            finally:
+                await inbox.close()
+                for channel in outputs:
+                    await channel.close()
+                try:
+                    await call(node.stage.close)
+                except Exception as error:
+                    self._fail(node.name, error)
+
+        tasks = [run_source(stage_inputs[:1] or sink_inputs)]
+        for i, node in enumerate(self.stages):
+            outputs = stage_inputs[i + 1: i + 2] or sink_inputs
+            tasks.append(run_node(node, stage_inputs[i], outputs))
+        for node, inbox in zip(self.sinks, sink_inputs):
+            tasks.append(run_node(node, inbox, []))
+        await asyncio.gather(*tasks)
+        return self
+
+    def stats(self) -> dict:
+        """
+        Returns source frame count, per-node counters and channel stats.
+        """
+        return {
+            "source_frames": self.source_frames,
+            "nodes": {node.name: node.stats() for node in self.stages + self.sinks},
+            "channels": [channel.stats() for channel in self._channels],
+            "errors": [f"{name}: {error!r}" for name, error in self.errors],
+        }
+
+
+def _send(packet, outputs) -> bool:
+    """
+    Puts a packet into every output channel. Returns False once all of them
+    are closed, i.e. nothing downstream is left to consume.
+    """
+    sent = False
+    for channel in outputs:
+        try:
+            channel.put(packet)
+            sent = True
+        except ChannelClosed:
+            continue
+    return sent
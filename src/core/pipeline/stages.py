@@ -0,0 +1,240 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+import cv2
+
+from ..analytics.heatmap import Heatmap
+from ..archive_processor import ArchiveProcessor
+from ..overlay_renderer import OverlayRenderer
+from ..video_utils.detections_sidecar import encode_tracks
+
+
+class Packet:
+    """
+    One frame moving through a pipeline. Stages fill in tracks and
+    annotated; image stays the clean source frame.
+    """
+
+    def __init__(self, index: int, timestamp: Optional[float], image):
+        self.index = index
+        self.timestamp = timestamp
+        self.image = image
+        self.tracks = None
+        self.annotated = None
+
+    def __repr__(self) -> str:
+        return f"Packet(index={self.index}, timestamp={self.timestamp})"
+
+
+class Source(ABC):
+    """
+    Produces packets. read() returns None at the end of the stream.
+    open() and close() run on the thread (or executor) that reads.
+    """
+
+    def open(self) -> None:
+        pass
+
+    @abstractmethod
+    def read(self) -> Optional[Packet]:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class Stage(ABC):
+    """
+    Transforms packets one at a time. process() returns the packet to pass
+    on, or None to drop it. It may be a coroutine function; the asyncio
+    driver awaits those and runs plain ones in an executor.
+    """
+
+    def open(self) -> None:
+        pass
+
+    @abstractmethod
+    def process(self, packet: Packet) -> Optional[Packet]:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class Sink(Stage):
+    """
+    Consumes packets; nothing is passed on.
+    """
+
+    def process(self, packet: Packet) -> None:
+        self.write(packet)
+
+    @abstractmethod
+    def write(self, packet: Packet) -> None:
+        pass
+
+
+class CaptureSource(Source):
+    """
+    Reads frames from a VideoProcessor, StreamProcessor or anything else
+    with get_frame(), get_timestamp() and release().
+    """
+
+    def __init__(self, processor, max_frames: Optional[int] = None):
+        """
+        Args:
+            processor: The capture to read from; released on close().
+            max_frames (Optional[int]): Stop after this many frames.
+        """
+        self.processor = processor
+        self.max_frames = max_frames
+        self.index = 0
+
+    def read(self) -> Optional[Packet]:
+        if self.max_frames is not None and self.index >= self.max_frames:
+            return None
+        frame = self.processor.get_frame()
+        if frame is None:
+            return None
+        packet = Packet(self.index, self.processor.get_timestamp(), frame)
+        self.index += 1
+        return packet
+
+    def close(self) -> None:
+        self.processor.release()
+
+
+class SampleStage(Stage):
+    """
+    Passes every nth packet, like the GUI's frame skip.
+    """
+
+    def __init__(self, every: int = 3):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.every = every
+        self.count = 0
+
+    def process(self, packet: Packet) -> Optional[Packet]:
+        self.count += 1
+        return packet if self.count % self.every == 0 else None
+
+
+class DetectTrackStage(Stage):
+    """
+    Runs a Model (YOLO detection and DeepSORT tracking) and stores its
+    tracks on the packet. The model is closed with the stage.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def process(self, packet: Packet) -> Packet:
+        packet.tracks = self.model.process_frame(
+            packet.image, packet.index, packet.timestamp
+        )
+        return packet
+
+    def close(self) -> None:
+        close = getattr(self.model, "close", None)
+        if close is not None:
+            close()
+
+
+class HeatmapStage(Stage):
+    """
+    Accumulates the packets' tracks into a Heatmap, created for the frame
+    size of the first packet unless one is given.
+    """
+
+    def __init__(self, heatmap: Optional[Heatmap] = None, cell_size: int = 16):
+        self.heatmap = heatmap
+        self.cell_size = cell_size
+
+    def process(self, packet: Packet) -> Packet:
+        if self.heatmap is None:
+            h, w = packet.image.shape[:2]
+            self.heatmap = Heatmap((w, h), self.cell_size)
+        self.heatmap.update(packet.tracks or [], packet.timestamp, packet.index)
+        return packet
+
+
+class DrawStage(Stage):
+    """
+    Renders the tracks onto a copy of the frame as packet.annotated.
+    """
+
+    def __init__(self, renderer: Optional[OverlayRenderer] = None):
+        self.renderer = renderer or OverlayRenderer()
+
+    def process(self, packet: Packet) -> Packet:
+        packet.annotated = self.renderer.render(
+            packet.image.copy(), packet.tracks or []
+        )
+        return packet
+
+
+class ArchiveSink(Sink):
+    """
+    Writes frames to a video file with ArchiveProcessor, opened with the
+    size of the first frame. Writes the annotated frame if there is one.
+    """
+
+    def __init__(self, output_path: str, fps: int = 30, codec: str = "mp4v"):
+        self.output_path = output_path
+        self.fps = fps
+        self.codec = codec
+        self.archive = None
+        self.frames = 0
+
+    def write(self, packet: Packet) -> None:
+        frame = packet.annotated if packet.annotated is not None else packet.image
+        if self.archive is None:
+            h, w = frame.shape[:2]
+            self.archive = ArchiveProcessor(
+                self.output_path, fps=self.fps, frame_size=(w, h), codec=self.codec
+            )
+        self.archive.write_frame(frame)
+        self.frames += 1
+
+    def close(self) -> None:
+        if self.archive is not None:
+            self.archive.release()
+
+
+class VideoQueueSink(Sink):
+    """
+    Enqueues (clean frame, encoded tracks, frame index, timestamp) entries,
+    the GUI's archive format, to a VideoQueue. The GUI archives RGB
+    frames, so the BGR source frame is converted.
+    """
+
+    def __init__(self, video_queue):
+        """
+        Args:
+            video_queue: The VideoQueue class (or another object with
+                enqueue()).
+        """
+        self.video_queue = video_queue
+
+    def write(self, packet: Packet) -> None:
+        self.video_queue.enqueue(
+            (
+                cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB),
+                encode_tracks(packet.tracks or []),
+                packet.index,
+                packet.timestamp,
+            )
+        )
+
+
+class CallbackSink(Sink):
+    """
+    Hands every packet to a callable, e.g. to feed a GUI or a service.
+    """
+
+    def __init__(self, callback: Callable):
+        self.callback = callback
+
+    def write(self, packet: Packet) -> None:
+        self.callback(packet)
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+def format_duration(seconds: float) -> str:
+    """Formats seconds as m:ss, or h:mm:ss from an hour on."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class ProgressTracker:
+    """
+    Progress of a job with a known amount of work, e.g. the frames of a
+    video. The rate, and with it the ETA, is measured over the last
+    window seconds, so it follows changes in speed (a busier scene, a
+    different input size) instead of averaging over the whole run.
+    update() may be called from a worker thread while the GUI reads.
+    """
+
+    def __init__(self, total: int, window: float = 5.0, unit: str = "frames"):
+        """
+        Args:
+            total (int): Units of work, 0 if unknown.
+            window (float): Seconds over which the rate is measured.
+            unit (str): Name of the unit in describe().
+        """
+        self.total = total
+        self.window = window
+        self.unit = unit
+        self.done = 0
+        self.started = None
+        self.finished = None
+        self._samples = deque()
+        self._lock = threading.Lock()
+
+    def start(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.started = now
+            self.finished = None
+            self.done = 0
+            self._samples.clear()
+            self._samples.append((now, 0))
+
+    def update(self, done: int, now: Optional[float] = None) -> None:
+        """Records that done units of work are complete."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.started is None:
+                self.started = now
+                self._samples.append((now, 0))
+            self.done = done
+            self._samples.append((now, done))
+            # Keep one sample older than the window as its start.
+            while len(self._samples) > 2 and self._samples[1][0] < now - self.window:
+                self._samples.popleft()
+
+    def finish(self, now: Optional[float] = None) -> None:
+        with self._lock:
+            self.finished = time.monotonic() if now is None else now
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        if self.started is None:
+            return 0.0
+        end = self.finished or (time.monotonic() if now is None else now)
+        return end - self.started
+
+    def rate(self) -> Optional[float]:
+        """Units per second over the window, None before two samples."""
+        with self._lock:
+            if len(self._samples) < 2:
+                return None
+            (t0, d0), (t1, d1) = self._samples[0], self._samples[-1]
+        if t1 <= t0:
+            return None
+        return (d1 - d0) / (t1 - t0)
+
+    def eta(self) -> Optional[float]:
+        """Seconds until done at the current rate, None if unknown."""
+        rate = self.rate()
+        if not self.total or not rate:
+            return None
+        return max(0.0, (self.total - self.done) / rate)
+
+    def describe(self) -> str:
+        """E.g. "42% - 118 frames/s - ETA 1:23"."""
+        parts = []
+        fraction = self.fraction
+        parts.append(f"{self.done} {self.unit}" if fraction is None else f"{fraction:.0%}")
+        rate = self.rate()
+        if rate is not None:
+            parts.append(f"{rate:.0f} {self.unit}/s")
+        if self.finished is not None:
+            parts.append(f"done in {format_duration(self.elapsed())}")
+        else:
+            eta = self.eta()
+            if eta is not None:
+                parts.append(f"ETA {format_duration(eta)}")
+        return " - ".join(parts)
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed()
+        return {
+            "done": self.done,
+            "total": self.total,
+            "elapsed_s": round(elapsed, 2),
+            "rate": round(self.done / elapsed, 2) if elapsed > 0 else None,
+        }
@@ -0,0 +1,257 @@
+import json
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.npy"
+ENTRIES_FILE = "entries.json"
+INDEX_FILE = "ivf.npz"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _spherical_kmeans(data: np.ndarray, k: int, iterations: int = 10, seed: int = 0):
+    """
+    Clusters L2-normalised rows by cosine similarity.
+
+    Returns:
+        tuple: (centroids k x D, assignment per row)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+    return centroids, np.argmax(data @ centroids.T, axis=1)
+
+
+class ReIDGallery:
+    """
+    Persistent gallery of per-track appearance embeddings for matching the
+    same person across videos.
+
+    Each (video_id, track_id) has one L2-normalised mean embedding. Search
+    uses an inverted-file index: embeddings are clustered with spherical
+    k-means and a query only scores the members of its n_probe nearest
+    clusters. Small galleries are searched exhaustively.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        n_probe: int = 4,
+        exact_below: int = 2048,
+        save_interval: float = 60.0,
+    ):
+        """
+        Args:
+            path (str): Gallery directory. Created if missing.
+            n_probe (int): Clusters scored per query.
+            exact_below (int): Gallery size under which search is exact.
+            save_interval (float): Seconds between automatic saves of
+                pending observations, None to only save explicitly.
+        """
+        self.path = path
+        self.n_probe = n_probe
+        self.exact_below = exact_below
+        self.save_interval = save_interval
+        os.makedirs(path, exist_ok=True)
+
+        self.embeddings = None
+        self.entries = []
+        self._positions = {}
+        self._centroids = None
+        self._assignments = None
+        self._indexed_count = 0
+        # (video_id, track_id) -> [feature sum, count, first_ts, last_ts]
+        self._pending = {}
+        self._last_save = time.monotonic()
+        self.__load()
+
+    def __load(self) -> None:
+        entries_path = os.path.join(self.path, ENTRIES_FILE)
+        if not os.path.isfile(entries_path):
+            return
+        with open(entries_path, "r") as f:
+            self.entries = json.load(f)
+        self.embeddings = np.load(os.path.join(self.path, EMBEDDINGS_FILE))
+        self._positions = {
+            (entry["video_id"], str(entry["track_id"])): i
+            for i, entry in enumerate(self.entries)
+        }
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if os.path.isfile(index_path):
+            with np.load(index_path) as index:
+                self._centroids = index["centroids"]
+                self._assignments = index["assignments"]
+            self._indexed_count = len(self._assignments)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def observe(self, video_id: str, track_id, feature, timestamp: float = None) -> None:
+        """
+        Accumulates one appearance feature of a track. Pending features are
+        averaged into the gallery on save().
+        """
+        key = (video_id, str(track_id))
+        feature = np.asarray(feature, dtype=np.float32)
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = [feature.copy(), 1, timestamp, timestamp]
+        else:
+            pending[0] += feature
+            pending[1] += 1
+            pending[3] = timestamp
+        if (
+            self.save_interval is not None
+            and time.monotonic() - self._last_save >= self.save_interval
+        ):
+            self.save()
+
+    def add(
+        self,
+        video_id: str,
+        track_id,
+        embedding,
+        count: int = 1,
+        first_ts: float = None,
+        last_ts: float = None,
+    ) -> None:
+        """
+        Adds a track embedding, merging it (weighted by count) with an
+        existing entry for the same video and track.
+        """
+        key = (video_id, str(track_id))
+        embedding = _normalize(np.asarray(embedding, dtype=np.float32))
+        position = self._positions.get(key)
+        if position is not None:
+            entry = self.entries[position]
+            total = entry["count"] + count
+            merged = self.embeddings[position] * entry["count"] + embedding * count
+            self.embeddings[position] = _normalize(merged)
+            entry["count"] = total
+            if last_ts is not None:
+                entry["last_ts"] = last_ts
+            return
+
+        self._positions[key] = len(self.entries)
+        self.entries.append(
+            {
+                "video_id": video_id,
+                "track_id": str(track_id),
+                "count": count,
+                "first_ts": first_ts,
+                "last_ts": last_ts,
+            }
+        )
+        row = embedding[np.newaxis, :]
+        self.embeddings = row if self.embeddings is None else np.vstack([self.embeddings, row])
+        if self._centroids is not None:
+            # Assign to the nearest existing cluster; rebuilt when stale.
+            cluster = int(np.argmax(self._centroids @ embedding))
+            self._assignments = np.append(self._assignments, cluster)
+
+    def __flush_pending(self) -> None:
+        for (video_id, track_id), (total, count, first_ts, last_ts) in self._pending.items():
+            self.add(video_id, track_id, total / count, count, first_ts, last_ts)
+        self._pending = {}
+
+    def build_index(self, n_lists: Optional[int] = None) -> None:
+        """
+        (Re)clusters the gallery. Defaults to about sqrt(N) clusters.
+        """
+        if self.embeddings is None or len(self.entries) == 0:
+            return
+        n = len(self.entries)
+        n_lists = n_lists or int(np.clip(np.sqrt(n), 1, 1024))
+        self._centroids, self._assignments = _spherical_kmeans(
+            self.embeddings, min(n_lists, n)
+        )
+        self._indexed_count = n
+
+    def save(self) -> None:
+        """
+        Merges pending observations, refreshes the index if it has grown
+        stale, and writes the gallery to disk.
+        """
+        self._last_save = time.monotonic()
+        self.__flush_pending()
+        if self.embeddings is None:
+            return
+        n = len(self.entries)
+        if n >= self.exact_below and (
+            self._centroids is None or n > 1.2 * self._indexed_count
+        ):
+            self.build_index()
+
+        tmp = os.path.join(self.path, "tmp_")
+        np.save(tmp + EMBEDDINGS_FILE, self.embeddings)
+        os.replace(tmp + EMBEDDINGS_FILE, os.path.join(self.path, EMBEDDINGS_FILE))
+        if self._centroids is not None:
+            np.savez(tmp + INDEX_FILE, centroids=self._centroids, assignments=self._assignments)
+            os.replace(tmp + INDEX_FILE, os.path.join(self.path, INDEX_FILE))
+        with open(tmp + ENTRIES_FILE, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp + ENTRIES_FILE, os.path.join(self.path, ENTRIES_FILE))
+
+    def __candidates(self, query: np.ndarray) -> np.ndarray:
+        n = len(self.entries)
+        if self._centroids is None or n < self.exact_below:
+            return np.arange(n)
+        n_probe = min(self.n_probe, len(self._centroids))
+        nearest = np.argpartition(-(self._centroids @ query), n_probe - 1)[:n_probe]
+        return np.flatnonzero(np.isin(self._assignments, nearest))
+
+    def search(self, embedding, k: int = 10, exclude_video: str = None) -> list:
+        """
+        Finds the k gallery tracks most similar to an embedding.
+
+        Args:
+            embedding: Appearance feature of the query person.
+            k (int): Maximum number of matches.
+            exclude_video (str): Skip tracks from this video.
+
+        Returns:
+            list: Dicts with video_id, track_id, similarity (cosine),
+            count, first_ts and last_ts, best match first.
+        """
+        if self.embeddings is None:
+            return []
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        candidates = self.__candidates(query)
+        if exclude_video is not None:
+            video_ids = np.array([entry["video_id"] for entry in self.entries])
+            candidates = candidates[video_ids[candidates] != exclude_video]
+        if candidates.size == 0:
+            return []
+        scores = self.embeddings[candidates] @ query
+        k = min(k, candidates.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            dict(self.entries[candidates[i]], similarity=float(scores[i]))
+            for i in top
+        ]
+
+    def find_track(self, video_id: str, track_id, k: int = 10) -> list:
+        """
+        Finds the person of a known track in other videos.
+
+        Returns:
+            list: Matches as for search(), excluding video_id itself.
+            Empty if the track is not in the gallery.
+        """
+        position = self._positions.get((video_id, str(track_id)))
+        if position is None:
+            return []
+        return self.search(self.embeddings[position], k, exclude_video=video_id)
@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 7878
+# Message prefix: header length and payload length, network byte order.
+_PREFIX = struct.Struct("!II")
+MAX_HEADER_BYTES = 1 << 16
+MAX_PAYLOAD_BYTES = 64 << 20
+
+
+class ProtocolError(Exception):
+    """Raised for malformed or unexpected messages."""
+
+
+class RemoteUnavailable(Exception):
+    """Raised when no inference server answered in time."""
+
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b"") -> None:
+    """
+    Sends one message: the 8-byte prefix, a JSON header and a binary
+    payload (JPEG for requests, float32 boxes for responses).
+    """
+    data = json.dumps(header).encode("utf-8")
+    sock.sendall(_PREFIX.pack(len(data), len(payload)) + data + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed by peer.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket):
+    """
+    Receives one message.
+
+    Returns:
+        tuple: (header dict, payload bytes).
+    """
+    header_size, payload_size = _PREFIX.unpack(_recv_exact(sock, _PREFIX.size))
+    if header_size > MAX_HEADER_BYTES or payload_size > MAX_PAYLOAD_BYTES:
+        raise ProtocolError(f"Message too large ({header_size}, {payload_size}).")
+    header = json.loads(_recv_exact(sock, header_size).decode("utf-8"))
+    payload = _recv_exact(sock, payload_size) if payload_size else b""
+    return header, payload
+
+
+def encode_frame(frame: np.ndarray, quality: int = 85, max_side: Optional[int] = None):
+    """
+    JPEG-encodes a frame, first downscaling it so its longer side is at
+    most max_side; the detector resizes to its input size anyway.
+
+    Returns:
+        tuple: (jpeg bytes, scale applied to the frame).
+    """
+    scale = 1.0
+    h, w = frame.shape[:2]
+    if max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        frame = cv2.resize(
+            frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA
+        )
+    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Cannot JPEG-encode frame.")
+    return jpeg.tobytes(), scale
+
+
+class _InferenceHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        send_message(
+            self.request,
+            {"type": "hello", "version": PROTOCOL_VERSION, "model": server.model_name},
+        )
+        while True:
+            try:
+                header, payload = recv_message(self.request)
+            except (ConnectionError, OSError, ProtocolError, ValueError):
+                return
+            if header.get("type") != "infer":
+                send_message(self.request, {"type": "error", "seq": header.get("seq")})
+                continue
+            start = time.perf_counter()
+            frame = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                send_message(
+                    self.request,
+                    {"type": "error", "seq": header["seq"], "error": "bad jpeg"},
+                )
+                continue
+            boxes = server.detect(frame, header.get("imgsz"))
+            send_message(
+                self.request,
+                {
+                    "type": "detections",
+                    "seq": header["seq"],
+                    "count": len(boxes),
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                },
+                boxes.astype(np.float32).tobytes(),
+            )
+
+
+class InferenceServer(socketserver.ThreadingTCPServer):
+    """
+    Serves detections over TCP. Clients send JPEG frames with sequence
+    numbers and receive (N, 5) float32 x1, y1, x2, y2, confidence rows in
+    the coordinates of the frame they sent. Requests from all connections
+    share one detector and are run one at a time.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        detector,
+        host: str = "0.0.0.0",
+        port: int = DEFAULT_PORT,
+        model_name: str = "",
+    ):
+        """
+        Args:
+            detector: A Model (or object with input_size, set_input_size
+                and detect(frame) -> (N, 5) array).
+            host (str): Interface to listen on.
+            port (int): TCP port, 0 picks a free one (see .port).
+            model_name (str): Reported to clients on connect.
+        """
+        super().__init__((host, port), _InferenceHandler)
+        self.detector = detector
+        self.model_name = model_name
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def detect(self, frame: np.ndarray, imgsz: Optional[int]) -> np.ndarray:
+        with self._lock:
+            if imgsz and imgsz != self.detector.input_size:
+                self.detector.set_input_size(imgsz)
+            return np.asarray(self.detector.detect(frame), np.float32).reshape(-1, 5)
+
+
+class _Connection:
+    """Client-side state of one server."""
+
+    def __init__(self, address: str):
+        host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+        self.address = address
+        self.host = host or "127.0.0.1"
+        self.port = int(port) if port else DEFAULT_PORT
+        self.sock = None
+        self.down_until = 0.0
+        self.latency = None  # smoothed round trip in seconds
+        self.requests = 0
+        self.failures = 0
+
+    def close(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+class RemoteDetector:
+    """
+    Sends frames to one or more InferenceServers and returns their
+    detections. Every request goes to the healthy server with the lowest
+    smoothed round-trip time (untried servers first), so sessions spread
+    over the pool and prefer fast servers. A server that times out or
+    fails is skipped for retry_after seconds and the request moves on to
+    the next one; RemoteUnavailable is raised when none answers, so the
+    caller can fall back to local inference.
+    """
+
+    def __init__(
+        self,
+        servers: Sequence[str],
+        timeout: float = 1.0,
+        jpeg_quality: int = 85,
+        max_side: Optional[int] = None,
+        retry_after: float = 5.0,
+    ):
+        """
+        Args:
+            servers (Sequence[str]): "host:port" addresses.
+            timeout (float): Seconds to connect and to wait for a response.
+            jpeg_quality (int): JPEG quality of transmitted frames.
+            max_side (Optional[int]): Downscale frames to this longer side
+                before sending; defaults to the requested imgsz.
+            retry_after (float): Seconds a failed server is skipped.
+        """
+        if not servers:
+            raise ValueError("No inference servers given.")
+        self.connections = [_Connection(address) for address in servers]
+        self.timeout = timeout
+        self.jpeg_quality = jpeg_quality
+        self.max_side = max_side
+        self.retry_after = retry_after
+        self.seq = 0
+
+    def _candidates(self) -> list:
+        now = time.monotonic()
+        healthy = [c for c in self.connections if c.down_until <= now]
+        return sorted(healthy, key=lambda c: -1.0 if c.latency is None else c.latency)
+
+    def _connect(self, conn: _Connection) -> socket.socket:
+        sock = socket.create_connection((conn.host, conn.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        hello, _ = recv_message(sock)
+        if hello.get("type") != "hello" or hello.get("version") != PROTOCOL_VERSION:
+            sock.close()
+            raise ProtocolError(f"Unexpected greeting from {conn.address}: {hello}")
+        return sock
+
+    def _request(self, conn: _Connection, header: dict, jpeg: bytes) -> np.ndarray:
+        if conn.sock is None:
+            conn.sock = self._connect(conn)
+        conn.sock.settimeout(self.timeout)
+        send_message(conn.sock, header, jpeg)
+        response, payload = recv_message(conn.sock)
+        if response.get("seq") != header["seq"] or response.get("type") != "detections":
+            raise ProtocolError(f"Unexpected response from {conn.address}: {response}")
+        return np.frombuffer(payload, np.float32).reshape(-1, 5)
+
+    def detect(self, frame: np.ndarray, imgsz: Optional[int] = None) -> np.ndarray:
+        """
+        Returns an (N, 5) array of x1, y1, x2, y2, confidence rows in the
+        coordinates of frame.
+
+        Raises:
+            RemoteUnavailable: If every server failed or is backing off.
+        """
+        jpeg, scale = encode_frame(frame, self.jpeg_quality, self.max_side or imgsz)
+        self.seq += 1
+        header = {"type": "infer", "seq": self.seq, "imgsz": imgsz}
+        for conn in self._candidates():
+            conn.requests += 1
+            start = time.monotonic()
+            try:
+                boxes = self._request(conn, header, jpeg)
+            except (OSError, ConnectionError, ProtocolError, ValueError):
+                # A late response would desynchronise the stream: reconnect.
+                conn.close()
+                conn.failures += 1
+                conn.down_until = time.monotonic() + self.retry_after
+                continue
+            elapsed = time.monotonic() - start
+            conn.latency = (
+                elapsed if conn.latency is None else 0.8 * conn.latency + 0.2 * elapsed
+            )
+            boxes = boxes.copy()
+            boxes[:, :4] /= scale
+            return boxes
+        raise RemoteUnavailable("No inference server answered.")
+
+    def stats(self) -> list:
+        now = time.monotonic()
+        return [
+            {
+                "server": c.address,
+                "up": c.down_until <= now,
+                "requests": c.requests,
+                "failures": c.failures,
+                "latency_ms": None if c.latency is None else round(c.latency * 1000, 1),
+            }
+            for c in self.connections
+        ]
+
+    def close(self) -> None:
+        for conn in self.connections:
+            conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve DroneLink person detections to remote players."
+    )
+    parser.add_argument("weights", help="YOLO weights file")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--device", help="Inference device, e.g. cuda:0")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    from .model_processor import Model
+
+    model = Model(
+        args.weights,
+        conf_threshold=args.conf,
+        input_size=args.imgsz,
+        device=args.device,
+    )
+    model.warm_up()
+    server = InferenceServer(
+        model, args.host, args.port, model_name=os.path.basename(args.weights)
+    )
+    print(f"Serving {args.weights} on {args.host}:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        model.close()
+
+
+if __name__ == "__main__":
+    main()
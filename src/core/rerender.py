@@ -0,0 +1,189 @@
+import argparse
+import shutil
+from typing import Iterable, Optional
+
+import cv2
+import numpy as np
+
+from .archive_processor import ArchiveProcessor
+from .overlay_renderer import OverlayRenderer
+from .video_utils.detections_sidecar import (
+    read_detections_sidecar,
+    scale_tracks,
+    sidecar_path_for,
+)
+from .video_utils.ffmpeg_writer import FFmpegWriter
+
+
+def filter_tracks(
+    tracks: list,
+    min_confidence: Optional[float] = None,
+    track_ids: Optional[Iterable] = None,
+) -> list:
+    """
+    Drops tracks below min_confidence or not in track_ids. Tracks without
+    a recorded confidence (coasting between detections) are kept.
+    """
+    wanted = None if track_ids is None else {str(t) for t in track_ids}
+    kept = []
+    for track in tracks:
+        if wanted is not None and str(track["track_id"]) not in wanted:
+            continue
+        confidence = track.get("confidence")
+        if min_confidence is not None and confidence is not None:
+            if confidence < min_confidence:
+                continue
+        kept.append(track)
+    return kept
+
+
+def blur_boxes(img: np.ndarray, tracks: list, scale: float = 1.0, kernel: int = 31):
+    """
+    Gaussian-blurs the inside of every box in place, e.g. to anonymise
+    people before sharing footage.
+    """
+    height, width = img.shape[:2]
+    kernel |= 1
+    for track in tracks:
+        x, y, w, h = (v * scale for v in track["bbox"])
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(width, int(x + w)), min(height, int(y + h))
+        if x1 > x0 and y1 > y0:
+            img[y0:y1, x0:x1] = cv2.GaussianBlur(
+                img[y0:y1, x0:x1], (kernel, kernel), 0
+            )
+
+
+def rerender(
+    video_path: str,
+    output_path: str,
+    sidecar_path: Optional[str] = None,
+    color: tuple = (0, 0, 255),
+    thickness: int = 2,
+    font_scale: float = 0.5,
+    min_confidence: Optional[float] = None,
+    track_ids: Optional[Iterable] = None,
+    blur: bool = False,
+    draw_boxes: bool = True,
+    backend: str = "opencv",
+    codec: Optional[str] = None,
+) -> int:
+    """
+    Composites overlays from a detections sidecar onto a clean archived
+    video. Only decoding, drawing and encoding happen; no model is loaded.
+
+    Args:
+        video_path (str): Clean video written by the archive export or
+            the event clipper.
+        output_path (str): Rendered output video.
+        sidecar_path (Optional[str]): Defaults to the video's
+            .detections.jsonl next to it.
+        color (tuple): BGR colour of boxes and labels.
+        thickness (int): Box line thickness.
+        font_scale (float): Label font scale.
+        min_confidence (Optional[float]): Hide detections below this.
+        track_ids (Optional[Iterable]): Only show these tracks.
+        blur (bool): Blur the inside of every shown box.
+        draw_boxes (bool): Draw boxes and labels.
+        backend (str): "opencv", "ffmpeg" or "auto".
+        codec (Optional[str]): FourCC (opencv) or ffmpeg encoder.
+
+    Returns:
+        int: Number of frames written.
+    """
+    header, records = read_detections_sidecar(
+        sidecar_path or sidecar_path_for(video_path)
+    )
+    tracks_by_frame = {record["frame"]: record["tracks"] for record in records}
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open {video_path}.")
+    fps = cap.get(cv2.CAP_PROP_FPS) or header.get("fps") or 30
+    if backend == "auto":
+        backend = "ffmpeg" if shutil.which("ffmpeg") else "opencv"
+
+    renderer = OverlayRenderer(color, thickness, font_scale)
+    writer = None
+    frames = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if writer is None:
+                frame_size = (frame.shape[1], frame.shape[0])
+                # Sidecar boxes are in the archived frame size; follow the
+                # video if it has been rescaled since.
+                archived_w, archived_h = header.get("frame_size", frame_size)
+                sx = frame_size[0] / archived_w
+                sy = frame_size[1] / archived_h
+                if backend == "ffmpeg":
+                    writer = FFmpegWriter(
+                        output_path, fps, frame_size, codec=codec or "libx264"
+                    )
+                else:
+                    writer = ArchiveProcessor(
+                        output_path, fps, frame_size, codec=codec or "mp4v"
+                    )
+
+            tracks = filter_tracks(
+                tracks_by_frame.get(frames, []), min_confidence, track_ids
+            )
+            if (sx, sy) != (1.0, 1.0):
+                tracks = scale_tracks(tracks, sx, sy)
+            if blur:
+                blur_boxes(frame, tracks)
+            if draw_boxes:
+                renderer.render(frame, tracks)
+            writer.write_frame(frame)
+            frames += 1
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-render overlays onto an archived DroneLink video "
+        "from its detections sidecar."
+    )
+    parser.add_argument("video", help="Clean archived video")
+    parser.add_argument("output", help="Output video")
+    parser.add_argument("--sidecar", help="Detections sidecar (.detections.jsonl)")
+    parser.add_argument(
+        "--color", default="0,0,255", help="Box colour as B,G,R (default red)"
+    )
+    parser.add_argument("--thickness", type=int, default=2)
+    parser.add_argument("--font-scale", type=float, default=0.5)
+    parser.add_argument("--min-confidence", type=float)
+    parser.add_argument("--tracks", nargs="+", help="Only show these track IDs")
+    parser.add_argument("--blur", action="store_true", help="Blur inside boxes")
+    parser.add_argument("--no-boxes", action="store_true", help="Do not draw boxes")
+    parser.add_argument(
+        "--backend", default="opencv", choices=("opencv", "ffmpeg", "auto")
+    )
+    parser.add_argument("--codec")
+    args = parser.parse_args(argv)
+
+    frames = rerender(
+        args.video,
+        args.output,
+        sidecar_path=args.sidecar,
+        color=tuple(int(c) for c in args.color.split(",")),
+        thickness=args.thickness,
+        font_scale=args.font_scale,
+        min_confidence=args.min_confidence,
+        track_ids=args.tracks,
+        blur=args.blur,
+        draw_boxes=not args.no_boxes,
+        backend=args.backend,
+        codec=args.codec,
+    )
+    print(f"Rendered {frames} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+import threading
+import time
+from typing import Optional
+
+import cv2
+import psutil
+
+STAGES = ("capture", "inference", "encoding", "gui")
+
+
+class ThreadProfile:
+    """
+    Thread budget and optional CPU set for each pipeline stage, so torch,
+    OpenCV, the decoder and the encoder do not each size their pools to the
+    whole machine.
+    """
+
+    def __init__(
+        self,
+        capture_threads: int = 1,
+        inference_threads: int = 4,
+        encoder_threads: int = 2,
+        gui_threads: int = 1,
+        affinity: Optional[dict] = None,
+    ):
+        """
+        Args:
+            capture_threads (int): Decoder threads of the video capture.
+            inference_threads (int): torch intra-op threads in the worker.
+            encoder_threads (int): ffmpeg encoder threads for recordings.
+            gui_threads (int): OpenCV threads for resizing and colour
+                conversion in the GUI process.
+            affinity (Optional[dict]): Stage name to list of CPU ids the
+                stage is pinned to. Stages not listed are not pinned.
+        """
+        self.capture_threads = max(1, int(capture_threads))
+        self.inference_threads = max(1, int(inference_threads))
+        self.encoder_threads = max(1, int(encoder_threads))
+        self.gui_threads = max(1, int(gui_threads))
+        self.affinity = {
+            stage: [int(cpu) for cpu in cpus]
+            for stage, cpus in (affinity or {}).items()
+            if stage in STAGES and cpus
+        }
+
+    @classmethod
+    def auto(
+        cls,
+        physical_cores: Optional[int] = None,
+        logical_cpus: Optional[int] = None,
+        pin: bool = False,
+    ) -> "ThreadProfile":
+        """
+        Derives a profile from the core count: one core is left to the GUI
+        and capture, about a quarter of the rest goes to encoding and the
+        remainder to inference.
+
+        Args:
+            physical_cores (Optional[int]): Defaults to the detected count.
+            logical_cpus (Optional[int]): Defaults to the detected count.
+            pin (bool): Also pin inference to its own CPUs, away from the
+                CPUs shared by capture, encoding and the GUI.
+        """
+        logical = logical_cpus or os.cpu_count() or 1
+        physical = physical_cores or psutil.cpu_count(logical=False) or logical
+        encoder = max(1, (physical - 1) // 4)
+        inference = max(1, physical - 1 - encoder)
+        affinity = None
+        if pin and logical > 2:
+            # Logical CPUs per core, to pin whole cores with SMT enabled.
+            per_core = max(1, logical // physical)
+            shared = list(range(min(logical - 1, (1 + encoder) * per_core)))
+            workers = list(range(len(shared), logical))
+            affinity = {
+                "capture": shared,
+                "gui": shared,
+                "encoding": shared,
+                "inference": workers,
+            }
+        return cls(
+            capture_threads=2 if physical >= 4 else 1,
+            inference_threads=inference,
+            encoder_threads=encoder,
+            gui_threads=1,
+            affinity=affinity,
+        )
+
+    def threads(self, stage: str) -> int:
+        """Returns the thread budget of a stage."""
+        if stage == "encoding":
+            return self.encoder_threads
+        return getattr(self, f"{stage}_threads")
+
+    def to_dict(self) -> dict:
+        return {
+            "capture_threads": self.capture_threads,
+            "inference_threads": self.inference_threads,
+            "encoder_threads": self.encoder_threads,
+            "gui_threads": self.gui_threads,
+            "affinity": dict(self.affinity),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ThreadProfile":
+        return cls(**data)
+
+
+class ResourceGovernor:
+    """
+    Applies a ThreadProfile to each stage from inside the thread or
+    process running it, and reports the CPU time every registered stage
+    actually used against its thread budget.
+    """
+
+    def __init__(self, profile: Optional[ThreadProfile] = None):
+        """
+        Args:
+            profile (Optional[ThreadProfile]): Defaults to
+                ThreadProfile.auto().
+        """
+        self.profile = profile or ThreadProfile.auto()
+        # stage -> list of (pid, native thread id or None for the process)
+        self._members = {stage: [] for stage in STAGES}
+        self._last_sample = None
+
+    def apply(self, stage: str) -> None:
+        """
+        Configures the calling thread (and, for inference, its process)
+        for the stage and registers it for the utilisation report. Call it
+        at the start of the stage's thread or process. A governor in
+        another process must register() the worker's pid itself.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage!r}, expected one of {STAGES}")
+        # Pin first so thread pools created below inherit the CPU set.
+        cpus = self.profile.affinity.get(stage)
+        if cpus:
+            set_affinity(cpus, whole_process=stage == "inference")
+
+        if stage == "inference":
+            import torch
+
+            torch.set_num_threads(self.profile.inference_threads)
+            # The worker's own OpenCV calls (letterboxing) are small.
+            cv2.setNumThreads(1)
+            self.register(stage, os.getpid())
+        else:
+            if stage == "gui":
+                cv2.setNumThreads(self.profile.gui_threads)
+            self.register(stage, os.getpid(), threading.get_native_id())
+
+    def register(self, stage: str, pid: int, native_id: Optional[int] = None) -> None:
+        """
+        Counts a process, or one thread of it, towards a stage in report().
+        """
+        member = (pid, native_id)
+        if member not in self._members[stage]:
+            self._members[stage].append(member)
+
+    def unregister(self, stage: str, pid: int) -> None:
+        """Removes a process, and all its threads, from a stage."""
+        self._members[stage] = [m for m in self._members[stage] if m[0] != pid]
+
+    def _cpu_seconds(self) -> dict:
+        totals = {}
+        threads_by_pid = {}
+        for stage, members in self._members.items():
+            seconds = 0.0
+            for pid, native_id in members:
+                try:
+                    proc = psutil.Process(pid)
+                    if native_id is None:
+                        times = proc.cpu_times()
+                        seconds += times.user + times.system
+                        continue
+                    if pid not in threads_by_pid:
+                        threads_by_pid[pid] = {t.id: t for t in proc.threads()}
+                    thread = threads_by_pid[pid].get(native_id)
+                    if thread is not None:
+                        seconds += thread.user_time + thread.system_time
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            if stage == "encoding":
+                seconds += _ffmpeg_children_seconds()
+            totals[stage] = seconds
+        return totals
+
+    def report(self) -> dict:
+        """
+        Returns, per stage, the thread budget, pinned CPUs and utilisation
+        since the previous call: "cpu_percent" (100 = one core busy) and
+        "budget_percent" (cpu_percent spread over the thread budget).
+        The first call only starts the measurement and reports None.
+        """
+        now = time.monotonic()
+        cpu = self._cpu_seconds()
+        previous_time, previous_cpu = self._last_sample or (None, {})
+        self._last_sample = (now, cpu)
+
+        report = {}
+        for stage in STAGES:
+            entry = {
+                "threads": self.profile.threads(stage),
+                "cpus": self.profile.affinity.get(stage),
+                "registered": len(self._members[stage]),
+                "cpu_percent": None,
+                "budget_percent": None,
+            }
+            if previous_time is not None and now > previous_time:
+                used = cpu[stage] - previous_cpu.get(stage, 0.0)
+                percent = max(0.0, used) / (now - previous_time) * 100
+                entry["cpu_percent"] = round(percent, 1)
+                entry["budget_percent"] = round(percent / entry["threads"], 1)
+            report[stage] = entry
+        return report
+
+
+def set_affinity(cpus: list, whole_process: bool = False) -> bool:
+    """
+    Pins the calling thread (Linux) or the whole process to the given
+    CPUs. Returns False if the platform does not support it.
+    """
+    available = set(range(os.cpu_count() or 1))
+    cpus = sorted(set(cpus) & available)
+    if not cpus:
+        return False
+    try:
+        if hasattr(os, "sched_setaffinity") and not whole_process:
+            # On Linux, pid 0 means the calling thread.
+            os.sched_setaffinity(0, cpus)
+        else:
+            psutil.Process().cpu_affinity(cpus)
+    except (AttributeError, OSError, psutil.Error):
+        return False
+    return True
+
+
+def _ffmpeg_children_seconds() -> float:
+    """CPU time of ffmpeg encoder subprocesses of this process."""
+    seconds = 0.0
+    try:
+        children = psutil.Process().children()
+    except psutil.Error:
+        return seconds
+    for child in children:
+        try:
+            if "ffmpeg" in child.name().lower():
+                times = child.cpu_times()
+                seconds += times.user + times.system
+        except psutil.Error:
+            continue
+    return seconds
@@ -0,0 +1,224 @@
+import math
+import os
+import queue
+import shutil
+import threading
+from typing import Optional
+
+import cv2
+
+from .archive_processor import ArchiveProcessor
+from .video_utils.ffmpeg_writer import FFmpegWriter
+from .video_utils.frame_clock import FrameClock
+
+PLAYLIST_FILE = "index.m3u8"
+
+
+class SegmentedRecorder:
+    """
+    Records frames into rolling fixed-duration segment files listed in an
+    HLS-style index.m3u8 playlist, so a crash only loses the segment being
+    written. Encoding runs on its own thread: write_frame never blocks,
+    and frames arriving while the encoder is behind are dropped and
+    counted.
+
+    Frames given with their timestamp are placed on the fixed fps
+    timeline: a frame is repeated until the next one is due, or skipped
+    if the next one is due first. Recordings of frames processed below
+    the output rate then play back in real time.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        fps: float = 30,
+        frame_size: Optional[tuple] = None,
+        segment_seconds: float = 60.0,
+        backend: str = "auto",
+        codec: Optional[str] = None,
+        preset: Optional[str] = "veryfast",
+        crf: Optional[int] = 23,
+        threads: int = 0,
+        rgb_input: bool = False,
+        queue_size: int = 120,
+    ):
+        """
+        Args:
+            output_dir (str): Directory for segments and the playlist.
+            fps (float): Frame rate of the recording. Frames written
+                without a timestamp are taken to arrive at this rate.
+            frame_size (Optional[tuple]): (width, height) of the output.
+                Taken from the first frame if None; other sizes are resized.
+            segment_seconds (float): Duration of each segment.
+            backend (str): "ffmpeg" (subprocess pipe), "opencv"
+                (cv2.VideoWriter) or "auto" (ffmpeg when installed).
+            codec (Optional[str]): ffmpeg encoder or OpenCV FourCC.
+                Defaults to libx264 / mp4v.
+            preset (Optional[str]): ffmpeg encoder preset.
+            crf (Optional[int]): ffmpeg constant rate factor.
+            threads (int): ffmpeg encoder threads, 0 for automatic.
+            rgb_input (bool): Frames are RGB instead of BGR.
+            queue_size (int): Frames buffered ahead of the encoder.
+        """
+        if backend == "auto":
+            backend = "ffmpeg" if shutil.which("ffmpeg") else "opencv"
+        if backend not in ("ffmpeg", "opencv"):
+            raise ValueError(f"Unknown recorder backend {backend!r}")
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.output_dir = output_dir
+        self.fps = fps
+        self.frame_size = tuple(frame_size) if frame_size else None
+        self.segment_frames = max(1, int(round(segment_seconds * fps)))
+        self.backend = backend
+        self.codec = codec or ("libx264" if backend == "ffmpeg" else "mp4v")
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.rgb_input = rgb_input
+        # MPEG-TS segments stay playable if the process dies mid-write.
+        self.extension = ".ts" if backend == "ffmpeg" else ".mp4"
+
+        self.segments = []
+        self.clock = FrameClock(fps)
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = None
+        self._segment_count = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write_frame(self, frame, timestamp: Optional[float] = None) -> bool:
+        """
+        Queues a frame for encoding without blocking.
+
+        Args:
+            frame (np.ndarray): Frame to record.
+            timestamp (Optional[float]): Source time of the frame in
+                seconds; None for a frame at the nominal rate.
+
+        Returns:
+            bool: False if the frame was dropped because the encoder is
+            behind or the recorder has been released.
+        """
+        if not self._thread.is_alive():
+            return False
+        try:
+            self._queue.put_nowait((frame, timestamp))
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+    def _open_segment(self):
+        name = f"segment_{len(self.segments):05d}{self.extension}"
+        path = os.path.join(self.output_dir, name)
+        if self.backend == "ffmpeg":
+            writer = FFmpegWriter(
+                path,
+                self.fps,
+                self.frame_size,
+                codec=self.codec,
+                preset=self.preset,
+                crf=self.crf,
+                input_pixel_format="rgb24" if self.rgb_input else "bgr24",
+                threads=self.threads,
+            )
+        else:
+            writer = ArchiveProcessor(path, self.fps, self.frame_size, codec=self.codec)
+        self._writer = writer
+        self._segment_name = name
+        self._segment_count = 0
+
+    def _close_segment(self):
+        self._writer.release()
+        self._writer = None
+        self.segments.append((self._segment_name, self._segment_count / self.fps))
+        self._write_playlist(finished=False)
+
+    def _write_playlist(self, finished: bool) -> None:
+        """Atomically rewrites index.m3u8 with all closed segments."""
+        target = max((duration for _, duration in self.segments), default=0)
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{math.ceil(target)}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for name, duration in self.segments:
+            lines += [f"#EXTINF:{duration:.3f},", name]
+        if finished:
+            lines.append("#EXT-X-ENDLIST")
+        tmp_path = os.path.join(self.output_dir, PLAYLIST_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, os.path.join(self.output_dir, PLAYLIST_FILE))
+
+    def _prepare(self, frame):
+        if self.frame_size is None:
+            self.frame_size = (frame.shape[1], frame.shape[0])
+        if (frame.shape[1], frame.shape[0]) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+        if self.backend == "opencv" and self.rgb_input:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        return frame
+
+    def _write(self, frame) -> None:
+        if self._writer is None:
+            self._open_segment()
+        self._writer.write_frame(frame)
+        self._segment_count += 1
+        self.frames_written += 1
+        if self._segment_count >= self.segment_frames:
+            self._close_segment()
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                frame, timestamp = item
+                # Output frame at which this one is due; the previous frame
+                # is held until then.
+                due = int(round(self.clock.tick(timestamp) * self.fps))
+                if due < self.frames_written:
+                    previous = frame
+                    continue
+                if self.frames_written < due:
+                    held = self._prepare(previous)
+                    while self.frames_written < due:
+                        self._write(held)
+                previous = frame
+                self._write(self._prepare(frame))
+        except IOError as exc:
+            # Surfaced through stats(); later frames are rejected.
+            self.error = exc
+
+        if self._writer is not None:
+            self._close_segment()
+        self._write_playlist(finished=True)
+
+    def stats(self) -> dict:
+        """
+        Returns frames written/dropped, closed segments, queue depth and
+        the encoder error, if any.
+        """
+        return {
+            "frames_written": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+            "segments": len(self.segments),
+            "queued": self._queue.qsize(),
+            "error": str(self.error) if self.error else None,
+        }
+
+    def release(self, timeout: Optional[float] = None) -> None:
+        """
+        Encodes the queued frames, closes the last segment and finalises
+        the playlist.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
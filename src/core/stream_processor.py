@@ -1,32 +1,136 @@
+from typing import Optional, Union
+
 import cv2
 
+from .stream_replay import StreamRecorder
+from .video_utils.frame_grabber import FrameGrabber
+from .video_utils.network_source import (
+    NetworkStreamOptions,
+    PacketLossEstimator,
+    is_network_source,
+    open_network_capture,
+)
+
 
 class StreamProcessor:
 
-    def __init__(self, stream_source: int = 0):
+    def __init__(
+        self,
+        stream_source: Union[int, str] = 0,
+        network_options: Optional[NetworkStreamOptions] = None,
+        read_timeout: float = 5.0,
+        max_backoff: float = 8.0,
+        max_retries: int = None,
+        record_path: Optional[str] = None,
+    ):
         """
-        Initializes the stream capture.
+        Initializes the stream capture. Frames are drained by a background
+        FrameGrabber so get_frame always returns the newest frame, and the
+        source is reopened automatically if it stalls or disconnects.
 
         args:
-            stream_source (int): Source
+            stream_source (int or str): Camera index, or a network URL
+            (rtsp://, udp://, http://, ...).
+            network_options (NetworkStreamOptions): Transport, jitter buffer
+            and decoder settings for URL sources.
+            read_timeout (float): Seconds a read may block before the
+            source is treated as stalled and reconnected.
+            max_backoff (float): Upper bound for the reconnect delay.
+            max_retries (int): Consecutive failed reconnects before giving
+            up, None to retry forever.
+            record_path (str): Directory to record every grabbed frame to,
+            with its arrival time, for replay by ReplayStreamProcessor.
+        """
+        self.stream_source = stream_source
+        self.read_timeout = read_timeout
+        self.is_network = is_network_source(stream_source)
+        self.network_options = network_options or NetworkStreamOptions()
+        self.loss_estimator = None
+        self.recorder = (
+            StreamRecorder(record_path, source=str(stream_source)) if record_path else None
+        )
+        self.grabber = FrameGrabber(
+            self._open_capture,
+            max_backoff=max_backoff,
+            max_retries=max_retries,
+            on_frame=self._on_frame if self.is_network or self.recorder else None,
+        ).start()
+
+    def _open_capture(self):
+        """
+        Opens the underlying capture. Path/URL sources get a bounded
+        open/read timeout so a stalled source surfaces as a failed read
+        instead of blocking; camera backends reject those properties.
+        """
+        timeout_ms = int(self.read_timeout * 1000)
+        if self.is_network:
+            cap = open_network_capture(
+                self.stream_source, self.network_options, timeout_ms
+            )
+            if self.loss_estimator is None:
+                self.loss_estimator = PacketLossEstimator(cap.get(cv2.CAP_PROP_FPS))
+        elif isinstance(self.stream_source, str):
+            cap = cv2.VideoCapture(
+                self.stream_source,
+                cv2.CAP_FFMPEG,
+                [
+                    cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                    cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms,
+                ],
+            )
+        else:
+            cap = cv2.VideoCapture(self.stream_source)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def _on_frame(self, cap, frame, arrival: float) -> None:
         """
-        self.cap = cv2.VideoCapture(stream_source)
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        Feeds the stream timestamp of each frame to the loss estimator, and
+        the frame to the recorder.
+        """
+        stream_ms = None
+        if self.is_network:
+            stream_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+            self.loss_estimator.update(stream_ms, arrival)
+        if self.recorder is not None:
+            self.recorder.write(frame, arrival, stream_ms)
 
     def get_frame(self):
         """
-        Reads the next frame from the stream.
+        Returns the newest frame from the stream, waiting for one to arrive
+        (including across reconnects).
 
         Returns:
-            np.ndarray or None: The video frame if available, else None.
+            np.ndarray or None: The video frame, or None once the stream
+            has been released or has given up reconnecting.
+        """
+        return self.grabber.read()
+
+    def get_timestamp(self) -> float:
+        """
+        Returns the wall-clock arrival time (seconds since the epoch) of
+        the last frame returned by get_frame.
+        """
+        return self.grabber.last_read_time
+
+    def stats(self) -> dict:
+        """
+        Returns grabber statistics (frames grabbed/read/dropped,
+        reconnects and connection state), plus frame loss and jitter
+        estimates for network sources.
         """
-        ret, frame = self.cap.read()
-        if not ret:
-            return None
-        return frame
+        stats = self.grabber.stats()
+        if self.loss_estimator is not None:
+            stats.update(self.loss_estimator.stats())
+        if self.recorder is not None:
+            stats["recorded"] = self.recorder.frames_written
+            stats["record_dropped"] = self.recorder.frames_dropped
+        return stats
 
     def release(self):
         """
         Releases the stream capture resource
         """
-        self.cap.release()
+        self.grabber.stop()
+        if self.recorder is not None:
+            self.recorder.close()
@@ -0,0 +1,367 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from .video_utils.frame_grabber import FrameGrabber
+
+META_FILE = "meta.json"
+INDEX_FILE = "index.jsonl"
+FRAMES_FILE = "frames.bin"
+
+
+def is_stream_recording(path) -> bool:
+    """Whether path is a directory written by StreamRecorder."""
+    return isinstance(path, str) and os.path.isfile(os.path.join(path, INDEX_FILE))
+
+
+class StreamRecorder:
+    """
+    Records the raw frames of a live source with their original arrival
+    times, so a session can be replayed with its real timing (bursts,
+    stalls, reconnect gaps) by ReplayStreamProcessor. Frames are stored
+    uncompressed: replay then costs no decoding and reproduces exactly the
+    pixels the pipeline saw.
+
+    A recording is a directory with the concatenated frames (frames.bin),
+    one JSON line per frame (index.jsonl: offset, shape, arrival and the
+    stream timestamp if known) and meta.json. Writing runs on its own
+    thread; frames arriving while the disk is behind are dropped and
+    counted, and the index is flushed per frame so a crash keeps
+    everything written so far.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        source: Optional[str] = None,
+        queue_size: int = 60,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        Args:
+            path (str): Directory of the recording, created if missing.
+            source (Optional[str]): Description of the recorded source.
+            queue_size (int): Frames buffered ahead of the writer.
+            max_bytes (Optional[int]): Frame data after which recording
+                stops; None records until closed.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self.full = False
+        self.error = None
+        self.meta = {"source": source, "started_at": time.time()}
+        self._write_meta()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, frame: np.ndarray, arrival: float, stream_ms: Optional[float] = None) -> None:
+        """
+        Queues one frame without blocking.
+
+        Args:
+            frame (np.ndarray): Frame as read from the source.
+            arrival (float): Wall-clock arrival time in seconds.
+            stream_ms (Optional[float]): Stream timestamp, if the source
+                reports one.
+        """
+        if self.full or self.error is not None:
+            return
+        try:
+            self._queue.put_nowait((frame, arrival, stream_ms))
+        except queue.Full:
+            self.frames_dropped += 1
+
+    def _run(self) -> None:
+        with open(os.path.join(self.path, FRAMES_FILE), "wb") as frames, open(
+            os.path.join(self.path, INDEX_FILE), "w"
+        ) as index:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                if self.full or self.error is not None:
+                    continue
+                frame, arrival, stream_ms = item
+                frame = np.ascontiguousarray(frame)
+                if self.max_bytes is not None and self.bytes_written + frame.nbytes > self.max_bytes:
+                    self.full = True
+                    continue
+                try:
+                    frames.write(frame.data)
+                    entry = {
+                        "offset": self.bytes_written,
+                        "shape": list(frame.shape),
+                        "dtype": frame.dtype.str,
+                        "arrival": arrival,
+                    }
+                    if stream_ms is not None:
+                        entry["stream_ms"] = stream_ms
+                    # The index only ever points at data already written.
+                    frames.flush()
+                    index.write(json.dumps(entry) + "\n")
+                    index.flush()
+                except OSError as e:
+                    self.error = e
+                    continue
+                self.bytes_written += frame.nbytes
+                self.frames_written += 1
+
+    def _write_meta(self) -> None:
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Writes the queued frames and finalises meta.json."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.meta.update(
+            {
+                "frames": self.frames_written,
+                "dropped": self.frames_dropped,
+                "bytes": self.bytes_written,
+                "truncated": self.full,
+            }
+        )
+        self._write_meta()
+
+
+class StreamRecording:
+    """
+    Read access to a StreamRecorder directory. Frames are memory-mapped,
+    so opening a recording of any length is cheap.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        meta_path = os.path.join(path, META_FILE)
+        self.meta = {}
+        if os.path.isfile(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        self.index = []
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            for line in f:
+                try:
+                    self.index.append(json.loads(line))
+                except ValueError:
+                    # Last line cut short by a crash.
+                    break
+        frames_path = os.path.join(path, FRAMES_FILE)
+        self._data = (
+            np.memmap(frames_path, np.uint8, mode="r")
+            if self.index and os.path.getsize(frames_path)
+            else None
+        )
+        self.arrivals = np.array([e["arrival"] for e in self.index], np.float64)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the first and last frame arrival."""
+        return float(self.arrivals[-1] - self.arrivals[0]) if len(self) else 0.0
+
+    def frame(self, i: int) -> np.ndarray:
+        """Returns a copy of frame i."""
+        entry = self.index[i]
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"]))
+        start = entry["offset"]
+        raw = self._data[start : start + count * dtype.itemsize]
+        return raw.view(dtype).reshape(entry["shape"]).copy()
+
+    def close(self) -> None:
+        self._data = None
+
+
+class RecordingCapture:
+    """
+    Capture-like view of a StreamRecording (read/isOpened/release), whose
+    read() returns each frame at its recorded arrival time relative to the
+    first read, divided by speed.
+    """
+
+    def __init__(self, recording: StreamRecording, speed: float = 1.0, loop: bool = False):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.recording = recording
+        self.speed = speed
+        self.loop = loop
+        self.position = 0
+        self.late = 0
+        self._base = None
+
+    def isOpened(self) -> bool:
+        return len(self.recording) > 0
+
+    def read(self):
+        if self.position >= len(self.recording):
+            if not self.loop:
+                return False, None
+            self.position = 0
+            self._base = None
+        arrivals = self.recording.arrivals
+        now = time.monotonic()
+        if self._base is None:
+            self._base = now
+        due = self._base + (arrivals[self.position] - arrivals[0]) / self.speed
+        if due > now:
+            time.sleep(due - now)
+        elif now - due > 0.05:
+            self.late += 1
+        frame = self.recording.frame(self.position)
+        self.position += 1
+        return True, frame
+
+    def release(self) -> None:
+        pass
+
+
+class ReplayStreamProcessor:
+    """
+    Drop-in for StreamProcessor that plays a StreamRecording back with
+    its recorded timing (or scaled by speed). Frames go through the same
+    FrameGrabber as a live source, so a consumer slower than the recorded
+    rate drops frames exactly as it would have live.
+    """
+
+    def __init__(self, recording_path: str, speed: float = 1.0, loop: bool = False):
+        """
+        Args:
+            recording_path (str): Directory written by StreamRecorder.
+            speed (float): Playback rate; 2.0 delivers frames twice as fast
+                as recorded.
+            loop (bool): Start over at the end instead of ending the stream.
+        """
+        self.stream_source = recording_path
+        self.recording = StreamRecording(recording_path)
+        self.capture = RecordingCapture(self.recording, speed, loop)
+        self.grabber = FrameGrabber(lambda: self.capture, max_retries=0).start()
+
+    def get_frame(self):
+        """
+        Returns the newest replayed frame, waiting for it to be due.
+
+        Returns:
+            np.ndarray or None: The frame, or None once the recording
+            ended or the replay was released.
+        """
+        return self.grabber.read()
+
+    def get_timestamp(self) -> float:
+        """
+        Returns the wall-clock replay arrival time of the last frame
+        returned by get_frame.
+        """
+        return self.grabber.last_read_time
+
+    def stats(self) -> dict:
+        stats = self.grabber.stats()
+        stats.update(
+            {
+                "replayed": self.capture.position,
+                "recorded": len(self.recording),
+                "late": self.capture.late,
+            }
+        )
+        return stats
+
+    def release(self):
+        self.grabber.stop()
+        self.recording.close()
+
+
+def replay_benchmark(
+    recording_path: str,
+    process=None,
+    speed: float = 1.0,
+    max_frames: Optional[int] = None,
+) -> dict:
+    """
+    Replays a recording into process(frame) like the live pipeline, and
+    measures what a live session would have seen.
+
+    Args:
+        recording_path (str): Directory written by StreamRecorder.
+        process (Callable): Per-frame work, e.g. Model.process_frame. None
+            only drains the stream.
+        speed (float): Playback rate.
+        max_frames (Optional[int]): Stop after this many processed frames.
+
+    Returns:
+        dict: frames processed, dropped, recorded, processed fps, and
+        latency_ms / p95_ms from frame arrival to the end of process().
+    """
+    replay = ReplayStreamProcessor(recording_path, speed=speed)
+    latencies = []
+    start = time.perf_counter()
+    try:
+        while max_frames is None or len(latencies) < max_frames:
+            frame = replay.get_frame()
+            if frame is None:
+                break
+            arrival = replay.get_timestamp()
+            if process is not None:
+                process(frame)
+            latencies.append(time.time() - arrival)
+        elapsed = time.perf_counter() - start
+        stats = replay.stats()
+    finally:
+        replay.release()
+    latencies = np.array(latencies or [0.0])
+    return {
+        "frames": stats["frames_read"],
+        "dropped": stats["frames_dropped"],
+        "recorded": stats["recorded"],
+        "fps": round(stats["frames_read"] / max(elapsed, 1e-6), 2),
+        "latency_ms": round(float(latencies.mean()) * 1000, 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded DroneLink stream session through the "
+        "detector with its original timing and report drops and latency."
+    )
+    parser.add_argument("recording", help="Stream recording directory")
+    parser.add_argument("--model", help="Weights file (default: only drain)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--device")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--frames", type=int, help="Stop after this many frames")
+    args = parser.parse_args(argv)
+
+    model = None
+    if args.model:
+        from .model_processor import Model
+
+        model = Model(args.model, input_size=args.imgsz, device=args.device)
+        model.warm_up()
+    try:
+        result = replay_benchmark(
+            args.recording,
+            process=model.process_frame if model is not None else None,
+            speed=args.speed,
+            max_frames=args.frames,
+        )
+    finally:
+        if model is not None:
+            model.close()
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+import argparse
+import functools
+import json
+import multiprocessing as mp
+import queue
+import time
+from typing import Callable, Optional, Sequence
+from urllib.parse import parse_qsl, urlparse
+
+import cv2
+import numpy as np
+import psutil
+
+from .video_utils.frame_grabber import FrameGrabber
+
+DEFAULT_RESOLUTIONS = ((640, 360), (1280, 720), (1920, 1080))
+DEFAULT_SOURCE_COUNTS = (1, 2, 4, 6, 8, 12, 16)
+SCHEME = "synthetic"
+
+
+def parse_synthetic_source(source) -> Optional[dict]:
+    """
+    Returns the SyntheticCapture options of a source like
+    "synthetic://1280x720?fps=30&targets=8&jitter_ms=5&drop_rate=0.01",
+    or None if source is not synthetic.
+    """
+    if not isinstance(source, str) or not source.startswith(SCHEME + "://"):
+        return None
+    url = urlparse(source)
+    options = {}
+    if url.netloc:
+        width, _, height = url.netloc.partition("x")
+        options["width"], options["height"] = int(width), int(height)
+    for key, value in parse_qsl(url.query):
+        if key in ("targets", "seed"):
+            options[key] = int(value)
+        elif key in ("fps", "jitter_ms", "drop_rate", "duration"):
+            options[key] = float(value)
+        else:
+            raise ValueError(f"Unknown synthetic source option {key!r}")
+    return options
+
+
+class SyntheticCapture:
+    """
+    Capture-like (read/isOpened/release) generator of frames showing
+    person-like figures walking over a static textured background,
+    delivered at a nominal frame rate with optional timing jitter and
+    dropped frames, like a camera on a lossy link.
+    """
+
+    def __init__(
+        self,
+        width: int = 1280,
+        height: int = 720,
+        fps: float = 30.0,
+        targets: int = 5,
+        jitter_ms: float = 0.0,
+        drop_rate: float = 0.0,
+        duration: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+            fps (float): Nominal frame rate.
+            targets (int): Number of walking figures.
+            jitter_ms (float): Standard deviation of the delivery delay.
+                Frames are never reordered.
+            drop_rate (float): Probability that a frame is lost.
+            duration (Optional[float]): Seconds after which reads fail,
+                ending the stream. None generates forever.
+            seed (Optional[int]): Seed for reproducible scenes and timing.
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps)
+        self.jitter = jitter_ms / 1000.0
+        self.drop_rate = drop_rate
+        self.duration = duration
+        self.frames = 0
+        self.dropped = 0
+        self._rng = np.random.default_rng(seed)
+        self._background = self._render_background()
+        # Figure height is about a sixth of the frame, as from a drone.
+        self._size = max(12, self.height // 6)
+        self._positions = self._rng.uniform(
+            (0, 0), (self.width, self.height), (targets, 2)
+        )
+        speed = self._size / self.fps
+        self._velocities = self._rng.uniform(-speed, speed, (targets, 2))
+        self._colors = self._rng.integers(40, 255, (targets, 3))
+        self._start = None
+        self._next = 0
+        self._released = False
+        # [x, y, w, h] of every figure in the last frame read.
+        self.boxes = []
+
+    def _render_background(self) -> np.ndarray:
+        tile = self._rng.integers(60, 140, (max(1, self.height // 32), max(1, self.width // 32), 3))
+        return cv2.resize(
+            tile.astype(np.uint8), (self.width, self.height), interpolation=cv2.INTER_LINEAR
+        )
+
+    def isOpened(self) -> bool:
+        return not self._released
+
+    def _advance(self) -> None:
+        self._positions += self._velocities
+        for axis, limit in ((0, self.width), (1, self.height)):
+            out = (self._positions[:, axis] < 0) | (self._positions[:, axis] > limit)
+            self._velocities[out, axis] *= -1
+            np.clip(self._positions[:, axis], 0, limit, out=self._positions[:, axis])
+
+    def _draw(self) -> np.ndarray:
+        frame = self._background.copy()
+        size = self._size
+        self.boxes = []
+        for (x, y), color in zip(self._positions.astype(int), self._colors.tolist()):
+            w = size // 3
+            head = size // 6
+            top = y - size
+            cv2.circle(frame, (x, top + head), head, color, -1)
+            cv2.rectangle(frame, (x - w // 2, top + 2 * head), (x + w // 2, y - size // 3), color, -1)
+            cv2.line(frame, (x - w // 4, y - size // 3), (x - w // 3, y), color, max(1, w // 5))
+            cv2.line(frame, (x + w // 4, y - size // 3), (x + w // 3, y), color, max(1, w // 5))
+            self.boxes.append([x - w // 2, top, w, size])
+        return frame
+
+    def read(self):
+        if self._released:
+            return False, None
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        while True:
+            if self.duration is not None and self._next / self.fps >= self.duration:
+                return False, None
+            index = self._next
+            self._next += 1
+            self._advance()
+            if self.drop_rate and self._rng.random() < self.drop_rate:
+                self.dropped += 1
+                continue
+            break
+        due = self._start + index / self.fps
+        if self.jitter:
+            due += abs(self._rng.normal(0.0, self.jitter))
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.frames += 1
+        return True, self._draw()
+
+    def release(self) -> None:
+        self._released = True
+
+
+class SyntheticStreamProcessor:
+    """
+    Drop-in for StreamProcessor backed by a SyntheticCapture, with the
+    same newest-frame FrameGrabber semantics as a live source.
+    """
+
+    def __init__(self, **options):
+        """
+        Args:
+            **options: SyntheticCapture arguments (width, height, fps,
+                targets, jitter_ms, drop_rate, duration, seed).
+        """
+        self.stream_source = "synthetic"
+        self.capture = SyntheticCapture(**options)
+        self.grabber = FrameGrabber(lambda: self.capture, max_retries=0).start()
+
+    def get_frame(self):
+        """
+        Returns the newest generated frame, or None once the duration is
+        over or the source was released.
+        """
+        return self.grabber.read()
+
+    def get_timestamp(self) -> float:
+        """Returns the wall-clock arrival time of the last frame read."""
+        return self.grabber.last_read_time
+
+    def stats(self) -> dict:
+        stats = self.grabber.stats()
+        stats["source_dropped"] = self.capture.dropped
+        return stats
+
+    def release(self):
+        self.grabber.stop()
+        self.capture.release()
+
+
+def run_feed(
+    source_options: dict,
+    model_factory: Optional[Callable],
+    duration: float,
+    frame_skip: int = 1,
+) -> dict:
+    """
+    Runs one feed like a live session: a synthetic source drained by a
+    detector (model_factory() -> object with process_frame), or only
+    drained without one. As in the player, only one frame in frame_skip
+    is processed: a frame is processed once frame_skip frame intervals
+    have passed since the last processed one, the others are read and
+    discarded.
+
+    Returns:
+        dict: frames processed, dropped, processed fps and latency_ms /
+        p95_ms from frame arrival to the end of processing.
+    """
+    model = model_factory() if model_factory is not None else None
+    if model is not None and hasattr(model, "warm_up"):
+        model.warm_up()
+    source = SyntheticStreamProcessor(duration=duration, **source_options)
+    interval = 1.0 / source.capture.fps
+    latencies = []
+    start = time.perf_counter()
+    try:
+        index = 0
+        due = 0.0
+        while True:
+            frame = source.get_frame()
+            if frame is None:
+                break
+            arrival = source.get_timestamp()
+            index += 1
+            if arrival < due:
+                continue
+            # Half a frame interval of slack for delivery jitter.
+            due = arrival + (max(1, int(frame_skip)) - 0.5) * interval
+            if model is not None:
+                model.process_frame(frame, index - 1, arrival)
+            latencies.append(time.time() - arrival)
+        elapsed = time.perf_counter() - start
+        stats = source.stats()
+    finally:
+        source.release()
+        if model is not None and hasattr(model, "close"):
+            model.close()
+    latencies = np.array(latencies or [0.0])
+    return {
+        "frames": len(latencies),
+        "dropped": stats["frames_dropped"],
+        "fps": round(len(latencies) / max(elapsed, 1e-6), 2),
+        "latency_ms": round(float(latencies.mean()) * 1000, 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+    }
+
+
+def _feed_process(results, source_options, model_factory, duration, frame_skip):
+    results.put(run_feed(source_options, model_factory, duration, frame_skip))
+
+
+class LoadTest:
+    """
+    Finds how many concurrent feeds a machine sustains. For each
+    resolution the number of feeds is ramped up, every feed running in
+    its own process (as a VideoPlayer worker does), until the feeds
+    saturate: they no longer process saturation_fraction of the nominal
+    frame rate, or frames wait longer than the latency budget.
+    """
+
+    def __init__(
+        self,
+        model_factory: Optional[Callable] = None,
+        resolutions: Sequence = DEFAULT_RESOLUTIONS,
+        source_counts: Sequence[int] = DEFAULT_SOURCE_COUNTS,
+        fps: float = 30.0,
+        frame_skip: int = 1,
+        duration: float = 10.0,
+        targets: int = 5,
+        jitter_ms: float = 0.0,
+        drop_rate: float = 0.0,
+        latency_budget_ms: float = 500.0,
+        saturation_fraction: float = 0.9,
+    ):
+        """
+        Args:
+            model_factory (Optional[Callable]): Picklable callable creating
+                the detector in each feed process, e.g.
+                functools.partial(default_model_factory, path, imgsz,
+                device). None measures generation and hand-off only.
+            resolutions (Sequence): (width, height) pairs to test.
+            source_counts (Sequence[int]): Numbers of concurrent feeds.
+            fps (float): Frame rate of every feed.
+            frame_skip (int): Every frame_skip-th frame must be processed;
+                the target processing rate per feed is fps / frame_skip.
+            duration (float): Seconds each step runs.
+            targets (int): Walking figures per frame.
+            jitter_ms (float): Delivery jitter of the sources.
+            drop_rate (float): Frame loss of the sources.
+            latency_budget_ms (float): Mean arrival-to-result latency above
+                which a step counts as saturated.
+            saturation_fraction (float): Share of the target rate each feed
+                must reach.
+        """
+        self.model_factory = model_factory
+        self.resolutions = [tuple(int(v) for v in r) for r in resolutions]
+        self.source_counts = sorted(int(n) for n in source_counts)
+        self.fps = fps
+        self.frame_skip = max(1, int(frame_skip))
+        self.duration = duration
+        self.source_options = {
+            "fps": fps,
+            "targets": targets,
+            "jitter_ms": jitter_ms,
+            "drop_rate": drop_rate,
+        }
+        self.latency_budget_ms = latency_budget_ms
+        self.saturation_fraction = saturation_fraction
+
+    def run_step(self, resolution: tuple, sources: int) -> dict:
+        """
+        Runs sources concurrent feeds at one resolution.
+
+        Returns:
+            dict: The step's resolution, sources, total and per-feed
+            processed fps, latency, drop ratio, CPU use and whether it
+            saturated.
+        """
+        results = mp.Queue()
+        options = dict(self.source_options, width=resolution[0], height=resolution[1])
+        processes = [
+            mp.Process(
+                target=_feed_process,
+                args=(
+                    results,
+                    dict(options, seed=i),
+                    self.model_factory,
+                    self.duration,
+                    self.frame_skip,
+                ),
+                daemon=True,
+            )
+            for i in range(sources)
+        ]
+        psutil.cpu_percent(None)
+        for process in processes:
+            process.start()
+        feeds = []
+        deadline = time.monotonic() + self.duration + 120
+        while len(feeds) < sources and time.monotonic() < deadline:
+            try:
+                feeds.append(results.get(timeout=1.0))
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    break
+        cpu = psutil.cpu_percent(None)
+        for process in processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        if len(feeds) < sources:
+            return {
+                "resolution": list(resolution),
+                "sources": sources,
+                "failed": sources - len(feeds),
+                "saturated": True,
+            }
+
+        target = self.fps / self.frame_skip
+        frames = sum(f["frames"] for f in feeds)
+        dropped = sum(f["dropped"] for f in feeds)
+        per_feed = min(f["fps"] for f in feeds)
+        latency = float(np.mean([f["latency_ms"] for f in feeds]))
+        return {
+            "resolution": list(resolution),
+            "sources": sources,
+            "total_fps": round(sum(f["fps"] for f in feeds), 2),
+            "min_feed_fps": per_feed,
+            "latency_ms": round(latency, 2),
+            "p95_ms": max(f["p95_ms"] for f in feeds),
+            "drop_ratio": round(dropped / max(frames + dropped, 1), 3),
+            "cpu_percent": cpu,
+            "saturated": per_feed < self.saturation_fraction * target
+            or latency > self.latency_budget_ms,
+        }
+
+    def run(self, on_step: Optional[Callable] = None) -> dict:
+        """
+        Ramps every resolution up to saturation.
+
+        Args:
+            on_step (Optional[Callable]): Called with each step's result.
+
+        Returns:
+            dict: "curve" (all step results) and "capacity", the most
+            feeds sustained per resolution ("WxH" -> count, 0 if even one
+            feed saturates).
+        """
+        curve = []
+        capacity = {}
+        for resolution in self.resolutions:
+            key = f"{resolution[0]}x{resolution[1]}"
+            capacity[key] = 0
+            for sources in self.source_counts:
+                step = self.run_step(resolution, sources)
+                curve.append(step)
+                if on_step is not None:
+                    on_step(step)
+                if step["saturated"]:
+                    break
+                capacity[key] = sources
+        return {"curve": curve, "capacity": capacity}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ramp synthetic camera feeds through the DroneLink detector "
+        "until saturation and report the throughput/latency curve."
+    )
+    parser.add_argument("--model", help="Weights file (default: no inference)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--device")
+    parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        default=[f"{w}x{h}" for w, h in DEFAULT_RESOLUTIONS],
+        help="WxH sizes (default: 640x360 1280x720 1920x1080)",
+    )
+    parser.add_argument(
+        "--sources", type=int, nargs="+", default=list(DEFAULT_SOURCE_COUNTS)
+    )
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--frame-skip", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--targets", type=int, default=5)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--latency-budget-ms", type=float, default=500.0)
+    parser.add_argument("--output", help="Write the result as JSON")
+    args = parser.parse_args(argv)
+
+    model_factory = None
+    if args.model:
+        from .auto_tuner import default_model_factory
+
+        model_factory = functools.partial(
+            default_model_factory, args.model, args.imgsz, args.device
+        )
+    test = LoadTest(
+        model_factory,
+        resolutions=[tuple(int(v) for v in r.split("x")) for r in args.resolutions],
+        source_counts=args.sources,
+        fps=args.fps,
+        frame_skip=args.frame_skip,
+        duration=args.duration,
+        targets=args.targets,
+        jitter_ms=args.jitter_ms,
+        drop_rate=args.drop_rate,
+        latency_budget_ms=args.latency_budget_ms,
+    )
+
+    def progress(step):
+        if "failed" in step:
+            print(f"{step['resolution']} x{step['sources']}: {step['failed']} feeds failed")
+            return
+        print(
+            f"{step['resolution'][0]}x{step['resolution'][1]} x{step['sources']}: "
+            f"{step['total_fps']} fps total, {step['min_feed_fps']} min/feed, "
+            f"{step['latency_ms']} ms (p95 {step['p95_ms']}), "
+            f"drops {step['drop_ratio']:.1%}, CPU {step['cpu_percent']}%"
+            + ("  SATURATED" if step["saturated"] else "")
+        )
+
+    result = test.run(on_step=progress)
+    print(json.dumps(result["capacity"], indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import cv2
+import numpy as np
+
+INDEX_FORMAT = "dronelink-thumbnails"
+INDEX_VERSION = 1
+
+
+def index_paths(directory: str, video_hash: str) -> tuple:
+    """Returns the (sprite, metadata) paths of a video's index."""
+    base = os.path.join(directory, video_hash)
+    return base + ".thumbs.npy", base + ".thumbs.json"
+
+
+def scene_scores(thumbnails: list) -> np.ndarray:
+    """
+    Returns, per thumbnail, the Bhattacharyya distance between its
+    hue/saturation histogram and the previous thumbnail's (0 for the
+    first): near 0 for the same scene, towards 1 for a cut.
+    """
+    scores = np.zeros(len(thumbnails), np.float32)
+    previous = None
+    for i, thumb in enumerate(thumbnails):
+        hsv = cv2.cvtColor(np.ascontiguousarray(thumb), cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        cv2.normalize(hist, hist)
+        if previous is not None:
+            scores[i] = cv2.compareHist(previous, hist, cv2.HISTCMP_BHATTACHARYYA)
+        previous = hist
+    return scores
+
+
+class ThumbnailIndex:
+    """
+    A video's thumbnail strip and scene changes. The strip is one
+    (height, count * width, 3) BGR image stored as a memory-mapped .npy
+    file, so opening an index costs no decoding and only the pages drawn
+    are read. The metadata (timestamps, scene scores) sits next to it as
+    JSON and is written last, marking the index complete.
+    """
+
+    def __init__(self, strip: np.ndarray, meta: dict):
+        self.strip = strip
+        self.meta = meta
+        self.timestamps = np.asarray(meta["timestamps"], np.float64)
+        self.scene_scores = np.asarray(meta["scene_scores"], np.float32)
+        self.scene_changes = list(meta["scene_changes"])
+        self.thumb_size = tuple(meta["thumb_size"])
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def duration(self) -> float:
+        return self.meta["duration"]
+
+    @classmethod
+    def load(cls, directory: str, video_hash: str) -> Optional["ThumbnailIndex"]:
+        """Opens a complete index, or returns None if there is none."""
+        strip_path, meta_path = index_paths(directory, video_hash)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            strip = np.load(strip_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if meta.get("format") != INDEX_FORMAT or meta.get("version") != INDEX_VERSION:
+            return None
+        return cls(strip, meta)
+
+    def thumbnail(self, i: int) -> np.ndarray:
+        w = self.thumb_size[0]
+        return self.strip[:, i * w:(i + 1) * w]
+
+    def index_at(self, seconds: float) -> int:
+        """Index of the last thumbnail at or before the given time."""
+        i = int(np.searchsorted(self.timestamps, seconds, side="right")) - 1
+        return min(max(i, 0), len(self) - 1)
+
+
+def _decode_range(video_path, frame_numbers, fps, strip, thumb_size, first, cancel):
+    """
+    Decodes the given ascending frame numbers into strip slots first,
+    first + 1, ... Nearby targets are reached by grabbing forward, distant
+    ones by seeking (which decodes from the preceding keyframe).
+    """
+    w, h = thumb_size
+    cap = cv2.VideoCapture(video_path)
+    position = 0
+    try:
+        for slot, target in enumerate(frame_numbers, first):
+            if cancel is not None and cancel.is_set():
+                return
+            if not 0 <= target - position <= 2 * fps:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                position = target
+            while position < target and cap.grab():
+                position += 1
+            ok, frame = cap.read()
+            if not ok:
+                continue
+            position += 1
+            strip[:, slot * w:(slot + 1) * w] = cv2.resize(
+                frame, (w, h), interpolation=cv2.INTER_AREA
+            )
+    finally:
+        cap.release()
+
+
+def build_thumbnail_index(
+    video_path: str,
+    directory: str,
+    video_hash: str,
+    thumb_width: int = 96,
+    max_thumbs: int = 1000,
+    min_interval: float = 1.0,
+    scene_threshold: float = 0.35,
+    workers: Optional[int] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Optional[ThumbnailIndex]:
+    """
+    Samples thumbnails evenly over a video with parallel decoders, scores
+    scene changes and stores the index under directory.
+
+    Args:
+        video_path (str): The video file.
+        directory (str): Index directory, e.g. ~/DroneLink/thumbnails.
+        video_hash (str): Content hash naming the index (see video_hash()).
+        thumb_width (int): Thumbnail width; height follows the aspect ratio.
+        max_thumbs (int): Upper bound of thumbnails for long videos.
+        min_interval (float): Minimum seconds between thumbnails.
+        scene_threshold (float): Histogram distance counted as a cut.
+        workers (Optional[int]): Parallel decoders, default one per CPU.
+        cancel (Optional[threading.Event]): Aborts the build when set.
+
+    Returns:
+        Optional[ThumbnailIndex]: The index, or None if cancelled.
+    """
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+    height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    cap.release()
+    if frame_count <= 0 or not width:
+        raise IOError(f"Cannot index {video_path}: unknown length.")
+
+    duration = frame_count / fps
+    count = max(1, min(max_thumbs, int(duration / min_interval)))
+    frame_numbers = np.linspace(0, frame_count - 1, count).round().astype(int)
+    frame_numbers = np.unique(frame_numbers)
+    count = len(frame_numbers)
+    thumb_size = (thumb_width, max(2, round(thumb_width * height / width)))
+
+    os.makedirs(directory, exist_ok=True)
+    strip_path, meta_path = index_paths(directory, video_hash)
+    partial = strip_path + ".partial"
+    strip = np.lib.format.open_memmap(
+        partial,
+        mode="w+",
+        dtype=np.uint8,
+        shape=(thumb_size[1], count * thumb_size[0], 3),
+    )
+    workers = max(1, min(workers or os.cpu_count() or 1, count))
+    bounds = np.linspace(0, count, workers + 1).astype(int)
+    with ThreadPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                _decode_range,
+                video_path,
+                frame_numbers[start:stop],
+                fps,
+                strip,
+                thumb_size,
+                start,
+                cancel,
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
+        for future in futures:
+            future.result()
+    strip.flush()
+    del strip
+    if cancel is not None and cancel.is_set():
+        os.remove(partial)
+        return None
+    os.replace(partial, strip_path)
+
+    strip = np.load(strip_path, mmap_mode="r")
+    w = thumb_size[0]
+    scores = scene_scores([strip[:, i * w:(i + 1) * w] for i in range(count)])
+    meta = {
+        "format": INDEX_FORMAT,
+        "version": INDEX_VERSION,
+        "video_hash": video_hash,
+        "duration": duration,
+        "fps": fps,
+        "thumb_size": list(thumb_size),
+        "timestamps": [round(n / fps, 3) for n in frame_numbers.tolist()],
+        "scene_scores": [round(float(s), 4) for s in scores],
+        "scene_changes": [int(i) for i in np.nonzero(scores > scene_threshold)[0]],
+        "scene_threshold": scene_threshold,
+    }
+    with open(meta_path + ".partial", "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".partial", meta_path)
+    return ThumbnailIndex(strip, meta)
@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+# Column name -> dtype. Each column is a raw little-endian file that only
+# ever grows, so appends are cheap and reads can be memory-mapped.
+COLUMNS = {
+    "frame": np.dtype("<i8"),
+    "timestamp": np.dtype("<f8"),
+    "track_id": np.dtype("<i8"),
+    "x": np.dtype("<f4"),
+    "y": np.dtype("<f4"),
+    "w": np.dtype("<f4"),
+    "h": np.dtype("<f4"),
+    "confidence": np.dtype("<f4"),
+}
+
+INDEX_FILE = "index.json"
+
+
+class TrackStore:
+    """
+    Append-only columnar store of confirmed track observations.
+
+    Rows are buffered in memory and written in chunks to one file per
+    column. index.json records, per chunk, its row range and frame/time
+    bounds, and per track the chunks it appears in plus its first/last
+    appearance, so queries only touch the chunks they need.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "a",
+        chunk_size: int = 65536,
+        flush_interval: float = 30.0,
+    ):
+        """
+        Args:
+            path (str): Directory of the store. Created if missing.
+            mode (str): "a" to append (and read), "r" for read-only.
+            chunk_size (int): Buffered rows that trigger a flush.
+            flush_interval (float): Seconds after which buffered rows are
+                flushed even if the chunk is not full, bounding what a
+                crash can lose.
+        """
+        if mode not in ("a", "r"):
+            raise ValueError(f"Unknown mode {mode!r}, expected 'a' or 'r'")
+        self.path = path
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+
+        index_path = os.path.join(path, INDEX_FILE)
+        if mode == "r" and not os.path.isfile(index_path):
+            raise FileNotFoundError(f"No track store at {path}")
+        if mode == "a":
+            os.makedirs(path, exist_ok=True)
+
+        self.index = {"version": 1, "rows": 0, "chunks": [], "tracks": {}}
+        if os.path.isfile(index_path):
+            with open(index_path, "r") as f:
+                self.index = json.load(f)
+        if mode == "a":
+            self.__truncate_uncommitted()
+            self.__commit_index()
+
+        self._buffer = {name: [] for name in COLUMNS}
+        self._last_flush = time.monotonic()
+
+    def __column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def __truncate_uncommitted(self) -> None:
+        """Drops column bytes written after the last committed index."""
+        rows = self.index["rows"]
+        for name, dtype in COLUMNS.items():
+            col_path = self.__column_path(name)
+            with open(col_path, "ab") as f:
+                f.truncate(rows * dtype.itemsize)
+
+    def __commit_index(self) -> None:
+        """
+        Atomically replaces index.json. A crash before this point leaves
+        the old index, and the extra column bytes are truncated on reopen.
+        """
+        tmp_path = os.path.join(self.path, INDEX_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, os.path.join(self.path, INDEX_FILE))
+
+    def append(
+        self,
+        frame_index: int,
+        timestamp: float,
+        track_ids: Iterable,
+        boxes: Iterable,
+        confidences: Optional[Iterable] = None,
+    ) -> None:
+        """
+        Buffers the confirmed tracks of one frame.
+
+        Args:
+            frame_index (int): Source frame index.
+            timestamp (float): Frame timestamp in seconds.
+            track_ids (Iterable): Track IDs (ints or numeric strings).
+            boxes (Iterable): [x, y, w, h] per track.
+            confidences (Optional[Iterable]): Detection confidence per
+                track, None where the track was not matched this frame.
+        """
+        if self.mode != "a":
+            raise IOError(f"Track store {self.path} is read-only.")
+        track_ids = list(track_ids)
+        if confidences is None:
+            confidences = [None] * len(track_ids)
+        buf = self._buffer
+        for track_id, (x, y, w, h), conf in zip(track_ids, boxes, confidences):
+            buf["frame"].append(frame_index)
+            buf["timestamp"].append(timestamp)
+            buf["track_id"].append(int(track_id))
+            buf["x"].append(x)
+            buf["y"].append(y)
+            buf["w"].append(w)
+            buf["h"].append(h)
+            buf["confidence"].append(np.nan if conf is None else conf)
+
+        if (
+            len(buf["frame"]) >= self.chunk_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered rows as a new chunk and commits the index."""
+        self._last_flush = time.monotonic()
+        n = len(self._buffer["frame"])
+        if n == 0 or self.mode != "a":
+            return
+
+        columns = {
+            name: np.asarray(self._buffer[name], dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        for name, values in columns.items():
+            with open(self.__column_path(name), "ab") as f:
+                f.write(values.tobytes())
+
+        start = self.index["rows"]
+        chunk_id = len(self.index["chunks"])
+        self.index["chunks"].append(
+            {
+                "start": start,
+                "stop": start + n,
+                "frame_min": int(columns["frame"].min()),
+                "frame_max": int(columns["frame"].max()),
+                "ts_min": float(columns["timestamp"].min()),
+                "ts_max": float(columns["timestamp"].max()),
+            }
+        )
+        tracks = self.index["tracks"]
+        for track_id in np.unique(columns["track_id"]):
+            mask = columns["track_id"] == track_id
+            frames = columns["frame"][mask]
+            stamps = columns["timestamp"][mask]
+            entry = tracks.setdefault(
+                str(int(track_id)),
+                {
+                    "chunks": [],
+                    "count": 0,
+                    "first_frame": int(frames[0]),
+                    "first_ts": float(stamps[0]),
+                },
+            )
+            entry["chunks"].append(chunk_id)
+            entry["count"] += int(mask.sum())
+            entry["last_frame"] = int(frames[-1])
+            entry["last_ts"] = float(stamps[-1])
+        self.index["rows"] = start + n
+        self.__commit_index()
+
+        self._buffer = {name: [] for name in COLUMNS}
+
+    def close(self) -> None:
+        """Flushes any buffered rows."""
+        self.flush()
+
+    def __column(self, name: str) -> np.ndarray:
+        rows = self.index["rows"]
+        if rows == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(
+            self.__column_path(name), dtype=COLUMNS[name], mode="r", shape=(rows,)
+        )
+
+    def __select(self, chunks: list, row_filter) -> dict:
+        """
+        Gathers all columns for rows of the given chunks accepted by
+        row_filter(columns, start, stop) -> boolean mask.
+        """
+        cols = {name: self.__column(name) for name in COLUMNS}
+        picked = {name: [] for name in COLUMNS}
+        for chunk in chunks:
+            start, stop = chunk["start"], chunk["stop"]
+            mask = row_filter(cols, start, stop)
+            if not mask.any():
+                continue
+            for name in COLUMNS:
+                picked[name].append(np.asarray(cols[name][start:stop][mask]))
+        return {
+            name: np.concatenate(parts) if parts else np.empty(0, COLUMNS[name])
+            for name, parts in picked.items()
+        }
+
+    def track_ids(self) -> list:
+        """Returns all track IDs in the store, sorted."""
+        return sorted(int(track_id) for track_id in self.index["tracks"])
+
+    def first_last(self, track_id) -> Optional[dict]:
+        """
+        Returns the first and last appearance of a track.
+
+        Returns:
+            dict or None: first_frame, first_ts, last_frame, last_ts and
+            count, or None if the track is unknown.
+        """
+        entry = self.index["tracks"].get(str(int(track_id)))
+        if entry is None:
+            return None
+        return {key: value for key, value in entry.items() if key != "chunks"}
+
+    def trajectory(self, track_id) -> dict:
+        """
+        Returns every observation of a track in frame order.
+
+        Returns:
+            dict: Column name -> np.ndarray (frame, timestamp, track_id,
+            x, y, w, h, confidence). Empty arrays for unknown tracks.
+        """
+        track_id = int(track_id)
+        entry = self.index["tracks"].get(str(track_id), {"chunks": []})
+        chunks = [self.index["chunks"][i] for i in entry["chunks"]]
+        return self.__select(
+            chunks,
+            lambda cols, start, stop: cols["track_id"][start:stop] == track_id,
+        )
+
+    def frames(self, track_id) -> np.ndarray:
+        """Returns the frame indices in which a track was visible."""
+        return self.trajectory(track_id)["frame"]
+
+    def in_time_range(self, t_start: float, t_end: float) -> dict:
+        """
+        Returns all observations with t_start <= timestamp <= t_end.
+
+        Returns:
+            dict: Column name -> np.ndarray, as for trajectory().
+        """
+        chunks = [
+            chunk
+            for chunk in self.index["chunks"]
+            if chunk["ts_max"] >= t_start and chunk["ts_min"] <= t_end
+        ]
+
+        def in_range(cols, start, stop):
+            stamps = cols["timestamp"][start:stop]
+            return (stamps >= t_start) & (stamps <= t_end)
+
+        return self.__select(chunks, in_range)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query a DroneLink track store.")
+    parser.add_argument("store", help="Track store directory")
+    parser.add_argument("track_id", nargs="?", type=int, help="Track to describe")
+    args = parser.parse_args(argv)
+
+    store = TrackStore(args.store, mode="r")
+    if args.track_id is None:
+        print(" ".join(str(track_id) for track_id in store.track_ids()))
+        return
+    info = store.first_last(args.track_id)
+    if info is None:
+        print(f"Track {args.track_id} not found.")
+        return
+    print(json.dumps(info, indent=4))
+
+
+if __name__ == "__main__":
+    main()
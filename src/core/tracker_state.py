@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+
+def snapshot_path(directory: str, source) -> str:
+    """
+    Returns the snapshot file of a source: a video content hash, or a
+    camera index / stream URL (hashed into a file name).
+    """
+    key = hashlib.sha1(str(source).encode()).hexdigest()[:20]
+    return os.path.join(directory, f"{key}.npz")
+
+
+def next_track_id(deepsort) -> int:
+    """
+    The ID a deep_sort_realtime DeepSort gives its next new track. The
+    counter is the private Tracker._next_id: it is only accessed through
+    this function and reserve_track_ids, which fail loudly if a
+    deep_sort_realtime release renames it.
+    """
+    tracker = deepsort.tracker
+    if not isinstance(getattr(tracker, "_next_id", None), int):
+        raise RuntimeError(
+            "deep_sort_realtime Tracker has no _next_id counter; "
+            "track IDs cannot be continued with this version"
+        )
+    return tracker._next_id
+
+
+def reserve_track_ids(deepsort, next_id: int) -> None:
+    """
+    Makes new tracks of a DeepSort start at next_id or later, never
+    lowering the counter.
+    """
+    deepsort.tracker._next_id = max(next_track_id(deepsort), int(next_id))
+
+
+def _plain(value):
+    """NumPy scalars as Python values, so they serialise to JSON."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _stack(arrays: list, width: int) -> np.ndarray:
+    if not arrays:
+        return np.zeros((0, width), np.float32)
+    return np.asarray(arrays, np.float32).reshape(len(arrays), -1)
+
+
+class TrackerSnapshot:
+    """
+    Serialisable state of a DeepSort tracker: every track with its Kalman
+    mean and covariance, hit/age counters, state and appearance features,
+    the metric's per-track feature budget and the ID counter. Restoring
+    it into a fresh tracker continues the same identities, so a restarted
+    worker needs no warm-up frames before known people keep their IDs.
+    """
+
+    def __init__(self, next_id: int, tracks: list, samples: dict, meta: Optional[dict] = None):
+        """
+        Args:
+            next_id (int): ID the tracker gives its next new track.
+            tracks (list): Per-track dicts (track_id, mean, covariance,
+                hits, age, time_since_update, state, n_init, max_age,
+                features, det_class, det_conf, original_ltwh).
+            samples (dict): Track ID to the feature list of the matching
+                metric (its nn_budget window).
+            meta (Optional[dict]): Where the snapshot was taken, e.g.
+                frame_index, timestamp and the frame transform.
+        """
+        self.next_id = int(next_id)
+        self.tracks = tracks
+        self.samples = samples
+        self.meta = dict(meta or {})
+
+    @classmethod
+    def capture(cls, deepsort, **meta) -> "TrackerSnapshot":
+        """Takes the state of a deep_sort_realtime DeepSort instance."""
+        tracker = deepsort.tracker
+        tracks = [
+            {
+                "track_id": track.track_id,
+                "mean": np.array(track.mean, np.float64),
+                "covariance": np.array(track.covariance, np.float64),
+                "hits": track.hits,
+                "age": track.age,
+                "time_since_update": track.time_since_update,
+                "state": int(track.state),
+                "n_init": track._n_init,
+                "max_age": track._max_age,
+                "features": [np.asarray(f, np.float32) for f in track.features],
+                "det_class": _plain(track.det_class),
+                "det_conf": None if track.det_conf is None else float(track.det_conf),
+                "original_ltwh": None
+                if track.original_ltwh is None
+                else [float(v) for v in track.original_ltwh],
+            }
+            for track in tracker.tracks
+        ]
+        samples = {
+            track_id: [np.asarray(f, np.float32) for f in features]
+            for track_id, features in tracker.metric.samples.items()
+        }
+        return cls(next_track_id(deepsort), tracks, samples, meta)
+
+    def restore(self, deepsort) -> None:
+        """Replaces the state of a DeepSort instance with this snapshot."""
+        tracker = deepsort.tracker
+        tracks = []
+        for entry in self.tracks:
+            track = tracker.track_class(
+                entry["mean"].copy(),
+                entry["covariance"].copy(),
+                entry["track_id"],
+                entry["n_init"],
+                entry["max_age"],
+                original_ltwh=None
+                if entry["original_ltwh"] is None
+                else np.array(entry["original_ltwh"]),
+                det_class=entry["det_class"],
+                det_conf=entry["det_conf"],
+            )
+            track.hits = entry["hits"]
+            track.age = entry["age"]
+            track.time_since_update = entry["time_since_update"]
+            track.state = entry["state"]
+            track.features = [f.copy() for f in entry["features"]]
+            tracks.append(track)
+        tracker.tracks = tracks
+        tracker.metric.samples = {
+            track_id: [f.copy() for f in features]
+            for track_id, features in self.samples.items()
+        }
+        reserve_track_ids(deepsort, self.next_id)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the snapshot as an .npz file, replacing the previous one
+        atomically so a crash mid-write keeps the last complete snapshot.
+        Not compressed: it is written from the inference loop, and
+        features barely compress.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        width = 0
+        for features in [t["features"] for t in self.tracks] + list(self.samples.values()):
+            if features:
+                width = features[0].size
+                break
+        sample_ids = list(self.samples)
+        meta = dict(
+            self.meta,
+            next_id=self.next_id,
+            saved_at=time.time(),
+            tracks=[
+                {
+                    k: v
+                    for k, v in t.items()
+                    if k not in ("mean", "covariance", "features")
+                }
+                for t in self.tracks
+            ],
+            sample_ids=sample_ids,
+        )
+        tmp = path + ".partial.npz"
+        np.savez(
+            tmp,
+            means=np.array([t["mean"] for t in self.tracks], np.float64).reshape(-1, 8),
+            covariances=np.array(
+                [t["covariance"] for t in self.tracks], np.float64
+            ).reshape(-1, 8, 8),
+            track_features=_stack(
+                [f for t in self.tracks for f in t["features"]], width
+            ),
+            track_feature_counts=np.array(
+                [len(t["features"]) for t in self.tracks], np.int64
+            ),
+            sample_features=_stack(
+                [f for i in sample_ids for f in self.samples[i]], width
+            ),
+            sample_counts=np.array([len(self.samples[i]) for i in sample_ids], np.int64),
+            meta=np.array(json.dumps(meta)),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TrackerSnapshot":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            means = data["means"]
+            covariances = data["covariances"]
+            track_features = np.split(
+                data["track_features"], np.cumsum(data["track_feature_counts"])[:-1]
+            )
+            sample_features = np.split(
+                data["sample_features"], np.cumsum(data["sample_counts"])[:-1]
+            )
+        tracks = []
+        for i, entry in enumerate(meta.pop("tracks")):
+            entry = dict(entry, mean=means[i], covariance=covariances[i])
+            entry["features"] = list(track_features[i]) if len(track_features) > i else []
+            tracks.append(entry)
+        samples = {
+            track_id: list(sample_features[i])
+            for i, track_id in enumerate(meta.pop("sample_ids"))
+        }
+        return cls(meta.pop("next_id"), tracks, samples, meta)
+
+    def matches(
+        self, timestamp: Optional[float], transform=None, max_gap: float = 2.0
+    ) -> bool:
+        """
+        Whether this snapshot continues a frame at timestamp: taken at most
+        max_gap seconds before (or after, for a slightly rewound file) it,
+        with the same frame transform, so positions are comparable.
+        """
+        taken = self.meta.get("timestamp")
+        if taken is None or timestamp is None:
+            return False
+        same_geometry = self.meta.get("transform") == (
+            None if transform is None else [float(v) for v in transform]
+        )
+        return same_geometry and abs(timestamp - taken) <= max_gap
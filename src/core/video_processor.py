@@ -2,14 +2,21 @@ import cv2
 
 
 class VideoProcessor:
-    def __init__(self, video_path: str):
+    def __init__(self, video_path: str, decode_threads: int = 0):
         """
         Initializes the video capture.
 
         Args:
             video_path (str): Path to the video file.
+            decode_threads (int): Decoder threads, 0 lets the backend
+            decide (usually one per CPU).
         """
-        self.cap = cv2.VideoCapture(video_path)
+        if decode_threads:
+            self.cap = cv2.VideoCapture(
+                video_path, cv2.CAP_ANY, [cv2.CAP_PROP_N_THREADS, decode_threads]
+            )
+        else:
+            self.cap = cv2.VideoCapture(video_path)
 
     def get_frame(self):
         """
@@ -25,6 +32,37 @@ class VideoProcessor:
             return None
         return frame
 
+    def grab(self) -> bool:
+        """
+        Advances past the next frame without retrieving it, which skips
+        the colour conversion and copy. Returns False at the end.
+        """
+        return self.cap.grab()
+
+    def get_timestamp(self) -> float:
+        """
+        Returns the position of the last frame read, in seconds from the
+        start of the video.
+        """
+        return self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+    @property
+    def frame_count(self) -> int:
+        """Number of frames in the file, 0 if unknown."""
+        return max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+
+    @property
+    def fps(self) -> float:
+        """Nominal frame rate, 30 if unknown."""
+        return self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def seek(self, frame_index: int) -> None:
+        """
+        Positions the capture so the next get_frame() returns the given
+        frame.
+        """
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+
     def release(self):
         """Releases the video capture resource."""
         self.cap.release()
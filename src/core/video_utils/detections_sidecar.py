@@ -0,0 +1,109 @@
+import json
+import os
+from typing import Optional
+
+SIDECAR_FORMAT = "dronelink-detections"
+SIDECAR_VERSION = 1
+SIDECAR_SUFFIX = ".detections.jsonl"
+
+
+def sidecar_path_for(video_path: str) -> str:
+    """Returns the sidecar path that accompanies a video file."""
+    return os.path.splitext(video_path)[0] + SIDECAR_SUFFIX
+
+
+def encode_tracks(tracked_objects, scale: float = 1.0) -> list:
+    """
+    Converts Model.process_frame output into JSON-serialisable dicts,
+    scaling boxes by the given factor.
+    """
+    encoded = []
+    for track in tracked_objects:
+        item = {
+            "bbox": [round(float(v) * scale, 2) for v in track["bbox"]],
+            "track_id": str(track["track_id"]),
+        }
+        if track.get("confidence") is not None:
+            item["confidence"] = round(float(track["confidence"]), 4)
+        encoded.append(item)
+    return encoded
+
+
+def scale_tracks(tracks: list, sx: float, sy: Optional[float] = None) -> list:
+    """
+    Returns encoded tracks with boxes scaled by sx horizontally and sy
+    (default sx) vertically.
+    """
+    sy = sx if sy is None else sy
+    scaled = []
+    for track in tracks:
+        x, y, w, h = track["bbox"]
+        item = dict(track)
+        item["bbox"] = [
+            round(x * sx, 2),
+            round(y * sy, 2),
+            round(w * sx, 2),
+            round(h * sy, 2),
+        ]
+        scaled.append(item)
+    return scaled
+
+
+class DetectionsSidecarWriter:
+    """
+    Writes per-frame tracks as JSON lines next to a video file. The first
+    line is a header (format, version and any metadata such as frame size
+    and fps); each following line is one frame:
+    {"frame": <index in the video>, "source_frame": <index in the source>,
+    "timestamp": <seconds>, "tracks": [{"bbox": [x, y, w, h],
+    "track_id": "7"}, ...]}. Boxes are in the video's pixel coordinates.
+    """
+
+    def __init__(self, path: str, **metadata):
+        self.path = path
+        self._file = open(path, "w")
+        self._frame = 0
+        header = {"format": SIDECAR_FORMAT, "version": SIDECAR_VERSION}
+        header.update(metadata)
+        self._file.write(json.dumps(header) + "\n")
+
+    def write(
+        self,
+        tracks: list,
+        source_frame: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Appends the record for the next video frame.
+
+        Args:
+            tracks (list): Tracks already encoded with encode_tracks().
+            source_frame (Optional[int]): Frame index in the original source.
+            timestamp (Optional[float]): Frame time in seconds.
+        """
+        record = {
+            "frame": self._frame,
+            "source_frame": source_frame,
+            "timestamp": timestamp,
+            "tracks": tracks,
+        }
+        self._file.write(json.dumps(record) + "\n")
+        self._frame += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_detections_sidecar(path: str):
+    """
+    Reads a sidecar written by DetectionsSidecarWriter.
+
+    Returns:
+        tuple: (header dict, list of frame records in order)
+    """
+    with open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != SIDECAR_FORMAT:
+            raise ValueError(f"{path} is not a detections sidecar.")
+        records = [json.loads(line) for line in f if line.strip()]
+    return header, records
@@ -0,0 +1,104 @@
+import os
+import shutil
+import subprocess
+from typing import Optional
+
+
+class FFmpegWriter:
+    """
+    Encodes frames with an ffmpeg subprocess fed raw frames through a pipe.
+    Has the same write_frame/release interface as ArchiveProcessor.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: float = 30,
+        frame_size: tuple = (640, 480),
+        codec: str = "libx264",
+        preset: Optional[str] = "veryfast",
+        crf: Optional[int] = 23,
+        input_pixel_format: str = "bgr24",
+        threads: int = 0,
+        ffmpeg_bin: str = "ffmpeg",
+    ):
+        """
+        Starts the encoder process.
+
+        :param output_path: Output file; the container follows the extension.
+        :param fps: Frames per second of the output.
+        :param frame_size: (width, height) of every written frame.
+        :param codec: ffmpeg video encoder (libx264, libx265, h264_nvenc...).
+        :param preset: Encoder speed preset, None to omit.
+        :param crf: Constant rate factor, None to omit.
+        :param input_pixel_format: Layout of written frames (bgr24/rgb24).
+        :param threads: Encoder threads, 0 lets ffmpeg decide.
+        :param ffmpeg_bin: ffmpeg executable name or path.
+        """
+        executable = shutil.which(ffmpeg_bin)
+        if executable is None:
+            raise IOError(f"{ffmpeg_bin} not found; cannot open {output_path}.")
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.frame_size = tuple(frame_size)
+        command = self.build_command(
+            output_path, fps, frame_size, codec, preset, crf,
+            input_pixel_format, threads,
+        )
+        command[0] = executable
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @staticmethod
+    def build_command(
+        output_path: str,
+        fps: float,
+        frame_size: tuple,
+        codec: str = "libx264",
+        preset: Optional[str] = "veryfast",
+        crf: Optional[int] = 23,
+        input_pixel_format: str = "bgr24",
+        threads: int = 0,
+    ) -> list:
+        """Returns the ffmpeg argument list for the given settings."""
+        width, height = frame_size
+        command = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo",
+            "-pix_fmt", input_pixel_format,
+            "-s", f"{width}x{height}",
+            "-r", str(fps),
+            "-i", "-",
+            "-an",
+            "-c:v", codec,
+        ]
+        if preset:
+            command += ["-preset", preset]
+        if crf is not None:
+            command += ["-crf", str(crf)]
+        if threads:
+            command += ["-threads", str(threads)]
+        command += ["-pix_fmt", "yuv420p", output_path]
+        return command
+
+    def write_frame(self, frame) -> None:
+        try:
+            self.process.stdin.write(frame.tobytes())
+        except (BrokenPipeError, OSError) as exc:
+            raise IOError(f"ffmpeg exited with code {self.process.poll()}") from exc
+
+    def release(self) -> None:
+        """
+        Closes the pipe and waits for ffmpeg to finish the file.
+        """
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
@@ -0,0 +1,39 @@
+from typing import Optional
+
+
+class FrameClock:
+    """
+    Turns the timestamps of processed frames into a monotonic timeline
+    starting at 0. Processed frames arrive at the inference rate, not at
+    the source rate, so writers use this time rather than a frame count.
+    Frames without a timestamp, and jumps backwards or longer than
+    max_gap (seeks, reconnects), advance it by one nominal frame.
+    """
+
+    def __init__(self, fps: float, max_gap: float = 5.0):
+        """
+        Args:
+            fps (float): Nominal rate, for frames whose timestamp is
+                missing or discontinuous.
+            max_gap (float): Longest timestamp step taken as real time.
+        """
+        self.step = 1.0 / fps
+        self.max_gap = max_gap
+        self.time = None
+        self.last_step = self.step
+        self._timestamp = None
+
+    def tick(self, timestamp: Optional[float] = None) -> float:
+        """Returns the time of the next frame, given its timestamp."""
+        if self.time is None:
+            self.time = 0.0
+        else:
+            step = self.step
+            if timestamp is not None and self._timestamp is not None:
+                delta = timestamp - self._timestamp
+                if 0 < delta <= self.max_gap:
+                    step = delta
+            self.time += step
+            self.last_step = step
+        self._timestamp = timestamp
+        return self.time
@@ -0,0 +1,176 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class FrameGrabber:
+    """
+    Drains a capture source on a background thread so that only the newest
+    frame is ever held. Frames that are overwritten before a consumer reads
+    them are counted as dropped. A source that fails or stalls is closed and
+    reopened with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        open_capture: Callable[[], Any],
+        initial_backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        max_retries: Optional[int] = None,
+        on_frame: Optional[Callable[[Any, Any, float], None]] = None,
+    ):
+        """
+        Args:
+            open_capture (Callable): Returns a new capture object exposing
+                read(), isOpened() and release() (e.g. cv2.VideoCapture).
+            initial_backoff (float): Seconds to wait before the first
+                reconnect attempt.
+            max_backoff (float): Upper bound for the reconnect delay.
+            max_retries (Optional[int]): Consecutive failed reconnects
+                before giving up. None retries forever.
+            on_frame (Optional[Callable]): Called on the grabbing thread
+                with (capture, frame, arrival time) after every successful
+                read, e.g. to sample stream timestamps or record frames.
+        """
+        self._open_capture = open_capture
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self._on_frame = on_frame
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._frame = None
+        self._frame_time = None
+        self._seq = 0
+        self._read_seq = 0
+        self.last_read_time = None
+        self._finished = False
+        self._stats = {
+            "frames_grabbed": 0,
+            "frames_read": 0,
+            "frames_dropped": 0,
+            "reconnects": 0,
+            "connected": False,
+        }
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "FrameGrabber":
+        """Starts the grabbing thread."""
+        self._thread.start()
+        return self
+
+    def _open(self):
+        try:
+            cap = self._open_capture()
+        except Exception:
+            return None
+        if cap is None or not cap.isOpened():
+            if cap is not None:
+                cap.release()
+            return None
+        return cap
+
+    def _set_connected(self, connected: bool) -> None:
+        with self._cond:
+            self._stats["connected"] = connected
+
+    def _run(self):
+        cap = None
+        failures = 0
+        backoff = self.initial_backoff
+        first_attempt = True
+        while not self._stop.is_set():
+            if cap is None:
+                if not first_attempt:
+                    if self.max_retries is not None and failures > self.max_retries:
+                        break
+                    if self._stop.wait(backoff):
+                        break
+                    backoff = min(backoff * 2, self.max_backoff)
+                    with self._cond:
+                        self._stats["reconnects"] += 1
+                first_attempt = False
+                cap = self._open()
+                if cap is None:
+                    failures += 1
+                    continue
+                self._set_connected(True)
+
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                # Disconnected or stalled past the backend read timeout.
+                cap.release()
+                cap = None
+                failures += 1
+                self._set_connected(False)
+                continue
+
+            failures = 0
+            backoff = self.initial_backoff
+            arrival = time.time()
+            if self._on_frame is not None:
+                self._on_frame(cap, frame, arrival)
+            with self._cond:
+                if self._seq > self._read_seq:
+                    self._stats["frames_dropped"] += 1
+                self._frame = frame
+                self._frame_time = arrival
+                self._seq += 1
+                self._stats["frames_grabbed"] += 1
+                self._cond.notify_all()
+
+        if cap is not None:
+            cap.release()
+        with self._cond:
+            self._finished = True
+            self._stats["connected"] = False
+            self._cond.notify_all()
+
+    def read(self, timeout: Optional[float] = None):
+        """
+        Waits for a frame newer than the last one returned.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait. None waits
+                until a frame arrives or the grabber stops.
+
+        Returns:
+            np.ndarray or None: The newest frame, or None on timeout or
+            once the grabber has stopped.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._seq > self._read_seq or self._finished, timeout
+            )
+            if not ready or self._seq == self._read_seq:
+                return None
+            self._read_seq = self._seq
+            self.last_read_time = self._frame_time
+            self._stats["frames_read"] += 1
+            return self._frame
+
+    def latest(self):
+        """
+        Returns the newest frame and its arrival time without waiting.
+
+        Returns:
+            tuple: (frame, wall-clock arrival time), both None if no frame
+            has been grabbed yet.
+        """
+        with self._cond:
+            return self._frame, self._frame_time
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the grab, drop and reconnect counters."""
+        with self._cond:
+            return dict(self._stats)
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """Stops the grabbing thread and releases the capture."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
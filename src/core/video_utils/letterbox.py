@@ -0,0 +1,108 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# (scale, pad_x, pad_y): model = source * scale + pad.
+Transform = Tuple[float, int, int]
+
+
+class Letterbox:
+    """
+    Fits frames into a size x size model input, keeping the aspect ratio
+    and padding the rest with grey as YOLO does, so the detector gets the
+    input it would have produced itself and only that crosses the process
+    boundary instead of the full-resolution frame.
+
+    Frames are written into a ring of reused buffers. A buffer handed to a
+    multiprocessing queue is pickled later by the queue's feeder thread,
+    so it must not be overwritten until the consumer has taken it: with
+    a queue of maxsize q, a ring of q + 2 buffers is never overwritten
+    while still queued. Frames already no larger than the input are
+    passed through unchanged: enlarging them would only add bytes.
+    """
+
+    PAD_VALUE = 114
+
+    def __init__(self, size: int = 640, buffers: int = 4):
+        """
+        Args:
+            size (int): Edge of the square model input.
+            buffers (int): Number of buffers reused in turn.
+        """
+        self.size = int(size)
+        self._buffers = [
+            np.full((self.size, self.size, 3), self.PAD_VALUE, np.uint8)
+            for _ in range(max(1, int(buffers)))
+        ]
+        self._next = 0
+        # The geometry last written into each buffer, to only repaint the
+        # padding when it changes.
+        self._layouts = [None] * len(self._buffers)
+
+    def transform_for(self, width: int, height: int) -> Transform:
+        """The (scale, pad_x, pad_y) mapping a width x height frame."""
+        scale = min(self.size / width, self.size / height)
+        new_w, new_h = round(width * scale), round(height * scale)
+        return scale, (self.size - new_w) // 2, (self.size - new_h) // 2
+
+    def __call__(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[Transform]]:
+        """
+        Letterboxes a frame into the next buffer.
+
+        Returns:
+            tuple: (buffer, (scale, pad_x, pad_y)), or (frame, None) for a
+            frame that fits the input as it is.
+        """
+        height, width = frame.shape[:2]
+        if max(width, height) <= self.size:
+            return frame, None
+        scale, pad_x, pad_y = self.transform_for(width, height)
+        new_w, new_h = round(width * scale), round(height * scale)
+        slot = self._next
+        self._next = (slot + 1) % len(self._buffers)
+        buffer = self._buffers[slot]
+        layout = (new_w, new_h, pad_x, pad_y)
+        if self._layouts[slot] != layout:
+            buffer[:] = self.PAD_VALUE
+            self._layouts[slot] = layout
+        target = buffer[pad_y : pad_y + new_h, pad_x : pad_x + new_w]
+        if (new_w, new_h) == (width, height):
+            target[:] = frame
+        else:
+            cv2.resize(frame, (new_w, new_h), dst=target, interpolation=cv2.INTER_AREA)
+        return buffer, (scale, pad_x, pad_y)
+
+
+def boxes_to_source(boxes: np.ndarray, transform: Optional[Transform]) -> np.ndarray:
+    """
+    Maps x1, y1, x2, y2 (, ...) rows from model input to source pixels.
+    Extra columns (e.g. confidence) are kept.
+    """
+    if transform is None or not len(boxes):
+        return boxes
+    scale, pad_x, pad_y = transform
+    mapped = np.array(boxes, np.float32, copy=True)
+    mapped[:, [0, 2]] = (mapped[:, [0, 2]] - pad_x) / scale
+    mapped[:, [1, 3]] = (mapped[:, [1, 3]] - pad_y) / scale
+    return mapped
+
+
+def boxes_to_model(boxes: np.ndarray, transform: Optional[Transform]) -> np.ndarray:
+    """The inverse of boxes_to_source."""
+    if transform is None or not len(boxes):
+        return boxes
+    scale, pad_x, pad_y = transform
+    mapped = np.array(boxes, np.float32, copy=True)
+    mapped[:, [0, 2]] = mapped[:, [0, 2]] * scale + pad_x
+    mapped[:, [1, 3]] = mapped[:, [1, 3]] * scale + pad_y
+    return mapped
+
+
+def ltwh_to_source(bbox, transform: Optional[Transform]) -> list:
+    """Maps one [x, y, w, h] box from model input to source pixels."""
+    if transform is None:
+        return bbox
+    scale, pad_x, pad_y = transform
+    x, y, w, h = bbox
+    return [(x - pad_x) / scale, (y - pad_y) / scale, w / scale, h / scale]
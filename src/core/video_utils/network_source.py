@@ -0,0 +1,200 @@
+import os
+import threading
+from collections import deque
+from statistics import median
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+import cv2
+
+NETWORK_SCHEMES = ("rtsp", "rtsps", "rtmp", "rtp", "udp", "srt", "tcp", "http", "https")
+TRANSPORTS = ("tcp", "udp", "udp_multicast", "http")
+
+# OPENCV_FFMPEG_CAPTURE_OPTIONS is read from the environment when a capture
+# is opened, so concurrent opens with different options must be serialised.
+_ENV_LOCK = threading.Lock()
+_ENV_KEY = "OPENCV_FFMPEG_CAPTURE_OPTIONS"
+
+
+def is_network_source(source: Union[int, str]) -> bool:
+    """
+    Returns True if the source is a URL with a network scheme
+    (rtsp://, udp://, http://, ...).
+    """
+    if not isinstance(source, str):
+        return False
+    return urlparse(source).scheme.lower() in NETWORK_SCHEMES
+
+
+class NetworkStreamOptions:
+    """
+    Demuxer/decoder settings for a network stream source.
+    """
+
+    def __init__(
+        self,
+        transport: str = "tcp",
+        jitter_buffer_ms: int = 200,
+        decode_threads: int = 0,
+        socket_buffer_kb: int = 1024,
+    ):
+        """
+        Args:
+            transport (str): RTSP lower transport, one of TRANSPORTS.
+            jitter_buffer_ms (int): How long the demuxer may hold packets
+                to reorder late/out-of-order arrivals. 0 disables the
+                reorder buffer for lowest latency.
+            decode_threads (int): Decoder threads, 0 lets FFmpeg decide.
+            socket_buffer_kb (int): UDP receive buffer size.
+        """
+        if transport not in TRANSPORTS:
+            raise ValueError(
+                f"Unknown transport {transport!r}, expected one of {TRANSPORTS}"
+            )
+        self.transport = transport
+        self.jitter_buffer_ms = max(0, int(jitter_buffer_ms))
+        self.decode_threads = max(0, int(decode_threads))
+        self.socket_buffer_kb = max(0, int(socket_buffer_kb))
+
+    def ffmpeg_options(self, url: str) -> str:
+        """
+        Builds the OPENCV_FFMPEG_CAPTURE_OPTIONS string ("key;value|...")
+        for the given URL.
+        """
+        scheme = urlparse(url).scheme.lower()
+        delay_us = self.jitter_buffer_ms * 1000
+        options = []
+        if scheme in ("rtsp", "rtsps"):
+            options.append(("rtsp_transport", self.transport))
+            # Roughly one reorder slot per 10 ms of jitter budget.
+            options.append(("reorder_queue_size", max(0, self.jitter_buffer_ms // 10)))
+        if scheme in ("udp", "rtp"):
+            options.append(("buffer_size", self.socket_buffer_kb * 1024))
+            options.append(("overrun_nonfatal", 1))
+        options.append(("max_delay", delay_us))
+        if self.jitter_buffer_ms == 0:
+            options.append(("fflags", "nobuffer"))
+        return "|".join(f"{key};{value}" for key, value in options)
+
+    def to_dict(self) -> dict:
+        return {
+            "transport": self.transport,
+            "jitter_buffer_ms": self.jitter_buffer_ms,
+            "decode_threads": self.decode_threads,
+            "socket_buffer_kb": self.socket_buffer_kb,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NetworkStreamOptions":
+        return cls(**data)
+
+
+def open_network_capture(
+    url: str,
+    options: Optional[NetworkStreamOptions] = None,
+    timeout_ms: int = 5000,
+):
+    """
+    Opens a network stream with the FFmpeg backend.
+
+    Args:
+        url (str): Stream URL.
+        options (NetworkStreamOptions): Transport, jitter buffer and
+            decoder settings. Defaults are used if None.
+        timeout_ms (int): Open/read timeout in milliseconds.
+
+    Returns:
+        cv2.VideoCapture: The (possibly unopened) capture.
+    """
+    options = options or NetworkStreamOptions()
+    params = [
+        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+        cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms,
+    ]
+    if options.decode_threads:
+        params += [cv2.CAP_PROP_N_THREADS, options.decode_threads]
+
+    with _ENV_LOCK:
+        previous = os.environ.get(_ENV_KEY)
+        os.environ[_ENV_KEY] = options.ffmpeg_options(url)
+        try:
+            return cv2.VideoCapture(url, cv2.CAP_FFMPEG, params)
+        finally:
+            if previous is None:
+                os.environ.pop(_ENV_KEY, None)
+            else:
+                os.environ[_ENV_KEY] = previous
+
+
+class PacketLossEstimator:
+    """
+    Estimates frame loss and interarrival jitter of a network stream.
+    OpenCV does not expose RTP counters, so losses are inferred from gaps
+    in presentation timestamps (or arrival times when the stream carries
+    none) larger than the nominal frame interval.
+    """
+
+    def __init__(self, nominal_fps: float = 0.0):
+        """
+        Args:
+            nominal_fps (float): Frame rate reported by the stream. Values
+                outside (0, 240) are ignored and the interval is learned
+                from the median of recent frame gaps instead.
+        """
+        self.nominal_interval = 1000.0 / nominal_fps if 0 < nominal_fps < 240 else None
+        self._intervals = deque(maxlen=30)
+        self._last_ts = None
+        self._last_arrival = None
+        self.frames_received = 0
+        self.frames_lost = 0
+        self.jitter_ms = 0.0
+
+    def _interval(self) -> Optional[float]:
+        if self.nominal_interval:
+            return self.nominal_interval
+        if len(self._intervals) >= 5:
+            return median(self._intervals)
+        return None
+
+    def update(self, pts_ms: Optional[float], arrival: float) -> None:
+        """
+        Records one received frame.
+
+        Args:
+            pts_ms (Optional[float]): Presentation timestamp in ms, or
+                None/0 if the stream does not provide one.
+            arrival (float): Arrival time in seconds.
+        """
+        arrival_ms = arrival * 1000.0
+        has_pts = bool(pts_ms) and pts_ms > 0
+        ts = pts_ms if has_pts else arrival_ms
+        self.frames_received += 1
+
+        if self._last_ts is not None:
+            delta = ts - self._last_ts
+            interval = self._interval()
+            missing = 0
+            if delta > 0 and interval and delta > 1.5 * interval:
+                missing = int(round(delta / interval)) - 1
+                self.frames_lost += missing
+            elif delta > 0:
+                self._intervals.append(delta)
+
+            # RFC 3550 style running jitter estimate.
+            expected = delta if has_pts else interval
+            if expected and not missing:
+                deviation = abs((arrival_ms - self._last_arrival) - expected)
+                self.jitter_ms += (deviation - self.jitter_ms) / 16.0
+
+        self._last_ts = ts
+        self._last_arrival = arrival_ms
+
+    def stats(self) -> dict:
+        """Returns received/lost frame counts, loss ratio and jitter."""
+        total = self.frames_received + self.frames_lost
+        return {
+            "frames_received": self.frames_received,
+            "frames_lost": self.frames_lost,
+            "loss_ratio": self.frames_lost / total if total else 0.0,
+            "jitter_ms": self.jitter_ms,
+        }
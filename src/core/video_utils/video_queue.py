@@ -2,20 +2,43 @@ import threading
 from collections import deque
 from typing import Optional, Any
 
+import numpy as np
+
+
+def item_nbytes(item: Any) -> int:
+    """
+    Bytes of the arrays and buffers in a queued item, e.g. the frame of an
+    archive tuple; other fields are not counted.
+    """
+    if isinstance(item, np.ndarray):
+        return item.nbytes
+    if isinstance(item, (bytes, bytearray)):
+        return len(item)
+    if isinstance(item, (tuple, list)):
+        return sum(item_nbytes(part) for part in item)
+    return 0
+
 
 class VideoQueue:
     """
     A class-level (singleton-like) thread-safe queue for storing video frames.
-    Automatically discards the oldest frame if maxlen is reached.
+    Automatically discards the oldest frames once max_size frames or
+    max_bytes are exceeded. The bytes held are tracked for memory
+    accounting, and shed() frees the oldest frames on demand.
     """
 
     _queue = deque()
     _instance = None
     _lock = threading.Lock()
     _max_size: Optional[int] = None
+    _max_bytes: Optional[int] = None
+    _nbytes = 0
+    _dropped = 0
 
     @classmethod
-    def configure(cls, max_size: Optional[int] = None) -> None:
+    def configure(
+        cls, max_size: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> None:
         """
         Configures a maximum size for the shared queue.
 
@@ -23,8 +46,23 @@ class VideoQueue:
             max_size (Optional[int]): Maximum number of frames to store.
             If None, the queue grows dynamically. If set and the queue
             is full, the oldest frame is removed.
+            max_bytes (Optional[int]): Maximum bytes of frame data stored,
+            likewise enforced by removing the oldest frames.
         """
-        cls._max_size = max_size
+        with cls._lock:
+            cls._max_size = max_size
+            cls._max_bytes = max_bytes
+            cls._trim()
+
+    @classmethod
+    def _trim(cls) -> None:
+        """Drops the oldest frames beyond the limits. Caller holds _lock."""
+        while cls._queue and (
+            (cls._max_size is not None and len(cls._queue) > cls._max_size)
+            or (cls._max_bytes is not None and cls._nbytes > cls._max_bytes)
+        ):
+            cls._nbytes -= item_nbytes(cls._queue.popleft())
+            cls._dropped += 1
 
     @classmethod
     def enqueue(cls, frame: Any) -> None:
@@ -37,6 +75,8 @@ class VideoQueue:
         """
         with cls._lock:
             cls._queue.append(frame)
+            cls._nbytes += item_nbytes(frame)
+            cls._trim()
 
     @classmethod
     def dequeue(cls) -> Optional[Any]:
@@ -47,7 +87,11 @@ class VideoQueue:
             The first frame if available, or None if the queue is empty.
         """
         with cls._lock:
-            return cls._queue.popleft() if cls._queue else None
+            if not cls._queue:
+                return None
+            frame = cls._queue.popleft()
+            cls._nbytes -= item_nbytes(frame)
+            return frame
 
     @classmethod
     def peek(cls) -> Optional[Any]:
@@ -100,3 +144,36 @@ class VideoQueue:
         """
         with cls._lock:
             cls._queue.clear()
+            cls._nbytes = 0
+
+    @classmethod
+    def nbytes(cls) -> int:
+        """
+        Returns the bytes of frame data held.
+        """
+        return cls._nbytes
+
+    @classmethod
+    def dropped(cls) -> int:
+        """
+        Returns how many frames were discarded by the limits or shed().
+        """
+        return cls._dropped
+
+    @classmethod
+    def shed(cls, target_bytes: int) -> int:
+        """
+        Discards the oldest frames until at least target_bytes are freed
+        (or the queue is empty).
+
+        Returns:
+            The number of bytes freed.
+        """
+        freed = 0
+        with cls._lock:
+            while cls._queue and freed < target_bytes:
+                size = item_nbytes(cls._queue.popleft())
+                cls._nbytes -= size
+                cls._dropped += 1
+                freed += size
+        return freed
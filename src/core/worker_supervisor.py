@@ -0,0 +1,270 @@
+import multiprocessing as mp
+import time
+from typing import Callable, Optional
+
+
+class WorkerHandle:
+    """
+    Shared state between the supervisor and one worker process. The worker
+    calls ready() once its model is loaded, beat() on every loop iteration
+    and begin_frame()/end_frame() around each inference; the supervisor
+    reads the timestamps (time.monotonic, which is system-wide) to detect
+    hangs. A standby worker loads its model and then waits in
+    wait_until_active() until the supervisor promotes it.
+    """
+
+    def __init__(self, active: bool = True):
+        self.running = mp.Value("b", True)
+        self.active = mp.Value("b", active)
+        self.is_ready = mp.Value("b", False)
+        self.heartbeat = mp.Value("d", 0.0)
+        # Start of the frame being processed, 0 while idle.
+        self.busy_since = mp.Value("d", 0.0)
+        self.frames = mp.Value("i", 0)
+        self.first_frame_done = mp.Value("d", 0.0)
+        self.process = None
+        # Free for the spawn callable, e.g. the worker's queues.
+        self.queues = None
+        self.started = time.monotonic()
+
+    # Worker side.
+
+    def ready(self) -> None:
+        self.beat()
+        self.is_ready.value = True
+
+    def beat(self) -> None:
+        self.heartbeat.value = time.monotonic()
+
+    def begin_frame(self) -> None:
+        now = time.monotonic()
+        self.heartbeat.value = now
+        self.busy_since.value = now
+
+    def end_frame(self) -> None:
+        now = time.monotonic()
+        self.busy_since.value = 0.0
+        if not self.frames.value:
+            self.first_frame_done.value = now
+        self.frames.value += 1
+        self.heartbeat.value = now
+
+    def wait_until_active(self, poll: float = 0.05) -> bool:
+        """
+        Blocks a standby worker until it is promoted. Returns False if it
+        is stopped instead.
+        """
+        while self.running.value and not self.active.value:
+            self.beat()
+            time.sleep(poll)
+        return bool(self.running.value)
+
+    # Supervisor side.
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    def fault(
+        self,
+        now: float,
+        heartbeat_timeout: float,
+        frame_timeout: float,
+        startup_timeout: float,
+    ) -> Optional[dict]:
+        """
+        Returns {"kind", ...details} if the worker is dead or stuck.
+        """
+        if not self.process.is_alive():
+            return {"kind": "crashed", "exitcode": self.process.exitcode}
+        if not self.is_ready.value:
+            if now - self.started > startup_timeout:
+                return {
+                    "kind": "startup_timeout",
+                    "seconds": round(now - self.started, 2),
+                }
+            return None
+        busy_since = self.busy_since.value
+        if busy_since and now - busy_since > frame_timeout:
+            return {"kind": "stalled", "seconds": round(now - busy_since, 2)}
+        if now - self.heartbeat.value > heartbeat_timeout:
+            return {
+                "kind": "unresponsive",
+                "seconds": round(now - self.heartbeat.value, 2),
+            }
+        return None
+
+    def stop(self, timeout: float) -> None:
+        """
+        Asks the worker to exit, then terminates and finally kills it.
+        """
+        self.running.value = False
+        if self.process is None:
+            return
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class WorkerSupervisor:
+    """
+    Keeps one active inference worker and, optionally, a hot standby
+    whose model is already loaded. check() must be called periodically
+    (e.g. from a GUI timer): a worker that exited, stopped sending
+    heartbeats or spent longer than frame_timeout on one frame is stopped
+    and replaced by the standby, so processing resumes without a model
+    reload. A new standby is then started in the background. Every
+    incident is kept in .incidents and, if given, written to a MetricsLog
+    as "worker_incident"; the first frame after a failover is logged as
+    "worker_recovered" with the outage duration.
+
+    Killing a worker while it holds the lock of a multiprocessing queue can
+    leave that queue unusable; this is the price of not hanging forever.
+    """
+
+    def __init__(
+        self,
+        spawn: Callable,
+        standby: bool = True,
+        heartbeat_timeout: float = 5.0,
+        frame_timeout: float = 10.0,
+        startup_timeout: float = 120.0,
+        stop_timeout: float = 2.0,
+        metrics=None,
+        on_retired: Optional[Callable] = None,
+    ):
+        """
+        Args:
+            spawn (Callable): Called with a WorkerHandle; must start and
+                return the worker process, passing the handle to it.
+            standby (bool): Keep a pre-warmed standby worker.
+            heartbeat_timeout (float): Seconds without a heartbeat after
+                which a ready worker counts as hung.
+            frame_timeout (float): Maximum seconds for a single frame.
+            startup_timeout (float): Maximum seconds to load the model.
+            stop_timeout (float): Grace period before terminating a worker.
+            metrics (MetricsLog, optional): Receives incident records.
+            on_retired (Callable, optional): Called with the pid of every
+                worker process that was stopped.
+        """
+        self.spawn = spawn
+        self.standby_enabled = standby
+        self.heartbeat_timeout = heartbeat_timeout
+        self.frame_timeout = frame_timeout
+        self.startup_timeout = startup_timeout
+        self.stop_timeout = stop_timeout
+        self.metrics = metrics
+        self.on_retired = on_retired
+        self.incidents = []
+        self.active = None
+        self.standby = None
+        self._pending = None
+
+    def _start(self, active: bool) -> WorkerHandle:
+        handle = WorkerHandle(active=active)
+        handle.process = self.spawn(handle)
+        return handle
+
+    def _retire(self, handle: Optional[WorkerHandle], timeout: float) -> None:
+        if handle is None:
+            return
+        handle.stop(timeout)
+        if self.on_retired is not None and handle.pid is not None:
+            self.on_retired(handle.pid)
+
+    def start(self) -> None:
+        """Starts the active worker and, if enabled, the standby."""
+        self.active = self._start(active=True)
+        if self.standby_enabled:
+            self.standby = self._start(active=False)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops all workers, killing those that do not exit within timeout
+        (default stop_timeout) seconds.
+        """
+        if timeout is None:
+            timeout = self.stop_timeout
+        # Signal both first so they shut down in parallel.
+        for handle in (self.active, self.standby):
+            if handle is not None:
+                handle.running.value = False
+        self._retire(self.active, timeout)
+        self._retire(self.standby, timeout)
+        self.active = self.standby = None
+        self._pending = None
+
+    @property
+    def pids(self) -> list:
+        return [h.pid for h in (self.active, self.standby) if h is not None]
+
+    def _record(self, event: str, record: dict) -> None:
+        if self.metrics is not None:
+            self.metrics.log(event, **record)
+
+    def check(self) -> Optional[dict]:
+        """
+        Checks worker health and fails over if needed.
+
+        Returns:
+            Optional[dict]: The incident handled by this call, if any.
+        """
+        if self.active is None:
+            return None
+        now = time.monotonic()
+        if self._pending is not None and self.active.frames.value > 0:
+            detected, recovered = self._pending
+            # From detecting the fault to the replacement's first frame.
+            outage = self.active.first_frame_done.value - detected
+            recovered["outage_ms"] = round(outage * 1000, 1)
+            self._record("worker_recovered", recovered)
+            self._pending = None
+
+        incident = None
+        fault = self.active.fault(
+            now, self.heartbeat_timeout, self.frame_timeout, self.startup_timeout
+        )
+        if fault is not None:
+            incident = self._fail_over(fault, now)
+
+        if self.standby is not None and not self.standby.process.is_alive():
+            standby_fault = {
+                "kind": "standby_crashed",
+                "exitcode": self.standby.process.exitcode,
+            }
+            standby_incident = self._log_incident(
+                standby_fault, self.standby.pid, "restarted", now
+            )
+            incident = incident or standby_incident
+            self._retire(self.standby, 0.0)
+            self.standby = self._start(active=False)
+        return incident
+
+    def _fail_over(self, fault: dict, now: float) -> dict:
+        failed = self.active
+        # The failed worker must be gone before its replacement opens the
+        # session's track store.
+        self._retire(failed, 0.0)
+        if self.standby is not None and self.standby.process.is_alive():
+            recovery = "standby" if self.standby.is_ready.value else "warming_standby"
+            self.active, self.standby = self.standby, None
+            self.active.active.value = True
+        else:
+            recovery = "cold_start"
+            self.active = self._start(active=True)
+        if self.standby_enabled:
+            self.standby = self._start(active=False)
+        incident = self._log_incident(fault, failed.pid, recovery, now)
+        self._pending = (now, {"kind": fault["kind"], "pid": self.active.pid})
+        return incident
+
+    def _log_incident(self, fault: dict, pid, recovery: str, now: float) -> dict:
+        incident = dict(fault, pid=pid, recovery=recovery)
+        incident["failover_ms"] = round((time.monotonic() - now) * 1000, 1)
+        self.incidents.append(incident)
+        self._record("worker_incident", incident)
+        return incident
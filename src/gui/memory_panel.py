@@ -0,0 +1,112 @@
+from PySide6.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QPlainTextEdit,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+from PySide6.QtCore import QTimer, Qt
+
+MB = 1 << 20
+
+
+class MemoryPanel(QWidget):
+    """
+    Debug panel showing a VideoPlayer's memory: the bytes each subsystem
+    holds, process and worker RSS, the growth trend and recent shedding,
+    refreshed every second. With allocation tracing enabled the Snapshot
+    button lists the Python allocations that grew since the last one.
+    """
+
+    def __init__(self, player, parent=None):
+        super().__init__(parent)
+        self.player = player
+        self.setWindowTitle("Memory")
+        self.setWindowFlag(Qt.Window)
+
+        self.summary = QLabel()
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Subsystem", "MB"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.details = QPlainTextEdit()
+        self.details.setReadOnly(True)
+        self.details.setMaximumBlockCount(500)
+
+        self.snapshot_button = QPushButton("Snapshot")
+        self.snapshot_button.setToolTip(
+            "List Python allocations that grew since the previous snapshot"
+        )
+        self.snapshot_button.clicked.connect(self.take_snapshot)
+        self.trace_button = QPushButton("Trace Allocations")
+        self.trace_button.clicked.connect(self.start_trace)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.trace_button)
+        buttons.addWidget(self.snapshot_button)
+        buttons.addStretch(1)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.summary)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        layout.addWidget(self.details)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self._shown_sheds = 0
+        self._update_buttons()
+        self.refresh()
+
+    def refresh(self) -> None:
+        report = self.player.memory_report()
+        rows = sorted(report["subsystems"].items(), key=lambda kv: -kv[1])
+        rows.append(("(unaccounted)", report["unaccounted"]))
+        rows += [(f"{name} RSS", size) for name, size in report["processes"].items()]
+        self.table.setRowCount(len(rows))
+        for row, (name, size) in enumerate(rows):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            item = QTableWidgetItem(f"{size / MB:.1f}")
+            item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.table.setItem(row, 1, item)
+
+        text = f"RSS {report['rss'] / MB:.0f} MB, total {report['total'] / MB:.0f} MB"
+        if report["ceiling"]:
+            text += f" of {report['ceiling'] / MB:.0f} MB"
+        if report["growth"] is not None:
+            text += f", trend {report['growth'] / MB * 60:+.1f} MB/min"
+        self.summary.setText(text)
+
+        new = min(report["shed_count"] - self._shown_sheds, len(report["shed_events"]))
+        for event in report["shed_events"][len(report["shed_events"]) - new:]:
+            freed = ", ".join(f"{k} {v} MB" for k, v in event["freed_mb"].items())
+            self.details.appendPlainText(
+                f"Over the ceiling by {event['target_mb']} MB, freed: {freed or 'nothing'}"
+            )
+        self._shown_sheds = report["shed_count"]
+
+    def start_trace(self) -> None:
+        self.player.memory.start_trace()
+        self.details.appendPlainText("Tracing allocations; take a snapshot later.")
+        self._update_buttons()
+
+    def take_snapshot(self) -> None:
+        diff = self.player.memory.snapshot_diff(limit=15)
+        self.details.appendPlainText("Largest growth since the previous snapshot:")
+        for stat in diff:
+            self.details.appendPlainText(
+                f"  {stat['size_diff'] / 1024:+9.1f} KiB "
+                f"({stat['count_diff']:+d} blocks)  {stat['location']}"
+            )
+
+    def _update_buttons(self) -> None:
+        tracing = self.player.memory.tracing
+        self.trace_button.setEnabled(not tracing)
+        self.snapshot_button.setEnabled(tracing)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
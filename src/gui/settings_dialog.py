@@ -1,12 +1,21 @@
 import os
+import threading
+
 from PySide6.QtWidgets import (
     QVBoxLayout,
     QDialog,
     QLabel,
     QComboBox,
     QDialogButtonBox,
+    QPushButton,
+    QFileDialog,
+    QInputDialog,
+    QProgressDialog,
+    QMessageBox,
 )
-from PySide6.QtCore import QSettings, Signal, Slot
+from PySide6.QtCore import QSettings, Qt, Signal, Slot
+
+from core.auto_tuner import AutoTuner, load_sample_frames, save_to_qsettings
 
 
 class SettingsDialog(QDialog):
@@ -14,6 +23,10 @@ class SettingsDialog(QDialog):
 
     settings_updated = Signal(str)  # Signal to notify about setting change
     frame_skip_updated = Signal(int)
+    # Emitted from the auto-tune thread, delivered on the GUI thread.
+    tune_progress = Signal(int, int, object)
+    tune_finished = Signal(object)
+    tune_failed = Signal(str)
     # search assets folder for model files and return the paths
     assets = os.listdir(
         os.path.abspath(
@@ -42,7 +55,7 @@ class SettingsDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Settings")
         self.setModal(True)
-        self.setFixedSize(300, 200)
+        self.setFixedSize(300, 240)
 
         # Layout
         layout = QVBoxLayout(self)
@@ -61,6 +74,18 @@ class SettingsDialog(QDialog):
         )
         layout.addWidget(self.frame_skip_combo)
 
+        self.auto_tune_button = QPushButton("Auto-tune for this machine...", self)
+        self.auto_tune_button.setEnabled(bool(self.MODEL_PATHS))
+        self.auto_tune_button.clicked.connect(self.auto_tune)
+        layout.addWidget(self.auto_tune_button)
+        self.tune_progress.connect(self.__on_tune_progress)
+        self.tune_finished.connect(self.__on_tune_finished)
+        self.tune_failed.connect(self.__on_tune_failed)
+        self.progress = None
+        self.target_fps = None
+        # Auto-tune result, saved with the other settings on Save.
+        self.tuned = None
+
         # Dialog Buttons (Save/Cancel)
         self.button_box = QDialogButtonBox(
             QDialogButtonBox.Save | QDialogButtonBox.Cancel, self
@@ -84,6 +109,8 @@ class SettingsDialog(QDialog):
     def save_settings(self):
         """Save settings using QSettings and emit signal for updates"""
         settings = QSettings("DroneTek", "DroneLink")
+        if self.tuned is not None:
+            save_to_qsettings(self.tuned, self.target_fps)
         selected_model = self.model_selection_combo.currentText()
         frame_skip = int(self.frame_skip_combo.currentText())
         settings.setValue("frame_skip", frame_skip)
@@ -92,3 +119,85 @@ class SettingsDialog(QDialog):
         self.settings_updated.emit(selected_model)
         self.frame_skip_updated.emit(frame_skip)
         self.accept()
+
+    @Slot()
+    def auto_tune(self):
+        """
+        Benchmark the available models on a sample clip and select the
+        most accurate model, imgsz, backend and frame skip that reach the
+        target frame rate. The benchmark runs in a background thread; the
+        result is shown in the dialog and saved on Save.
+        """
+        sample, _ = QFileDialog.getOpenFileName(
+            self,
+            "Sample Clip for Auto-tune",
+            "",
+            "Video Files (*.mp4 *.avi *.mov);;All Files (*.*)",
+        )
+        if not sample:
+            return
+        settings = QSettings("DroneTek", "DroneLink")
+        target_fps, ok = QInputDialog.getDouble(
+            self,
+            "Auto-tune",
+            "Target frame rate (FPS):",
+            float(settings.value("tuning/target_fps", 15)),
+            1.0,
+            120.0,
+            1,
+        )
+        if not ok:
+            return
+
+        self.target_fps = target_fps
+        self.auto_tune_button.setEnabled(False)
+        self.progress = QProgressDialog("Benchmarking...", None, 0, 0, self)
+        self.progress.setWindowTitle("Auto-tune")
+        self.progress.setWindowModality(Qt.WindowModal)
+        self.progress.setMinimumDuration(0)
+        self.progress.show()
+
+        def run():
+            try:
+                frames = load_sample_frames(sample, 60)
+                tuner = AutoTuner(self.MODEL_PATHS, target_fps=target_fps)
+                best = tuner.run(frames, on_progress=self.tune_progress.emit)["best"]
+            except Exception as exc:
+                self.tune_failed.emit(str(exc))
+                return
+            self.tune_finished.emit(best)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def __on_tune_progress(self, done, total, m):
+        self.progress.setMaximum(total)
+        self.progress.setValue(done)
+        self.progress.setLabelText(
+            f"{m['model']} imgsz {m['imgsz']} on {m['backend']}: "
+            f"{m['inference_fps']:.1f} FPS"
+        )
+
+    def __end_tuning(self):
+        self.progress.close()
+        self.progress = None
+        self.auto_tune_button.setEnabled(True)
+
+    def __on_tune_failed(self, message):
+        self.__end_tuning()
+        QMessageBox.warning(self, "Auto-tune", message)
+
+    def __on_tune_finished(self, best):
+        self.__end_tuning()
+        self.tuned = best
+        self.model_selection_combo.setCurrentText(best["model"])
+        self.frame_skip_combo.setCurrentText(str(best["frame_skip"]))
+        verdict = (
+            "meets" if best["meets_target"] else "does NOT meet (fastest found)"
+        )
+        QMessageBox.information(
+            self,
+            "Auto-tune",
+            f"{best['model']}, imgsz {best['imgsz']}, {best['backend']}, "
+            f"frame skip {best['frame_skip']}: {best['sustained_fps']:.1f} FPS "
+            f"{verdict} the {self.target_fps:g} FPS target. Save to apply it.",
+        )
@@ -0,0 +1,83 @@
+import numpy as np
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QColor, QImage, QPainter, QPen
+from PySide6.QtCore import QRect, Qt, Signal
+
+
+class TimelineWidget(QWidget):
+    """
+    Scrubbable thumbnail timeline drawn straight from a ThumbnailIndex
+    sprite strip, with scene changes marked in yellow and the playhead
+    in red. Clicking or dragging emits scrubbed(seconds).
+    """
+
+    scrubbed = Signal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = None
+        self.image = None
+        self._strip = None
+        self.position = 0.0
+        self.setFixedHeight(48)
+
+    def set_index(self, index) -> None:
+        """Shows a ThumbnailIndex (or nothing, if None)."""
+        self.index = index
+        self.image = None
+        if index is not None:
+            strip = index.strip
+            if not strip.flags["C_CONTIGUOUS"]:
+                strip = np.ascontiguousarray(strip)
+            # Wraps the memory map without copying; keep it referenced.
+            self._strip = strip
+            h, w = strip.shape[:2]
+            self.image = QImage(strip.data, w, h, 3 * w, QImage.Format_BGR888)
+        self.update()
+
+    def set_position(self, seconds: float) -> None:
+        self.position = seconds
+        self.update()
+
+    def seconds_at(self, x: float) -> float:
+        if self.index is None or self.width() <= 0:
+            return 0.0
+        fraction = min(max(x / self.width(), 0.0), 1.0)
+        return fraction * self.index.duration
+
+    def _x_of(self, seconds: float) -> int:
+        return round(seconds / max(self.index.duration, 1e-6) * self.width())
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(30, 30, 30))
+        if self.index is None:
+            painter.end()
+            return
+        thumb_w, thumb_h = self.index.thumb_size
+        height = self.height()
+        slot = max(1, round(thumb_w * height / thumb_h))
+        # As many thumbnails as fit, each the one nearest its slot's time.
+        for x in range(0, self.width(), slot):
+            i = self.index.index_at(self.seconds_at(x + slot / 2))
+            painter.drawImage(
+                QRect(x, 0, slot, height),
+                self.image,
+                QRect(i * thumb_w, 0, thumb_w, thumb_h),
+            )
+        painter.setPen(QPen(QColor(255, 210, 0), 1))
+        for i in self.index.scene_changes:
+            x = self._x_of(self.index.timestamps[i])
+            painter.drawLine(x, 0, x, height)
+        painter.setPen(QPen(QColor(255, 0, 0), 2))
+        x = self._x_of(self.position)
+        painter.drawLine(x, 0, x, height)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.index is not None:
+            self.scrubbed.emit(self.seconds_at(event.position().x()))
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self.index is not None:
+            self.scrubbed.emit(self.seconds_at(event.position().x()))
@@ -1,64 +1,280 @@
 import cv2
+import numpy as np
+import os
 import queue
 import threading
+import time
 import multiprocessing as mp
+from collections import OrderedDict
 
-from PySide6.QtWidgets import QMainWindow, QLabel, QVBoxLayout, QWidget, QPushButton
-from PySide6.QtGui import QImage, QPixmap
-from PySide6.QtCore import QTimer, Qt, Signal
+from PySide6.QtWidgets import (
+    QMainWindow,
+    QLabel,
+    QVBoxLayout,
+    QHBoxLayout,
+    QWidget,
+    QPushButton,
+    QProgressBar,
+)
+from PySide6.QtGui import QImage, QPixmap, QKeySequence, QShortcut
+from PySide6.QtCore import QEvent, QTimer, Qt, Signal
 
 from core.video_processor import VideoProcessor
 from core.stream_processor import StreamProcessor
+from core.stream_replay import ReplayStreamProcessor, is_stream_recording
+from core.synthetic_source import SyntheticStreamProcessor, parse_synthetic_source
 from core.model_processor import Model
+from core.tracker_state import TrackerSnapshot
+from core.track_store import TrackStore
+from core.reid_gallery import ReIDGallery
+from core.detection_cache import DetectionCache
+from core.resource_governor import ResourceGovernor, ThreadProfile
+from core.video_utils.network_source import NetworkStreamOptions
+from core.adaptive_resolution import ResolutionController
+from core.metrics import MetricsLog
+from core.worker_supervisor import WorkerSupervisor
+from core.remote_inference import RemoteDetector
+from core.overlay_renderer import OverlayRenderer
+from core.segment_recorder import SegmentedRecorder
+from core.event_clipper import EventClipper
+from core.video_utils.detections_sidecar import encode_tracks
+from core.thumbnail_index import ThumbnailIndex, build_thumbnail_index
+from core.frame_cache import FrameCache, FramePrefetcher
+from core.progress import ProgressTracker, format_duration
+from core.analytics.heatmap import Heatmap
+from core.analytics.zones import Line, Zone, ZoneCounter
+from core.memory_monitor import MemoryMonitor
+from core.video_utils.video_queue import item_nbytes
+from core.video_utils.letterbox import Letterbox
+from gui.timeline_widget import TimelineWidget
 
 
-def draw_object_contours(img, tracked_objects):
+def process_frames_worker(
+    frame_queue,
+    processed_queue,
+    model_path,
+    running_flag,
+    n=3,
+    track_store_path=None,
+    reid_gallery_path=None,
+    video_id=None,
+    detection_cache_path=None,
+    detection_cache_max_mb=512,
+    video_hash=None,
+    resource_profile=None,
+    input_size=640,
+    device=None,
+    adaptive_resolution=None,
+    metrics_path=None,
+    supervision=None,
+    remote_inference=None,
+    lossless=False,
+    tracker_snapshot_path=None,
+    snapshot_interval=2.0,
+    snapshot_max_gap=5.0,
+):
     """
-    For each detected object, draw a bounding box and label.
-    """
-    for track in tracked_objects:
-        x, y, w, h = map(int, track["bbox"])
-        # Ensure ROI is within image bounds
-        if y < 0 or x < 0 or y + h > img.shape[0] or x + w > img.shape[1]:
-            continue
-        cv2.rectangle(img, (x, y), (x + w, y + h), (0, 0, 255), 2)
-        label = f"ID {track['track_id']}"
-        cv2.putText(
-            img, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1
-        )
-    return img
+    Process frames in a separate process. The worker continuously pulls
+    (frame_index, timestamp, frame, transform, generation) items from
+    frame_queue, processes them using the model, and puts (frame_index,
+    timestamp, frame, tracks, generation) into processed_queue for
+    display, skips nth frame (default 3).
 
+    The seek generation is passed through so the player can tell results
+    of frames read before a seek. A transform means the frame was
+    letterboxed to the model input on the capture side: tracks are mapped
+    back to source pixels and the frame is not sent back (None), as the
+    player kept the original.
 
-def process_frames_worker(frame_queue, processed_queue, model_path, running_flag, n=3):
-    """
-    Process frames in a separate process. The worker continuously pulls frames
-    from frame_queue, processes them using the model, draws contours, and puts
-    the processed frame into processed_queue, skips nth frame (default 3).
+    Confirmed tracks are recorded in a TrackStore if track_store_path is
+    given, and their appearance features in a ReIDGallery if
+    reid_gallery_path is given. Detections of a file source (identified by
+    video_hash) are cached in the DetectionCache at detection_cache_path,
+    so re-opened videos skip the detector.
+
+    torch/OpenCV thread counts and CPU affinity follow resource_profile (a
+    ThreadProfile dict) if given; input_size and device configure the
+    detector. adaptive_resolution (ResolutionController keyword arguments)
+    lets the input size follow load; switches and other events go to the
+    MetricsLog at metrics_path. remote_inference (RemoteDetector keyword
+    arguments, including "servers") moves detection to inference servers,
+    with local fallback.
+
+    With a WorkerHandle as supervision the worker reports heartbeats to a
+    WorkerSupervisor and, if started as a standby, waits with a warmed-up
+    model until promoted. With lossless, results wait for room in
+    processed_queue instead of being dropped (analysis mode, where every
+    result is kept).
+
+    With tracker_snapshot_path the tracker state is saved there every
+    snapshot_interval seconds and on exit, and restored on the first frame
+    if the snapshot is of a frame at most snapshot_max_gap seconds away
+    with the same transform, so a restarted worker keeps the track IDs.
+    Snapshots that cannot be saved or read are logged to the MetricsLog as
+    "tracker_snapshot_error" events.
     """
-    model = Model(model_path)
+    if resource_profile:
+        ResourceGovernor(ThreadProfile.from_dict(resource_profile)).apply("inference")
+    model = Model(
+        model_path,
+        video_id=video_id,
+        video_hash=video_hash,
+        input_size=input_size,
+        device=device,
+        remote=RemoteDetector(**remote_inference) if remote_inference else None,
+    )
+    if supervision is not None:
+        model.warm_up()
+        supervision.ready()
+        if not supervision.wait_until_active():
+            return
+    # Opened only once active: a standby must not touch the session's
+    # stores while another worker writes them.
+    detection_cache = None
+    if detection_cache_path and video_hash:
+        detection_cache = DetectionCache(
+            detection_cache_path, max_bytes=int(detection_cache_max_mb) << 20
+        )
+    model.attach_stores(
+        track_store=TrackStore(track_store_path) if track_store_path else None,
+        reid_gallery=ReIDGallery(reid_gallery_path) if reid_gallery_path else None,
+        detection_cache=detection_cache,
+    )
+    metrics = MetricsLog(metrics_path) if metrics_path else None
+    controller = None
+    if adaptive_resolution:
+        controller = ResolutionController(
+            initial_size=input_size, metrics=metrics, **adaptive_resolution
+        )
     frame_counter = 0
+    restore_pending = bool(tracker_snapshot_path)
+    last_snapshot = time.monotonic()
+    last_frame = None
     # Skip frames that are not the nth frame
     while running_flag.value:
+        if supervision is not None:
+            supervision.beat()
         frame_counter += 1
         if frame_counter % n != 0:
             continue
         try:
-            frame = frame_queue.get(timeout=0.05)
+            frame_index, timestamp, frame, transform, generation = frame_queue.get(
+                timeout=0.05
+            )
         except queue.Empty:
             continue
 
-        tracked_objects = model.process_frame(frame)
-        processed_frame = draw_object_contours(frame, tracked_objects)
+        if restore_pending:
+            restore_pending = False
+            _restore_tracker(
+                model, tracker_snapshot_path, timestamp, transform, snapshot_max_gap, metrics
+            )
+        if supervision is not None:
+            supervision.begin_frame()
+        start = time.perf_counter()
+        tracked_objects = model.process_frame(frame, frame_index, timestamp, transform)
+        if supervision is not None:
+            supervision.end_frame()
+        if controller is not None:
+            new_size = controller.update(
+                time.perf_counter() - start,
+                _queue_depth(frame_queue),
+                frame_index,
+            )
+            if new_size is not None:
+                model.set_input_size(new_size)
 
-        try:
-            processed_queue.put(processed_frame, timeout=0.05)
-        except queue.Full:
-            # Skip frame if the processed queue is full to avoid blocking
-            pass
+        last_frame = (frame_index, timestamp, transform)
+        if tracker_snapshot_path and time.monotonic() - last_snapshot >= snapshot_interval:
+            _save_tracker(model, tracker_snapshot_path, *last_frame, metrics)
+            last_snapshot = time.monotonic()
+
+        if transform is not None:
+            frame = None
+        item = (frame_index, timestamp, frame, tracked_objects, generation)
+        while True:
+            try:
+                processed_queue.put(item, timeout=0.05)
+                break
+            except queue.Full:
+                # Skip frame if the processed queue is full to avoid
+                # blocking, unless every result is wanted.
+                if not lossless or not running_flag.value:
+                    break
+                if supervision is not None:
+                    supervision.beat()
+
+    if tracker_snapshot_path and last_frame is not None:
+        _save_tracker(model, tracker_snapshot_path, *last_frame, metrics)
+    model.close()
+    if metrics is not None:
+        metrics.close()
+
+
+def _save_tracker(model, path, frame_index, timestamp, transform, metrics) -> None:
+    """Saves the tracker state at path; failures are logged to metrics."""
+    try:
+        model.snapshot_tracker(
+            frame_index=frame_index,
+            timestamp=timestamp,
+            transform=None if transform is None else [float(v) for v in transform],
+        ).save(path)
+    except OSError as e:
+        if metrics is not None:
+            metrics.log("tracker_snapshot_error", action="save", path=path, error=str(e))
+
+
+def _restore_tracker(model, path, timestamp, transform, max_gap, metrics) -> None:
+    """Restores the snapshot at path if it continues the current frame."""
+    if not os.path.isfile(path):
+        return
+    try:
+        snapshot = TrackerSnapshot.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        if metrics is not None:
+            metrics.log("tracker_snapshot_error", action="read", path=path, error=str(e))
+        return
+    if not snapshot.matches(timestamp, transform, max_gap):
+        return
+    model.restore_tracker(snapshot)
+    if metrics is not None:
+        metrics.log(
+            "tracker_restored",
+            tracks=len(snapshot.tracks),
+            next_id=snapshot.next_id,
+            gap_s=round(timestamp - snapshot.meta["timestamp"], 3),
+        )
+
+
+def _queue_depth(q) -> int:
+    """Frames waiting in a multiprocessing queue, 0 where unsupported."""
+    try:
+        return q.qsize()
+    except NotImplementedError:
+        # macOS has no sem_getvalue.
+        return 0
 
 
 class VideoPlayer(QMainWindow):
     video_closed = Signal()
+    thumbnail_index_ready = Signal(object)
+    thumbnail_index_failed = Signal(str)
+    frame_prefetched = Signal(int)
+    analysis_finished = Signal(dict)
+    zones_changed = Signal(dict)
+    # Frames are annotated at display resolution, but neither side goes
+    # below this export size (unless the source is smaller) so archived
+    # frames stay usable.
+    MIN_RENDER_SIZE = (960, 640)
+    # Rate of the display timer, the nominal source frame rate.
+    DISPLAY_FPS = 30
+    # Queue depth in analysis mode, keeping the worker supplied.
+    ANALYSIS_QUEUE_SIZE = 8
+    # Seconds without results after the end of the file before an
+    # analysis is considered complete (results lost with a replaced worker).
+    ANALYSIS_IDLE_TIMEOUT = 15.0
+    # Interval of memory accounting samples.
+    MEMORY_INTERVAL_MS = 2000
 
     def __init__(
         self,
@@ -68,6 +284,33 @@ class VideoPlayer(QMainWindow):
         use_stream: bool = False,
         queue_size=1,
         frame_skip=3,
+        network_options=None,
+        track_store_path=None,
+        reid_gallery_path=None,
+        video_id=None,
+        detection_cache_path=None,
+        detection_cache_max_mb=512,
+        video_hash=None,
+        resource_profile=None,
+        input_size=640,
+        device=None,
+        adaptive_resolution=None,
+        metrics_path=None,
+        supervisor_options=None,
+        remote_inference=None,
+        thumbnail_dir=None,
+        frame_cache_mb=256,
+        analysis=False,
+        preview_interval=1.0,
+        heatmap_cell_size=16,
+        zones=None,
+        zone_report_path=None,
+        memory_ceiling_mb=None,
+        memory_trace=False,
+        stream_record_path=None,
+        replay_speed=1.0,
+        preprocess=False,
+        tracker_snapshot_path=None,
     ):
         """
         Initializes the VideoPlayer GUI.
@@ -76,13 +319,159 @@ class VideoPlayer(QMainWindow):
             video_source (str or int): Video file path or stream source.
             model_path (str): Path to the model weights.
             use_stream (bool, optional): Use live stream processing if True.
+            Besides cameras and URLs, stream sources may be stream
+            recordings (see replay_speed) or "synthetic://WxH?fps=..."
+            generated test feeds.
             queue_size (int, optional): Maximum size of the
             inter-process queues.
+            network_options (NetworkStreamOptions, optional): Transport,
+            jitter buffer and decoder settings for URL streams.
+            track_store_path (str, optional): Directory of a TrackStore to
+            record confirmed track observations in.
+            reid_gallery_path (str, optional): Directory of the ReIDGallery
+            that collects per-track appearance embeddings.
+            video_id (str, optional): Identifies this session; also its
+            re-identification gallery entries unless video_hash is given.
+            detection_cache_path (str, optional): SQLite file caching
+            detector outputs across sessions.
+            detection_cache_max_mb (int, optional): Size bound of the cache.
+            video_hash (str, optional): Content hash of the video file;
+            caching is only used when it is given.
+            resource_profile (ThreadProfile, optional): Thread budgets and
+            CPU affinity of capture, inference, encoding and the GUI.
+            Defaults to ThreadProfile.auto().
+            input_size (int, optional): Detector inference size (imgsz).
+            device (str, optional): Inference backend, e.g. "cpu" or
+            "cuda:0"; None lets YOLO pick.
+            adaptive_resolution (dict, optional): ResolutionController
+            options (min_size, max_size, ...) enabling load-dependent input
+            sizes. The latency budget defaults to the frame skip at the
+            nominal display rate.
+            metrics_path (str, optional): JSON-lines file receiving worker
+            metrics such as input size switches and worker incidents.
+            supervisor_options (dict, optional): WorkerSupervisor options
+            (standby, heartbeat_timeout, frame_timeout, ...).
+            remote_inference (dict, optional): RemoteDetector options:
+            "servers" ("host:port" list), timeout, jpeg_quality, ...
+            Detection then runs on those servers, falling back to the
+            local model when none answers.
+            thumbnail_dir (str, optional): Where thumbnail indexes are
+            kept. For files with a video_hash the timeline is shown from
+            the stored index, or built in the background on first open.
+            frame_cache_mb (int, optional): Memory for displayed and
+            prefetched frames of a file, from which seeking and stepping
+            are served without decoding or inference.
+            analysis (bool, optional): Analysis mode for files: every
+            frame_skip-th frame is processed as fast as the hardware
+            allows, without dropping any, and only a preview frame every
+            preview_interval seconds is shown next to progress and ETA.
+            Once done the player pauses at the end with all tracks cached
+            for review. Otherwise playback is paced in real time.
+            preview_interval (float, optional): Seconds between previews
+            in analysis mode.
+            heatmap_cell_size (int, optional): Cell size in source pixels
+            of the occupancy/dwell heatmap accumulated from all results;
+            None disables it.
+            zones (dict, optional): Counting lines and zones in source
+            pixels, as from ZoneCounter.to_dict(). More can be drawn on
+            the video; zones_changed reports the new geometry.
+            zone_report_path (str, optional): JSON-lines file receiving
+            the line and zone counts periodically.
+            memory_ceiling_mb (float, optional): RSS of the player and its
+            workers above which buffered archive frames, then cached
+            frames are dropped. None never drops.
+            memory_trace (bool, optional): Trace Python allocations with
+            tracemalloc so memory snapshots can be diffed.
+            stream_record_path (str, optional): Directory to record the raw
+            frames of a live source to, with their arrival times.
+            replay_speed (float, optional): Playback rate when video_source
+            is such a recording, replayed as a live stream.
+            preprocess (bool, optional): Letterbox frames to the model input
+            size on the capture side, so only model-sized frames go to the
+            worker and only tracks come back; the full-resolution frames
+            wait here for their tracks. Re-identification features are
+            then computed from the smaller frames.
+            tracker_snapshot_path (str, optional): File the workers save
+            the tracker state to periodically and on exit. A worker
+            started for the same source near the same position (after a
+            frame skip change, a failover or an application restart)
+            restores it and keeps the track IDs.
         """
         super().__init__()
         self.model_path = model_path
         self.frame_skip = frame_skip
+        self.video_id = video_id
+        # Re-opening a file adds to its gallery entries, not a new video.
+        self.reid_video_id = video_hash or video_id
+        self.recorder = None
+        self.event_clipper = None
+        self.governor = ResourceGovernor(resource_profile)
+        self.governor.apply("gui")
+        self.adaptive_resolution = adaptive_resolution
+        self.analysis = bool(analysis) and not use_stream
+        if self.analysis:
+            queue_size = max(queue_size, self.ANALYSIS_QUEUE_SIZE)
+        self.queue_size = queue_size
+        # Keyword arguments forwarded to every worker process started.
+        self.worker_options = {
+            "track_store_path": track_store_path,
+            "reid_gallery_path": reid_gallery_path,
+            "video_id": self.reid_video_id,
+            "detection_cache_path": detection_cache_path,
+            "detection_cache_max_mb": detection_cache_max_mb,
+            "video_hash": video_hash,
+            "resource_profile": self.governor.profile.to_dict(),
+            "input_size": input_size,
+            "device": device,
+            "adaptive_resolution": self._adaptive_options(),
+            "metrics_path": metrics_path,
+            "remote_inference": remote_inference,
+            "lossless": self.analysis,
+            "tracker_snapshot_path": tracker_snapshot_path,
+        }
         self.running = True
+        self.seekable = not use_stream
+        # Source index of the frame on screen.
+        self.playhead = None
+        self.paused_at = None
+        # Incremented by every seek; results of frames read before the
+        # latest one carry an older generation and are not displayed.
+        self.seek_generation = 0
+        self._seek_request = None
+        self._seek_lock = threading.Lock()
+        # Cleared while paused, so capture stops instead of dropping frames.
+        self.capture_enabled = threading.Event()
+        self.capture_enabled.set()
+        self.render_bounds = self.MIN_RENDER_SIZE
+        # Accumulated by the relay thread from every result, created for
+        # the frame size of the first one.
+        self.heatmap_cell_size = heatmap_cell_size
+        self.heatmap = None
+        self.heatmap_visible = False
+        # Line and zone counts, updated by the relay thread. Clicks on the
+        # video add points to draft_points while drawing a line or zone.
+        self.zone_counter = ZoneCounter.from_dict(
+            zones or {}, report_path=zone_report_path
+        )
+        self.drawing = None
+        self.draft_points = []
+        # (width, height, scale) of the frame on screen.
+        self.shown_geometry = None
+        # Bytes of a frame sent to the worker and of the pixmap on screen,
+        # for memory accounting.
+        self.worker_frame_bytes = 0
+        self.pixmap_bytes = 0
+        # Capture-side letterboxing: full-resolution frames sent to the
+        # worker as model-sized ones, by frame index, in sending order.
+        self.letterbox = (
+            Letterbox(input_size, buffers=self.queue_size + 2) if preprocess else None
+        )
+        self.pending_frames = OrderedDict()
+        self.pending_lock = threading.Lock()
+        # At most this many sent frames await their result: those in the
+        # frame and processed queues, the one being processed and the one
+        # held by the relay. More are only left over from a lost worker.
+        self.max_pending = 2 * self.queue_size + 2
         self.setAttribute(Qt.WA_DeleteOnClose, True)
 
         # Set up GUI components.
@@ -92,6 +481,21 @@ class VideoPlayer(QMainWindow):
         self.video_label = QLabel()
         self.video_label.setScaledContents(True)
         self.layout.addWidget(self.video_label)
+        self.timeline = TimelineWidget()
+        self.timeline.setVisible(False)
+        self.timeline.scrubbed.connect(self.preview_at)
+        self.timeline.scrubbed.connect(self.seek_seconds)
+        self.layout.addWidget(self.timeline)
+        self.preview_label = QLabel()
+        self.preview_label.setVisible(False)
+        self.layout.addWidget(self.preview_label)
+        self.thumbnail_index_ready.connect(self.set_thumbnail_index)
+        self.thumbnail_index_failed.connect(self._log_thumbnail_error)
+        self.thumbnail_cancel = threading.Event()
+        if thumbnail_dir and video_hash and not use_stream:
+            self.load_thumbnail_index(video_source, thumbnail_dir, video_hash)
+        # Drawn onto RGB frames, so (255, 0, 0) is red.
+        self.renderer = OverlayRenderer(color=(255, 0, 0))
 
         self.close_button = QPushButton("x")
         self.close_button.setFixedSize(30, 30)
@@ -103,38 +507,138 @@ class VideoPlayer(QMainWindow):
         self.play_pause_button = QPushButton("Pause")
         self.play_pause_button.setCheckable(True)
         self.play_pause_button.setChecked(False)
-        self.layout.addWidget(self.play_pause_button)
-        # Hide button when streaming
-        self.play_pause_button.setVisible(not use_stream)
+        self.step_back_button = QPushButton("<")
+        self.step_back_button.setToolTip("Previous frame (Left)")
+        self.step_back_button.clicked.connect(lambda: self.step(-1))
+        self.step_forward_button = QPushButton(">")
+        self.step_forward_button.setToolTip("Next frame (Right)")
+        self.step_forward_button.clicked.connect(lambda: self.step(1))
+        controls = QHBoxLayout()
+        controls.addWidget(self.step_back_button)
+        controls.addWidget(self.play_pause_button)
+        controls.addWidget(self.step_forward_button)
+        self.layout.addLayout(controls)
+        analytics = QHBoxLayout()
+        self.heatmap_button = QPushButton("Heatmap")
+        self.heatmap_button.setCheckable(True)
+        self.heatmap_button.setToolTip("Show where people were seen")
+        self.heatmap_button.setVisible(heatmap_cell_size is not None)
+        self.heatmap_button.toggled.connect(self.set_heatmap_visible)
+        self.line_button = QPushButton("Line")
+        self.line_button.setToolTip("Count crossings: click both ends on the video")
+        self.line_button.clicked.connect(lambda: self.start_drawing("line"))
+        self.zone_button = QPushButton("Zone")
+        self.zone_button.setToolTip(
+            "Count entries: click the corners on the video, right-click to close"
+        )
+        self.zone_button.clicked.connect(lambda: self.start_drawing("zone"))
+        self.clear_zones_button = QPushButton("Clear")
+        self.clear_zones_button.setToolTip("Remove all lines and zones")
+        self.clear_zones_button.clicked.connect(self.clear_zones)
+        for button in (
+            self.heatmap_button,
+            self.line_button,
+            self.zone_button,
+            self.clear_zones_button,
+        ):
+            analytics.addWidget(button)
+        self.layout.addLayout(analytics)
+        self.video_label.installEventFilter(self)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(False)
+        self.progress_label = QLabel()
+        self.layout.addWidget(self.progress_bar)
+        self.layout.addWidget(self.progress_label)
+        self.progress_bar.setVisible(self.analysis)
+        self.progress_label.setVisible(self.analysis)
+        # Hide playback controls when streaming
+        for button in (
+            self.play_pause_button,
+            self.step_back_button,
+            self.step_forward_button,
+        ):
+            button.setVisible(not use_stream)
+        if not use_stream:
+            QShortcut(QKeySequence(Qt.Key_Left), self, lambda: self.step(-1))
+            QShortcut(QKeySequence(Qt.Key_Right), self, lambda: self.step(1))
         # Connect toggle signal
         self.play_pause_button.toggled.connect(self.toggle_play_pause)
 
         # Initialize video capture processor.
+        capture_threads = self.governor.profile.capture_threads
         if use_stream:
-            self.video_processor = StreamProcessor(video_source)
+            if network_options is None or not network_options.decode_threads:
+                settings = network_options.to_dict() if network_options else {}
+                settings["decode_threads"] = capture_threads
+                network_options = NetworkStreamOptions.from_dict(settings)
+            synthetic = parse_synthetic_source(video_source)
+            if synthetic is not None:
+                self.video_processor = SyntheticStreamProcessor(**synthetic)
+            elif is_stream_recording(video_source):
+                self.video_processor = ReplayStreamProcessor(video_source, replay_speed)
+            else:
+                self.video_processor = StreamProcessor(
+                    video_source, network_options, record_path=stream_record_path
+                )
         else:
-            self.video_processor = VideoProcessor(video_source)
+            self.video_processor = VideoProcessor(video_source, capture_threads)
 
-        # Multiprocessing queues for frame exchange.
-        self.frame_queue = mp.Queue(maxsize=queue_size)
-        self.processed_queue = mp.Queue(maxsize=queue_size)
-        # Shared flag for graceful shutdown.
-        self.running_flag = mp.Value("b", True)
+        # Frames around the playhead of a file, for seeking and stepping.
+        # Shown frames are cached with their tracks; while paused a second
+        # decoder fills in the frames around them.
+        self.frame_cache = None
+        self.prefetcher = None
+        if self.seekable:
+            self.frame_count = self.video_processor.frame_count
+            self.source_fps = self.video_processor.fps
+            self.frame_cache = FrameCache(int(frame_cache_mb) << 20)
+            self.prefetcher = FramePrefetcher(
+                video_source,
+                self.frame_cache,
+                prepare=self._prepare_frame,
+                on_frame=self.frame_prefetched.emit,
+                ahead=self.DISPLAY_FPS,
+                behind=self.DISPLAY_FPS,
+                decode_threads=capture_threads,
+            )
+            self.frame_prefetched.connect(self._on_frame_prefetched)
+
+        # Analysis mode bookkeeping: the last frame sent to and received
+        # from the worker, and when capture reached the end of the file.
+        self.preview_interval = preview_interval
+        self.last_preview = 0.0
+        self.last_sent = -1
+        self.last_result = -1
+        self.last_result_time = None
+        self.results = 0
+        self.capture_done_at = None
+        self.progress = ProgressTracker(self.frame_count) if self.analysis else None
+
+        # Multiprocessing queues for frame exchange. Every worker process
+        # gets its own pair (see _spawn_worker), so a killed worker cannot
+        # leave its replacement with a queue lock held forever; these are
+        # the active worker's.
+        self.frame_queue = None
+        self.processed_queue = None
+        # Filled from processed_queue by a relay thread (_relay_processed).
+        self.display_buffer = queue.Queue(maxsize=queue_size)
 
         # Start capture thread.
         self.capture_thread = threading.Thread(target=self.capture_frames, daemon=True)
-        # Start the frame processing process.
-        self.processing_process = mp.Process(
-            target=process_frames_worker,
-            args=(
-                self.frame_queue,
-                self.processed_queue,
-                self.model_path,
-                self.running_flag,
-                self.frame_skip,
-            ),
-            daemon=True,
+        # The frame processing process, restarted from a warm standby if it
+        # crashes or hangs.
+        self.metrics = MetricsLog(metrics_path) if metrics_path else None
+        self.supervisor = WorkerSupervisor(
+            self._spawn_worker,
+            metrics=self.metrics,
+            on_retired=lambda pid: self.governor.unregister("inference", pid),
+            **(supervisor_options or {}),
         )
+        self.health_timer = QTimer(self)
+        self.health_timer.timeout.connect(self.check_worker)
+        self.progress_timer = QTimer(self)
+        self.progress_timer.timeout.connect(self.update_analysis_progress)
 
         # Timer to update displayed frame (~30 FPS).
         self.timer = QTimer(self)
@@ -142,96 +646,789 @@ class VideoPlayer(QMainWindow):
         self.timer.start(33)
         self.archive_queue = archive_queue
 
+        # Bytes held per subsystem, sampled by memory_timer.
+        self.memory = MemoryMonitor(
+            memory_ceiling_mb,
+            trace_frames=10 if memory_trace else 0,
+            metrics=self.metrics,
+        )
+        self._register_memory_probes()
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.memory.sample)
+        self.memory_timer.start(self.MEMORY_INTERVAL_MS)
+
+        self.supervisor.start()
+        self._use_active_queues()
+        if self.analysis:
+            self.progress.start()
+            self.progress_timer.start(250)
         self.capture_thread.start()
-        self.processing_process.start()
+        self.health_timer.start(500)
 
     def toggle_play_pause(self, checked):
         """
         Toggle play/pause state of the video playback.
         """
         if checked:
-            # Paused: stop updating frames
+            # Paused: stop updating frames and capturing new ones, and
+            # decode the frames around the playhead for stepping.
             self.timer.stop()
+            self.capture_enabled.clear()
+            self.paused_at = self.playhead
+            if self.prefetcher is not None and self.playhead is not None:
+                self.prefetcher.set_playhead(self.playhead)
             self.play_pause_button.setText("Play")
         else:
-            # Playing: resume frame updates
+            # Playing: resume frame updates, from the playhead if it moved
+            if self.prefetcher is not None:
+                self.prefetcher.suspend()
+            if self.playhead is not None and self.playhead != self.paused_at:
+                self._restart_capture(self.playhead + 1)
+            self.capture_enabled.set()
             self.timer.start(33)
             self.play_pause_button.setText("Pause")
 
     def capture_frames(self):
         """
-        Continuously capture frames from the video source and enqueue.
+        Continuously capture frames from the video source and enqueue
+        them together with their source frame index and timestamp.
         """
+        self.governor.apply("capture")
+        frame_index = 0
+        generation = self.seek_generation
+        clock = None
         while self.running:
-            frame = self.video_processor.get_frame()
+            with self._seek_lock:
+                request, self._seek_request = self._seek_request, None
+            if request is not None:
+                target, generation = request
+                self.video_processor.seek(target)
+                frame_index = target
+                clock = None
+            if not self.capture_enabled.wait(0.05):
+                clock = None
+                continue
+            if self.analysis and frame_index % self.frame_skip:
+                # Not sampled: advance the decoder without converting.
+                if self.video_processor.grab():
+                    frame_index += 1
+                    continue
+                frame = None
+            else:
+                frame = self.video_processor.get_frame()
             if frame is None:
-                break
+                if not self.seekable:
+                    break
+                if self.capture_done_at is None:
+                    self.capture_done_at = time.monotonic()
+                # End of the file: wait for a seek back.
+                time.sleep(0.05)
+                continue
+            timestamp = self.video_processor.get_timestamp()
+
+            if self.analysis:
+                self._put_lossless(
+                    self._worker_item(frame_index, timestamp, frame, generation)
+                )
+                self.last_sent = frame_index
+            else:
+                if self.seekable:
+                    clock = self._pace(clock, timestamp)
+                try:
+                    self.frame_queue.put(
+                        self._worker_item(frame_index, timestamp, frame, generation),
+                        timeout=0.05,
+                    )
+                except queue.Full:
+                    self._discard_pending(frame_index)
+            frame_index += 1
+
+    def _worker_item(self, frame_index, timestamp, frame, generation=0):
+        """
+        Returns the frame_queue item of a captured frame. With
+        preprocessing the worker gets the letterboxed frame and its
+        transform, and the original waits in pending_frames.
+        """
+        if self.letterbox is None:
+            self.worker_frame_bytes = frame.nbytes
+            return frame_index, timestamp, frame, None, generation
+        model_input, transform = self.letterbox(frame)
+        self.worker_frame_bytes = model_input.nbytes
+        if transform is None:
+            # Small enough already: sent and returned as it is.
+            return frame_index, timestamp, frame, None, generation
+        with self.pending_lock:
+            self.pending_frames[frame_index] = frame
+            while len(self.pending_frames) > self.max_pending:
+                self.pending_frames.popitem(last=False)
+        return frame_index, timestamp, model_input, transform, generation
+
+    def _discard_pending(self, frame_index) -> None:
+        """Forgets the original of a frame the worker never received."""
+        with self.pending_lock:
+            self.pending_frames.pop(frame_index, None)
+
+    def _attach_frame(self, item):
+        """
+        Puts the original frame back into a result of a letterboxed frame.
+        Frames sent before it have no result coming (dropped on a full
+        queue or lost with a replaced worker) and are discarded.
 
+        Returns:
+            tuple: The complete item, or None if its frame is gone.
+        """
+        frame_index, timestamp, frame, tracked_objects, generation = item
+        if frame is not None:
+            return item
+        with self.pending_lock:
+            if frame_index not in self.pending_frames:
+                return None
+            while True:
+                index, frame = self.pending_frames.popitem(last=False)
+                if index == frame_index:
+                    break
+        return frame_index, timestamp, frame, tracked_objects, generation
+
+    def _pace(self, clock, timestamp):
+        """
+        Sleeps until a file frame is due in real time.
+
+        Args:
+            clock (tuple): (monotonic, media) time of the reference frame,
+            or None to make this frame the reference.
+            timestamp (float): Media time of the frame.
+
+        Returns:
+            tuple: The reference for the next frame.
+        """
+        now = time.monotonic()
+        if clock is None:
+            return now, timestamp
+        delay = clock[0] + (timestamp - clock[1]) - now
+        if delay < -0.5:
+            # Fell behind, e.g. decoding is slower than real time.
+            return now, timestamp
+        if delay > 0:
+            time.sleep(min(delay, 1.0))
+        return clock
+
+    def _put_lossless(self, item):
+        """
+        Waits for room in the active worker's frame queue.
+        """
+        while self.running:
             try:
-                self.frame_queue.put(frame, timeout=0.05)
+                self.frame_queue.put(item, timeout=0.1)
+                return
             except queue.Full:
                 continue
+            except ValueError:
+                # The queue of a replaced worker was closed; retry on the
+                # new one.
+                continue
+        self._discard_pending(item[0])
 
     def display_frame(self):
         """
         Dequeues and displays the latest processed frame. If multiple frames
         are waiting, skip to the most recent to minimize delay.
         """
-        processed_frame = None
         # Get the latest frame
         try:
-            processed_frame = self.processed_queue.get_nowait()
+            item = self.display_buffer.get_nowait()
         except queue.Empty:
             return
 
-        if processed_frame is None:
+        if item is None:
             self.close()
             return
+        frame_index, timestamp, frame, tracked_objects, generation = item
+        if generation != self.seek_generation:
+            # Captured before the seek, still in flight.
+            return
+
+        min_w, min_h = self.MIN_RENDER_SIZE
+        self.render_bounds = (
+            max(self.video_label.width(), min_w),
+            max(self.video_label.height(), min_h),
+        )
+        frame_rgb, scale = self._prepare_frame(frame)
+        self.playhead = frame_index
+        if self.frame_cache is not None:
+            self.frame_cache.put(
+                frame_index, frame_rgb, timestamp, scale, tracked_objects
+            )
+        if self.event_clipper is not None:
+            # Clips keep clean frames; boxes go to the sidecar.
+            self.event_clipper.push(
+                frame_rgb, tracked_objects, frame_index, timestamp, scale
+            )
+        # The archive keeps the clean frame and its tracks so overlays can
+        # be re-rendered later without running the model again.
+        self.archive_queue.enqueue(
+            (frame_rgb, encode_tracks(tracked_objects, scale), frame_index, timestamp)
+        )
+        annotated = frame_rgb.copy()
+        self.renderer.render(annotated, tracked_objects, scale)
+        self._draw_analytics(annotated, scale)
 
-        # Convert color space and create QImage.
-        frame_rgb = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+        if self.recorder is not None:
+            self.recorder.write_frame(annotated, timestamp)
+        self._present(annotated, timestamp, scale)
 
-        self.archive_queue.enqueue(frame_rgb.copy())
+    def _prepare_frame(self, frame):
+        """
+        Downscales a BGR frame to the render bounds and converts it to RGB.
+        Called from the prefetch thread as well, hence the bounds are read
+        from render_bounds rather than the widgets.
 
-        h, w, ch = frame_rgb.shape
+        Returns:
+            tuple: (RGB frame, scale applied).
+        """
+        # Downscale to the display size before annotating so overlay and
+        # colour conversion cost do not grow with the source resolution.
+        h, w = frame.shape[:2]
+        bound_w, bound_h = self.render_bounds
+        min_w, min_h = self.MIN_RENDER_SIZE
+        # Fit the bounds, unless that takes either side below the minimum.
+        scale = min(1.0, max(min(bound_w / w, bound_h / h), min_w / w, min_h / h))
+        if scale < 1.0:
+            frame = cv2.resize(
+                frame,
+                (max(1, int(w * scale)), max(1, int(h * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), scale
+
+    def _present(self, annotated, timestamp, scale=1.0):
+        h, w, ch = annotated.shape
+        self.shown_geometry = (w, h, scale)
         bytes_per_line = ch * w
-        q_image = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
+        q_image = QImage(annotated.data, w, h, bytes_per_line, QImage.Format_RGB888)
         self.video_label.setPixmap(QPixmap.fromImage(q_image))
+        self.pixmap_bytes = q_image.sizeInBytes()
+        if timestamp is not None:
+            self.timeline.set_position(timestamp)
 
-    def set_frame_skip(self, frame_skip: int):
+    def show_cached(self, frame_index: int) -> bool:
         """
-        Change how many frames to skip: terminate the old process
-        and start a new one with the updated skip-count.
+        Shows a frame from the frame cache with the boxes it had during
+        playback. Returns False if the frame is not cached.
         """
-        self.frame_skip = frame_skip
+        entry = self.frame_cache.get(frame_index)
+        if entry is None:
+            return False
+        tracks = self.frame_cache.tracks_at(frame_index, self.frame_skip)
+        annotated = entry.frame.copy()
+        self.renderer.render(annotated, tracks or [], entry.scale)
+        self._draw_analytics(annotated, entry.scale)
+        self._present(annotated, entry.timestamp, entry.scale)
+        return True
+
+    def _draw_analytics(self, annotated, scale):
+        if self.heatmap_visible and self.heatmap is not None:
+            self.heatmap.blend(annotated, rgb=True)
+        if self.zone_counter.lines or self.zone_counter.zones or self.draft_points:
+            self.zone_counter.draw(annotated, scale, draft=self.draft_points)
+
+    def _redraw_paused(self):
+        """Redraws the paused frame, e.g. after an overlay changed."""
+        paused = self.play_pause_button.isChecked()
+        if paused and self.frame_cache is not None and self.playhead is not None:
+            self.show_cached(self.playhead)
 
-        self.running_flag.value = False
-        self.processing_process.terminate()
-        self.processing_process.join()
+    def set_heatmap_visible(self, visible: bool):
+        """Shows or hides the live heatmap overlay."""
+        self.heatmap_visible = visible
+        self._redraw_paused()
+
+    def start_drawing(self, kind: str):
+        """
+        Starts drawing a counting "line" or "zone" with the mouse.
+        """
+        self.drawing = kind
+        self.draft_points = []
+        self.video_label.setCursor(Qt.CrossCursor)
+
+    def _finish_drawing(self):
+        points = self.draft_points
+        if self.drawing == "line" and len(points) == 2:
+            name = f"Line {len(self.zone_counter.lines) + 1}"
+            self.zone_counter.add_line(Line(name, *points))
+        elif self.drawing == "zone" and len(points) >= 3:
+            name = f"Zone {len(self.zone_counter.zones) + 1}"
+            self.zone_counter.add_zone(Zone(name, points))
+        self.drawing = None
+        self.draft_points = []
+        self.video_label.unsetCursor()
+        self.zones_changed.emit(self.zone_counter.to_dict())
+
+    def clear_zones(self):
+        """Removes all counting lines and zones."""
+        self.zone_counter.clear()
+        self.zones_changed.emit(self.zone_counter.to_dict())
+        self._redraw_paused()
+
+    def _source_point(self, position):
+        """
+        Maps a position on the video label to source pixel coordinates.
+        """
+        if self.shown_geometry is None:
+            return None
+        w, h, scale = self.shown_geometry
+        # The label stretches the frame to its own size.
+        x = position.x() * w / max(1, self.video_label.width())
+        y = position.y() * h / max(1, self.video_label.height())
+        return x / scale, y / scale
+
+    def eventFilter(self, watched, event):
+        if (
+            watched is self.video_label
+            and self.drawing is not None
+            and event.type() == QEvent.MouseButtonPress
+        ):
+            if event.button() == Qt.RightButton:
+                self._finish_drawing()
+            else:
+                point = self._source_point(event.position())
+                if point is not None:
+                    self.draft_points.append(point)
+                if self.drawing == "line" and len(self.draft_points) == 2:
+                    self._finish_drawing()
+            self._redraw_paused()
+            return True
+        return super().eventFilter(watched, event)
+
+    def export_heatmap(self, path: str) -> list:
+        """
+        Writes the heatmap as a PNG at path and its grids as an .npz file
+        next to it (see Heatmap.load).
+
+        Returns:
+            list: The files written, empty if nothing was seen yet.
+        """
+        heatmap = self.heatmap
+        if heatmap is None:
+            return []
+        base = os.path.splitext(path)[0]
+        heatmap.export_image(base + ".png")
+        heatmap.save(base + ".npz")
+        return [base + ".png", base + ".npz"]
+
+    def _update_analytics(self, item):
+        """
+        Adds a result to the heatmap and the line and zone counts.
+        """
+        frame_index, timestamp, frame, tracked_objects, _ = item
+        # Both skip frames replayed after a seek back by their index.
+        self.zone_counter.update(tracked_objects, timestamp, frame_index)
+        if self.heatmap_cell_size is None:
+            return
+        if self.heatmap is None:
+            h, w = frame.shape[:2]
+            self.heatmap = Heatmap((w, h), self.heatmap_cell_size)
+        self.heatmap.update(tracked_objects, timestamp, frame_index)
+
+    def _on_frame_prefetched(self, frame_index: int):
+        if self.play_pause_button.isChecked() and frame_index == self.playhead:
+            self.show_cached(frame_index)
+
+    def seek(self, frame_index: int):
+        """
+        Moves playback to a source frame of a file. A cached frame is shown
+        at once; otherwise it appears when decoded, by the prefetcher while
+        paused or by the capture thread, which continues from it, while
+        playing.
+        """
+        if not self.seekable or self.analysis:
+            return
+        if self.frame_count:
+            frame_index = min(frame_index, self.frame_count - 1)
+        frame_index = max(0, int(frame_index))
+        self.playhead = frame_index
+        self.show_cached(frame_index)
+        if self.play_pause_button.isChecked():
+            self.prefetcher.set_playhead(frame_index)
+        else:
+            self._restart_capture(frame_index)
 
-        self.running_flag = mp.Value("b", True)
-        self.processing_process = mp.Process(
+    def seek_seconds(self, seconds: float):
+        self.seek(round(seconds * self.source_fps))
+
+    def step(self, frames: int):
+        """
+        Pauses and moves the given number of frames forward (or back, if
+        negative).
+        """
+        if not self.seekable or self.playhead is None:
+            return
+        if not self.play_pause_button.isChecked():
+            self.play_pause_button.setChecked(True)
+        self.seek(self.playhead + frames)
+
+    def _restart_capture(self, frame_index: int):
+        """
+        Makes the capture thread continue from the given frame and drops
+        the frames already buffered for display.
+        """
+        with self._seek_lock:
+            self.seek_generation += 1
+            self._seek_request = (frame_index, self.seek_generation)
+        while True:
+            try:
+                self.display_buffer.get_nowait()
+            except queue.Empty:
+                break
+
+    def load_thumbnail_index(self, video_path, directory: str, video_hash: str):
+        """
+        Shows the stored thumbnail index of a file, or builds it in a
+        background thread and shows it when done. Failures are logged to
+        the session metrics as "thumbnail_error" events.
+        """
+        index = ThumbnailIndex.load(directory, video_hash)
+        if index is not None:
+            self.set_thumbnail_index(index)
+            return
+
+        def build():
+            try:
+                index = build_thumbnail_index(
+                    video_path,
+                    directory,
+                    video_hash,
+                    workers=self.governor.profile.capture_threads,
+                    cancel=self.thumbnail_cancel,
+                )
+            except IOError as e:
+                self.thumbnail_index_failed.emit(str(e))
+                return
+            if index is not None and not self.thumbnail_cancel.is_set():
+                self.thumbnail_index_ready.emit(index)
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def _log_thumbnail_error(self, message: str):
+        # Runs on the GUI thread, once self.metrics exists.
+        if self.metrics is not None:
+            self.metrics.log("thumbnail_error", error=message)
+
+    def set_thumbnail_index(self, index):
+        self.timeline.set_index(index)
+        self.timeline.setVisible(index is not None)
+
+    def preview_at(self, seconds: float):
+        """
+        Shows the timeline thumbnail nearest the scrubbed position.
+        """
+        index = self.timeline.index
+        thumb = np.ascontiguousarray(index.thumbnail(index.index_at(seconds)))
+        h, w = thumb.shape[:2]
+        image = QImage(thumb.data, w, h, 3 * w, QImage.Format_BGR888)
+        self.preview_label.setPixmap(QPixmap.fromImage(image).scaled(w * 2, h * 2))
+        self.preview_label.setToolTip(f"{seconds:.1f} s")
+        self.preview_label.setVisible(True)
+
+    def start_recording(self, output_dir: str, **options) -> None:
+        """
+        Start recording displayed frames into rolling segments.
+
+        Args:
+            output_dir (str): Directory for the segments and playlist.
+            **options: Forwarded to SegmentedRecorder (fps, backend,
+            codec, preset, crf, segment_seconds, ...). Encoder threads
+            default to the resource profile's budget.
+        """
+        self.stop_recording()
+        options.setdefault("threads", self.governor.profile.encoder_threads)
+        self.recorder = SegmentedRecorder(output_dir, rgb_input=True, **options)
+
+    def stop_recording(self) -> None:
+        """
+        Stop recording and finalise the segment playlist.
+        """
+        if self.recorder is not None:
+            self.recorder.release()
+            self.recorder = None
+
+    def start_event_clips(self, output_dir: str, **options) -> None:
+        """
+        Start writing clips around new person sightings.
+
+        Args:
+            output_dir (str): Directory for the clips and their sidecars.
+            **options: Forwarded to EventClipper (fps, pre_seconds,
+            post_seconds, jpeg_quality, ...).
+        """
+        self.stop_event_clips()
+        self.event_clipper = EventClipper(output_dir, rgb_input=True, **options)
+
+    def stop_event_clips(self) -> None:
+        """
+        Stop event clipping, writing out the event in progress.
+        """
+        if self.event_clipper is not None:
+            self.event_clipper.close()
+            self.event_clipper = None
+
+    def stop_worker(self, timeout: float = 2.0):
+        """
+        Ask the processing processes to exit so the active one can flush
+        its track store, terminating (and finally killing) any that do not
+        stop within the timeout.
+        """
+        self.health_timer.stop()
+        self.supervisor.stop(timeout)
+
+    def _spawn_worker(self, handle):
+        """
+        Starts a processing process, with its own queues, reporting to the
+        given WorkerHandle.
+        """
+        handle.queues = (
+            mp.Queue(maxsize=self.queue_size),
+            mp.Queue(maxsize=self.queue_size),
+        )
+        process = mp.Process(
             target=process_frames_worker,
             args=(
-                self.frame_queue,
-                self.processed_queue,
+                *handle.queues,
                 self.model_path,
-                self.running_flag,
+                handle.running,
                 self.frame_skip,
             ),
+            kwargs=dict(self.worker_options, supervision=handle),
             daemon=True,
         )
-        self.processing_process.start()
+        process.start()
+        self.governor.register("inference", process.pid)
+        return process
+
+    def _use_active_queues(self):
+        """
+        Switches capture and display to the queues of the active worker,
+        discarding those of a replaced one.
+        """
+        old = (self.frame_queue, self.processed_queue)
+        self.frame_queue, self.processed_queue = self.supervisor.active.queues
+        for q in old:
+            if q is not None and q not in self.supervisor.active.queues:
+                # Nobody reads it any more; do not wait for its buffer.
+                q.cancel_join_thread()
+                q.close()
+        threading.Thread(
+            target=self._relay_processed, args=(self.processed_queue,), daemon=True
+        ).start()
+
+    def _relay_processed(self, source):
+        """
+        Moves processed frames from a worker's queue to the display buffer
+        until that worker is replaced. A worker killed halfway through
+        sending a frame leaves a truncated message that blocks its reader
+        for good; reading here instead of in display_frame keeps that from
+        freezing the GUI.
+        """
+        while self.running and source is self.processed_queue:
+            try:
+                item = source.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            except (OSError, ValueError, EOFError):
+                return
+            item = self._attach_frame(item)
+            if item is None:
+                continue
+            self._update_analytics(item)
+            if self.analysis:
+                self._record_result(item)
+                now = time.monotonic()
+                if now - self.last_preview >= self.preview_interval:
+                    self.last_preview = now
+                    try:
+                        self.display_buffer.put_nowait(item)
+                    except queue.Full:
+                        pass
+                continue
+            while self.running and source is self.processed_queue:
+                try:
+                    self.display_buffer.put(item, timeout=0.05)
+                    break
+                except queue.Full:
+                    continue
+
+    def _record_result(self, item):
+        """
+        Keeps the tracks of an analysed frame for review and advances the
+        progress.
+        """
+        frame_index, _, _, tracked_objects, _ = item
+        if self.frame_cache is not None:
+            self.frame_cache.set_tracks(frame_index, tracked_objects)
+        self.results += 1
+        self.last_result = max(self.last_result, frame_index)
+        self.last_result_time = time.monotonic()
+        self.progress.update(self.last_result + 1)
+
+    def update_analysis_progress(self):
+        """
+        Shows the analysis progress and ETA, and finishes the analysis
+        once the results of every frame sent are back.
+        """
+        fraction = self.progress.fraction
+        if fraction is not None:
+            self.progress_bar.setValue(round(fraction * 1000))
+        self.progress_label.setText(self.progress.describe())
+        if self.capture_done_at is None:
+            return
+        idle = time.monotonic() - max(self.last_result_time or 0, self.capture_done_at)
+        if self.last_result >= self.last_sent or idle > self.ANALYSIS_IDLE_TIMEOUT:
+            self.finish_analysis()
+
+    def finish_analysis(self):
+        """
+        Ends analysis mode: reports the run, then pauses at the end so the
+        results can be reviewed by seeking and stepping.
+        """
+        self.progress_timer.stop()
+        self.progress.update(max(self.progress.done, self.progress.total))
+        self.progress.finish()
+        summary = dict(self.progress.summary(), frames_analysed=self.results)
+        elapsed = summary["elapsed_s"]
+        summary["speed"] = (
+            round(self.progress.done / self.source_fps / elapsed, 2) if elapsed else None
+        )
+        self.analysis = False
+        self.progress_bar.setValue(1000)
+        text = f"Analysed {self.results} frames in {format_duration(elapsed)}"
+        if summary["speed"]:
+            text += f" ({summary['speed']:.1f}x real time)"
+        self.progress_label.setText(text)
+        if self.metrics is not None:
+            self.metrics.log("analysis_done", **summary)
+        self.play_pause_button.setChecked(True)
+        self.analysis_finished.emit(summary)
+
+    def check_worker(self):
+        """
+        Lets the supervisor replace a crashed or hung processing process.
+        The supervisor logs the incident as a "worker_incident" metrics
+        event and keeps it in its incidents list.
+        """
+        if self.supervisor.check() is not None:
+            self._use_active_queues()
+
+    def set_frame_skip(self, frame_skip: int):
+        """
+        Change how many frames to skip: terminate the old processes
+        and start new ones with the updated skip-count.
+        """
+        self.frame_skip = frame_skip
+        self.worker_options["adaptive_resolution"] = self._adaptive_options()
+
+        self.stop_worker()
+        self.supervisor.start()
+        self._use_active_queues()
+        self.health_timer.start(500)
+
+    def _adaptive_options(self):
+        """
+        Returns the ResolutionController options for the worker: the
+        configured ones, with the latency budget of the current frame skip
+        and the frame queue capacity filled in. In analysis mode the
+        decoder always keeps the queue full, so its depth is not used.
+        """
+        if not self.adaptive_resolution:
+            return None
+        options = {
+            "target_latency_ms": 1000.0 * self.frame_skip / self.DISPLAY_FPS,
+            "queue_capacity": 0 if self.analysis else self.queue_size,
+        }
+        options.update(self.adaptive_resolution)
+        return options
+
+    def _register_memory_probes(self):
+        """
+        Registers what the player holds with the memory monitor. Tracker
+        state lives in the worker processes and is covered by their RSS.
+        """
+        memory = self.memory
+        memory.register("archive_queue", self.archive_queue.nbytes)
+        if self.frame_cache is not None:
+            memory.register("frame_cache", lambda: self.frame_cache.nbytes)
+        memory.register("display_buffer", self._display_buffer_bytes)
+        memory.register("worker_queues", self._worker_queue_bytes)
+        memory.register("pending_frames", self._pending_frame_bytes)
+        memory.register(
+            "heatmap", lambda: self.heatmap.nbytes if self.heatmap is not None else 0
+        )
+        memory.register(
+            "event_clips",
+            lambda: self.event_clipper.nbytes() if self.event_clipper is not None else 0,
+        )
+        memory.register("pixmap", lambda: self.pixmap_bytes)
+        memory.add_processes("workers", lambda: self.supervisor.pids)
+        # Archive frames first: losing a few exported frames is cheaper than
+        # decoding again for every seek.
+        memory.add_shedder("archive_queue", self.archive_queue.shed)
+        if self.frame_cache is not None:
+            memory.add_shedder("frame_cache", self.frame_cache.shed)
+
+    def _worker_queue_bytes(self) -> int:
+        # Results of letterboxed frames carry no frame.
+        depth = _queue_depth(self.frame_queue)
+        if self.letterbox is None:
+            depth += _queue_depth(self.processed_queue)
+        return depth * self.worker_frame_bytes
+
+    def _pending_frame_bytes(self) -> int:
+        with self.pending_lock:
+            return sum(frame.nbytes for frame in self.pending_frames.values())
+
+    def _display_buffer_bytes(self) -> int:
+        with self.display_buffer.mutex:
+            items = list(self.display_buffer.queue)
+        return sum(item_nbytes(item) for item in items)
+
+    def memory_report(self) -> dict:
+        """
+        Returns the latest memory sample (see MemoryMonitor.sample) with the
+        growth trend in bytes per second.
+        """
+        report = dict(self.memory.last or self.memory.sample())
+        report["growth"] = self.memory.growth()
+        report["ceiling"] = self.memory.ceiling
+        report["shed_events"] = list(self.memory.shed_events)
+        report["shed_count"] = self.memory.shed_count
+        return report
+
+    def resource_report(self) -> dict:
+        """
+        Returns per-stage thread budgets and CPU utilisation since the
+        previous call (see ResourceGovernor.report).
+        """
+        return self.governor.report()
 
     def close(self):
         """
         Cleanly shutdown threads, processes, and release resources.
         """
         self.running = False
-        self.running_flag.value = False
+        self.thumbnail_cancel.set()
+        self.progress_timer.stop()
+        if self.prefetcher is not None:
+            self.prefetcher.close()
         self.video_processor.release()
-        self.processing_process.terminate()
-        self.processing_process.join()
+        self.stop_worker()
+        # Frames still buffered for the stopped worker must not keep the
+        # interpreter from exiting.
+        self.frame_queue.cancel_join_thread()
+        self.stop_recording()
+        self.stop_event_clips()
+        self.zone_counter.close()
+        self.memory_timer.stop()
+        self.memory.close()
+        if self.metrics is not None:
+            self.metrics.close()
         cv2.destroyAllWindows()
         super().close()
 
@@ -241,9 +1438,21 @@ class VideoPlayer(QMainWindow):
         """
         self.video_closed.emit()
         self.running = False
-        self.running_flag.value = False
+        self.thumbnail_cancel.set()
+        self.progress_timer.stop()
+        if self.prefetcher is not None:
+            self.prefetcher.close()
         self.video_processor.release()
-        self.processing_process.terminate()
-        self.processing_process.join()
+        self.stop_worker()
+        # Frames still buffered for the stopped worker must not keep the
+        # interpreter from exiting.
+        self.frame_queue.cancel_join_thread()
+        self.stop_recording()
+        self.stop_event_clips()
+        self.zone_counter.close()
+        self.memory_timer.stop()
+        self.memory.close()
+        if self.metrics is not None:
+            self.metrics.close()
         cv2.destroyAllWindows()
         super().closeEvent(event)
@@ -1,8 +1,12 @@
+import hashlib
+import json
+import os
 import sys
 import cv2
 import time
 from PySide6.QtWidgets import (
     QApplication,
+    QFileDialog,
     QMainWindow,
     QMenuBar,
     QVBoxLayout,
@@ -17,12 +21,25 @@ from PySide6.QtCore import Slot, Qt, QSettings
 from PySide6.QtMultimedia import QMediaDevices
 
 from core.video_utils.video_queue import VideoQueue
+from core.video_utils.network_source import NetworkStreamOptions, TRANSPORTS
 from core.archive_processor import ArchiveProcessor
+from core.video_utils.detections_sidecar import (
+    DetectionsSidecarWriter,
+    scale_tracks,
+    sidecar_path_for,
+)
+from core.reid_gallery import ReIDGallery
+from core.detection_cache import video_hash
+from core.resource_governor import ThreadProfile
+from core.stream_replay import is_stream_recording
+from core.synthetic_source import parse_synthetic_source
+from core.tracker_state import snapshot_path
 
 
 from gui.dialog_handler import DialogHandler
 from gui.video_player import VideoPlayer
 from gui.metadata_viewer import MetadataViewer
+from gui.memory_panel import MemoryPanel
 from gui.settings_dialog import SettingsDialog
 
 
@@ -32,6 +49,17 @@ class MainApp(QMainWindow):
         self.setWindowTitle("DroneLink")
 
         self.archive_queue = VideoQueue()
+        # Frames waiting for the archive processor can be bounded in bytes
+        # ("memory/archive_queue_mb", unset: unbounded); the oldest are
+        # dropped beyond it and the export reports how many.
+        archive_queue_mb = int(
+            QSettings("DroneTek", "DroneLink").value("memory/archive_queue_mb", 0) or 0
+        )
+        if archive_queue_mb > 0:
+            VideoQueue.configure(max_bytes=archive_queue_mb << 20)
+        # Archive frames already dropped when the last export was written.
+        self.archive_dropped_reported = 0
+        self.memory_panel = None
 
         self.model_key = model_key
         self.frame_skip = frame_skip
@@ -62,14 +90,31 @@ class MainApp(QMainWindow):
         self.file_menu.addAction(self.open_action)
         self.open_action.triggered.connect(self.__open_file)
 
+        self.analyze_action = QAction("Analyze", self)
+        self.file_menu.addAction(self.analyze_action)
+        self.analyze_action.triggered.connect(self.__analyze_file)
+        # Whether the next file opened is analysed rather than played.
+        self.analyze_next = False
+
         self.connect_action = QAction("Connect", self)
         self.file_menu.addAction(self.connect_action)
         self.connect_action.triggered.connect(self.__connect_feed)
 
+        self.record_action = QAction("Record", self)
+        self.record_action.setCheckable(True)
+        self.file_menu.addAction(self.record_action)
+        self.record_action.toggled.connect(self.__toggle_recording)
+
+        self.event_clips_action = QAction("Event Clips", self)
+        self.event_clips_action.setCheckable(True)
+        self.file_menu.addAction(self.event_clips_action)
+        self.event_clips_action.toggled.connect(self.__toggle_event_clips)
+
         self.file_menu.addAction("Exit").triggered.connect(self.close)
 
         # Disable the open action if no valid model path is set.
         self.open_action.setDisabled(self.model_path is None)
+        self.analyze_action.setDisabled(self.model_path is None)
 
         # Settings menu
         settings_menu = menubar.addMenu("Settings")
@@ -77,6 +122,21 @@ class MainApp(QMainWindow):
         settings_action.triggered.connect(self.__open_settings)
         settings_menu.addAction(settings_action)
 
+        # Tools menu
+        tools_menu = menubar.addMenu("Tools")
+        find_person_action = QAction("Find Person in Other Videos...", self)
+        find_person_action.triggered.connect(self.__find_person)
+        tools_menu.addAction(find_person_action)
+        resource_action = QAction("Resource Usage...", self)
+        resource_action.triggered.connect(self.__show_resource_usage)
+        tools_menu.addAction(resource_action)
+        heatmap_action = QAction("Export Heatmap", self)
+        heatmap_action.triggered.connect(self.__export_heatmap)
+        tools_menu.addAction(heatmap_action)
+        memory_action = QAction("Memory...", self)
+        memory_action.triggered.connect(self.__show_memory)
+        tools_menu.addAction(memory_action)
+
         top_layout.addWidget(menubar, 1, alignment=Qt.AlignTop)
         self.setMenuWidget(top_widget)
 
@@ -137,6 +197,19 @@ class MainApp(QMainWindow):
 
     def __open_file(self) -> None:
         """Trigger a file selection dialog to open a video file."""
+        self.analyze_next = False
+        self.dialog_handler.request_file_path(
+            title="Open Video File",
+            file_filter="Video Files (*.mp4 *.avi *.mov);;All Files (*.*)",
+            save_mode=False,
+        )
+
+    def __analyze_file(self) -> None:
+        """
+        Trigger a file selection dialog to analyse a video file as fast as
+        possible instead of playing it in real time.
+        """
+        self.analyze_next = True
         self.dialog_handler.request_file_path(
             title="Open Video File",
             file_filter="Video Files (*.mp4 *.avi *.mov);;All Files (*.*)",
@@ -166,42 +239,454 @@ class MainApp(QMainWindow):
 
     @Slot(str)
     def __connect_feed(self) -> None:
-        """Connect to the video feed by letting the user select
-        from available devices."""
+        """Connect to a video feed by letting the user select
+        from available devices or enter a network stream URL."""
         cams = QMediaDevices.videoInputs()
-        if not cams:
-            self.dialog_handler.show_message(
-                "No Devices", "No video devices available."
-            )
-            return
 
         # Build a list of human‑readable camera descriptions
         names = [cam.description() for cam in cams]
+        network_entry = "Network stream (RTSP/UDP/HTTP)..."
+        replay_entry = "Replay recorded stream..."
+        synthetic_entry = "Synthetic test feed..."
         chosen, ok = QInputDialog.getItem(
             self,
             "Select Camera",
             "Camera:",
-            names,
+            names + [network_entry, replay_entry, synthetic_entry],
             0,
             False,
         )
         if not ok:
             return
 
-        # Map back to the integer index of the chosen camera
-        idx = names.index(chosen)
+        network_options = None
+        if chosen == network_entry:
+            source, network_options = self.__ask_network_source()
+            if source is None:
+                return
+        elif chosen == replay_entry:
+            source = QFileDialog.getExistingDirectory(
+                self, "Stream Recording", self.__stream_recordings_dir()
+            )
+            if not source:
+                return
+        elif chosen == synthetic_entry:
+            source, ok = QInputDialog.getText(
+                self,
+                "Synthetic Feed",
+                "Source (size, fps, targets, jitter_ms, drop_rate):",
+                text="synthetic://1280x720?fps=30&targets=5",
+            )
+            if not ok or parse_synthetic_source(source) is None:
+                return
+        else:
+            # Map back to the integer index of the chosen camera
+            source = names.index(chosen)
 
         # Launch VideoPlayer exactly as before, with use_stream=True
         self.video_player = VideoPlayer(
-            idx,
+            source,
             self.archive_queue,
             self.model_path,
             use_stream=True,
             frame_skip=self.frame_skip,
+            network_options=network_options,
+            **self.__session_options(source),
         )
+        self.video_player.zones_changed.connect(self.__save_zones)
         self.video_frame_layout.addWidget(self.video_player)
         self.video_frame_layout.removeWidget(self.video_label)
 
+    def __ask_network_source(self):
+        """
+        Ask for a stream URL, transport and jitter buffer depth. The last
+        used values are remembered in QSettings.
+
+        Returns:
+            tuple: (url, NetworkStreamOptions), or (None, None) if cancelled.
+        """
+        settings = QSettings("DroneTek", "DroneLink")
+        url, ok = QInputDialog.getText(
+            self,
+            "Network Stream",
+            "Stream URL (rtsp://, udp://, http://):",
+            text=settings.value("stream/url", "rtsp://"),
+        )
+        if not ok or not url.strip():
+            return None, None
+
+        last_transport = settings.value("stream/transport", "tcp")
+        transport, ok = QInputDialog.getItem(
+            self,
+            "Network Stream",
+            "Transport:",
+            list(TRANSPORTS),
+            TRANSPORTS.index(last_transport) if last_transport in TRANSPORTS else 0,
+            False,
+        )
+        if not ok:
+            return None, None
+
+        jitter_ms, ok = QInputDialog.getInt(
+            self,
+            "Network Stream",
+            "Jitter buffer (ms, 0 = lowest latency):",
+            int(settings.value("stream/jitter_ms", 200)),
+            0,
+            5000,
+        )
+        if not ok:
+            return None, None
+
+        options = NetworkStreamOptions(
+            transport=transport,
+            jitter_buffer_ms=jitter_ms,
+            decode_threads=int(settings.value("stream/decode_threads", 0)),
+        )
+        settings.setValue("stream/url", url.strip())
+        settings.setValue("stream/transport", transport)
+        settings.setValue("stream/jitter_ms", jitter_ms)
+        return url.strip(), options
+
+    def __session_options(self, source) -> dict:
+        """
+        Returns the per-session VideoPlayer options: a new track store
+        directory under the "track_store/dir" setting (default
+        ~/DroneLink/tracks), the shared re-identification gallery under
+        "reid/gallery_dir" (default ~/DroneLink/gallery), a video_id
+        naming the session (the gallery uses the content hash of files
+        instead, so re-opened files match), and for video files the detection
+        cache ("detection_cache/path", default
+        ~/DroneLink/detection_cache.sqlite, bounded by
+        "detection_cache/max_mb") with the file's content hash, the
+        thread profile, and the detector "imgsz" and "device" settings
+        written by the auto-tuner. With "adaptive/enabled" the input size
+        varies between "adaptive/min_imgsz" (default 320) and "imgsz"
+        under load, logging switches to ~/DroneLink/metrics/<video_id>.jsonl.
+        The worker supervisor keeps a standby process unless
+        "supervisor/standby" is false and restarts workers silent for
+        "supervisor/heartbeat_timeout" seconds or stuck on one frame for
+        "supervisor/frame_timeout" seconds. "remote/servers" (comma
+        separated host:port) sends detection to inference servers, waiting
+        "remote/timeout_ms" (default 1000) per frame before falling back.
+        Thumbnail timelines are kept under "thumbnails/dir" (default
+        ~/DroneLink/thumbnails); "playback/frame_cache_mb" (default 256)
+        bounds the frames kept for seeking and stepping. Counting lines and
+        zones are in source pixels, so they are stored per source (file
+        content hash, or camera / URL) as JSON in "analytics/zones/<key>";
+        their counts are written to ~/DroneLink/counts/<video_id>.jsonl. Above
+        "memory/ceiling_mb" of RSS (unset: no limit) buffered frames are
+        dropped; "memory/trace" enables allocation tracing from the start.
+        With "stream/record_raw" the raw frames of live sources are recorded
+        under "stream/recordings_dir" (default ~/DroneLink/stream_recordings)
+        for replay, at "stream/replay_speed" (default 1). With
+        "capture/letterbox" frames are letterboxed to "imgsz" before they
+        are sent to the inference worker. Tracker state is snapshotted per
+        source under "tracker/snapshot_dir" (default
+        ~/DroneLink/tracker_state; empty disables) so a worker restarted at
+        the same position keeps the track IDs.
+        """
+        settings = QSettings("DroneTek", "DroneLink")
+        base = os.path.join(os.path.expanduser("~"), "DroneLink")
+        file_hash = None
+        if isinstance(source, str) and os.path.isfile(source):
+            name = os.path.splitext(os.path.basename(source))[0]
+            file_hash = video_hash(source)
+        else:
+            name = "stream"
+        video_id = f"{name}_{time.strftime('%Y%m%d-%H%M%S')}"
+        # Identifies the source for the geometry drawn on it.
+        self.zones_key = hashlib.sha1(str(file_hash or source).encode()).hexdigest()[:20]
+        snapshot_dir = settings.value(
+            "tracker/snapshot_dir", os.path.join(base, "tracker_state")
+        )
+        tracker_snapshot_path = (
+            snapshot_path(snapshot_dir, file_hash or source) if snapshot_dir else None
+        )
+        stream_record_path = None
+        if (
+            file_hash is None
+            and not is_stream_recording(source)
+            and str(settings.value("stream/record_raw", "false")).lower() == "true"
+        ):
+            stream_record_path = os.path.join(self.__stream_recordings_dir(), video_id)
+        input_size = int(settings.value("imgsz", 640))
+        adaptive = None
+        if str(settings.value("adaptive/enabled", "false")).lower() == "true":
+            adaptive = {
+                "min_size": min(
+                    int(settings.value("adaptive/min_imgsz", 320)), input_size
+                ),
+                "max_size": input_size,
+            }
+        servers = settings.value("remote/servers", "") or []
+        if isinstance(servers, str):
+            servers = servers.split(",")
+        servers = [address.strip() for address in servers if address.strip()]
+        remote = None
+        if servers:
+            remote = {
+                "servers": servers,
+                "timeout": int(settings.value("remote/timeout_ms", 1000)) / 1000.0,
+            }
+        return {
+            "track_store_path": os.path.join(
+                settings.value("track_store/dir", os.path.join(base, "tracks")),
+                video_id,
+            ),
+            "reid_gallery_path": self.__reid_gallery_path(),
+            "video_id": video_id,
+            "detection_cache_path": settings.value(
+                "detection_cache/path",
+                os.path.join(base, "detection_cache.sqlite"),
+            ),
+            "detection_cache_max_mb": int(
+                settings.value("detection_cache/max_mb", 512)
+            ),
+            "video_hash": file_hash,
+            "resource_profile": self.__resource_profile(),
+            "input_size": input_size,
+            "device": settings.value("device", "") or None,
+            "adaptive_resolution": adaptive,
+            "metrics_path": os.path.join(base, "metrics", f"{video_id}.jsonl"),
+            "supervisor_options": {
+                "standby": str(settings.value("supervisor/standby", "true")).lower()
+                == "true",
+                "heartbeat_timeout": float(
+                    settings.value("supervisor/heartbeat_timeout", 5.0)
+                ),
+                "frame_timeout": float(settings.value("supervisor/frame_timeout", 10.0)),
+            },
+            "remote_inference": remote,
+            "thumbnail_dir": settings.value(
+                "thumbnails/dir", os.path.join(base, "thumbnails")
+            ),
+            "frame_cache_mb": int(settings.value("playback/frame_cache_mb", 256)),
+            "zones": self.__zones(self.zones_key),
+            "zone_report_path": os.path.join(base, "counts", f"{video_id}.jsonl"),
+            "memory_ceiling_mb": float(settings.value("memory/ceiling_mb", 0)) or None,
+            "memory_trace": str(settings.value("memory/trace", "false")).lower()
+            == "true",
+            "stream_record_path": stream_record_path,
+            "replay_speed": float(settings.value("stream/replay_speed", 1.0)),
+            "preprocess": str(settings.value("capture/letterbox", "false")).lower()
+            == "true",
+            "tracker_snapshot_path": tracker_snapshot_path,
+        }
+
+    def __stream_recordings_dir(self) -> str:
+        return QSettings("DroneTek", "DroneLink").value(
+            "stream/recordings_dir",
+            os.path.join(os.path.expanduser("~"), "DroneLink", "stream_recordings"),
+        )
+
+    def __zones(self, key: str) -> dict:
+        """
+        Returns the counting lines and zones stored for a source in
+        "analytics/zones/<key>".
+        """
+        value = QSettings("DroneTek", "DroneLink").value(f"analytics/zones/{key}", "")
+        try:
+            return json.loads(value) if value else {}
+        except (TypeError, ValueError):
+            self.dialog_handler.show_message(
+                "Invalid Setting",
+                f"Ignoring invalid analytics/zones/{key} setting: {value}",
+            )
+            return {}
+
+    @Slot(dict)
+    def __save_zones(self, zones: dict) -> None:
+        """Stores the geometry drawn on the current source."""
+        QSettings("DroneTek", "DroneLink").setValue(
+            f"analytics/zones/{self.zones_key}", json.dumps(zones)
+        )
+
+    def __resource_profile(self) -> ThreadProfile:
+        """
+        Returns the thread profile stored as JSON in "governor/profile",
+        or one derived from the core count when it is "auto" (the
+        default); "governor/pin" enables CPU pinning for auto profiles.
+        """
+        settings = QSettings("DroneTek", "DroneLink")
+        value = settings.value("governor/profile", "auto")
+        if value and value != "auto":
+            try:
+                return ThreadProfile.from_dict(json.loads(value))
+            except (TypeError, ValueError):
+                self.dialog_handler.show_message(
+                    "Invalid Setting",
+                    f"Ignoring invalid governor/profile setting: {value}",
+                )
+        pin = str(settings.value("governor/pin", "false")).lower() == "true"
+        return ThreadProfile.auto(pin=pin)
+
+    def __reid_gallery_path(self) -> str:
+        """Returns the "reid/gallery_dir" setting (default ~/DroneLink/gallery)."""
+        return QSettings("DroneTek", "DroneLink").value(
+            "reid/gallery_dir",
+            os.path.join(os.path.expanduser("~"), "DroneLink", "gallery"),
+        )
+
+    def __toggle_recording(self, checked: bool) -> None:
+        """
+        Start or stop recording the current video into rolling segments.
+        Encoder settings come from the "recorder/*" QSettings keys.
+        """
+        player = getattr(self, "video_player", None)
+        if player is None:
+            if checked:
+                self.dialog_handler.show_message("No Video", "No video to record.")
+                self.record_action.setChecked(False)
+            return
+        if not checked:
+            player.stop_recording()
+            return
+
+        settings = QSettings("DroneTek", "DroneLink")
+        root = settings.value(
+            "recorder/dir",
+            os.path.join(os.path.expanduser("~"), "DroneLink", "recordings"),
+        )
+        output_dir = os.path.join(
+            root, player.video_id or time.strftime("%Y%m%d-%H%M%S")
+        )
+        try:
+            player.start_recording(
+                output_dir,
+                fps=30,
+                segment_seconds=float(settings.value("recorder/segment_seconds", 60)),
+                backend=settings.value("recorder/backend", "auto"),
+                codec=settings.value("recorder/codec", None) or None,
+                preset=settings.value("recorder/preset", "veryfast") or None,
+                crf=int(settings.value("recorder/crf", 23)),
+            )
+        except (IOError, ValueError) as exc:
+            self.dialog_handler.show_message("Recording Failed", str(exc))
+            self.record_action.setChecked(False)
+
+    def __toggle_event_clips(self, checked: bool) -> None:
+        """
+        Start or stop saving clips around new person sightings. Pre/post
+        durations come from the "events/*" QSettings keys.
+        """
+        player = getattr(self, "video_player", None)
+        if player is None:
+            if checked:
+                self.dialog_handler.show_message("No Video", "No video to clip.")
+                self.event_clips_action.setChecked(False)
+            return
+        if not checked:
+            player.stop_event_clips()
+            return
+
+        settings = QSettings("DroneTek", "DroneLink")
+        root = settings.value(
+            "events/dir",
+            os.path.join(os.path.expanduser("~"), "DroneLink", "events"),
+        )
+        output_dir = os.path.join(
+            root, player.video_id or time.strftime("%Y%m%d-%H%M%S")
+        )
+        player.start_event_clips(
+            output_dir,
+            fps=30,
+            pre_seconds=float(settings.value("events/pre_seconds", 5)),
+            post_seconds=float(settings.value("events/post_seconds", 10)),
+        )
+
+    def __find_person(self) -> None:
+        """
+        Ask for a track ID in the current video and list the most similar
+        people seen in other videos, using the re-identification gallery.
+        """
+        if getattr(self, "video_player", None) is None:
+            self.dialog_handler.show_message("No Video", "Open a video first.")
+            return
+        track_id, ok = QInputDialog.getInt(
+            self, "Find Person", "Track ID in the current video:", 1, 1
+        )
+        if not ok:
+            return
+
+        gallery = ReIDGallery(self.__reid_gallery_path(), save_interval=None)
+        matches = gallery.find_track(self.video_player.reid_video_id, track_id)
+        if not matches:
+            self.dialog_handler.show_message(
+                "Find Person",
+                f"No matches for track {track_id}. Appearance features are "
+                "saved periodically while a video is processed.",
+            )
+            return
+        lines = [
+            f"{m['video_id']}  track {m['track_id']}  "
+            f"similarity {m['similarity']:.2f}"
+            for m in matches
+        ]
+        self.dialog_handler.show_message("Find Person", "\n".join(lines))
+
+    def __show_resource_usage(self) -> None:
+        """
+        Show each pipeline stage's thread budget, pinned CPUs and CPU use
+        since the report was last shown.
+        """
+        player = getattr(self, "video_player", None)
+        if player is None:
+            self.dialog_handler.show_message("No Video", "Open a video first.")
+            return
+        lines = []
+        for stage, entry in player.resource_report().items():
+            usage = (
+                "measuring..."
+                if entry["cpu_percent"] is None
+                else f"{entry['cpu_percent']:.0f}% CPU "
+                f"({entry['budget_percent']:.0f}% of budget)"
+            )
+            cpus = ",".join(map(str, entry["cpus"])) if entry["cpus"] else "any"
+            lines.append(
+                f"{stage}: {entry['threads']} threads, CPUs {cpus}, {usage}"
+            )
+        self.dialog_handler.show_message("Resource Usage", "\n".join(lines))
+
+    def __show_memory(self) -> None:
+        """
+        Open the memory panel of the current video: bytes per subsystem,
+        RSS, growth and allocation snapshots.
+        """
+        player = getattr(self, "video_player", None)
+        if player is None:
+            self.dialog_handler.show_message("No Video", "Open a video first.")
+            return
+        if self.memory_panel is not None:
+            self.memory_panel.close()
+        self.memory_panel = MemoryPanel(player, self)
+        player.video_closed.connect(self.memory_panel.close)
+        self.memory_panel.show()
+
+    def __export_heatmap(self) -> None:
+        """
+        Save the session's heatmap (PNG and .npz grids) under the
+        "heatmaps/dir" setting (default ~/DroneLink/heatmaps).
+        """
+        player = getattr(self, "video_player", None)
+        if player is None:
+            self.dialog_handler.show_message("No Video", "Open a video first.")
+            return
+        directory = QSettings("DroneTek", "DroneLink").value(
+            "heatmaps/dir",
+            os.path.join(os.path.expanduser("~"), "DroneLink", "heatmaps"),
+        )
+        os.makedirs(directory, exist_ok=True)
+        paths = player.export_heatmap(
+            os.path.join(directory, f"{player.video_id or 'session'}.png")
+        )
+        if paths:
+            self.dialog_handler.show_message(
+                "Heatmap Exported", "Heatmap saved to:\n" + "\n".join(paths)
+            )
+        else:
+            self.dialog_handler.show_message("No Heatmap", "Nobody was seen yet.")
+
     def __open_settings(self) -> None:
         """
         Open the settings dialog and update the model path.
@@ -228,14 +713,17 @@ class MainApp(QMainWindow):
             settings.setValue("model", self.model_key)
             self.video_label.setText(f"Model Path: {self.model_path}")
             self.open_action.setDisabled(False)
+            self.analyze_action.setDisabled(False)
         else:
             self.open_action.setDisabled(True)
+            self.analyze_action.setDisabled(True)
 
     @Slot()
     def update_skipped_frames(self, frame_skip: int) -> None:
         """
         Update the number of skipped frames for video processing.
         """
+        self.frame_skip = frame_skip
         QSettings("DroneTek", "DroneLink").setValue("frame_skip", self.frame_skip)
         if hasattr(self, "video_player") and self.video_player is not None:
             self.video_player.set_frame_skip(self.frame_skip)
@@ -252,6 +740,7 @@ class MainApp(QMainWindow):
         """
         if not start_processors:
             return
+        analysis, self.analyze_next = self.analyze_next, False
         # Instantiate processors only when starting playback
         if file_path:
             self.meta_data = MetadataViewer(file_path)
@@ -260,7 +749,10 @@ class MainApp(QMainWindow):
                 self.archive_queue,
                 self.model_path,
                 frame_skip=self.frame_skip,
+                analysis=analysis,
+                **self.__session_options(file_path),
             )
+            self.video_player.zones_changed.connect(self.__save_zones)
             self.video_frame_layout.addWidget(self.video_player)
             self.video_frame_layout.removeWidget(self.video_label)
 
@@ -324,27 +816,43 @@ class MainApp(QMainWindow):
             )
             return
 
-        # Create ArchiveProcessor and write frames
-        archive_processor = ArchiveProcessor(file_path, 30, (960, 640))
+        # Create ArchiveProcessor and write clean frames; the detections go
+        # to a sidecar so overlays can be re-rendered with core.rerender.
+        export_size = (960, 640)
+        archive_processor = ArchiveProcessor(file_path, 30, export_size)
+        sidecar = DetectionsSidecarWriter(
+            sidecar_path_for(file_path), frame_size=list(export_size), fps=30
+        )
 
         frames_exported = 0
         while not self.archive_queue.is_empty():
-            frame = self.archive_queue.dequeue()
-            if frame is not None:
+            item = self.archive_queue.dequeue()
+            if item is not None:
+                frame, tracks, frame_index, timestamp = item
+                # Map boxes from the archived frame onto the export size.
+                h, w = frame.shape[:2]
+                tracks = scale_tracks(tracks, export_size[0] / w, export_size[1] / h)
                 # Convert from RGB to BGR if needed.
                 frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
                 # Resize frame to match the output video frame size.
-                frame = cv2.resize(frame, (960, 640))
+                frame = cv2.resize(frame, export_size)
                 archive_processor.write_frame(frame)
+                sidecar.write(tracks, frame_index, timestamp)
                 frames_exported += 1
 
         archive_processor.release()
+        sidecar.close()
+        dropped = VideoQueue.dropped() - self.archive_dropped_reported
+        self.archive_dropped_reported = VideoQueue.dropped()
 
         if frames_exported > 0:
-            self.dialog_handler.show_message(
-                "Export Complete",
-                f"Export complete: {frames_exported} frames exported.",
-            )
+            message = f"Export complete: {frames_exported} frames exported."
+            if dropped:
+                message += (
+                    f"\n{dropped} earlier frames were dropped to bound memory"
+                    " and are missing from the export."
+                )
+            self.dialog_handler.show_message("Export Complete", message)
         else:
             self.dialog_handler.show_message(
                 "Export Failed", "Failed to export frames."
@@ -361,7 +869,7 @@ if __name__ == "__main__":
     settings = QSettings("DroneTek", "DroneLink")
     # Retrieve the stored model key; default to "Default" if not set.
     model_key = settings.value("model", "Default")
-    frame_skip = settings.value("frame_skip", 3)
+    frame_skip = int(settings.value("frame_skip", 3))
     main_window = MainApp(model_key, frame_skip)
     main_window.showMaximized()
     main_window.show()
@@ -0,0 +1,109 @@
+import pytest
+
+from src.core.adaptive_resolution import ResolutionController
+from src.core.metrics import MetricsLog, read_metrics
+
+
+def controller(**kwargs):
+    options = dict(
+        min_size=320, max_size=640, target_latency_ms=100, window=5, cooldown=5
+    )
+    options.update(kwargs)
+    return ResolutionController(**options)
+
+
+def feed(ctrl, latency, frames, queue_depth=0):
+    """Returns the sizes switched to while feeding frames."""
+    switches = []
+    for i in range(frames):
+        size = ctrl.update(latency, queue_depth, frame_index=i)
+        if size is not None:
+            switches.append(size)
+    return switches
+
+
+def test_lowers_size_when_over_budget():
+    """
+    GIVEN a 100 ms budget at imgsz 640
+    WHEN frames take 120 ms
+    THEN the size is lowered one step after the cooldown.
+    """
+    ctrl = controller()
+    assert feed(ctrl, 0.120, 5) == [608]
+    assert ctrl.size == 608
+
+
+def test_far_over_budget_lowers_two_steps():
+    ctrl = controller()
+    assert feed(ctrl, 0.200, 5) == [576]
+
+
+def test_full_queue_lowers_size_within_budget():
+    ctrl = controller(queue_capacity=2)
+    assert feed(ctrl, 0.050, 5, queue_depth=2) == [608]
+
+
+def test_raises_size_with_headroom_up_to_max():
+    ctrl = controller(initial_size=512)
+    assert feed(ctrl, 0.030, 50) == [544, 576, 608, 640]
+    assert ctrl.size == 640
+
+
+def test_stays_within_bounds():
+    ctrl = controller(initial_size=352)
+    assert feed(ctrl, 0.500, 50) == [320]
+    assert ctrl.size == 320
+
+
+def test_no_switch_inside_the_dead_band():
+    ctrl = controller()
+    assert feed(ctrl, 0.075, 50) == []
+
+
+def test_backlog_blocks_raising():
+    ctrl = controller(initial_size=480, queue_capacity=4)
+    assert feed(ctrl, 0.030, 20, queue_depth=2) == []
+
+
+def test_single_frame_queue_is_not_a_backlog():
+    """
+    GIVEN a one-frame queue that the capture thread keeps full
+    WHEN frames take a tenth of the budget
+    THEN the size is not lowered, and recovers from a lower start.
+    """
+    ctrl = controller(initial_size=544, queue_capacity=1)
+    assert feed(ctrl, 0.010, 30, queue_depth=1) == [576, 608, 640]
+
+
+def test_only_a_sustained_full_queue_lowers_size():
+    ctrl = controller(queue_capacity=2)
+    for i in range(20):
+        assert ctrl.update(0.050, queue_depth=2 if i % 2 else 0) is None
+
+
+def test_sizes_snap_to_stride():
+    ctrl = controller(min_size=300, max_size=650, initial_size=500)
+    assert (ctrl.min_size, ctrl.max_size, ctrl.size) == (320, 640, 480)
+    assert controller(min_size=300, max_size=310).min_size == 288
+    with pytest.raises(ValueError):
+        ResolutionController(min_size=640, max_size=320)
+
+
+def test_switches_are_logged(tmp_path):
+    path = str(tmp_path / "metrics" / "session.jsonl")
+    metrics = MetricsLog(path)
+    ctrl = controller(metrics=metrics)
+    feed(ctrl, 0.120, 5)
+    metrics.log("other", value=1)
+    metrics.close()
+
+    records = read_metrics(path, "imgsz_switch")
+    assert len(records) == 1
+    assert records[0]["from"] == 640 and records[0]["to"] == 608
+    assert records[0]["latency_ms"] == 120.0
+    assert records[0]["budget_ms"] == 100.0
+    assert records[0]["frame_index"] == 4
+    assert ctrl.switches == [
+        {k: v for k, v in records[0].items() if k not in ("event", "time")}
+    ]
+    assert len(read_metrics(path)) == 2
@@ -0,0 +1,129 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import src.core.auto_tuner as tuner_module
+from src.core.auto_tuner import AutoTuner, load_sample_frames
+
+# Simulated per-frame CPU latency in seconds for (model, imgsz).
+LATENCY = {
+    ("large", 640): 0.200,
+    ("large", 320): 0.080,
+    ("small", 640): 0.050,
+    ("small", 320): 0.020,
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+def make_factory(clock, created):
+    class FakeModel:
+        def __init__(self, path, imgsz, backend):
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.cost = LATENCY[(name, imgsz)] / (4 if backend == "gpu" else 1)
+            self.closed = False
+            created.append(self)
+
+        def process_frame(self, frame, frame_index, timestamp):
+            clock.now += self.cost
+            return []
+
+        def close(self):
+            self.closed = True
+
+    return FakeModel
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tuner_module.time, "perf_counter", clock.perf_counter)
+    return clock
+
+
+def frames(n=10):
+    return [np.zeros((8, 8, 3), dtype=np.uint8)] * n
+
+
+def tuner(fake_time, created, target_fps, backends=("cpu",), weights=None):
+    return AutoTuner(
+        weights or {"large": "large", "small": "small"},
+        imgsz_options=(320, 640),
+        frame_skips=(1, 2, 3, 4),
+        backends=backends,
+        target_fps=target_fps,
+        model_factory=make_factory(fake_time, created),
+    )
+
+
+def test_picks_most_accurate_configuration_meeting_target(fake_time, tmp_path):
+    """
+    GIVEN a large model needing 200 ms at imgsz 640 and 80 ms at 320
+    WHEN tuning for 12 FPS
+    THEN the large model at 640 is too slow even at skip 2 (10 FPS) but
+    meets the target at skip 3 (15 FPS), which beats a smaller model.
+    """
+    large = tmp_path / "large.pt"
+    large.write_bytes(b"x" * 100)
+    small = tmp_path / "small.pt"
+    small.write_bytes(b"x" * 10)
+    created = []
+    # Listed small first: the larger weights file ranks as more accurate.
+    weights = {"small": str(small), "large": str(large)}
+    result = tuner(fake_time, created, 12, weights=weights).run(frames())
+    best = result["best"]
+    assert (best["model"], best["imgsz"], best["frame_skip"]) == ("large", 640, 3)
+    assert best["latency_ms"] == pytest.approx(200)
+    assert best["sustained_fps"] == pytest.approx(15)
+    assert best["meets_target"]
+    # 2 models x 2 sizes x 1 backend measured, 4 skips each.
+    assert len(created) == 4 and all(m.closed for m in created)
+    assert len(result["results"]) == 16
+
+
+def test_faster_backend_allows_smaller_skip(fake_time):
+    created = []
+    auto = tuner(fake_time, created, 12, backends=("cpu", "gpu"))
+    best = auto.run(frames())["best"]
+    # On the GPU the large model takes 50 ms: 20 FPS without skipping.
+    assert (best["model"], best["imgsz"], best["backend"]) == ("large", 640, "gpu")
+    assert best["frame_skip"] == 1
+
+
+def test_falls_back_to_fastest_when_target_unreachable(fake_time):
+    best = tuner(fake_time, [], 1000).run(frames())["best"]
+    assert not best["meets_target"]
+    assert (best["model"], best["imgsz"], best["frame_skip"]) == ("small", 320, 4)
+
+
+def test_decode_rate_caps_sustained_fps(fake_time):
+    result = tuner(fake_time, [], 30).run(frames(), decode_fps=25)
+    assert max(r["sustained_fps"] for r in result["results"]) == 25
+    assert not result["best"]["meets_target"]
+
+
+def test_progress_reports_each_measured_configuration(fake_time):
+    seen = []
+    tuner(fake_time, [], 10).run(
+        frames(), on_progress=lambda done, total, m: seen.append((done, total))
+    )
+    assert seen == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_load_sample_frames_limits_count(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (16, 16))
+    for _ in range(12):
+        writer.write(np.zeros((16, 16, 3), np.uint8))
+    writer.release()
+    assert len(load_sample_frames(path, max_frames=5)) == 5
+    with pytest.raises(IOError):
+        load_sample_frames(str(tmp_path / "missing.mp4"))
@@ -0,0 +1,109 @@
+import asyncio
+import queue
+import threading
+import time
+
+import pytest
+
+from src.core.pipeline.channel import (
+    BLOCK,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    AsyncChannel,
+    Channel,
+    ChannelClosed,
+)
+
+
+def drain(channel):
+    items = []
+    while True:
+        try:
+            items.append(channel.get(timeout=0))
+        except (queue.Empty, ChannelClosed):
+            return items
+
+
+def test_drop_oldest_keeps_newest_items():
+    channel = Channel(2, DROP_OLDEST)
+    assert [channel.put(i) for i in range(5)] == [True] * 5
+    assert drain(channel) == [3, 4]
+    assert channel.stats()["dropped"] == 3
+
+
+def test_drop_newest_keeps_backlog():
+    channel = Channel(2, DROP_NEWEST)
+    assert [channel.put(i) for i in range(4)] == [True, True, False, False]
+    assert drain(channel) == [0, 1]
+    assert channel.stats()["dropped"] == 2
+
+
+def test_block_waits_for_consumer():
+    """
+    GIVEN a full blocking channel
+    WHEN a producer puts another item
+    THEN it waits until the consumer takes one, and times out otherwise.
+    """
+    channel = Channel(1, BLOCK)
+    channel.put("a")
+    assert channel.put("b", timeout=0.05) is False
+
+    threading.Timer(0.05, channel.get).start()
+    start = time.monotonic()
+    assert channel.put("c", timeout=2) is True
+    assert time.monotonic() - start >= 0.04
+    assert drain(channel) == ["c"]
+
+
+def test_close_drains_then_raises_and_wakes_blocked_producer():
+    channel = Channel(1, BLOCK)
+    channel.put(1)
+    errors = []
+
+    def produce():
+        try:
+            channel.put(2)
+        except ChannelClosed:
+            errors.append("closed")
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    time.sleep(0.05)
+    channel.close()
+    producer.join(1)
+    assert errors == ["closed"]
+    assert channel.get() == 1
+    with pytest.raises(ChannelClosed):
+        channel.get()
+    with pytest.raises(queue.Empty):
+        Channel().get(timeout=0.01)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        Channel(0)
+    with pytest.raises(ValueError):
+        Channel(1, "spill")
+
+
+def test_async_channel_policies_and_close():
+    async def scenario():
+        blocking = AsyncChannel(1, BLOCK)
+        await blocking.put(1)
+        waiter = asyncio.ensure_future(blocking.put(2))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert await blocking.get() == 1
+        await waiter
+        assert await blocking.get() == 2
+
+        dropping = AsyncChannel(1, DROP_OLDEST)
+        for i in range(3):
+            await dropping.put(i)
+        await dropping.close()
+        assert await dropping.get() == 2
+        with pytest.raises(ChannelClosed):
+            await dropping.get()
+        return dropping.stats()
+
+    assert asyncio.run(scenario())["dropped"] == 2
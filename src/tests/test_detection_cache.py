@@ -0,0 +1,79 @@
+import numpy as np
+
+from src.core.detection_cache import (
+    ROW_OVERHEAD,
+    DetectionCache,
+    cache_key,
+    video_hash,
+    weights_hash,
+)
+
+
+def dets(n, value=1.0):
+    return np.full((n, 5), value, dtype=np.float32)
+
+
+def test_put_get_round_trip_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = DetectionCache(path)
+    cache.put("a", dets(3, 2.5))
+    cache.put("empty", dets(0))
+    assert cache.get("missing") is None
+    cache.close()
+
+    cache = DetectionCache(path)
+    np.testing.assert_array_equal(cache.get("a"), dets(3, 2.5))
+    assert cache.get("empty").shape == (0, 5)
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 0,
+        "entries": 2,
+        "bytes": 3 * 5 * 4 + 2 * ROW_OVERHEAD,
+    }
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """
+    GIVEN a cache that fits about three entries
+    WHEN a fourth is added after reading the oldest
+    THEN the least recently used entry is evicted.
+    """
+    entry = 10 * 5 * 4 + ROW_OVERHEAD
+    cache = DetectionCache(str(tmp_path / "c.sqlite"), max_bytes=int(entry * 3.5))
+    for key in ("a", "b", "c"):
+        cache.put(key, dets(10))
+    cache.get("a")
+    cache.put("d", dets(10))
+
+    assert cache.get("b") is None
+    assert all(cache.get(k) is not None for k in ("a", "c", "d"))
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    cache.close()
+
+
+def test_key_changes_with_every_configuration_part():
+    base = ("vid", 7, "weights", 640, [0], 0.2)
+    keys = {
+        cache_key(*base),
+        cache_key("other", 7, "weights", 640, [0], 0.2),
+        cache_key("vid", 8, "weights", 640, [0], 0.2),
+        cache_key("vid", 7, "other", 640, [0], 0.2),
+        cache_key("vid", 7, "weights", 320, [0], 0.2),
+        cache_key("vid", 7, "weights", 640, [0, 2], 0.2),
+        cache_key("vid", 7, "weights", 640, [0], 0.3),
+    }
+    assert len(keys) == 7
+    assert cache_key(*base) == cache_key("vid", 7, "weights", 640, (0,), 0.2)
+
+
+def test_video_hash_follows_content_not_name(tmp_path):
+    data = np.random.default_rng(0).bytes(3 << 20)
+    first, copy, edited = (tmp_path / n for n in ("a.mp4", "b.mp4", "c.mp4"))
+    first.write_bytes(data)
+    copy.write_bytes(data)
+    edited.write_bytes(data[:-1] + b"x")
+
+    assert video_hash(str(first)) == video_hash(str(copy))
+    assert video_hash(str(first)) != video_hash(str(edited))
+    assert weights_hash(str(first)) == weights_hash(str(copy))
@@ -0,0 +1,160 @@
+import os
+
+import cv2
+import numpy as np
+
+from src.core.event_clipper import EventClipper
+from src.core.video_utils.detections_sidecar import read_detections_sidecar
+
+
+def frame(value=0, size=(32, 24)):
+    return np.full((size[1], size[0], 3), value, dtype=np.uint8)
+
+
+def person(track_id, x=4):
+    return {"bbox": [x, 2, 8, 16], "track_id": str(track_id)}
+
+
+def push_all(clipper, tracks_per_frame):
+    for i, tracks in enumerate(tracks_per_frame):
+        clipper.push(frame(i), tracks, frame_index=i, timestamp=i / 10)
+
+
+def clip_records(output_dir, name):
+    return read_detections_sidecar(os.path.join(output_dir, name + ".detections.jsonl"))
+
+
+def test_new_track_writes_pre_and_post_buffer(tmp_path):
+    """
+    GIVEN 1 s of pre-roll and 1 s of post-roll at 10 fps
+    WHEN a track first appears at frame 30 of 60
+    THEN one clip holding frames 20-40 is written with its detections.
+    """
+    out = str(tmp_path)
+    clipper = EventClipper(out, fps=10, pre_seconds=1, post_seconds=1)
+    push_all(clipper, [[person(1)] if 30 <= i < 35 else [] for i in range(60)])
+    clipper.close()
+
+    assert clipper.clips == [os.path.join(out, "event_0000.mp4")]
+    header, records = clip_records(out, "event_0000")
+    assert header["trigger_track_ids"] == ["1"]
+    assert header["frame_size"] == [32, 24]
+    assert [r["source_frame"] for r in records] == list(range(20, 41))
+    assert [r["frame"] for r in records] == list(range(21))
+    assert records[10]["tracks"] == [{"bbox": [4.0, 2.0, 8.0, 16.0], "track_id": "1"}]
+    assert records[10]["timestamp"] == 3.0
+
+    cap = cv2.VideoCapture(clipper.clips[0])
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 21
+    cap.release()
+
+
+def test_durations_follow_timestamps_at_a_low_processing_rate(tmp_path):
+    """
+    GIVEN 30 fps clips with 1 s of pre-roll and post-roll
+    WHEN frames are processed at only 5 fps and a track appears at 6 s
+    THEN the clip spans 5-7 s of source time, 2 s of video, with every
+    frame held for six video frames.
+    """
+    out = str(tmp_path)
+    clipper = EventClipper(out, fps=30, pre_seconds=1, post_seconds=1)
+    for i in range(60):
+        tracks = [person(1)] if i == 30 else []
+        clipper.push(frame(i), tracks, frame_index=6 * i, timestamp=i / 5)
+    clipper.close()
+
+    header, records = clip_records(out, "event_0000")
+    assert header["fps"] == 30
+    sources = [r["source_frame"] for r in records]
+    assert sources == [6 * i for i in range(25, 35) for _ in range(6)] + [6 * 35]
+    assert [r["frame"] for r in records] == list(range(61))
+    cap = cv2.VideoCapture(clipper.clips[0])
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 61
+    cap.release()
+
+
+def test_overlapping_events_are_merged(tmp_path):
+    """
+    GIVEN a second person appearing shortly after the first clip ends
+    WHEN frames are pushed
+    THEN a single clip covers both sightings.
+    """
+    out = str(tmp_path)
+    clipper = EventClipper(out, fps=10, pre_seconds=1, post_seconds=1)
+    tracks = [[] for _ in range(80)]
+    tracks[20] = [person(1)]
+    tracks[35] = [person(2)]
+    push_all(clipper, tracks)
+    clipper.close()
+
+    assert len(clipper.clips) == 1
+    header, records = clip_records(out, "event_0000")
+    assert header["trigger_track_ids"] == ["1", "2"]
+    assert [r["source_frame"] for r in records] == list(range(10, 46))
+
+
+def test_separate_events_do_not_share_frames(tmp_path):
+    out = str(tmp_path)
+    clipper = EventClipper(out, fps=10, pre_seconds=1, post_seconds=1)
+    tracks = [[] for _ in range(80)]
+    tracks[20] = [person(1)]
+    tracks[60] = [person(2)]
+    push_all(clipper, tracks)
+    clipper.close()
+
+    assert len(clipper.clips) == 2
+    first = [r["source_frame"] for r in clip_records(out, "event_0000")[1]]
+    second = [r["source_frame"] for r in clip_records(out, "event_0001")[1]]
+    assert first == list(range(10, 31))
+    assert second == list(range(50, 71))
+
+
+def test_known_tracks_do_not_trigger_again(tmp_path):
+    clipper = EventClipper(str(tmp_path), fps=10, pre_seconds=1, post_seconds=1)
+    push_all(clipper, [[person(1)] for _ in range(60)])
+    clipper.close()
+    assert len(clipper.clips) == 1
+
+
+def test_open_event_is_written_on_close_and_long_events_split(tmp_path):
+    out = str(tmp_path)
+    clipper = EventClipper(
+        out, fps=10, pre_seconds=1, post_seconds=1, max_clip_seconds=3
+    )
+    # A new person every half second keeps the event open.
+    push_all(clipper, [[person(i // 5)] for i in range(70)])
+    assert clipper.stats()["event_open"]
+    clipper.close()
+
+    frames = []
+    for i in range(len(clipper.clips)):
+        frames += [r["source_frame"] for r in clip_records(out, f"event_{i:04d}")[1]]
+    assert len(clipper.clips) == 3
+    assert frames == list(range(70))
+
+
+def test_ring_buffer_holds_compressed_frames(tmp_path):
+    clipper = EventClipper(str(tmp_path), fps=10, pre_seconds=2, post_seconds=1)
+    for i in range(100):
+        clipper.push(frame(i, size=(320, 240)), [])
+    stats = clipper.stats()
+    clipper.close()
+
+    assert stats["buffered_frames"] == 20
+    assert stats["buffered_bytes"] < 20 * 320 * 240 * 3 / 10
+    assert clipper.clips == []
+
+
+def test_rgb_input_is_written_as_bgr(tmp_path):
+    clipper = EventClipper(
+        str(tmp_path), fps=10, pre_seconds=1, post_seconds=1, rgb_input=True
+    )
+    rgb = np.zeros((24, 32, 3), dtype=np.uint8)
+    rgb[..., 0] = 255
+    clipper.push(rgb, [person(1)])
+    clipper.close()
+
+    cap = cv2.VideoCapture(clipper.clips[0])
+    ok, bgr = cap.read()
+    cap.release()
+    assert ok and bgr[12, 16, 2] > 200 and bgr[12, 16, 0] < 50
@@ -0,0 +1,138 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.core.frame_cache import FrameCache, FramePrefetcher
+
+
+def frame_of(value, shape=(10, 10, 3)):
+    return np.full(shape, value, np.uint8)
+
+
+@pytest.fixture
+def numbered_clip(tmp_path):
+    """60 frames at 10 FPS whose brightness encodes the frame number."""
+    path = str(tmp_path / "numbered.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(60):
+        writer.write(frame_of(i * 4, (48, 64, 3)))
+    writer.release()
+    return path
+
+
+def frame_number(frame):
+    return int(round(frame.mean() / 4))
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    """
+    GIVEN a cache holding three 300-byte frames
+    WHEN an older frame is read and a fourth one is added
+    THEN the least recently used frame is evicted, not the one read.
+    """
+    cache = FrameCache(max_bytes=900)
+    for i in range(3):
+        cache.put(i, frame_of(i), timestamp=i / 10)
+    assert cache.get(0).timestamp == 0.0
+    cache.put(3, frame_of(3), timestamp=0.3)
+
+    assert 1 not in cache
+    assert all(i in cache for i in (0, 2, 3))
+    assert cache.nbytes == 900
+    assert cache.stats()["evictions"] == 1
+
+
+def test_replacing_a_frame_keeps_the_size_accounting():
+    cache = FrameCache(max_bytes=1000)
+    cache.put(5, frame_of(1), 0.5)
+    cache.put(5, frame_of(2, (5, 10, 3)), 0.5, scale=0.5)
+    assert len(cache) == 1 and cache.nbytes == 150
+    assert cache.get(5).scale == 0.5
+    assert cache.get(6) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_tracks_outlive_frames_and_cover_skipped_frames():
+    """
+    GIVEN a worker that processed every third frame
+    WHEN tracks are looked up for a skipped frame after its pixels were evicted
+    THEN the tracks of the preceding processed frame are returned, but
+    only within the skip distance.
+    """
+    cache = FrameCache(max_bytes=300)
+    tracks = [{"track_id": 7, "bbox": [1, 2, 3, 4]}]
+    cache.put(3, frame_of(3), 0.3, tracks=tracks)
+    cache.put(4, frame_of(4), 0.4)
+
+    assert 3 not in cache
+    assert cache.tracks_at(3) == tracks
+    assert cache.tracks_at(5, max_distance=3) == tracks
+    assert cache.tracks_at(5) is None
+    assert cache.tracks_at(7, max_distance=3) is None
+
+
+def test_prefetch_decodes_around_the_playhead(numbered_clip):
+    """
+    GIVEN a prefetcher positioned in the middle of a clip
+    WHEN it has filled its window
+    THEN the frames ahead and behind are cached with the right content,
+    reached with one seek for each direction.
+    """
+    cache = FrameCache(max_bytes=64 << 20)
+    prefetcher = FramePrefetcher(numbered_clip, cache, ahead=5, behind=4)
+    try:
+        prefetcher.set_playhead(30)
+        assert prefetcher.wait_idle(timeout=10)
+    finally:
+        prefetcher.close()
+
+    assert sorted(cache._frames) == list(range(26, 36))
+    for i in range(26, 36):
+        assert frame_number(cache.get(i).frame) == i
+    assert cache.get(30).timestamp == pytest.approx(3.0, abs=0.11)
+    assert prefetcher.decoded == 10
+    assert prefetcher.seeks == 2
+
+
+def test_prefetch_skips_cached_frames_and_stops_at_the_end(numbered_clip):
+    cache = FrameCache(max_bytes=64 << 20)
+    cache.put(57, frame_of(0), 5.7)
+    prefetcher = FramePrefetcher(numbered_clip, cache, ahead=10, behind=2)
+    try:
+        prefetcher.set_playhead(56)
+        assert prefetcher.wait_idle(timeout=10)
+    finally:
+        prefetcher.close()
+
+    assert sorted(cache._frames) == list(range(54, 60))
+    # The cached frame was not decoded again.
+    assert frame_number(cache.get(57).frame) == 0
+    assert prefetcher.decoded == 5
+
+
+def test_prefetch_window_shrinks_to_the_cache_and_prepares_frames(numbered_clip):
+    """
+    GIVEN a cache with room for six prepared frames and a larger window
+    WHEN the prefetcher runs
+    THEN it decodes only what fits, so the window never evicts itself,
+    and caches frames as returned by prepare.
+    """
+    small = (12, 16, 3)
+    cache = FrameCache(max_bytes=6 * int(np.prod(small)))
+    reported = []
+
+    def prepare(frame):
+        return cv2.resize(frame, (16, 12)), 0.25
+
+    prefetcher = FramePrefetcher(
+        numbered_clip, cache, prepare=prepare, on_frame=reported.append, ahead=20, behind=20
+    )
+    try:
+        prefetcher.set_playhead(10)
+        assert prefetcher.wait_idle(timeout=10)
+    finally:
+        prefetcher.close()
+
+    assert 10 in cache and len(cache) <= 6
+    assert cache.get(10).frame.shape == small and cache.get(10).scale == 0.25
+    assert all(i in cache for i in reported[-len(cache):])
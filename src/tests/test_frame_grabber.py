@@ -0,0 +1,142 @@
+import threading
+import time
+
+import numpy as np
+
+from src.core.video_utils.frame_grabber import FrameGrabber
+
+
+class FakeCapture:
+    """Capture that yields n frames then reports a failed read."""
+
+    def __init__(self, n_frames, value=0, opened=True, delay=0.0):
+        self._remaining = n_frames
+        self._value = value
+        self._opened = opened
+        self._delay = delay
+        self.released = False
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self):
+        if self._delay:
+            time.sleep(self._delay)
+        if self._remaining <= 0:
+            return False, None
+        self._remaining -= 1
+        return True, np.full((2, 2, 3), self._value, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_read_returns_newest_frame_and_counts_drops():
+    """
+    GIVEN a fast source and a consumer that does not read for a while
+    WHEN the consumer reads
+    THEN it gets the newest frame and the skipped ones are counted as drops.
+    """
+    gate = threading.Event()
+
+    class CountingCapture(FakeCapture):
+        def __init__(self):
+            super().__init__(n_frames=0)
+            self.i = 0
+
+        def read(self):
+            if self.i >= 5:
+                gate.wait()
+                return False, None
+            self.i += 1
+            return True, np.full((2, 2, 3), self.i, dtype=np.uint8)
+
+    grabber = FrameGrabber(CountingCapture, max_retries=0).start()
+    assert wait_until(lambda: grabber.stats()["frames_grabbed"] == 5)
+
+    frame = grabber.read(timeout=1.0)
+    assert frame[0, 0, 0] == 5
+    stats = grabber.stats()
+    assert stats["frames_dropped"] == 4
+    assert stats["frames_read"] == 1
+
+    # No newer frame has arrived, so a second read times out.
+    assert grabber.read(timeout=0.05) is None
+    gate.set()
+    grabber.stop()
+
+
+def test_reconnects_with_backoff_after_disconnect():
+    """
+    GIVEN a source that disconnects after two frames
+    WHEN the grabber keeps running
+    THEN it reopens the source and continues delivering frames.
+    """
+    opened = []
+
+    def open_capture():
+        cap = FakeCapture(n_frames=2, value=len(opened), delay=0.001)
+        opened.append(cap)
+        return cap
+
+    grabber = FrameGrabber(open_capture, initial_backoff=0.01, max_backoff=0.02)
+    grabber.start()
+    assert wait_until(lambda: grabber.stats()["reconnects"] >= 2)
+    grabber.stop()
+
+    assert len(opened) >= 3
+    # Every capture that disconnected was released.
+    assert all(cap.released for cap in opened[:-1])
+    assert grabber.stats()["connected"] is False
+
+
+def test_gives_up_after_max_retries_and_read_returns_none():
+    """
+    GIVEN a source that never opens
+    WHEN max_retries is exhausted
+    THEN read() returns None instead of blocking forever.
+    """
+    attempts = []
+
+    def open_capture():
+        attempts.append(1)
+        return FakeCapture(0, opened=False)
+
+    grabber = FrameGrabber(
+        open_capture, initial_backoff=0.001, max_retries=2
+    ).start()
+    assert grabber.read(timeout=2.0) is None
+    assert len(attempts) == 3
+    assert grabber.stats()["reconnects"] == 2
+
+
+def test_stop_unblocks_waiting_reader():
+    """
+    GIVEN a reader blocked waiting for a frame
+    WHEN the grabber is stopped
+    THEN the reader returns None.
+    """
+    grabber = FrameGrabber(
+        lambda: FakeCapture(0, opened=False), initial_backoff=10.0
+    ).start()
+    result = {}
+
+    def reader():
+        result["frame"] = grabber.read()
+
+    t = threading.Thread(target=reader)
+    t.start()
+    time.sleep(0.05)
+    grabber.stop()
+    t.join(1.0)
+    assert not t.is_alive()
+    assert result["frame"] is None
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from src.core.analytics.heatmap import Heatmap
+from src.core.pipeline.stages import HeatmapStage, Packet
+
+
+def person(track_id, x, y, w=10, h=20):
+    return {"track_id": track_id, "bbox": [x, y, w, h]}
+
+
+def test_tracks_accumulate_at_their_foot_point():
+    """
+    GIVEN a 100 x 60 frame in 20 px cells
+    WHEN a person stands still for four frames at 10 FPS
+    THEN occupancy counts every frame, dwell sums the time between them
+    and visits counts one entry, all in the cell under their feet.
+    """
+    heatmap = Heatmap((100, 60), cell_size=20)
+    assert heatmap.grid_size == (5, 3)
+    for i in range(4):
+        heatmap.update([person(1, 25, 10)], timestamp=i / 10)
+
+    # Foot point (30, 30): column 1, row 1.
+    assert heatmap.occupancy[1, 1] == 4
+    assert heatmap.dwell[1, 1] == pytest.approx(0.3)
+    assert heatmap.visits[1, 1] == 1
+    assert heatmap.occupancy.sum() == 4 and heatmap.frames == 4
+
+
+def test_moving_track_visits_cells_and_gaps_add_no_dwell():
+    heatmap = Heatmap((100, 60), cell_size=20, max_gap=1.0)
+    heatmap.update([person(1, 5, 0)], 0.0)
+    heatmap.update([person(1, 45, 0)], 0.1)
+    heatmap.update([person(1, 5, 0)], 0.2)
+    # Seen again after a long gap in the same cell: no dwell for the gap.
+    heatmap.update([person(1, 5, 0)], 5.0)
+
+    assert heatmap.visits[1, 0] == 2 and heatmap.visits[1, 2] == 1
+    assert heatmap.dwell[1, 2] == pytest.approx(0.1)
+    assert heatmap.dwell[1, 0] == pytest.approx(0.1)
+    # Boxes outside the frame are clamped to the border cells.
+    heatmap.update([person(2, 500, 500)], 5.1)
+    assert heatmap.occupancy[2, 4] == 1
+
+
+def test_frames_replayed_after_a_seek_back_count_once():
+    """
+    GIVEN frames 0-9 of a person standing still, added with their index
+    WHEN playback seeks back to frame 5 and plays on to frame 14
+    THEN frames 5-9 are not added again and counting resumes at frame 10.
+    """
+    heatmap = Heatmap((100, 60), cell_size=20)
+    for i in range(10):
+        assert heatmap.update([person(1, 25, 10)], i / 10, frame_index=i)
+    added = [heatmap.update([person(1, 25, 10)], i / 10, i) for i in range(5, 15)]
+
+    assert added == [False] * 5 + [True] * 5
+    assert heatmap.occupancy[1, 1] == 15 and heatmap.frames == 15
+    assert heatmap.visits[1, 1] == 1
+    assert heatmap.dwell[1, 1] == pytest.approx(1.4)
+
+
+def test_blend_draws_only_where_people_were_seen():
+    heatmap = Heatmap((100, 60), cell_size=20)
+    heatmap.update([person(1, 85, 40)], 0.0)
+    frame = np.full((30, 50, 3), 50, np.uint8)
+    heatmap.blend(frame, rgb=True)
+
+    # Display-size frame: the bottom-right cell maps to its corner.
+    assert not np.array_equal(frame[-1, -1], [50, 50, 50])
+    np.testing.assert_array_equal(frame[0, 0], [50, 50, 50])
+    assert heatmap.render("visits").shape == (60, 100, 3)
+    with pytest.raises(ValueError):
+        heatmap.grid("speed")
+
+
+def test_save_and_load_round_trip(tmp_path):
+    heatmap = Heatmap((64, 48), cell_size=16)
+    heatmap.update([person(1, 10, 10), person(2, 40, 20)], 0.0)
+    heatmap.update([person(1, 10, 10)], 0.5)
+    heatmap.save(str(tmp_path / "map.npz"))
+    heatmap.export_image(str(tmp_path / "map.png"))
+
+    loaded = Heatmap.load(str(tmp_path / "map.npz"))
+    assert loaded.frame_size == (64, 48) and loaded.cell_size == 16
+    assert loaded.frames == 2
+    for kind in ("occupancy", "dwell", "visits"):
+        np.testing.assert_array_equal(loaded.grid(kind), heatmap.grid(kind))
+    assert (tmp_path / "map.png").stat().st_size > 0
+
+
+def test_heatmap_stage_sizes_the_map_from_the_first_packet():
+    stage = HeatmapStage(cell_size=10)
+    packet = Packet(0, 0.0, np.zeros((40, 80, 3), np.uint8))
+    packet.tracks = [person(3, 30, 10)]
+    assert stage.process(packet) is packet
+    assert stage.heatmap.grid_size == (8, 4)
+    assert stage.heatmap.occupancy[3, 3] == 1
@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.core.video_utils.letterbox import (
+    Letterbox,
+    boxes_to_model,
+    boxes_to_source,
+    ltwh_to_source,
+)
+
+
+def test_4k_frames_shrink_more_than_tenfold():
+    """
+    GIVEN a 3840 x 2160 frame and a 640 model input
+    WHEN it is letterboxed
+    THEN the buffer is 640 x 640 with the frame centred between grey bars,
+    a twentieth of the bytes, and boxes map back to source pixels.
+    """
+    frame = np.zeros((2160, 3840, 3), np.uint8)
+    frame[:, :1920] = 255
+    letterbox = Letterbox(640)
+    buffer, transform = letterbox(frame)
+
+    assert buffer.shape == (640, 640, 3)
+    assert frame.nbytes / buffer.nbytes > 10
+    scale, pad_x, pad_y = transform
+    assert (pad_x, pad_y) == (0, 140) and scale == 640 / 3840
+    assert (buffer[:140] == Letterbox.PAD_VALUE).all()
+    assert (buffer[140:500, :320] == 255).all() and (buffer[140:500, 321:] == 0).all()
+
+    assert ltwh_to_source([320, 140, 64, 36], transform) == [1920, 0, 384, 216]
+    raw = np.array([[320, 140, 384, 176, 0.5]], np.float32)
+    back = boxes_to_model(boxes_to_source(raw, transform), transform)
+    np.testing.assert_allclose(back, raw, rtol=1e-5)
+
+
+def test_buffers_are_reused_in_turn_and_small_frames_pass_through():
+    letterbox = Letterbox(64, buffers=2)
+    a, _ = letterbox(np.zeros((128, 256, 3), np.uint8))
+    b, _ = letterbox(np.zeros((256, 128, 3), np.uint8))
+    c, transform = letterbox(np.full((256, 128, 3), 7, np.uint8))
+    assert a is c and a is not b
+    # Repainted for the new layout: no stale image from the wide frame.
+    assert (c[:, :16] == Letterbox.PAD_VALUE).all() and (c[:, 16:48] == 7).all()
+    assert transform == (0.25, 16, 0)
+
+    small = np.zeros((48, 64, 3), np.uint8)
+    same, none = letterbox(small)
+    assert same is small and none is None
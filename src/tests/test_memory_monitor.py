@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from src.core.frame_cache import FrameCache
+from src.core.memory_monitor import MB, MemoryMonitor
+from src.core.metrics import MetricsLog, read_metrics
+
+
+def test_sample_accounts_subsystems_against_rss():
+    monitor = MemoryMonitor()
+    held = np.ones(4 * MB, np.uint8)
+    monitor.register("buffer", lambda: held.nbytes)
+    monitor.register("broken", lambda: 1 / 0)
+    monitor.add_processes("workers", lambda: [])
+
+    record = monitor.sample(now=0.0)
+    assert record["subsystems"] == {"buffer": 4 * MB, "broken": 0}
+    assert record["rss"] >= 4 * MB
+    assert record["unaccounted"] == record["rss"] - 4 * MB
+    assert record["processes"] == {"workers": 0}
+    assert record["total"] == record["rss"] and monitor.last is record
+
+
+def test_over_the_ceiling_sheds_in_order(tmp_path):
+    """
+    GIVEN a ceiling far below the process RSS, an archive buffer of 3 MB
+    and a frame cache of 8 MB
+    WHEN a sample is taken
+    THEN the archive buffer is shed first, then the cache, and the shed
+    is logged.
+    """
+    cache = FrameCache(max_bytes=64 * MB)
+    for i in range(8):
+        cache.put(i, np.zeros(MB, np.uint8), i / 30)
+    archive = [3 * MB]
+
+    def shed_archive(target):
+        freed, archive[0] = archive[0], 0
+        return freed
+
+    metrics = MetricsLog(str(tmp_path / "metrics.jsonl"))
+    monitor = MemoryMonitor(ceiling_mb=1, metrics=metrics)
+    monitor.add_shedder("archive_queue", shed_archive)
+    monitor.add_shedder("frame_cache", cache.shed)
+    monitor.sample(now=0.0)
+    metrics.close()
+
+    assert archive[0] == 0 and len(cache) == 0
+    assert cache.tracks_at(0) is None and cache.stats()["evictions"] == 8
+    (event,) = read_metrics(str(tmp_path / "metrics.jsonl"), "memory_shed")
+    assert event["freed_mb"] == {"archive_queue": 3.0, "frame_cache": 8.0}
+    assert monitor.shed_count == 1
+
+    # Nothing left to free: not recorded again.
+    monitor.sample(now=1.0)
+    assert monitor.shed_count == 1
+
+
+def test_growth_is_the_trend_of_the_total():
+    monitor = MemoryMonitor()
+    assert monitor.growth() is None
+    for t in range(10):
+        monitor.history.append((float(t), 100 * MB + t * MB + (MB if t % 2 else 0)))
+    assert monitor.growth() == pytest.approx(MB, rel=0.1)
+
+
+def test_snapshot_diff_finds_growing_allocations():
+    monitor = MemoryMonitor()
+    assert monitor.snapshot_diff() == []
+    monitor.start_trace(frames=1)
+    try:
+        leak = [bytearray(10_000) for _ in range(100)]
+        diff = monitor.snapshot_diff(limit=5)
+        assert diff[0]["size_diff"] >= 1_000_000
+        assert __file__ in diff[0]["location"]
+        assert len(leak) == 100
+    finally:
+        monitor.close()
+    assert not monitor.tracing
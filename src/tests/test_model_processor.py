@@ -193,3 +193,208 @@ def test_torch_no_grad_context_applied(monkeypatch):
     m = Model("dummy.pt")
     # If torch.is_grad_enabled() is True inside the call, assertion fails
     _ = m.process_frame(np.zeros((10, 10, 3), dtype=np.uint8))
+
+
+class RecordingStore:
+    """Collects TrackStore.append calls."""
+
+    def __init__(self, existing_ids=()):
+        self.rows = []
+        self._existing_ids = list(existing_ids)
+
+    def track_ids(self):
+        return self._existing_ids
+
+    def append(self, frame_index, timestamp, track_ids, boxes, confidences):
+        self.rows.append((frame_index, timestamp, track_ids, boxes, confidences))
+
+
+def test_process_frame_appends_confirmed_tracks_to_store(monkeypatch):
+    """
+    With a track store, process_frame should append only confirmed tracks
+    with their frame index, timestamp and detection confidence.
+    """
+    monkeypatch.setattr(model_module, "YOLO", lambda path: (lambda frame, **kw: []))
+    fake_tracker = FakeTracker(5, 20, 0.5)
+    confirmed = FakeTrack([1, 2, 3, 4], track_id="3", confirmed=True)
+    confirmed.det_conf = 0.8
+    fake_tracker._tracks_to_return = [
+        confirmed,
+        FakeTrack([5, 5, 3, 3], track_id="4", confirmed=False),
+    ]
+    monkeypatch.setattr(model_module, "DeepSort", lambda *a, **kw: fake_tracker)
+
+    store = RecordingStore()
+    m = Model("dummy.pt", track_store=store)
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    m.process_frame(frame, frame_index=12, timestamp=1.5)
+    # Without an explicit index the model's own frame counter is used.
+    m.process_frame(frame)
+
+    assert store.rows[0] == (12, 1.5, ["3"], [[1, 2, 3, 4]], [0.8])
+    assert store.rows[1][0] == 1
+
+
+def test_track_ids_continue_after_existing_store_ids(monkeypatch):
+    """
+    A model writing to a store that already holds tracks should start its
+    tracker IDs after the highest stored ID.
+    """
+
+    class InnerTracker:
+        _next_id = 1
+
+    fake_tracker = FakeTracker(5, 20, 0.5)
+    fake_tracker.tracker = InnerTracker()
+    monkeypatch.setattr(model_module, "YOLO", lambda path: None)
+    monkeypatch.setattr(model_module, "DeepSort", lambda *a, **kw: fake_tracker)
+
+    Model("dummy.pt", track_store=RecordingStore(existing_ids=[3, 17]))
+    assert fake_tracker.tracker._next_id == 18
+
+
+def test_process_frame_feeds_fresh_features_to_reid_gallery(monkeypatch):
+    """
+    Only confirmed tracks matched in the current frame contribute their
+    appearance feature to the gallery.
+    """
+
+    class Gallery:
+        def __init__(self):
+            self.observed = []
+
+        def observe(self, video_id, track_id, feature, timestamp):
+            self.observed.append((video_id, track_id, feature, timestamp))
+
+    fresh = FakeTrack([0, 0, 1, 1], track_id="1", confirmed=True)
+    fresh.time_since_update, fresh.features = 0, [[0.1], [0.2]]
+    fresh.get_feature = lambda: fresh.features[-1]
+    coasting = FakeTrack([0, 0, 1, 1], track_id="2", confirmed=True)
+    coasting.time_since_update, coasting.features = 2, [[0.3]]
+
+    fake_tracker = FakeTracker(5, 20, 0.5)
+    fake_tracker._tracks_to_return = [fresh, coasting]
+    monkeypatch.setattr(model_module, "YOLO", lambda path: (lambda frame, **kw: []))
+    monkeypatch.setattr(model_module, "DeepSort", lambda *a, **kw: fake_tracker)
+
+    gallery = Gallery()
+    m = Model("dummy.pt", reid_gallery=gallery, video_id="flight7")
+    m.process_frame(np.zeros((4, 4, 3), dtype=np.uint8), 0, 2.5)
+    assert gallery.observed == [("flight7", "1", [0.2], 2.5)]
+
+
+def test_cached_detections_skip_the_detector(monkeypatch, tmp_path):
+    """
+    GIVEN a detection cache and a video hash
+    WHEN the same frame index is processed by a second model
+    THEN the detector is not run and the tracker gets the same detections.
+    """
+    from src.core.detection_cache import DetectionCache
+
+    calls = []
+
+    def fake_yolo(frame, **kwargs):
+        calls.append(kwargs)
+        return [FakeResult([[0, 0, 4, 6], [1, 1, 1, 1]], [0.9, 0.8])]
+
+    class CapturingTracker(FakeTracker):
+        def update_tracks(self, detections, frame):
+            self.detections = detections
+            return []
+
+    weights = tmp_path / "w.pt"
+    weights.write_bytes(b"weights")
+    monkeypatch.setattr(model_module, "YOLO", lambda path: fake_yolo)
+    monkeypatch.setattr(
+        model_module, "DeepSort", lambda *a, **kw: CapturingTracker(1, 1, 1.0)
+    )
+    cache_path = str(tmp_path / "cache.sqlite")
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    first = Model(
+        str(weights), detection_cache=DetectionCache(cache_path), video_hash="v1"
+    )
+    first.process_frame(frame, frame_index=5)
+    first.close()
+
+    second = Model(
+        str(weights), detection_cache=DetectionCache(cache_path), video_hash="v1"
+    )
+    second.process_frame(frame, frame_index=5)
+    assert len(calls) == 1
+    # The zero-size box is still filtered after the cache.
+    ((box, conf, cls),) = second.tracker.detections
+    assert [float(v) for v in box] == [0, 0, 4, 6]
+    assert abs(conf - 0.9) < 1e-6 and cls == 0
+
+    # A different frame or a different input size is a miss.
+    second.process_frame(frame, frame_index=6)
+    second.input_size = 320
+    second.process_frame(frame, frame_index=5)
+    assert len(calls) == 3
+
+
+def test_device_is_passed_to_the_detector(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        model_module, "YOLO", lambda path: (lambda frame, **kw: calls.append(kw) or [])
+    )
+    monkeypatch.setattr(model_module, "DeepSort", lambda *a, **kw: FakeTracker(1, 1, 1))
+
+    Model("dummy.pt", input_size=320, device="cpu").process_frame(
+        np.zeros((4, 4, 3), dtype=np.uint8)
+    )
+    assert calls == [{"conf": 0.2, "classes": [0], "imgsz": 320, "device": "cpu"}]
+
+
+def test_set_input_size_applies_to_next_frame(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        model_module, "YOLO", lambda path: (lambda frame, **kw: calls.append(kw) or [])
+    )
+    monkeypatch.setattr(model_module, "DeepSort", lambda *a, **kw: FakeTracker(1, 1, 1))
+
+    m = Model("dummy.pt", input_size=640)
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    m.process_frame(frame)
+    m.set_input_size(384)
+    m.process_frame(frame)
+    assert [kw["imgsz"] for kw in calls] == [640, 384]
+    assert m.input_size == 384
+
+
+def test_letterboxed_frames_report_source_boxes(monkeypatch, tmp_path):
+    """
+    GIVEN a 4K frame letterboxed to 640 on the capture side (scale 1/6,
+    70 px of padding above)
+    WHEN the model processes the letterboxed frame with its transform
+    THEN the tracker works in model pixels, while returned boxes and the
+    detection cache are in source pixels.
+    """
+    from src.core.detection_cache import DetectionCache
+
+    monkeypatch.setattr(
+        model_module,
+        "YOLO",
+        lambda path: (lambda frame, **kw: [FakeResult([[100, 100, 120, 160]], [0.9])]),
+    )
+
+    class CapturingTracker(FakeTracker):
+        def update_tracks(self, detections, frame):
+            self.detections = detections
+            return [FakeTrack([100, 100, 20, 60], "1", True)]
+
+    monkeypatch.setattr(
+        model_module, "DeepSort", lambda *a, **kw: CapturingTracker(1, 1, 1.0)
+    )
+    weights = tmp_path / "w.pt"
+    weights.write_bytes(b"weights")
+    cache = DetectionCache(str(tmp_path / "cache.sqlite"))
+    m = Model(str(weights), detection_cache=cache, video_hash="v1")
+    transform = (1 / 6, 0, 70)
+
+    (obj,) = m.process_frame(np.zeros((640, 640, 3), np.uint8), 3, 0.1, transform)
+    assert [round(v, 3) for v in obj["bbox"]] == [600, 180, 120, 360]
+    assert [float(v) for v in m.tracker.detections[0][0]] == [100, 100, 20, 60]
+    key = model_module.cache_key("v1", 3, m.weights_hash, 640, [0], 0.2)
+    np.testing.assert_allclose(cache.get(key)[0], [600, 180, 720, 540, 0.9], rtol=1e-5)
@@ -0,0 +1,154 @@
+import http.server
+import socketserver
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.stream_processor import StreamProcessor
+from src.core.video_utils.network_source import (
+    NetworkStreamOptions,
+    PacketLossEstimator,
+    is_network_source,
+)
+
+
+class MJPEGHandler(http.server.BaseHTTPRequestHandler):
+    """Serves a short multipart MJPEG stream of solid-colour frames."""
+
+    n_frames = 20
+    interval = 0.01
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", "multipart/x-mixed-replace; boundary=frame"
+        )
+        self.end_headers()
+        for i in range(self.n_frames):
+            _, buf = cv2.imencode(".jpg", np.full((48, 64, 3), i * 10, np.uint8))
+            data = buf.tobytes()
+            try:
+                self.wfile.write(
+                    b"--frame\r\nContent-Type: image/jpeg\r\n"
+                    + b"Content-Length: %d\r\n\r\n" % len(data)
+                    + data
+                    + b"\r\n"
+                )
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            time.sleep(self.interval)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def loopback_stream_url():
+    """Starts a local MJPEG-over-HTTP server and yields its URL."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), MJPEGHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/stream.mjpg"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        (0, False),
+        ("rtsp://10.0.0.2:8554/drone", True),
+        ("udp://@:5600", True),
+        ("HTTP://host/stream.mjpg", True),
+        ("C:/videos/flight.mp4", False),
+        ("flight.mp4", False),
+    ],
+)
+def test_is_network_source(source, expected):
+    assert is_network_source(source) is expected
+
+
+def test_ffmpeg_options_for_rtsp_and_udp():
+    """
+    Transport and jitter buffer settings map onto FFmpeg demuxer options.
+    """
+    opts = NetworkStreamOptions(transport="udp", jitter_buffer_ms=150)
+    rtsp = dict(kv.split(";") for kv in opts.ffmpeg_options("rtsp://h/s").split("|"))
+    assert rtsp["rtsp_transport"] == "udp"
+    assert rtsp["max_delay"] == "150000"
+    assert rtsp["reorder_queue_size"] == "15"
+    assert "fflags" not in rtsp
+
+    low_latency = NetworkStreamOptions(jitter_buffer_ms=0, socket_buffer_kb=512)
+    udp = dict(kv.split(";") for kv in low_latency.ffmpeg_options("udp://@:5600").split("|"))
+    assert udp["buffer_size"] == str(512 * 1024)
+    assert udp["fflags"] == "nobuffer"
+    assert "rtsp_transport" not in udp
+
+
+def test_invalid_transport_raises():
+    with pytest.raises(ValueError):
+        NetworkStreamOptions(transport="carrier-pigeon")
+
+
+def test_options_round_trip_through_dict():
+    opts = NetworkStreamOptions("udp", 80, 2, 256)
+    assert NetworkStreamOptions.from_dict(opts.to_dict()).to_dict() == opts.to_dict()
+
+
+def test_loss_estimator_counts_pts_gaps():
+    """
+    GIVEN a 10 fps stream whose timestamps skip two frames
+    WHEN the frames are fed to the estimator
+    THEN two frames are reported lost.
+    """
+    est = PacketLossEstimator(nominal_fps=10)
+    for i, pts in enumerate([100, 200, 300, 600, 700]):
+        est.update(pts, arrival=i * 0.1)
+    stats = est.stats()
+    assert stats["frames_received"] == 5
+    assert stats["frames_lost"] == 2
+    assert stats["loss_ratio"] == pytest.approx(2 / 7)
+
+
+def test_loss_estimator_learns_interval_without_pts():
+    """
+    Without timestamps or a usable fps the interval is learned from
+    arrival gaps, and a long gap is counted as loss.
+    """
+    est = PacketLossEstimator(nominal_fps=0)
+    arrivals = [i * 0.04 for i in range(8)] + [0.28 + 0.12]
+    for t in arrivals:
+        est.update(None, t)
+    assert est.stats()["frames_lost"] == 2
+    assert est.stats()["jitter_ms"] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_stream_processor_reads_loopback_stream(loopback_stream_url):
+    """
+    GIVEN a local MJPEG server
+    WHEN StreamProcessor connects to its URL
+    THEN frames are delivered and network statistics are reported.
+    """
+    processor = StreamProcessor(
+        loopback_stream_url,
+        NetworkStreamOptions(jitter_buffer_ms=0),
+        read_timeout=2.0,
+        max_retries=0,
+    )
+    frame = processor.get_frame()
+    assert frame is not None
+    assert frame.shape == (48, 64, 3)
+
+    while processor.get_frame() is not None:
+        pass
+    stats = processor.stats()
+    processor.release()
+
+    assert stats["frames_grabbed"] == MJPEGHandler.n_frames
+    assert stats["frames_received"] == MJPEGHandler.n_frames
+    assert "frames_lost" in stats and "jitter_ms" in stats
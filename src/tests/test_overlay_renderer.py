@@ -0,0 +1,67 @@
+import numpy as np
+
+from src.core.overlay_renderer import OverlayRenderer
+
+RED = (0, 0, 255)
+
+
+def is_red(pixel):
+    return tuple(int(c) for c in pixel) == RED
+
+
+def test_render_draws_box_and_label():
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    OverlayRenderer().render(img, [{"bbox": [20, 40, 30, 30], "track_id": "5"}])
+
+    assert is_red(img[40, 35])  # top edge
+    assert is_red(img[70, 20])  # bottom-left corner
+    # Label pixels sit above the box.
+    assert any(is_red(p) for p in img[20:40, 20:60].reshape(-1, 3))
+    # Box interior untouched.
+    assert not img[55, 35].any()
+
+
+def test_boxes_touching_the_border_are_clipped_not_skipped():
+    """
+    A box extending past the image edge is still drawn, clipped to the
+    image, with its label moved inside the box when there is no room.
+    """
+    img = np.zeros((50, 50, 3), dtype=np.uint8)
+    OverlayRenderer().render(img, [{"bbox": [-10, -10, 30, 30], "track_id": 1}])
+    assert is_red(img[0, 5])
+    assert is_red(img[19, 5])
+    assert any(is_red(p) for p in img[3:18, 3:18].reshape(-1, 3))
+
+
+def test_box_fully_outside_is_ignored():
+    img = np.zeros((20, 20, 3), dtype=np.uint8)
+    OverlayRenderer().render(img, [{"bbox": [30, 30, 5, 5], "track_id": 1}])
+    assert not img.any()
+
+
+def test_scale_maps_source_boxes_onto_smaller_image():
+    img = np.zeros((50, 50, 3), dtype=np.uint8)
+    OverlayRenderer().render(img, [{"bbox": [40, 40, 40, 40], "track_id": 1}], scale=0.5)
+    assert is_red(img[20, 30])
+    assert is_red(img[40, 30])
+
+
+def test_label_sprites_are_cached_with_lru_bound():
+    renderer = OverlayRenderer(max_sprites=2)
+    first = renderer.label_sprite(1)
+    assert renderer.label_sprite(1) is first
+    renderer.label_sprite(2)
+    renderer.label_sprite(3)
+    # Track 1 was least recently used and has been evicted.
+    assert list(renderer._sprites) == [2, 3]
+    assert first.dtype == bool and first.any()
+
+
+def test_render_layer_is_transparent_outside_overlay():
+    layer = OverlayRenderer().render_layer(
+        (40, 30), [{"bbox": [10, 12, 10, 10], "track_id": 2}]
+    )
+    assert layer.shape == (30, 40, 4)
+    assert layer[12, 15, 3] == 255
+    assert tuple(layer[12, 15, :3]) == RED
+    assert layer[0, 39, 3] == 0
@@ -0,0 +1,224 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.pipeline.channel import DROP_OLDEST
+from src.core.pipeline.pipeline import Pipeline
+from src.core.pipeline.stages import (
+    ArchiveSink,
+    CallbackSink,
+    CaptureSource,
+    DetectTrackStage,
+    DrawStage,
+    Packet,
+    SampleStage,
+    Sink,
+    Source,
+    Stage,
+    VideoQueueSink,
+)
+from src.core.video_processor import VideoProcessor
+
+
+class ListSource(Source):
+    def __init__(self, count=None):
+        self.counter = itertools.count() if count is None else iter(range(count))
+        self.closed = False
+
+    def read(self):
+        index = next(self.counter, None)
+        if index is None:
+            return None
+        return Packet(index, index / 30, np.zeros((32, 48, 3), np.uint8))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeModel:
+    def __init__(self):
+        self.closed = False
+
+    def process_frame(self, frame, frame_index, timestamp):
+        return [{"bbox": [4, 4, 10, 10], "track_id": str(frame_index)}]
+
+    def close(self):
+        self.closed = True
+
+
+class ListQueue:
+    def __init__(self):
+        self.items = []
+
+    def enqueue(self, item):
+        self.items.append(item)
+
+
+def test_threaded_pipeline_runs_source_to_sinks():
+    """
+    GIVEN a 9-frame source, sampling every 3rd frame, detection and drawing
+    WHEN the pipeline runs on threads
+    THEN both sinks get frames 2, 5 and 8 in order, annotated and with
+    tracks, and every stage is closed.
+    """
+    source = ListSource(9)
+    model = FakeModel()
+    received = []
+    archive = ListQueue()
+    pipeline = (
+        Pipeline(source)
+        .add(SampleStage(3))
+        .add(DetectTrackStage(model))
+        .add(DrawStage())
+        .add_sink(CallbackSink(received.append))
+        .add_sink(VideoQueueSink(archive))
+    ).run()
+
+    assert pipeline.errors == []
+    assert [p.index for p in received] == [2, 5, 8]
+    assert received[0].tracks == [{"bbox": [4, 4, 10, 10], "track_id": "2"}]
+    assert received[0].annotated.any() and not received[0].image.any()
+    assert [(item[1][0]["track_id"], item[2]) for item in archive.items] == [
+        ("2", 2),
+        ("5", 5),
+        ("8", 8),
+    ]
+    assert source.closed and model.closed
+    stats = pipeline.stats()
+    assert stats["source_frames"] == 9
+    assert stats["nodes"]["0:SampleStage"]["processed"] == 9
+    assert stats["nodes"]["1:DetectTrackStage"]["processed"] == 3
+
+
+def test_video_queue_sink_archives_rgb_frames():
+    """
+    GIVEN a BGR source frame that is pure blue
+    WHEN it is written to a VideoQueueSink
+    THEN the archived frame is in the GUI's RGB order, and converting it
+    back as the export does restores the original.
+    """
+    bgr = np.zeros((8, 8, 3), np.uint8)
+    bgr[..., 0] = 255
+    packet = Packet(0, 0.0, bgr)
+    archive = ListQueue()
+    VideoQueueSink(archive).write(packet)
+
+    frame = archive.items[0][0]
+    assert (frame[..., 2] == 255).all() and not frame[..., :2].any()
+    assert (cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) == bgr).all()
+
+
+def test_slow_dropping_sink_does_not_stall_others():
+    fast, slow = [], []
+
+    def slow_write(packet):
+        time.sleep(0.02)
+        slow.append(packet.index)
+
+    pipeline = (
+        Pipeline(ListSource(50))
+        .add_sink(CallbackSink(lambda p: fast.append(p.index)), capacity=50)
+        .add_sink(CallbackSink(slow_write), capacity=2, policy=DROP_OLDEST)
+    ).run()
+
+    assert fast == list(range(50))
+    assert slow[-1] == 49 and len(slow) < 50
+    dropped = pipeline.stats()["channels"][1]["dropped"]
+    assert dropped == 50 - len(slow)
+
+
+def test_stage_error_stops_pipeline():
+    class Failing(Stage):
+        def process(self, packet):
+            if packet.index == 3:
+                raise RuntimeError("boom")
+            return packet
+
+    source = ListSource()  # endless
+    received = []
+    pipeline = Pipeline(source).add(Failing()).add_sink(CallbackSink(received.append))
+    assert pipeline.start().join(timeout=5)
+
+    assert [name for name, _ in pipeline.errors] == ["0:Failing"]
+    assert [p.index for p in received] == [0, 1, 2]
+    assert source.closed
+
+
+def test_base_classes_require_their_abstract_methods():
+    class NoWrite(Sink):
+        pass
+
+    for cls in (Source, Stage, Sink, NoWrite):
+        with pytest.raises(TypeError):
+            cls()
+
+
+def test_stop_ends_endless_source():
+    received = []
+    pipeline = Pipeline(ListSource()).add_sink(CallbackSink(received.append)).start()
+    time.sleep(0.05)
+    pipeline.stop()
+    assert pipeline.join(timeout=5)
+    assert received and pipeline.errors == []
+
+
+def test_async_driver_mixes_coroutine_and_blocking_stages():
+    threads = set()
+
+    class Blocking(Stage):
+        def process(self, packet):
+            threads.add(threading.get_ident())
+            return packet
+
+    class Async(Stage):
+        async def process(self, packet):
+            await asyncio.sleep(0)
+            packet.tracks = [{"bbox": [0, 0, 1, 1], "track_id": "a"}]
+            return packet
+
+    received = []
+    pipeline = (
+        Pipeline(ListSource(6))
+        .add(Blocking())
+        .add(Async())
+        .add(SampleStage(2))
+        .add_sink(CallbackSink(received.append))
+    )
+    asyncio.run(pipeline.run_async())
+
+    assert [p.index for p in received] == [1, 3, 5]
+    assert all(p.tracks for p in received)
+    assert threading.get_ident() not in threads
+    assert pipeline.stats()["nodes"]["1:Async"]["processed"] == 6
+
+
+def test_capture_source_to_archive_sink(tmp_path):
+    clip = str(tmp_path / "in.mp4")
+    writer = cv2.VideoWriter(clip, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 20, np.uint8))
+    writer.release()
+
+    out = str(tmp_path / "out" / "annotated.mp4")
+    sink = ArchiveSink(out, fps=10)
+    pipeline = (
+        Pipeline(CaptureSource(VideoProcessor(clip), max_frames=8))
+        .add(DetectTrackStage(FakeModel()))
+        .add(DrawStage())
+        .add_sink(sink)
+    ).run()
+
+    assert pipeline.errors == []
+    assert sink.frames == 8
+    cap = cv2.VideoCapture(out)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 8
+    assert (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (
+        64,
+        48,
+    )
+    cap.release()
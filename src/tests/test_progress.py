@@ -0,0 +1,45 @@
+import pytest
+
+from src.core.progress import ProgressTracker, format_duration
+
+
+def test_rate_and_eta_follow_the_recent_window():
+    """
+    GIVEN an analysis that ran at 100 frames/s and then slowed to 50
+    WHEN the rate is measured over a 5 s window
+    THEN rate and ETA reflect the recent speed, not the overall average.
+    """
+    progress = ProgressTracker(total=3000, window=5.0)
+    progress.start(now=0.0)
+    for t in range(1, 11):
+        progress.update(100 * t, now=float(t))
+    for t in range(11, 21):
+        progress.update(1000 + 50 * (t - 10), now=float(t))
+
+    assert progress.fraction == pytest.approx(0.5)
+    assert progress.rate() == pytest.approx(50.0)
+    assert progress.eta() == pytest.approx(30.0)
+    assert progress.describe() == "50% - 50 frames/s - ETA 0:30"
+
+
+def test_unknown_total_and_finished_run():
+    progress = ProgressTracker(total=0, unit="frames")
+    progress.start(now=0.0)
+    assert progress.rate() is None and progress.eta() is None
+    progress.update(120, now=2.0)
+    assert progress.fraction is None
+    assert progress.describe() == "120 frames - 60 frames/s"
+    progress.finish(now=2.0)
+    assert progress.summary() == {
+        "done": 120,
+        "total": 0,
+        "elapsed_s": 2.0,
+        "rate": 60.0,
+    }
+    assert progress.describe().endswith("done in 0:02")
+
+
+def test_format_duration():
+    assert format_duration(0) == "0:00"
+    assert format_duration(83.4) == "1:23"
+    assert format_duration(3725) == "1:02:05"
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from src.core.reid_gallery import ReIDGallery
+
+
+@pytest.fixture
+def gallery_path(tmp_path):
+    return str(tmp_path / "gallery")
+
+
+def make_people(n, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def noisy(vector, scale=0.05, seed=1):
+    rng = np.random.default_rng(seed)
+    return vector + scale * rng.standard_normal(vector.shape).astype(np.float32)
+
+
+def test_observe_averages_features_per_track_on_save(gallery_path):
+    """
+    Pending observations are merged into one normalised embedding per
+    (video, track) when the gallery is saved.
+    """
+    gallery = ReIDGallery(gallery_path, save_interval=None)
+    gallery.observe("flight1", "3", [1.0, 0.0], timestamp=10.0)
+    gallery.observe("flight1", "3", [0.0, 1.0], timestamp=12.0)
+    assert len(gallery) == 0
+    gallery.save()
+
+    assert len(gallery) == 1
+    np.testing.assert_allclose(gallery.embeddings[0], [2 ** -0.5, 2 ** -0.5], rtol=1e-6)
+    entry = gallery.entries[0]
+    assert (entry["count"], entry["first_ts"], entry["last_ts"]) == (2, 10.0, 12.0)
+
+
+def test_find_track_matches_same_person_in_other_videos(gallery_path):
+    """
+    GIVEN people seen in flight A and again (with noise) in flight B
+    WHEN searching for a flight A track
+    THEN the same person in flight B is the best match and flight A
+    tracks are excluded.
+    """
+    people = make_people(50)
+    gallery = ReIDGallery(gallery_path, save_interval=None)
+    for i, person in enumerate(people):
+        gallery.add("A", i, person)
+        gallery.add("B", 100 + i, noisy(person, seed=i))
+    gallery.save()
+
+    matches = ReIDGallery(gallery_path).find_track("A", 7, k=3)
+    assert matches[0]["video_id"] == "B"
+    assert matches[0]["track_id"] == "107"
+    assert matches[0]["similarity"] > 0.9
+    assert all(m["video_id"] != "A" for m in matches)
+    assert ReIDGallery(gallery_path).find_track("A", 999) == []
+
+
+def test_ivf_index_is_built_for_large_galleries_and_persisted(gallery_path):
+    """
+    Above exact_below the gallery builds a clustered index, which is
+    reloaded from disk and still finds the right person.
+    """
+    people = make_people(300, seed=3)
+    gallery = ReIDGallery(gallery_path, exact_below=100, n_probe=3, save_interval=None)
+    for i, person in enumerate(people):
+        gallery.add("A", i, person)
+    gallery.save()
+
+    reloaded = ReIDGallery(gallery_path, exact_below=100, n_probe=3)
+    assert reloaded._centroids is not None
+    assert len(reloaded._assignments) == 300
+    result = reloaded.search(noisy(people[42]), k=1)
+    assert result[0]["track_id"] == "42"
+
+    # New entries are assigned to existing clusters until the next rebuild.
+    reloaded.add("B", 1, people[42])
+    assert len(reloaded._assignments) == 301
+
+
+def test_add_merges_repeat_entries(gallery_path):
+    gallery = ReIDGallery(gallery_path, save_interval=None)
+    gallery.add("A", 1, [1.0, 0.0], count=3)
+    gallery.add("A", 1, [0.0, 1.0], count=1, last_ts=5.0)
+    assert len(gallery) == 1
+    assert gallery.entries[0]["count"] == 4
+    assert gallery.entries[0]["last_ts"] == 5.0
+    assert gallery.embeddings[0][0] > gallery.embeddings[0][1]
+
+
+def test_search_on_empty_gallery(gallery_path):
+    assert ReIDGallery(gallery_path).search([1.0, 0.0]) == []
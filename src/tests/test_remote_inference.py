@@ -0,0 +1,220 @@
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import src.core.model_processor as model_module
+from src.core.model_processor import Model
+from src.core.remote_inference import (
+    InferenceServer,
+    RemoteDetector,
+    RemoteUnavailable,
+    encode_frame,
+)
+
+
+class FakeDetector:
+    """Finds one box covering the bright area of the frame."""
+
+    def __init__(self, delay=0.0):
+        self.input_size = 640
+        self.delay = delay
+        self.calls = 0
+
+    def set_input_size(self, size):
+        self.input_size = size
+
+    def detect(self, frame):
+        self.calls += 1
+        time.sleep(self.delay)
+        ys, xs = np.nonzero(frame[:, :, 0] > 128)
+        if not len(xs):
+            return np.zeros((0, 5), np.float32)
+        return np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, 0.9]])
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(detector):
+        server = InferenceServer(detector, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"127.0.0.1:{server.port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def frame_with_box():
+    frame = np.zeros((480, 640, 3), np.uint8)
+    frame[100:200, 320:400] = 255
+    return frame
+
+
+def unused_address():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"127.0.0.1:{port}"
+
+
+def test_round_trip_returns_boxes_in_frame_coordinates(serve):
+    """
+    GIVEN an inference server on localhost
+    WHEN a frame is sent downscaled to imgsz 320
+    THEN the detections come back scaled to the original frame and the
+    server ran at the requested imgsz.
+    """
+    detector = FakeDetector()
+    client = RemoteDetector([serve(detector)])
+    boxes = client.detect(frame_with_box(), imgsz=320)
+    client.close()
+
+    assert boxes.shape == (1, 5)
+    np.testing.assert_allclose(boxes[0, :4], [320, 100, 400, 200], atol=3)
+    assert boxes[0, 4] == pytest.approx(0.9)
+    assert detector.input_size == 320
+    assert client.stats()[0]["requests"] == 1
+
+
+def test_faster_server_is_preferred(serve):
+    slow, fast = FakeDetector(delay=0.05), FakeDetector()
+    client = RemoteDetector([serve(slow), serve(fast)])
+    for _ in range(6):
+        client.detect(frame_with_box())
+    client.close()
+    # Each server is tried once, then the faster one takes the rest.
+    assert (slow.calls, fast.calls) == (1, 5)
+
+
+def test_timeout_fails_over_to_next_server(serve):
+    stuck, healthy = FakeDetector(delay=0.5), FakeDetector()
+    client = RemoteDetector([serve(stuck), serve(healthy)], timeout=0.1)
+    client.connections[1].latency = 1.0  # try the stuck server first
+
+    boxes = client.detect(frame_with_box())
+    assert len(boxes) == 1
+    stats = client.stats()
+    assert stats[0]["failures"] == 1 and not stats[0]["up"]
+    assert healthy.calls == 1
+
+    # The stuck server is skipped while it backs off.
+    client.detect(frame_with_box())
+    assert stats[0]["requests"] == client.stats()[0]["requests"]
+    client.close()
+
+
+def test_unreachable_servers_raise():
+    client = RemoteDetector([unused_address()], timeout=0.2)
+    with pytest.raises(RemoteUnavailable):
+        client.detect(frame_with_box())
+    # Backing off: no new connection attempt.
+    with pytest.raises(RemoteUnavailable):
+        client.detect(frame_with_box())
+    assert client.stats()[0]["requests"] == 1
+
+
+def test_model_falls_back_to_local_detection(monkeypatch):
+    local_calls = []
+
+    class FakeTracker:
+        def update_tracks(self, detections, frame):
+            local_calls.append(("track", len(detections)))
+            return []
+
+    def fake_yolo(path):
+        def run(frame, **kwargs):
+            local_calls.append("yolo")
+            return []
+
+        return run
+
+    monkeypatch.setattr(model_module, "YOLO", fake_yolo)
+    monkeypatch.setattr(model_module, "DeepSort", lambda *a, **kw: FakeTracker())
+
+    class Remote:
+        available = True
+
+        def detect(self, frame, imgsz):
+            if not self.available:
+                raise RemoteUnavailable
+            return np.array([[0, 0, 10, 10, 0.9]], np.float32)
+
+        def close(self):
+            pass
+
+    remote = Remote()
+    model = Model("dummy.pt", remote=remote)
+    frame = np.zeros((20, 20, 3), np.uint8)
+    model.process_frame(frame)
+    remote.available = False
+    model.process_frame(frame)
+    assert local_calls == [("track", 1), "yolo", ("track", 0)]
+
+
+
+def test_remote_detections_are_not_cached(monkeypatch, tmp_path):
+    """
+    GIVEN a detection cache keyed by the local weights
+    WHEN a remote server answers, then is unavailable
+    THEN only the local model's detections are cached, since the server
+    may run other weights.
+    """
+    from src.core.detection_cache import DetectionCache
+
+    class FakeTracker:
+        def update_tracks(self, detections, frame):
+            return []
+
+    monkeypatch.setattr(model_module, "YOLO", lambda path: (lambda frame, **kw: []))
+    monkeypatch.setattr(model_module, "DeepSort", lambda *a, **kw: FakeTracker())
+
+    class Remote:
+        available = True
+
+        def detect(self, frame, imgsz):
+            if not self.available:
+                raise RemoteUnavailable
+            return np.array([[0, 0, 10, 10, 0.9]], np.float32)
+
+        def close(self):
+            pass
+
+    weights = tmp_path / "w.pt"
+    weights.write_bytes(b"weights")
+    remote = Remote()
+    cache = DetectionCache(str(tmp_path / "cache.sqlite"))
+    model = Model(str(weights), remote=remote, detection_cache=cache, video_hash="v1")
+    frame = np.zeros((20, 20, 3), np.uint8)
+    model.process_frame(frame, frame_index=0)
+    remote.available = False
+    model.process_frame(frame, frame_index=1)
+
+    def cached(index):
+        return cache.get(
+            model_module.cache_key(
+                "v1",
+                index,
+                model.weights_hash,
+                model.input_size,
+                model.yolo_kwargs["classes"],
+                model.conf_threshold,
+            )
+        )
+
+    assert cached(0) is None
+    assert cached(1) is not None
+
+
+def test_encode_frame_limits_size():
+    jpeg, scale = encode_frame(np.zeros((1080, 1920, 3), np.uint8), max_side=640)
+    assert scale == pytest.approx(1 / 3)
+    assert jpeg[:2] == b"\xff\xd8"
+    assert encode_frame(np.zeros((10, 10, 3), np.uint8), max_side=640)[1] == 1.0
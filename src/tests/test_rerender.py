@@ -0,0 +1,154 @@
+import os
+import subprocess
+import sys
+
+import cv2
+import numpy as np
+
+from src.core.rerender import rerender, filter_tracks, main
+from src.core.video_utils.detections_sidecar import (
+    DetectionsSidecarWriter,
+    read_detections_sidecar,
+    scale_tracks,
+    sidecar_path_for,
+)
+
+SIZE = (64, 48)
+
+
+def write_archive(tmp_path, tracks_per_frame, frame_size=SIZE):
+    video_path = str(tmp_path / "archive.mp4")
+    writer = cv2.VideoWriter(
+        video_path, cv2.VideoWriter_fourcc(*"mp4v"), 10, frame_size
+    )
+    sidecar = DetectionsSidecarWriter(
+        sidecar_path_for(video_path), frame_size=list(SIZE), fps=10
+    )
+    for i, tracks in enumerate(tracks_per_frame):
+        writer.write(np.full((frame_size[1], frame_size[0], 3), 128, np.uint8))
+        sidecar.write(tracks, source_frame=i * 3, timestamp=i / 10)
+    writer.release()
+    sidecar.close()
+    return video_path
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def is_red(pixel):
+    b, g, r = (int(c) for c in pixel)
+    return r > 200 and g < 60 and b < 60
+
+
+PERSON = {"bbox": [10, 10, 20, 20], "track_id": "3", "confidence": 0.9}
+FAINT = {"bbox": [40, 10, 10, 20], "track_id": "4", "confidence": 0.3}
+
+
+def test_sidecar_round_trip(tmp_path):
+    video_path = write_archive(tmp_path, [[PERSON], []])
+    header, records = read_detections_sidecar(sidecar_path_for(video_path))
+    assert header["frame_size"] == [64, 48]
+    assert records[0] == {
+        "frame": 0, "source_frame": 0, "timestamp": 0.0, "tracks": [PERSON]
+    }
+    assert records[1]["tracks"] == []
+
+
+def test_rerender_draws_boxes_from_sidecar(tmp_path):
+    """
+    GIVEN a clean archive and its sidecar
+    WHEN it is re-rendered
+    THEN boxes appear only on frames that had tracks.
+    """
+    video_path = write_archive(tmp_path, [[PERSON], []])
+    out = str(tmp_path / "rendered.mp4")
+    assert rerender(video_path, out) == 2
+
+    frames = read_frames(out)
+    assert is_red(frames[0][10, 20])
+    assert not is_red(frames[1][10, 20])
+
+
+def test_rerender_applies_confidence_cutoff_and_track_filter(tmp_path):
+    video_path = write_archive(tmp_path, [[PERSON, FAINT]])
+    out = str(tmp_path / "rendered.mp4")
+
+    rerender(video_path, out, min_confidence=0.5)
+    frame = read_frames(out)[0]
+    assert is_red(frame[10, 20]) and not is_red(frame[10, 45])
+
+    rerender(video_path, out, track_ids=[4])
+    frame = read_frames(out)[0]
+    assert not is_red(frame[10, 20]) and is_red(frame[10, 45])
+
+
+def test_coasting_tracks_without_confidence_are_kept():
+    coasting = {"bbox": [0, 0, 1, 1], "track_id": "9"}
+    assert filter_tracks([coasting, FAINT], min_confidence=0.5) == [coasting]
+
+
+def test_rerender_blurs_boxes(tmp_path):
+    video_path = str(tmp_path / "archive.mp4")
+    pattern = np.zeros((48, 64, 3), np.uint8)
+    pattern[:, ::2] = 255
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 10, SIZE)
+    writer.write(pattern)
+    writer.release()
+    sidecar = DetectionsSidecarWriter(sidecar_path_for(video_path), frame_size=[64, 48])
+    sidecar.write([PERSON])
+    sidecar.close()
+
+    out = str(tmp_path / "blurred.avi")
+    rerender(video_path, out, blur=True, draw_boxes=False, codec="MJPG")
+    frame = read_frames(out)[0].astype(int)
+    # Stripes inside the box are smoothed, outside they are not.
+    assert np.abs(np.diff(frame[20, 14:26, 1])).max() < 60
+    assert np.abs(np.diff(frame[40, 40:50, 1])).max() > 150
+
+
+def test_boxes_follow_a_rescaled_archive(tmp_path):
+    video_path = write_archive(tmp_path, [[PERSON]], frame_size=(128, 96))
+    out = str(tmp_path / "rendered.mp4")
+    main([video_path, out])
+    assert is_red(read_frames(out)[0][20, 40])
+
+
+
+def test_boxes_follow_an_archive_rescaled_on_one_axis(tmp_path):
+    """
+    GIVEN an archive stretched to twice its height only
+    WHEN it is re-rendered
+    THEN boxes are scaled vertically, not by the width ratio.
+    """
+    video_path = write_archive(tmp_path, [[PERSON]], frame_size=(64, 96))
+    out = str(tmp_path / "rendered.mp4")
+    main([video_path, out])
+    frame = read_frames(out)[0]
+    assert is_red(frame[35, 10])
+    assert not is_red(frame[10, 20])
+
+
+def test_scale_tracks_scales_axes_independently():
+    scaled = scale_tracks([PERSON], 2.0, 0.5)
+    assert scaled[0]["bbox"] == [20.0, 5.0, 40.0, 10.0]
+    assert scaled[0]["confidence"] == 0.9
+    assert PERSON["bbox"] == [10, 10, 20, 20]
+
+
+def test_rerender_does_not_load_the_model():
+    code = (
+        "import sys, src.core.rerender; "
+        "sys.exit('ultralytics' in sys.modules or 'torch' in sys.modules)"
+    )
+    # Run from the repository root, where the src package is importable.
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+import cv2
+import pytest
+import torch
+
+import src.core.resource_governor as governor_module
+from src.core.resource_governor import ResourceGovernor, ThreadProfile
+
+
+@pytest.fixture
+def restore_thread_settings():
+    torch_threads, cv_threads = torch.get_num_threads(), cv2.getNumThreads()
+    yield
+    torch.set_num_threads(torch_threads)
+    cv2.setNumThreads(cv_threads)
+
+
+def test_auto_profile_splits_cores_between_stages():
+    """
+    GIVEN an 8-core laptop with SMT
+    WHEN a profile is derived automatically
+    THEN one core is left to GUI/capture, encoding gets a share and
+    inference the rest, without exceeding the core count.
+    """
+    profile = ThreadProfile.auto(physical_cores=8, logical_cpus=16, pin=True)
+    assert profile.encoder_threads == 1
+    assert profile.inference_threads == 6
+    assert 1 + profile.encoder_threads + profile.inference_threads <= 8
+    assert profile.affinity["inference"] == list(range(4, 16))
+    assert profile.affinity["gui"] == profile.affinity["capture"] == [0, 1, 2, 3]
+    assert not set(profile.affinity["gui"]) & set(profile.affinity["inference"])
+
+
+def test_auto_profile_on_small_machines_uses_single_threads():
+    profile = ThreadProfile.auto(physical_cores=2, logical_cpus=2, pin=True)
+    assert profile.to_dict() == {
+        "capture_threads": 1,
+        "inference_threads": 1,
+        "encoder_threads": 1,
+        "gui_threads": 1,
+        "affinity": {},
+    }
+
+
+def test_profile_round_trips_through_dict():
+    profile = ThreadProfile(2, 5, 3, 1, affinity={"inference": [1, 2], "bogus": [0]})
+    restored = ThreadProfile.from_dict(profile.to_dict())
+    assert restored.to_dict() == profile.to_dict()
+    assert restored.affinity == {"inference": [1, 2]}
+    assert restored.threads("encoding") == 3
+
+
+def test_apply_sets_torch_and_opencv_threads(restore_thread_settings):
+    governor = ResourceGovernor(ThreadProfile(inference_threads=3, gui_threads=2))
+    governor.apply("inference")
+    assert torch.get_num_threads() == 3
+    assert cv2.getNumThreads() == 1
+
+    governor.apply("gui")
+    assert cv2.getNumThreads() == 2
+
+
+def test_apply_pins_stage_to_its_cpus(monkeypatch, restore_thread_settings):
+    pinned = []
+    monkeypatch.setattr(
+        governor_module,
+        "set_affinity",
+        lambda cpus, whole_process=False: pinned.append((cpus, whole_process)),
+    )
+    profile = ThreadProfile(affinity={"capture": [0], "inference": [1, 2]})
+    governor = ResourceGovernor(profile)
+    governor.apply("capture")
+    governor.apply("inference")
+    governor.apply("encoding")
+    assert pinned == [([0], False), ([1, 2], True)]
+
+
+def test_unknown_stage_raises():
+    with pytest.raises(ValueError):
+        ResourceGovernor(ThreadProfile()).apply("display")
+
+
+def test_report_measures_registered_thread_utilisation():
+    """
+    GIVEN a busy capture thread registered with the governor
+    WHEN two reports are taken around the busy period
+    THEN the capture stage shows substantial CPU use and idle stages none.
+    """
+    governor = ResourceGovernor(ThreadProfile(capture_threads=2))
+    registered = threading.Event()
+    stop = threading.Event()
+
+    def busy():
+        governor.apply("capture")
+        registered.set()
+        while not stop.is_set():
+            sum(range(1000))
+
+    thread = threading.Thread(target=busy)
+    thread.start()
+    registered.wait()
+    first = governor.report()
+    time.sleep(0.3)
+    second = governor.report()
+    stop.set()
+    thread.join()
+
+    assert first["capture"]["cpu_percent"] is None
+    assert second["capture"]["registered"] == 1
+    assert second["capture"]["cpu_percent"] > 20
+    assert second["capture"]["budget_percent"] == pytest.approx(
+        second["capture"]["cpu_percent"] / 2, abs=0.1
+    )
+    assert second["inference"]["cpu_percent"] == 0
+    assert second["capture"]["threads"] == 2
+
+
+def test_set_affinity_ignores_unknown_cpus():
+    assert governor_module.set_affinity([os.cpu_count() + 7]) is False
@@ -0,0 +1,163 @@
+import os
+import shutil
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import src.core.segment_recorder as recorder_module
+from src.core.segment_recorder import SegmentedRecorder, PLAYLIST_FILE
+from src.core.video_utils.ffmpeg_writer import FFmpegWriter
+
+
+def frame(value=0, size=(32, 24)):
+    return np.full((size[1], size[0], 3), value, dtype=np.uint8)
+
+
+def read_playlist(output_dir):
+    with open(os.path.join(output_dir, PLAYLIST_FILE)) as f:
+        return f.read().splitlines()
+
+
+def test_opencv_backend_rolls_segments_and_writes_playlist(tmp_path):
+    """
+    GIVEN 25 frames at 10 fps with 1-second segments
+    WHEN the recorder is released
+    THEN three segments exist and the finished playlist lists them.
+    """
+    out = str(tmp_path / "rec")
+    recorder = SegmentedRecorder(out, fps=10, segment_seconds=1, backend="opencv")
+    for i in range(25):
+        assert recorder.write_frame(frame(i))
+    recorder.release()
+
+    names = ["segment_00000.mp4", "segment_00001.mp4", "segment_00002.mp4"]
+    for name in names:
+        assert os.path.getsize(os.path.join(out, name)) > 0
+    lines = read_playlist(out)
+    assert lines[0] == "#EXTM3U"
+    assert "#EXT-X-TARGETDURATION:1" in lines
+    assert [line for line in lines if line.startswith("segment_")] == names
+    assert "#EXTINF:0.500," in lines
+    assert lines[-1] == "#EXT-X-ENDLIST"
+    assert recorder.stats()["frames_written"] == 25
+    assert recorder.stats()["segments"] == 3
+
+    cap = cv2.VideoCapture(os.path.join(out, names[0]))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+    cap.release()
+
+
+def test_timestamped_frames_are_spread_over_the_output_rate(tmp_path):
+    """
+    GIVEN frames processed at 10 fps into a 30 fps recording
+    WHEN they are written with their timestamps
+    THEN each fills three output frames, so 2 s of source play for 2 s;
+    frames arriving faster than the output rate are skipped.
+    """
+    out = str(tmp_path / "rec")
+    recorder = SegmentedRecorder(out, fps=30, segment_seconds=60, backend="opencv")
+    for i in range(20):
+        recorder.write_frame(frame(200 * (i % 2)), timestamp=100 + i / 10)
+    for i in range(10):
+        recorder.write_frame(frame(), timestamp=102 + i / 100)
+    recorder.release()
+
+    # The last 10 fps frame ends at output frame 58; the burst spans 90 ms
+    # from 2.0 s and only adds the output frames due within it (61-64).
+    assert recorder.stats()["frames_written"] == 64
+    assert "#EXTINF:2.133," in read_playlist(out)
+    cap = cv2.VideoCapture(os.path.join(out, "segment_00000.mp4"))
+    values = [cap.read()[1][12, 16, 0] for _ in range(6)]
+    cap.release()
+    assert [v > 100 for v in values] == [False] * 3 + [True] * 3
+
+
+def test_frames_are_resized_to_the_first_frame_size(tmp_path):
+    out = str(tmp_path / "rec")
+    recorder = SegmentedRecorder(out, fps=5, backend="opencv", rgb_input=True)
+    recorder.write_frame(frame(size=(32, 24)))
+    recorder.write_frame(frame(size=(64, 48)))
+    recorder.release()
+
+    cap = cv2.VideoCapture(os.path.join(out, "segment_00000.mp4"))
+    assert (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (32, 24)
+    cap.release()
+
+
+def test_write_frame_drops_instead_of_blocking_when_encoder_is_behind(
+    tmp_path, monkeypatch
+):
+    """
+    GIVEN an encoder that is stuck
+    WHEN frames keep arriving
+    THEN write_frame returns immediately and counts dropped frames.
+    """
+    gate = threading.Event()
+
+    class SlowWriter:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def write_frame(self, frame):
+            gate.wait()
+
+        def release(self):
+            pass
+
+    monkeypatch.setattr(recorder_module, "ArchiveProcessor", SlowWriter)
+    recorder = SegmentedRecorder(
+        str(tmp_path / "rec"), fps=10, backend="opencv", queue_size=2
+    )
+    results = [recorder.write_frame(frame()) for _ in range(10)]
+    gate.set()
+    recorder.release()
+
+    assert results.count(False) == recorder.stats()["frames_dropped"]
+    assert recorder.stats()["frames_dropped"] >= 7
+
+
+def test_release_closes_recorder(tmp_path):
+    recorder = SegmentedRecorder(str(tmp_path / "rec"), backend="opencv")
+    recorder.release()
+    assert recorder.write_frame(frame()) is False
+    assert read_playlist(str(tmp_path / "rec"))[-1] == "#EXT-X-ENDLIST"
+
+
+def test_unknown_backend_raises(tmp_path):
+    with pytest.raises(ValueError):
+        SegmentedRecorder(str(tmp_path), backend="gstreamer")
+
+
+def test_ffmpeg_command_carries_codec_preset_and_crf():
+    command = FFmpegWriter.build_command(
+        "out.ts", 25, (1920, 1080), codec="libx265", preset="fast", crf=28,
+        input_pixel_format="rgb24", threads=2,
+    )
+    assert command[command.index("-c:v") + 1] == "libx265"
+    assert command[command.index("-preset") + 1] == "fast"
+    assert command[command.index("-crf") + 1] == "28"
+    assert command[command.index("-s") + 1] == "1920x1080"
+    assert command[command.index("-pix_fmt") + 1] == "rgb24"
+    assert command[command.index("-threads") + 1] == "2"
+    assert command[-1] == "out.ts"
+
+    bare = FFmpegWriter.build_command("out.avi", 25, (8, 8), "mjpeg", None, None)
+    assert "-preset" not in bare and "-crf" not in bare
+
+
+def test_ffmpeg_writer_raises_when_binary_missing(tmp_path):
+    with pytest.raises(IOError):
+        FFmpegWriter(str(tmp_path / "x.ts"), ffmpeg_bin="no-such-ffmpeg-binary")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_ffmpeg_backend_writes_ts_segments(tmp_path):
+    out = str(tmp_path / "rec")
+    recorder = SegmentedRecorder(out, fps=10, segment_seconds=1, backend="ffmpeg")
+    for i in range(15):
+        recorder.write_frame(frame(i))
+    recorder.release()
+    assert recorder.stats()["error"] is None
+    assert os.path.getsize(os.path.join(out, "segment_00001.ts")) > 0
@@ -0,0 +1,101 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.stream_processor import StreamProcessor
+from src.core.stream_replay import (
+    ReplayStreamProcessor,
+    StreamRecorder,
+    StreamRecording,
+    is_stream_recording,
+    replay_benchmark,
+)
+
+
+def record(path, arrivals, shape=(24, 32, 3)):
+    recorder = StreamRecorder(str(path), source="test")
+    for i, arrival in enumerate(arrivals):
+        recorder.write(np.full(shape, i, np.uint8), arrival, stream_ms=i * 40.0)
+    recorder.close()
+    return recorder
+
+
+def test_recording_round_trip(tmp_path):
+    recorder = record(tmp_path / "rec", [100.0, 100.04, 100.5])
+    assert recorder.frames_written == 3 and recorder.frames_dropped == 0
+    assert is_stream_recording(str(tmp_path / "rec"))
+    assert not is_stream_recording(str(tmp_path))
+
+    recording = StreamRecording(str(tmp_path / "rec"))
+    assert len(recording) == 3
+    assert recording.duration == pytest.approx(0.5)
+    assert recording.meta["frames"] == 3 and recording.meta["source"] == "test"
+    frame = recording.frame(2)
+    assert frame.shape == (24, 32, 3) and (frame == 2).all()
+    assert recording.index[1]["stream_ms"] == 40.0
+
+
+def test_recording_stops_at_max_bytes(tmp_path):
+    recorder = StreamRecorder(str(tmp_path / "rec"), max_bytes=700)
+    for i in range(5):
+        recorder.write(np.zeros((10, 10, 3), np.uint8), float(i))
+    recorder.close()
+    assert recorder.frames_written == 2 and recorder.meta["truncated"]
+    assert len(StreamRecording(str(tmp_path / "rec"))) == 2
+
+
+def test_replay_reproduces_recorded_timing(tmp_path):
+    """
+    GIVEN frames that arrived in a burst, then after a 300 ms stall
+    WHEN the recording is replayed at full and at double speed
+    THEN frames are delivered with the recorded gaps, scaled by the speed.
+    """
+    arrivals = [0.0, 0.02, 0.04, 0.34, 0.36]
+    record(tmp_path / "rec", arrivals)
+
+    for speed in (1.0, 2.0):
+        replay = ReplayStreamProcessor(str(tmp_path / "rec"), speed=speed)
+        values, times = [], []
+        while True:
+            frame = replay.get_frame()
+            if frame is None:
+                break
+            values.append(int(frame[0, 0, 0]))
+            times.append(replay.get_timestamp())
+        stats = replay.stats()
+        replay.release()
+
+        assert values == [0, 1, 2, 3, 4]
+        assert stats["replayed"] == 5 and stats["frames_dropped"] == 0
+        gaps = np.diff(times)
+        assert gaps[2] == pytest.approx(0.3 / speed, abs=0.03)
+        assert gaps[0] < 0.05
+
+
+def test_slow_consumer_drops_frames_as_it_would_live(tmp_path):
+    record(tmp_path / "rec", [i / 100 for i in range(30)])
+    result = replay_benchmark(str(tmp_path / "rec"), process=lambda f: time.sleep(0.05))
+    assert result["recorded"] == 30
+    assert result["frames"] + result["dropped"] == 30
+    assert result["dropped"] > 15
+    assert result["latency_ms"] >= 50
+
+
+def test_stream_processor_records_grabbed_frames(tmp_path):
+    clip = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(clip, cv2.VideoWriter_fourcc(*"MJPG"), 30, (32, 24))
+    for i in range(10):
+        writer.write(np.full((24, 32, 3), i * 20, np.uint8))
+    writer.release()
+
+    processor = StreamProcessor(clip, max_retries=0, record_path=str(tmp_path / "rec"))
+    while processor.get_frame() is not None:
+        pass
+    processor.release()
+
+    recording = StreamRecording(str(tmp_path / "rec"))
+    assert len(recording) == 10
+    assert np.all(np.diff(recording.arrivals) >= 0)
+    assert recording.frame(0).shape == (24, 32, 3)
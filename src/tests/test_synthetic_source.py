@@ -0,0 +1,119 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.core.synthetic_source import (
+    LoadTest,
+    SyntheticCapture,
+    SyntheticStreamProcessor,
+    parse_synthetic_source,
+    run_feed,
+)
+
+
+class SlowModel:
+    """Stands in for the detector: a fixed cost per frame."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def process_frame(self, frame, frame_index=None, timestamp=None):
+        time.sleep(self.seconds)
+        return []
+
+
+def slow_model():
+    return SlowModel(0.05)
+
+
+def test_frames_show_moving_figures():
+    capture = SyntheticCapture(160, 120, fps=1000, targets=3, seed=1)
+    ok, first = capture.read()
+    boxes = [list(b) for b in capture.boxes]
+    for _ in range(20):
+        ok, frame = capture.read()
+    assert ok and frame.shape == (120, 160, 3) and frame.dtype == np.uint8
+    assert len(capture.boxes) == 3 and capture.boxes != boxes
+    assert not np.array_equal(first, frame)
+    # The same seed renders the same scene.
+    again = SyntheticCapture(160, 120, fps=1000, targets=3, seed=1)
+    np.testing.assert_array_equal(again.read()[1], first)
+
+
+def test_stream_runs_at_nominal_rate_with_drops():
+    """
+    GIVEN a 50 FPS source losing a fifth of its frames, for 1 s
+    WHEN it is drained like a live stream
+    THEN it ends after about a second having lost about a fifth.
+    """
+    source = SyntheticStreamProcessor(
+        width=64, height=48, fps=50, drop_rate=0.2, jitter_ms=2, duration=1.0, seed=3
+    )
+    start = time.monotonic()
+    frames = 0
+    while source.get_frame() is not None:
+        frames += 1
+    elapsed = time.monotonic() - start
+    stats = source.stats()
+    source.release()
+    assert elapsed == pytest.approx(1.0, abs=0.15)
+    assert frames + stats["source_dropped"] == 50
+    assert 3 <= stats["source_dropped"] <= 20
+
+
+def test_feed_processes_only_every_nth_frame():
+    """
+    GIVEN a 30 FPS feed and a frame skip of 3
+    WHEN it runs for a second
+    THEN about 10 frames are processed, evenly spaced, as in the player.
+    """
+    class Recorder:
+        def __init__(self):
+            self.indices = []
+
+        def process_frame(self, frame, frame_index=None, timestamp=None):
+            self.indices.append(frame_index)
+
+    model = Recorder()
+    result = run_feed(
+        {"width": 64, "height": 48, "fps": 30}, lambda: model, 1.0, frame_skip=3
+    )
+    assert 8 <= result["frames"] <= 11 and result["frames"] == len(model.indices)
+    assert set(np.diff(model.indices)) <= {2, 3, 4}
+
+
+def test_parse_synthetic_source():
+    assert parse_synthetic_source(0) is None
+    assert parse_synthetic_source("rtsp://camera") is None
+    assert parse_synthetic_source("synthetic://640x360?fps=15&targets=8&drop_rate=0.1") == {
+        "width": 640,
+        "height": 360,
+        "fps": 15.0,
+        "targets": 8,
+        "drop_rate": 0.1,
+    }
+    with pytest.raises(ValueError):
+        parse_synthetic_source("synthetic://640x360?colour=red")
+
+
+def test_load_test_stops_at_saturation():
+    """
+    GIVEN feeds at 30 FPS, each needing 50 ms of work per frame
+    WHEN the load test ramps feeds
+    THEN a single feed already cannot keep the 30 FPS target, while the
+    same feed with a frame skip of 3 (10 FPS) is sustained.
+    """
+    strict = LoadTest(
+        slow_model, resolutions=[(64, 48)], source_counts=[1, 2], duration=1.0
+    ).run()
+    assert strict["capacity"] == {"64x48": 0}
+    assert len(strict["curve"]) == 1 and strict["curve"][0]["saturated"]
+    assert strict["curve"][0]["drop_ratio"] > 0.2
+
+    skipping = LoadTest(
+        slow_model, resolutions=[(64, 48)], source_counts=[1], frame_skip=3, duration=1.0
+    ).run()
+    assert skipping["capacity"] == {"64x48": 1}
+    step = skipping["curve"][0]
+    assert step["min_feed_fps"] >= 9 and step["latency_ms"] >= 50
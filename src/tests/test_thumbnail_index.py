@@ -0,0 +1,75 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.thumbnail_index import (
+    ThumbnailIndex,
+    build_thumbnail_index,
+    index_paths,
+)
+
+
+@pytest.fixture
+def two_scene_clip(tmp_path):
+    """10 s at 10 FPS: blue for 6 s, then a red scene."""
+    path = str(tmp_path / "flight.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (160, 90))
+    for i in range(100):
+        frame = np.zeros((90, 160, 3), np.uint8)
+        frame[:, :, 0 if i < 60 else 2] = 200
+        cv2.putText(frame, str(i), (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (255,) * 3)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def test_build_samples_thumbnails_and_finds_the_cut(two_scene_clip, tmp_path):
+    """
+    GIVEN a clip that cuts from a blue to a red scene after 6 s
+    WHEN its index is built with several decoders
+    THEN thumbnails are spread evenly over the clip, come out in order,
+    and the only scene change is at the cut.
+    """
+    directory = str(tmp_path / "thumbs")
+    index = build_thumbnail_index(
+        two_scene_clip, directory, "abc", thumb_width=32, min_interval=0.5, workers=3
+    )
+    assert len(index) == 20
+    assert index.thumb_size == (32, 18)
+    assert index.strip.shape == (18, 20 * 32, 3)
+    assert index.timestamps[0] == 0 and index.timestamps[-1] == pytest.approx(9.9)
+    assert [index.timestamps[i] for i in index.scene_changes] == [
+        pytest.approx(6.25, abs=0.3)
+    ]
+    blue, red = index.thumbnail(0), index.thumbnail(19)
+    assert blue[..., 0].mean() > 150 and red[..., 2].mean() > 150
+
+
+def test_index_is_reopened_memory_mapped(two_scene_clip, tmp_path):
+    directory = str(tmp_path)
+    built = build_thumbnail_index(two_scene_clip, directory, "abc", workers=2)
+    index = ThumbnailIndex.load(directory, "abc")
+    assert isinstance(index.strip, np.memmap)
+    np.testing.assert_array_equal(index.strip, built.strip)
+    assert index.index_at(-1) == 0
+    assert index.timestamps[index.index_at(4.0)] <= 4.0
+    assert index.timestamps[index.index_at(4.0) + 1] > 4.0
+    assert index.index_at(99) == len(index) - 1
+    assert ThumbnailIndex.load(directory, "other") is None
+
+
+def test_cancelled_build_leaves_no_index(two_scene_clip, tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+    index = build_thumbnail_index(two_scene_clip, str(tmp_path), "abc", cancel=cancel)
+    assert index is None
+    assert not any(os.path.exists(p) for p in index_paths(str(tmp_path), "abc"))
+    assert os.listdir(tmp_path) == ["flight.mp4"]
+
+
+def test_unreadable_video_raises(tmp_path):
+    with pytest.raises(IOError):
+        build_thumbnail_index(str(tmp_path / "missing.mp4"), str(tmp_path), "abc")
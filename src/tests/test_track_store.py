@@ -0,0 +1,118 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.core.track_store import TrackStore, COLUMNS, INDEX_FILE
+
+
+def fill_store(store, n_frames=100):
+    """Track 1 visible on every frame, track 2 on even frames only."""
+    for i in range(n_frames):
+        ids = [1, 2] if i % 2 == 0 else [1]
+        boxes = [[i, i, 10, 20], [0, 0, 5, 5]][: len(ids)]
+        confs = [0.9, None][: len(ids)]
+        store.append(i, i / 10.0, ids, boxes, confs)
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "tracks")
+
+
+def test_append_flushes_in_chunks_and_indexes_tracks(store_path):
+    """
+    GIVEN a store with a small chunk size
+    WHEN rows are appended
+    THEN full chunks are written and the per-track index is maintained.
+    """
+    store = TrackStore(store_path, chunk_size=40)
+    fill_store(store)
+    store.close()
+
+    with open(os.path.join(store_path, INDEX_FILE)) as f:
+        index = json.load(f)
+    assert index["rows"] == 150
+    assert len(index["chunks"]) == 4
+    assert index["tracks"]["1"]["count"] == 100
+    assert index["tracks"]["2"]["count"] == 50
+    for name, dtype in COLUMNS.items():
+        size = os.path.getsize(os.path.join(store_path, f"{name}.bin"))
+        assert size == 150 * dtype.itemsize
+
+
+def test_query_trajectory_frames_and_first_last(store_path):
+    store = TrackStore(store_path, chunk_size=32)
+    fill_store(store)
+    store.close()
+
+    reader = TrackStore(store_path, mode="r")
+    assert reader.track_ids() == [1, 2]
+    np.testing.assert_array_equal(reader.frames(2), np.arange(0, 100, 2))
+
+    traj = reader.trajectory(1)
+    np.testing.assert_array_equal(traj["frame"], np.arange(100))
+    np.testing.assert_allclose(traj["x"], np.arange(100))
+    np.testing.assert_allclose(traj["confidence"], 0.9, rtol=1e-6)
+    # Tracks without a detection this frame store NaN confidence.
+    assert np.isnan(reader.trajectory(2)["confidence"]).all()
+
+    info = reader.first_last(2)
+    assert info == {
+        "count": 50,
+        "first_frame": 0,
+        "first_ts": 0.0,
+        "last_frame": 98,
+        "last_ts": 9.8,
+    }
+    assert reader.first_last(999) is None
+    assert reader.frames(999).size == 0
+
+
+def test_in_time_range(store_path):
+    store = TrackStore(store_path, chunk_size=16)
+    fill_store(store)
+    store.close()
+
+    rows = TrackStore(store_path, mode="r").in_time_range(2.0, 2.35)
+    assert list(rows["frame"]) == [20, 20, 21, 22, 22, 23]
+    assert list(rows["track_id"]) == [1, 2, 1, 1, 2, 1]
+
+
+def test_reopen_appends_and_discards_uncommitted_bytes(store_path):
+    """
+    GIVEN a store whose column files hold bytes past the committed index
+    (e.g. a crash mid-flush)
+    WHEN it is reopened for appending
+    THEN the extra bytes are discarded and new rows append cleanly.
+    """
+    store = TrackStore(store_path)
+    store.append(0, 0.0, ["7"], [[1, 2, 3, 4]], [0.5])
+    store.close()
+    with open(os.path.join(store_path, "frame.bin"), "ab") as f:
+        f.write(b"\x00" * 5)
+
+    store = TrackStore(store_path)
+    store.append(1, 0.1, ["7"], [[2, 3, 4, 5]], [0.6])
+    store.close()
+
+    reader = TrackStore(store_path, mode="r")
+    np.testing.assert_array_equal(reader.frames(7), [0, 1])
+    assert reader.first_last(7)["last_frame"] == 1
+
+
+def test_read_only_store_rejects_appends(store_path):
+    with pytest.raises(FileNotFoundError):
+        TrackStore(store_path, mode="r")
+    TrackStore(store_path).close()
+    reader = TrackStore(store_path, mode="r")
+    with pytest.raises(IOError):
+        reader.append(0, 0.0, [1], [[0, 0, 1, 1]])
+
+
+def test_flush_interval_bounds_buffered_rows(store_path):
+    store = TrackStore(store_path, flush_interval=0.0)
+    store.append(0, 0.0, [3], [[0, 0, 1, 1]])
+    # Flushed immediately, visible to a separate reader without close().
+    assert TrackStore(store_path, mode="r").frames(3).tolist() == [0]
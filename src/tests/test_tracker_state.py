@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pytest
+from deep_sort_realtime.deepsort_tracker import DeepSort
+
+from src.core.tracker_state import (
+    TrackerSnapshot,
+    next_track_id,
+    reserve_track_ids,
+    snapshot_path,
+)
+
+
+def _tracker():
+    return DeepSort(max_age=10, nn_budget=30, embedder=None)
+
+
+def _step(deepsort, x, embeds):
+    detections = [([x, 10, 40, 80], 0.9, 0), ([200, 50, 40, 80], 0.8, 0)]
+    return deepsort.update_tracks(detections, embeds=embeds)
+
+
+def test_restored_tracker_keeps_ids_after_restart(tmp_path):
+    """
+    GIVEN a tracker with two confirmed tracks, saved to disk
+    WHEN a fresh tracker restores the snapshot and sees the same people
+    THEN they keep their IDs instead of starting new tracks, and the
+    Kalman states, feature budgets and ID counter are carried over.
+    """
+    rng = np.random.default_rng(0)
+    embeds = [rng.normal(size=128) for _ in range(2)]
+    original = _tracker()
+    for i in range(5):
+        _step(original, 10 + i, embeds)
+    path = snapshot_path(str(tmp_path / "state"), "rtsp://drone/cam")
+    TrackerSnapshot.capture(original, frame_index=5, timestamp=12.5).save(path)
+
+    loaded = TrackerSnapshot.load(path)
+    restarted = _tracker()
+    loaded.restore(restarted)
+
+    assert loaded.meta["frame_index"] == 5 and loaded.meta["timestamp"] == 12.5
+    assert restarted.tracker._next_id == original.tracker._next_id == 3
+    for before, after in zip(original.tracker.tracks, restarted.tracker.tracks):
+        assert after.track_id == before.track_id
+        assert after.state == before.state and after.hits == before.hits
+        np.testing.assert_allclose(after.mean, before.mean)
+        np.testing.assert_allclose(after.covariance, before.covariance)
+    assert {k: len(v) for k, v in restarted.tracker.metric.samples.items()} == {
+        k: len(v) for k, v in original.tracker.metric.samples.items()
+    }
+
+    tracks = _step(restarted, 15, embeds)
+    assert sorted(t.track_id for t in tracks if t.is_confirmed()) == ["1", "2"]
+    assert restarted.tracker._next_id == 3
+
+
+def test_restore_never_lowers_the_id_counter():
+    deepsort = _tracker()
+    deepsort.tracker._next_id = 40
+    TrackerSnapshot(7, [], {}).restore(deepsort)
+    assert deepsort.tracker._next_id == 40 and deepsort.tracker.tracks == []
+
+
+def test_empty_tracker_round_trips(tmp_path):
+    path = str(tmp_path / "empty.npz")
+    TrackerSnapshot.capture(_tracker(), timestamp=0.0).save(path)
+    loaded = TrackerSnapshot.load(path)
+    assert loaded.tracks == [] and loaded.samples == {} and loaded.next_id == 1
+    assert not os.path.exists(path + ".partial.npz")
+
+
+def test_matches_requires_nearby_timestamp_and_same_transform():
+    snapshot = TrackerSnapshot(1, [], {}, {"timestamp": 100.0, "transform": [0.5, 0, 140]})
+    assert snapshot.matches(101.5, (0.5, 0, 140))
+    assert not snapshot.matches(110.0, (0.5, 0, 140))
+    assert not snapshot.matches(100.0, None)
+    assert not snapshot.matches(None, (0.5, 0, 140))
+    assert TrackerSnapshot(1, [], {}, {"timestamp": 3.0, "transform": None}).matches(2.0)
+
+
+def test_reserved_ids_are_used_by_the_installed_deep_sort():
+    """
+    GIVEN the installed deep_sort_realtime
+    WHEN IDs below 41 are reserved
+    THEN the next new track is "41". This breaks if a release renames or
+    stops using the private counter the helpers set.
+    """
+    deepsort = _tracker()
+    assert next_track_id(deepsort) == 1
+    reserve_track_ids(deepsort, 41)
+    reserve_track_ids(deepsort, 5)
+    tracks = deepsort.update_tracks([([10, 10, 40, 80], 0.9, 0)], embeds=[np.ones(128)])
+    assert [t.track_id for t in tracks] == ["41"]
+    assert next_track_id(deepsort) == 42
+
+
+def test_missing_id_counter_fails_loudly():
+    class Renamed:
+        tracker = object()
+
+    with pytest.raises(RuntimeError):
+        next_track_id(Renamed())
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.core.video_utils.video_queue import VideoQueue, item_nbytes
+
+
+@pytest.fixture
+def archive_queue():
+    queue = VideoQueue()
+    queue.clear()
+    yield queue
+    queue.configure()
+    queue.clear()
+
+
+def frame(value, size=100):
+    return (np.full(size, value, np.uint8), b"tracks", value, value / 30)
+
+
+def test_bytes_are_tracked_through_enqueue_and_dequeue(archive_queue):
+    assert item_nbytes(frame(0)) == 106
+    archive_queue.enqueue(frame(0))
+    archive_queue.enqueue(frame(1))
+    assert archive_queue.nbytes() == 212
+    archive_queue.dequeue()
+    assert archive_queue.nbytes() == 106
+    archive_queue.clear()
+    assert archive_queue.nbytes() == 0
+
+
+def test_limits_drop_the_oldest_frames(archive_queue):
+    """
+    GIVEN a queue limited to 300 bytes and, separately, to 2 frames
+    WHEN more frames are enqueued
+    THEN the oldest are dropped and counted, and the newest are kept.
+    """
+    dropped = archive_queue.dropped()
+    archive_queue.configure(max_bytes=300)
+    for value in range(5):
+        archive_queue.enqueue(frame(value))
+    assert archive_queue.size() == 2 and archive_queue.nbytes() == 212
+    assert archive_queue.dequeue()[2] == 3
+
+    archive_queue.configure(max_size=2)
+    for value in range(5, 8):
+        archive_queue.enqueue(frame(value))
+    assert [archive_queue.dequeue()[2] for _ in range(2)] == [6, 7]
+    assert archive_queue.dropped() - dropped == 5
+
+
+def test_shed_frees_the_oldest_frames(archive_queue):
+    for value in range(4):
+        archive_queue.enqueue(frame(value))
+    assert archive_queue.shed(150) == 212
+    assert archive_queue.size() == 2 and archive_queue.dequeue()[2] == 2
+    assert archive_queue.shed(10_000) == 106
+    assert archive_queue.shed(10) == 0
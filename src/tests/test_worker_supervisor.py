@@ -0,0 +1,155 @@
+import multiprocessing as mp
+import os
+import time
+
+import pytest
+
+from src.core.metrics import MetricsLog, read_metrics
+from src.core.worker_supervisor import WorkerSupervisor
+
+
+def fake_worker(handle, behaviour):
+    """
+    Stand-in for process_frames_worker: "ok" processes frames forever,
+    "crash" exits after its first frame, "hang" blocks inside a frame and
+    "mute" stops sending heartbeats between frames.
+    """
+    handle.ready()
+    if not handle.wait_until_active(poll=0.01):
+        return
+    while handle.running.value:
+        handle.beat()
+        if behaviour == "mute":
+            time.sleep(60)
+        handle.begin_frame()
+        if behaviour == "hang":
+            time.sleep(60)
+        time.sleep(0.01)
+        handle.end_frame()
+        if behaviour == "crash":
+            os._exit(3)
+
+
+def make_spawner(behaviours):
+    """Spawns workers with the given behaviours in turn, then "ok" ones."""
+    spawned = []
+
+    def spawn(handle):
+        behaviour = behaviours.pop(0) if behaviours else "ok"
+        process = mp.Process(target=fake_worker, args=(handle, behaviour), daemon=True)
+        process.start()
+        spawned.append((behaviour, process))
+        return process
+
+    return spawn, spawned
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(0.02)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.fixture
+def supervisor_factory():
+    supervisors = []
+
+    def factory(behaviours, **kwargs):
+        spawn, spawned = make_spawner(list(behaviours))
+        options = dict(heartbeat_timeout=0.5, frame_timeout=0.5, stop_timeout=0.5)
+        options.update(kwargs)
+        supervisor = WorkerSupervisor(spawn, **options)
+        supervisors.append(supervisor)
+        return supervisor, spawned
+
+    yield factory
+    for supervisor in supervisors:
+        supervisor.stop()
+
+
+def test_crashed_worker_is_replaced_by_standby(supervisor_factory, tmp_path):
+    """
+    GIVEN an active worker that dies after one frame and a warm standby
+    WHEN the supervisor checks health
+    THEN the standby takes over, a new standby is started and the
+    incident and recovery are recorded.
+    """
+    metrics = MetricsLog(str(tmp_path / "metrics.jsonl"))
+    supervisor, spawned = supervisor_factory(["crash", "ok"], metrics=metrics)
+    supervisor.start()
+    standby = supervisor.standby
+    wait_for(lambda: standby.is_ready.value)
+
+    incident = wait_for(supervisor.check)
+    assert incident["kind"] == "crashed"
+    assert incident["exitcode"] == 3
+    assert incident["recovery"] == "standby"
+    assert supervisor.active is standby
+    assert supervisor.standby is not None and supervisor.standby is not standby
+    assert len(spawned) == 3
+
+    wait_for(lambda: standby.frames.value > 0)
+    supervisor.check()
+    metrics.close()
+    records = read_metrics(metrics.path)
+    assert [r["event"] for r in records] == ["worker_incident", "worker_recovered"]
+    assert records[1]["outage_ms"] >= 0
+
+
+def test_stalled_frame_is_detected(supervisor_factory):
+    supervisor, _ = supervisor_factory(["hang"], standby=False)
+    supervisor.start()
+    hung = supervisor.active
+    incident = wait_for(supervisor.check)
+    assert incident["kind"] == "stalled"
+    assert incident["recovery"] == "cold_start"
+    assert not hung.process.is_alive()
+    assert supervisor.active is not hung
+
+
+def test_missing_heartbeats_are_detected(supervisor_factory):
+    supervisor, _ = supervisor_factory(["mute"], standby=False)
+    supervisor.start()
+    incident = wait_for(supervisor.check)
+    assert incident["kind"] == "unresponsive"
+
+
+def test_healthy_worker_is_left_alone(supervisor_factory):
+    supervisor, spawned = supervisor_factory([])
+    supervisor.start()
+    active = supervisor.active
+    wait_for(lambda: active.frames.value > 5)
+    for _ in range(10):
+        assert supervisor.check() is None
+        time.sleep(0.05)
+    assert supervisor.active is active
+    assert supervisor.standby.frames.value == 0
+    assert len(spawned) == 2
+
+
+def test_dead_standby_is_restarted(supervisor_factory):
+    retired = []
+    supervisor, _ = supervisor_factory([], on_retired=retired.append)
+    supervisor.start()
+    standby = supervisor.standby
+    standby.process.kill()
+    standby.process.join()
+    incident = wait_for(supervisor.check)
+    assert incident["kind"] == "standby_crashed"
+    assert supervisor.standby is not standby
+    assert retired == [standby.pid]
+
+
+def test_stop_ends_all_workers(supervisor_factory):
+    retired = []
+    supervisor, spawned = supervisor_factory(["hang"], on_retired=retired.append)
+    supervisor.start()
+    wait_for(lambda: supervisor.active.busy_since.value)
+    supervisor.stop(timeout=0.1)
+    assert not any(process.is_alive() for _, process in spawned)
+    assert sorted(retired) == sorted(process.pid for _, process in spawned)
+    assert supervisor.pids == []
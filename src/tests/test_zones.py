@@ -0,0 +1,153 @@
+import time
+
+import numpy as np
+
+from src.core.analytics.zones import (
+    Line,
+    Zone,
+    ZoneCounter,
+    points_in_polygon,
+    segments_intersect,
+)
+from src.core.metrics import read_metrics
+
+
+def at(track_id, x, y):
+    """A 10 x 20 box whose foot point is (x, y)."""
+    return {"track_id": track_id, "bbox": [x - 5, y - 20, 10, 20]}
+
+
+def test_vectorised_geometry():
+    points = np.array([[5, 5], [15, 5], [5, 15], [10, 0]], np.float32)
+    square = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], np.float32)
+    assert points_in_polygon(points, square)[:3].tolist() == [True, False, False]
+
+    p = np.array([[0, -5], [0, -5], [20, -5]], np.float32)
+    q = np.array([[0, 5], [5, -1], [20, 5]], np.float32)
+    a = np.array([[-10, 0]], np.float32)
+    b = np.array([[10, 0]], np.float32)
+    # Through the segment, not reaching it, and beside its end.
+    assert segments_intersect(p, q, a, b)[:, 0].tolist() == [True, False, False]
+
+
+def test_line_crossings_are_counted_once_per_direction():
+    """
+    GIVEN a horizontal line from (0, 50) to (100, 50)
+    WHEN one person walks down across it and stays, and another walks up
+    THEN each crossing counts once, in its direction, and standing on the
+    line or hovering beyond it adds nothing.
+    """
+    counter = ZoneCounter(lines=[Line("gate", (0, 50), (100, 50))])
+    frames = [
+        [at(1, 50, 30), at(2, 20, 80)],
+        [at(1, 50, 50), at(2, 20, 60)],  # 1 stands on the line
+        [at(1, 50, 60), at(2, 20, 40)],  # 1 crosses down, 2 crosses up
+        [at(1, 51, 70), at(2, 20, 30)],
+        [at(1, 52, 65), at(2, 20, 35)],
+    ]
+    events = [counter.update(tracks, t / 10) for t, tracks in enumerate(frames)]
+
+    # Walking from a (left) to b (right), downwards is left to right: "in".
+    assert counter.counts()["lines"] == {"gate": {"in": 1, "out": 1}}
+    assert {(e["track_id"], e["direction"]) for e in events[2]} == {(1, "in"), (2, "out")}
+    assert not events[3] and not events[4]
+
+
+def test_crossings_replayed_after_a_seek_back_count_once():
+    """
+    GIVEN a person crossing a line at frame 2, counted with frame indices
+    WHEN playback seeks back to frame 0 and plays the crossing again
+    THEN it is still one crossing, and new frames count again.
+    """
+    counter = ZoneCounter(lines=[Line("gate", (0, 50), (100, 50))])
+    walk = [at(1, 50, 30), at(1, 50, 40), at(1, 50, 60), at(1, 50, 70)]
+    for i, track in enumerate(walk):
+        counter.update([track], i / 10, frame_index=i)
+    replayed = [counter.update([track], i / 10, i) for i, track in enumerate(walk)]
+    assert replayed == [[], [], [], []]
+    assert counter.counts()["lines"]["gate"] == {"in": 1, "out": 0}
+
+    events = counter.update([at(1, 50, 30)], 0.4, frame_index=4)
+    assert [e["direction"] for e in events] == ["out"]
+    assert counter.frames == 5
+
+
+def test_passing_beside_a_line_does_not_count():
+    counter = ZoneCounter(lines=[Line("short", (0, 50), (40, 50))])
+    counter.update([at(1, 80, 30)], 0.0)
+    events = counter.update([at(1, 80, 70)], 0.1)
+    assert events == []
+    assert counter.counts()["lines"]["short"] == {"in": 0, "out": 0}
+
+
+def test_zone_entries_exits_and_occupancy():
+    """
+    GIVEN a square zone
+    WHEN one person walks in and out again, and another is first seen inside
+    THEN the walker counts one entry and one exit, and the person first
+    seen inside counts towards occupancy but not as an entry.
+    """
+    counter = ZoneCounter(zones=[Zone("pad", [(10, 10), (60, 10), (60, 60), (10, 60)])])
+    counter.update([at(1, 0, 30)], 0.0)
+    counter.update([at(1, 30, 30), at(2, 40, 40)], 0.1)
+    assert counter.counts()["zones"]["pad"] == {"entered": 1, "exited": 0, "occupancy": 2}
+    events = counter.update([at(1, 80, 30), at(2, 40, 40)], 0.2)
+    assert events == [
+        {"kind": "zone", "name": "pad", "direction": "exited", "track_id": 1}
+    ]
+    assert counter.counts()["zones"]["pad"] == {"entered": 1, "exited": 1, "occupancy": 1}
+
+
+def test_geometry_added_later_starts_from_the_next_observation():
+    counter = ZoneCounter()
+    counter.update([at(1, 30, 30)], 0.0)
+    counter.add_zone(Zone("pad", [(0, 0), (50, 0), (50, 50), (0, 50)]))
+    counter.add_line(Line("gate", (0, 40), (100, 40)))
+    counter.update([at(1, 31, 30)], 0.1)
+    counter.update([at(1, 32, 45)], 0.2)
+    counts = counter.counts()
+    assert counts["zones"]["pad"]["entered"] == 0
+    assert counts["lines"]["gate"] == {"in": 1, "out": 0}
+    assert ZoneCounter.from_dict(counter.to_dict()).to_dict() == counter.to_dict()
+
+
+def test_reports_are_written_periodically(tmp_path):
+    path = str(tmp_path / "counts.jsonl")
+    counter = ZoneCounter(
+        lines=[Line("gate", (0, 50), (100, 50))],
+        report_path=path,
+        report_interval=1.0,
+    )
+    for i in range(25):
+        counter.update([at(1, 50, 30 if i < 12 else 70)], i / 10)
+    counter.close()
+
+    reports = read_metrics(path, "zone_counts")
+    assert [r["video_time"] for r in reports] == [1.0, 2.0, 2.4]
+    assert reports[0]["lines"]["gate"]["in"] == 0
+    assert reports[-1]["lines"]["gate"]["in"] == 1
+
+
+def test_hundreds_of_tracks_stay_cheap():
+    """
+    GIVEN 300 tracks and 10 lines and zones
+    WHEN frames are counted
+    THEN a frame takes a few milliseconds at most, negligible next to
+    inference, and all track state is kept.
+    """
+    rng = np.random.default_rng(0)
+    counter = ZoneCounter(
+        lines=[Line(f"l{i}", (0, 20 * i), (640, 20 * i + 5)) for i in range(10)],
+        zones=[
+            Zone(f"z{i}", [(30 * i, 0), (30 * i + 60, 0), (30 * i + 60, 400), (30 * i, 400)])
+            for i in range(10)
+        ],
+    )
+    positions = rng.uniform(0, 480, (300, 2))
+    start = time.perf_counter()
+    for frame in range(50):
+        positions += rng.normal(0, 3, positions.shape)
+        counter.update([at(i, x, y) for i, (x, y) in enumerate(positions)], frame / 30)
+    per_frame = (time.perf_counter() - start) / 50
+    assert per_frame < 0.02
+    assert len(counter._slots) == 300